@@ -0,0 +1,635 @@
+#!/usr/bin/env python3
+"""
+Alert rule evaluator for deployment/monitoring-alerting-config.yml
+
+The alerts.rules section of the monitoring config declares the alerts
+(Application Down, High Error Rate, Slow Response Time, ...) as condition
+strings such as "uptime < 99%" or "response_time > 1500ms". This module
+compiles each rule into a comparison over a sliding time window of
+health-probe samples and runs it through an alert state machine:
+
+    samples    one record per probe: a timestamp plus any of up, error,
+               response_time (ms), database_health, cache_hit_rate (%) and
+               memory_usage (%). A status field fills in up and error when
+               they are missing. Metrics a sample does not carry are skipped
+    windows    uptime and error_rate are the mean of up / error over the
+               last 5 minutes, response_time, cache_hit_rate and
+               memory_usage the mean of the reported values;
+               database_health is the latest sample. A window keeps prefix
+               sums over its samples, so adding a sample and reading the
+               window mean is O(1); rules on the same metric share it
+    states     ok -> pending when the condition becomes true (and the
+               window has --min-samples samples), pending -> firing once it
+               has held for the rule's optional `for` (default 0s, so an
+               alert fires on the first matching sample), firing -> resolved
+               when it stops. A firing alert climbs alerts.escalation.levels
+               (level 1 at 0s, level 2 at 5m, level 3 at 15m); each level
+               notifies the rule's channels that the level lists. A rule's
+               escalation_time is when it reaches level 2: the later levels
+               keep their spacing from it (Database Connection Failed,
+               escalation_time 180, escalates at 3m and 13m)
+
+Samples are evaluated in batches: window means for a whole batch come from
+one cumulative sum and a searchsorted, the conditions from one comparison,
+and the state machine only runs at the samples where a condition flips or
+a deadline (firing, next escalation level) falls. --stream evaluates one
+sample at a time instead, the way a live probe loop would; both give the
+same transitions, which is what replay --expect checks against a recorded
+stream.
+
+Usage:
+    python alert_rules.py rules
+    python alert_rules.py simulate samples.jsonl --hours 6 --rate 20 --seed 7
+    python alert_rules.py replay samples.jsonl --output transitions.jsonl
+    python alert_rules.py replay tests/fixtures/alert_samples.jsonl --stream \
+        --expect tests/fixtures/alert_transitions.jsonl
+    python alert_rules.py bench --rate 2000 --hours 1
+
+Requirements:
+    pip install numpy pyyaml
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG = os.path.join(SCRIPT_DIR, "deployment", "monitoring-alerting-config.yml")
+DEFAULT_MIN_SAMPLES = 3  # a window with fewer samples never matches
+DEFAULT_BATCH = 65536  # samples per batch when replaying
+# metric: (sample field, aggregation, window seconds, scale applied to the aggregate)
+METRICS = {
+    "uptime": ("up", "mean", 300, 100.0),
+    "error_rate": ("error", "mean", 300, 100.0),
+    "response_time": ("response_time", "mean", 300, 1.0),
+    "cache_hit_rate": ("cache_hit_rate", "mean", 600, 1.0),
+    "memory_usage": ("memory_usage", "mean", 300, 1.0),
+    "database_health": ("database_health", "last", 0, 1.0),
+}
+OPERATORS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "=": np.equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+UNITS = {"%": 1.0, "ms": 1.0, "s": 1000.0, "": 1.0}
+LITERALS = {"true": 1.0, "false": 0.0, "up": 1.0, "down": 0.0}
+
+
+class SlidingWindow:
+    """Samples of the last `seconds` seconds, as timestamps and prefix sums
+
+    Live samples are ts[head:size]; prefix[i] is the sum of the values
+    before sample i, so the window sum for sample j is
+    prefix[j + 1] - prefix[head]. The arrays are compacted (and the prefix
+    sums rebased) when they fill, which keeps appends amortised O(1).
+    """
+
+    def __init__(self, seconds: float, capacity: int = 1024):
+        self.seconds = seconds
+        self.ts = np.empty(capacity)
+        self.prefix = np.zeros(capacity + 1)
+        self.head = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size - self.head
+
+    def _reserve(self, extra: int):
+        if self.size + extra <= len(self.ts):
+            return
+        live = self.size - self.head
+        capacity = len(self.ts)
+        if live + extra > capacity // 2:
+            capacity = 2 * (live + extra)
+        ts = np.empty(capacity)
+        prefix = np.empty(capacity + 1)
+        ts[:live] = self.ts[self.head:self.size]
+        prefix[:live + 1] = self.prefix[self.head:self.size + 1] - self.prefix[self.head]
+        self.ts, self.prefix = ts, prefix
+        self.head, self.size = 0, live
+
+    def push(self, timestamp: float, value: float) -> Tuple[float, int]:
+        """Add one sample; returns the window mean and sample count"""
+        self._reserve(1)
+        n = self.size
+        self.ts[n] = timestamp
+        self.prefix[n + 1] = self.prefix[n] + value
+        self.size = n + 1
+        cutoff = timestamp - self.seconds
+        head = self.head
+        while self.ts[head] <= cutoff:
+            head += 1
+        self.head = head
+        count = n + 1 - head
+        return (self.prefix[n + 1] - self.prefix[head]) / count, count
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Add a batch of samples; returns the window mean and count as of each one"""
+        k = len(timestamps)
+        self._reserve(k)
+        n = self.size
+        self.ts[n:n + k] = timestamps
+        # Summed in the same order as push() so both paths agree to the bit
+        self.prefix[n + 1:n + k + 1] = np.cumsum(np.concatenate(([self.prefix[n]], values)))[1:]
+        self.size = n + k
+        starts = np.searchsorted(self.ts[self.head:n + k], timestamps - self.seconds, side="right") + self.head
+        ends = np.arange(n + 1, n + k + 1)
+        counts = ends - starts
+        self.head = int(starts[-1])
+        return (self.prefix[ends] - self.prefix[starts]) / counts, counts
+
+
+class Rule:
+    """One compiled alert rule"""
+
+    def __init__(self, name: str, severity: str, condition: str, channels: List[str],
+                 for_seconds: float = 0, window: Optional[float] = None, min_samples: int = DEFAULT_MIN_SAMPLES,
+                 escalation_time: float = 0):
+        self.name = name
+        self.severity = severity
+        self.condition = condition
+        self.metric, self.operator, self.threshold = parse_condition(condition)
+        self.field, self.aggregation, default_window, self.scale = METRICS[self.metric]
+        self.window = float(default_window if window is None else window)
+        self.channels = list(channels)
+        self.for_seconds = float(for_seconds)
+        self.escalation_time = float(escalation_time)
+        self.min_samples = 1 if self.aggregation == "last" else int(min_samples)
+        self.compare = OPERATORS[self.operator]
+
+    def matches(self, values, counts):
+        return self.compare(values, self.threshold) & (counts >= self.min_samples)
+
+    def describe(self) -> str:
+        window = "latest sample" if self.aggregation == "last" else f"{self.aggregation} over {self.window:g}s"
+        return (f"{self.name:<28} {self.severity:<8} {self.metric} {self.operator} {self.threshold:g} "
+                f"({window}, fires after {self.for_seconds:g}s, escalates after {self.escalation_time:g}s) "
+                f"-> {', '.join(self.channels)}")
+
+
+def parse_condition(condition: str) -> Tuple[str, str, float]:
+    """Split "response_time > 1500ms" into (metric, operator, threshold)"""
+    for operator in sorted(OPERATORS, key=len, reverse=True):
+        metric, found, value = condition.partition(operator)
+        if found:
+            break
+    else:
+        raise ValueError(f"No comparison operator in condition '{condition}'")
+    metric, value = metric.strip(), value.strip().lower()
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}' in condition '{condition}' "
+                         f"(known: {', '.join(METRICS)})")
+    if value in LITERALS:
+        return metric, operator, LITERALS[value]
+    number = value.rstrip("%ms")
+    unit = value[len(number):]
+    if unit not in UNITS:
+        raise ValueError(f"Unknown unit '{unit}' in condition '{condition}'")
+    try:
+        return metric, operator, float(number) * UNITS[unit]
+    except ValueError:
+        raise ValueError(f"Bad threshold '{value}' in condition '{condition}'") from None
+
+
+def load_config(path: str = DEFAULT_CONFIG, min_samples: int = DEFAULT_MIN_SAMPLES) -> Tuple[List[Rule], List[Dict]]:
+    """Compile alerts.rules and alerts.escalation.levels from the monitoring config"""
+    import yaml
+
+    with open(path, "r", encoding="utf-8") as f:
+        alerts = (yaml.safe_load(f) or {}).get("alerts", {})
+
+    rules = []
+    for group, entries in (alerts.get("rules") or {}).items():
+        severity = group[:-len("_alerts")] if group.endswith("_alerts") else group
+        for entry in entries or []:
+            rules.append(Rule(entry["name"], severity, entry["condition"], entry.get("channels", []),
+                              entry.get("for", 0), entry.get("window"),
+                              entry.get("min_samples", min_samples), entry.get("escalation_time", 0)))
+    levels = [{"level": int(level), "delay": float(spec.get("delay", 0)), "channels": spec.get("channels", [])}
+              for level, spec in sorted((alerts.get("escalation") or {}).get("levels", {}).items(),
+                                        key=lambda item: int(item[0]))]
+    return rules, levels
+
+
+class AlertState:
+    """State machine of one rule: ok, pending, firing"""
+
+    def __init__(self, rule: Rule, levels: List[Dict]):
+        self.rule = rule
+        levels = levels or [{"level": 1, "delay": 0.0, "channels": rule.channels}]
+        if rule.escalation_time and len(levels) > 1:
+            # The rule's escalation_time moves level 2; later levels keep their spacing from it
+            shift = rule.escalation_time - levels[1]["delay"]
+            levels = levels[:1] + [{**level, "delay": max(level["delay"] + shift, levels[0]["delay"])}
+                                   for level in levels[1:]]
+        self.levels = levels
+        self.state = "ok"
+        self.since = 0.0
+        self.fired_at = 0.0
+        self.level = 0
+
+    def next_deadline(self) -> Optional[float]:
+        if self.state == "pending":
+            return self.since + self.rule.for_seconds
+        if self.state == "firing" and self.level < len(self.levels):
+            return self.fired_at + self.levels[self.level]["delay"]
+        return None
+
+    def _channels(self, level: int) -> List[str]:
+        listed = set(self.levels[level - 1]["channels"])
+        return [c for c in self.rule.channels if c in listed] or self.rule.channels
+
+    def _event(self, timestamp: float, state: str, value: float) -> Dict:
+        event = {"timestamp": float(timestamp), "rule": self.rule.name, "severity": self.rule.severity,
+                 "state": state, "metric": self.rule.metric, "value": round(float(value), 3),
+                 "threshold": self.rule.threshold}
+        if state in ("firing", "escalated"):
+            event["level"] = self.level
+            event["channels"] = self._channels(self.level)
+        elif state == "resolved":
+            event["channels"] = sorted({c for level in range(1, self.level + 1) for c in self._channels(level)})
+        return event
+
+    def step(self, timestamp: float, matched: bool, value: float) -> List[Dict]:
+        """Advance on one evaluated sample"""
+        events = []
+        if not matched:
+            if self.state != "ok":
+                events.append(self._event(timestamp, "resolved" if self.state == "firing" else "inactive", value))
+                self.state = "ok"
+            return events
+        if self.state == "ok":
+            self.state, self.since = "pending", timestamp
+            events.append(self._event(timestamp, "pending", value))
+        if self.state == "pending" and timestamp >= self.since + self.rule.for_seconds:
+            self.state, self.fired_at, self.level = "firing", timestamp, 0
+        while self.state == "firing" and self.level < len(self.levels) \
+                and timestamp >= self.fired_at + self.levels[self.level]["delay"]:
+            self.level += 1
+            events.append(self._event(timestamp, "firing" if self.level == 1 else "escalated", value))
+        return events
+
+    def scan(self, timestamps: np.ndarray, matched: np.ndarray, values: np.ndarray) -> List[Dict]:
+        """Advance over a batch, stepping only where something can change"""
+        events = []
+        n = len(timestamps)
+        if n == 0:
+            return events
+        flips = (np.flatnonzero(matched[1:] != matched[:-1]) + 1).tolist()
+        for start, end in zip([0] + flips, flips + [n]):
+            if not matched[start]:
+                if self.state != "ok":
+                    events += self.step(timestamps[start], False, values[start])
+                continue
+            i = start
+            events += self.step(timestamps[i], True, values[i])
+            while True:
+                deadline = self.next_deadline()
+                if deadline is None:
+                    break
+                i += 1 + int(np.searchsorted(timestamps[i + 1:end], deadline))
+                if i >= end:
+                    break
+                events += self.step(timestamps[i], True, values[i])
+        return events
+
+
+class AlertEvaluator:
+    """Compiled rules plus the windows and alert states they run over"""
+
+    def __init__(self, rules: List[Rule], levels: Optional[List[Dict]] = None):
+        self.rules = rules
+        self.states = [AlertState(rule, levels or []) for rule in rules]
+        # Rules on the same metric and window share one SlidingWindow
+        self.groups: Dict[Tuple[str, float], Tuple[Optional[SlidingWindow], List[AlertState]]] = {}
+        for state in self.states:
+            rule = state.rule
+            key = (rule.metric, rule.window if rule.aggregation == "mean" else 0.0)
+            if key not in self.groups:
+                self.groups[key] = (SlidingWindow(rule.window) if rule.aggregation == "mean" else None, [])
+            self.groups[key][1].append(state)
+        self.fields = sorted({rule.field for rule in rules})
+        self.last_timestamp = -math.inf
+        self.samples = 0
+        self.late = 0
+
+    def feed(self, columns: Dict[str, np.ndarray]) -> List[Dict]:
+        """Evaluate a batch of samples given as columns (NaN = metric not sampled)"""
+        timestamps = np.asarray(columns["timestamp"], dtype=np.float64)
+        if len(timestamps) > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind="stable")
+            columns = {name: np.asarray(column)[order] for name, column in columns.items()}
+            timestamps = timestamps[order]
+        keep = timestamps >= self.last_timestamp
+        if not keep.all():
+            self.late += int(len(keep) - keep.sum())
+            timestamps = timestamps[keep]
+            columns = {name: np.asarray(column)[keep] for name, column in columns.items()}
+        if not len(timestamps):
+            return []
+        self.last_timestamp = timestamps[-1]
+        self.samples += len(timestamps)
+
+        events = []
+        for (metric, _), (window, states) in self.groups.items():
+            rule = states[0].rule
+            column = columns.get(rule.field)
+            if column is None:
+                continue
+            column = np.asarray(column, dtype=np.float64)
+            present = ~np.isnan(column)
+            ts, values = timestamps[present], column[present]
+            if not len(ts):
+                continue
+            if window is None:
+                aggregates, counts = values * rule.scale, np.ones(len(values), dtype=np.int64)
+            else:
+                means, counts = window.extend(ts, values)
+                aggregates = means * rule.scale
+            for state in states:
+                events += state.scan(ts, state.rule.matches(aggregates, counts), aggregates)
+        events.sort(key=lambda event: event["timestamp"])
+        return events
+
+    def push(self, sample: Dict) -> List[Dict]:
+        """Evaluate one sample (a dict with timestamp and metric fields)"""
+        timestamp = float(sample["timestamp"])
+        if timestamp < self.last_timestamp:
+            self.late += 1
+            return []
+        self.last_timestamp = timestamp
+        self.samples += 1
+        events = []
+        for (metric, _), (window, states) in self.groups.items():
+            rule = states[0].rule
+            value = sample.get(rule.field)
+            if value is None or value != value:
+                continue
+            if window is None:
+                aggregate, count = float(value) * rule.scale, 1
+            else:
+                mean, count = window.push(timestamp, float(value))
+                aggregate = mean * rule.scale
+            for state in states:
+                events += state.step(timestamp, bool(state.rule.matches(aggregate, count)), aggregate)
+        return events
+
+    def status(self) -> List[Dict]:
+        return [{"rule": s.rule.name, "state": s.state, "level": s.level if s.state == "firing" else 0}
+                for s in self.states]
+
+
+# =====================================================
+# Recorded sample streams
+# =====================================================
+
+def _timestamp(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        stamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if stamp.tzinfo is None:
+            stamp = stamp.replace(tzinfo=timezone.utc)
+        return stamp.timestamp()
+
+
+def _number(value) -> float:
+    if value is None or value == "":
+        return math.nan
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in LITERALS:
+            return LITERALS[lowered]
+        return float(lowered)
+    return float(value)
+
+
+def normalise(record: Dict, fields: List[str]) -> Dict:
+    """Timestamp and numeric fields of one recorded sample; status fills in up and error"""
+    sample = {"timestamp": _timestamp(record.get("timestamp", record.get("ts")))}
+    status = record.get("status")
+    for field in fields:
+        value = _number(record.get(field))
+        if value != value and status not in (None, ""):
+            code = int(status)
+            if field == "up":
+                value = 1.0 if 200 <= code < 400 else 0.0
+            elif field == "error":
+                value = 1.0 if code == 0 or code >= 500 else 0.0
+        sample[field] = value
+    return sample
+
+
+def read_samples(path: str, fields: List[str]) -> Iterator[Dict]:
+    """Samples from a JSON lines or CSV recording ('-' reads JSON lines from stdin)"""
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", newline="")
+    try:
+        if path.endswith(".csv"):
+            records = csv.DictReader(f)
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+        for record in records:
+            yield normalise(record, fields)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def batches(samples: Iterator[Dict], fields: List[str], size: int = DEFAULT_BATCH) -> Iterator[Dict[str, np.ndarray]]:
+    """Group samples into column arrays of up to `size` rows"""
+    names = ["timestamp"] + fields
+    rows = []
+    for sample in samples:
+        rows.append([sample[name] for name in names])
+        if len(rows) == size:
+            table = np.array(rows, dtype=np.float64)
+            yield {name: table[:, i] for i, name in enumerate(names)}
+            rows = []
+    if rows:
+        table = np.array(rows, dtype=np.float64)
+        yield {name: table[:, i] for i, name in enumerate(names)}
+
+
+def simulate(hours: float, rate: float, seed: int = 0, start: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """A synthetic probe stream with an outage, a slow spell, a cache drop and a memory climb
+
+    Every sample carries up, error and response_time; one in ten also has
+    the /api/health/detailed fields (database_health, cache_hit_rate,
+    memory_usage).
+    """
+    rng = np.random.default_rng(seed)
+    n = int(hours * 3600 * rate)
+    start = time.time() - hours * 3600 if start is None else start
+    offsets = np.sort(rng.uniform(0, hours * 3600, n))
+    timestamps = start + offsets
+    up = (rng.random(n) > 0.001).astype(np.float64)
+    error = (rng.random(n) < 0.002).astype(np.float64)
+    response_time = rng.lognormal(np.log(250), 0.4, n)
+    detailed = rng.random(n) < 0.1
+    database_health = np.where(detailed, 1.0, np.nan)
+    cache_hit_rate = np.where(detailed, rng.normal(85, 4, n), np.nan)
+    memory_usage = np.where(detailed, rng.normal(55, 5, n), np.nan)
+
+    def during(begin: float, minutes: float) -> np.ndarray:
+        at = begin * hours * 3600
+        return (offsets >= at) & (offsets < at + minutes * 60)
+
+    outage = during(0.2, 8)
+    up[outage], error[outage] = 0.0, 1.0
+    database_health[outage & detailed] = 0.0
+    response_time[during(0.4, 25)] *= 8
+    cache_hit_rate[during(0.6, 45)] -= 40
+    climb = during(0.75, 30)
+    memory_usage[climb] += np.linspace(0, 40, int(climb.sum()))
+    return {"timestamp": timestamps, "up": up, "error": error, "response_time": response_time,
+            "database_health": database_health, "cache_hit_rate": cache_hit_rate, "memory_usage": memory_usage}
+
+
+def _rows(columns: Dict[str, np.ndarray]) -> Iterator[Dict]:
+    names = list(columns)
+    for row in zip(*(columns[name].tolist() for name in names)):
+        yield {name: value for name, value in zip(names, row) if value == value}
+
+
+def format_event(event: Dict) -> str:
+    stamp = datetime.fromtimestamp(event["timestamp"], timezone.utc).isoformat(timespec="milliseconds")
+    return json.dumps({**event, "timestamp": stamp})
+
+
+def _replay(evaluator: AlertEvaluator, samples: Iterator[Dict], stream: bool, batch: int) -> Iterator[Dict]:
+    if stream:
+        for sample in samples:
+            yield from evaluator.push(sample)
+    else:
+        for columns in batches(samples, evaluator.fields, batch):
+            yield from evaluator.feed(columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the monitoring config's alert rules over probe samples")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="Monitoring config (default: %(default)s)")
+    parser.add_argument("--min-samples", type=int, default=DEFAULT_MIN_SAMPLES,
+                        help="Samples a window needs before a rule can match (default: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("rules", help="List the compiled rules and escalation levels")
+
+    p = sub.add_parser("simulate", help="Write a synthetic recorded sample stream")
+    p.add_argument("output", help="JSON lines file ('-' for stdout)")
+    p.add_argument("--hours", type=float, default=6)
+    p.add_argument("--rate", type=float, default=20, help="Samples per second (default: %(default)s)")
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("replay", help="Evaluate a recorded sample stream and print alert transitions")
+    p.add_argument("samples", help="JSON lines or .csv recording ('-' for stdin)")
+    p.add_argument("--stream", action="store_true", help="Evaluate one sample at a time")
+    p.add_argument("--batch", type=int, default=DEFAULT_BATCH, help="Samples per batch (default: %(default)s)")
+    p.add_argument("--output", help="Write transitions here instead of stdout")
+    p.add_argument("--expect", help="Transitions file to compare against; exits 1 on a difference")
+
+    p = sub.add_parser("bench", help="Time batch and per-sample evaluation on a synthetic stream")
+    p.add_argument("--hours", type=float, default=0.25)
+    p.add_argument("--rate", type=float, default=2000, help="Samples per second (default: %(default)s)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--batch", type=int, default=DEFAULT_BATCH)
+    args = parser.parse_args()
+
+    try:
+        rules, levels = load_config(args.config, args.min_samples)
+    except (OSError, KeyError, ValueError) as e:
+        print(f"❌ Could not load rules from {args.config}: {e}")
+        sys.exit(1)
+
+    if args.command == "rules":
+        print(f"📋 {len(rules)} rules from {args.config}")
+        for rule in rules:
+            print(f"   {rule.describe()}")
+        for level in levels:
+            print(f"   escalation level {level['level']}: after {level['delay']:g}s -> {', '.join(level['channels'])}")
+
+    elif args.command == "simulate":
+        columns = simulate(args.hours, args.rate, args.seed)
+        lines = (json.dumps(sample) + "\n" for sample in _rows(columns))
+        if args.output == "-":
+            sys.stdout.writelines(lines)
+        else:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+            print(f"✅ Wrote {len(columns['timestamp']):,} samples to {args.output}")
+
+    elif args.command == "replay":
+        evaluator = AlertEvaluator(rules, levels)
+        started = time.perf_counter()
+        try:
+            events = [format_event(event) for event in
+                      _replay(evaluator, read_samples(args.samples, evaluator.fields), args.stream, args.batch)]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"❌ Could not read samples from {args.samples}: {e}")
+            sys.exit(1)
+        elapsed = time.perf_counter() - started
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.writelines(line + "\n" for line in events)
+        elif not args.expect:
+            for line in events:
+                print(line)
+        print(f"📊 {evaluator.samples:,} samples, {len(events)} transitions in {elapsed:.2f}s "
+              f"({evaluator.samples / max(elapsed, 1e-9):,.0f} samples/s)"
+              + (f", {evaluator.late:,} out of order dropped" if evaluator.late else ""), file=sys.stderr)
+        if args.expect:
+            with open(args.expect, "r", encoding="utf-8") as f:
+                expected = [json.loads(line) for line in f if line.strip()]
+            actual = [json.loads(line) for line in events]
+            if actual != expected:
+                for i, (got, want) in enumerate(zip(actual + [None] * len(expected), expected + [None] * len(actual))):
+                    if got != want:
+                        print(f"❌ Transition {i + 1} differs:\n   expected {want}\n   got      {got}")
+                        break
+                sys.exit(1)
+            print(f"✅ {len(actual)} transitions match {args.expect}")
+
+    elif args.command == "bench":
+        columns = simulate(args.hours, args.rate, args.seed)
+        n = len(columns["timestamp"])
+        print(f"⏱️  {n:,} samples ({args.hours:g}h at {args.rate:g}/s), {len(rules)} rules")
+
+        evaluator = AlertEvaluator(rules, levels)
+        started = time.perf_counter()
+        batched = []
+        for i in range(0, n, args.batch):
+            batched += evaluator.feed({name: column[i:i + args.batch] for name, column in columns.items()})
+        elapsed = time.perf_counter() - started
+        print(f"   batch:  {elapsed:.2f}s  {n / elapsed:>12,.0f} samples/s")
+
+        evaluator = AlertEvaluator(rules, levels)
+        started = time.perf_counter()
+        streamed = []
+        for sample in _rows(columns):
+            streamed += evaluator.push(sample)
+        elapsed = time.perf_counter() - started
+        print(f"   stream: {elapsed:.2f}s  {n / elapsed:>12,.0f} samples/s")
+
+        for event in batched:
+            print(f"   {format_event(event)}")
+        if batched != streamed:
+            print(f"❌ Batch and per-sample evaluation disagree ({len(batched)} vs {len(streamed)} transitions)")
+            sys.exit(1)
+        print(f"✅ {len(batched)} transitions, identical in both modes")
+
+
+if __name__ == "__main__":
+    main()
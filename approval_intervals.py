@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Status intervals and dwell-time analytics over the PO audit trail
+
+Time-in-status needs each po_approvals event paired with the PO's next
+event, which in SQL is a self-join or window per PO and gets slow over
+millions of events. This module sorts the audit trail once by (PO,
+timestamp) and turns it into status intervals with array operations:
+
+    - an event's status is status_after, or the status its action implies
+      when status_after is empty (Rejected -> Draft, WO_Created -> none)
+    - consecutive events that leave the status unchanged are merged, so an
+      interval is a maximal run of one status
+    - an interval ends at the PO's next status change, or is open
+    - soft-deleted POs are left out, as in the reports
+
+Each status gets an interval index: intervals sorted by start with the
+maximum end per block of 512, so "which POs were in Submitted at time t"
+skips every block that closed before t and only tests the rest. On top of
+it sit the questions the approval-bottleneck work keeps asking:
+
+    stuck     POs in a status for more than N days at --as-of, grouped by
+              the division leader who has to act (po_headers.division_leader_id,
+              else the leader of the PO's division)
+    dwell     percentile dwell times per status, optionally per division or
+              leader, over intervals completed in --start..--end
+    timeline  the intervals of one PO
+
+Loading goes through report_engine.ColumnStore, so the sources are the same:
+a COPY directory, a SQLite stand-in, PostgreSQL or, fastest, a .npz snapshot
+(rewrite older snapshots, which lack status_after and division_leaders).
+
+Usage:
+    python approval_intervals.py po.npz --as-of 2026-06-30
+    python approval_intervals.py po.npz --query stuck --status Submitted --days 7 --as-of 2026-06-30
+    python approval_intervals.py po.npz --query dwell --status Approved --by leader --percentiles 50,75,95
+    python approval_intervals.py po.npz --query timeline --po O3-2026-0042
+    python approval_intervals.py standin.db --query all --json > intervals.json
+
+Requirements:
+    pip install numpy            (and psycopg for PostgreSQL sources)
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from report_engine import DAY, NULL_TS, ColumnStore, _date_arg, _iso, _resolve
+
+STATUSES = ("Draft", "Submitted", "Approved", "Issued", "Received", "Invoiced", "Paid", "Cancelled")
+STATUS_CODE = {name: code for code, name in enumerate(STATUSES)}
+# Status an action leaves the PO in when status_after was not recorded
+ACTION_STATUS = {"Created": "Draft", "Submitted": "Submitted", "Approved": "Approved", "Rejected": "Draft",
+                 "Issued": "Issued", "Received": "Received", "Invoiced": "Invoiced", "Paid": "Paid",
+                 "Cancelled": "Cancelled"}
+OPEN = np.iinfo(np.int64).max
+BLOCK = 512
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+class IntervalIndex:
+    """Half-open [start, end) intervals sorted by start, with the max end of each block"""
+
+    def __init__(self, start: np.ndarray, end: np.ndarray, ids: np.ndarray):
+        order = np.argsort(start)
+        self.start = start[order]
+        self.end = end[order]
+        self.ids = ids[order]
+        self.block_end = np.maximum.reduceat(self.end, np.arange(0, len(self.end), BLOCK)) \
+            if len(self.end) else np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def overlapping(self, t0: int, t1: int) -> np.ndarray:
+        """Ids of intervals overlapping [t0, t1)"""
+        candidates = int(np.searchsorted(self.start, t1, side="left"))
+        n_blocks = -(-candidates // BLOCK)
+        blocks = np.flatnonzero(self.block_end[:n_blocks] > t0)
+        if not len(blocks):
+            return self.ids[:0]
+        pos = (blocks[:, None] * BLOCK + np.arange(BLOCK)).ravel()
+        pos = pos[pos < candidates]
+        return self.ids[pos[self.end[pos] > t0]]
+
+    def at(self, t: int) -> np.ndarray:
+        """Ids of intervals containing the instant t"""
+        return self.overlapping(t, t + 1)
+
+
+def _code_map(labels: np.ndarray, names: Dict[str, str]) -> np.ndarray:
+    """Status code for each label of a dictionary-encoded column, -1 if none"""
+    return np.array([STATUS_CODE.get(names.get(label, label), -1) for label in labels.tolist()] + [-1],
+                    dtype=np.int16)
+
+
+def _grouped_percentiles(groups: np.ndarray, seconds: np.ndarray, size: int,
+                         percentiles: Sequence[float]) -> np.ndarray:
+    """np.percentile (linear) of non-negative seconds per group 0..size-1, NaN for empty groups"""
+    qs = np.asarray(percentiles, dtype=float) / 100
+    # one integer sort of (group, seconds) packed into int64 beats a lexsort
+    ordered = (np.sort(groups.astype(np.int64) << 40 | seconds) & ((1 << 40) - 1)).astype(float)
+    counts = np.bincount(groups, minlength=size)
+    if not len(ordered):
+        return np.full((size, len(qs)), np.nan)
+    offsets = np.r_[0, np.cumsum(counts)[:-1]]
+    pos = np.maximum(counts - 1, 0)[:, None] * qs[None, :]
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.ceil(pos).astype(np.int64)
+    low = ordered[np.minimum(offsets[:, None] + lo, len(ordered) - 1)]
+    high = ordered[np.minimum(offsets[:, None] + hi, len(ordered) - 1)]
+    out = low + (high - low) * (pos - lo)
+    out[counts == 0] = np.nan
+    return out
+
+
+class StatusIntervals:
+    """Status intervals of every live PO, built from the audit trail in one sort"""
+
+    def __init__(self, store: ColumnStore):
+        self.store = store
+        po, approvals = store["po_headers"], store["po_approvals"]
+        status = _code_map(approvals.labels["action"], ACTION_STATUS)[approvals["action"]]
+        if "status_after" in approvals.columns:
+            recorded = _code_map(approvals.labels["status_after"], {})[approvals["status_after"]]
+            status = np.where(recorded >= 0, recorded, status)
+        po_row = approvals["po_id"]
+        keep = np.flatnonzero((po_row >= 0) & (status >= 0) & (approvals["timestamp"] != NULL_TS))
+        keep = keep[po["deleted_at"][po_row[keep]] == NULL_TS]
+
+        # one sort by (PO, timestamp); stable, so same-second events keep the source order
+        ts = approvals["timestamp"][keep]
+        base = int(ts.min()) if len(ts) else 0
+        order = np.argsort(po_row[keep].astype(np.int64) << 32 | (ts - base), kind="stable")
+        rows = keep[order]
+        e_po, e_ts, e_status = po_row[rows], ts[order], status[rows]
+
+        # an interval starts at each event that changes the PO's status
+        first = np.r_[True, e_po[1:] != e_po[:-1]]
+        change = first | np.r_[True, e_status[1:] != e_status[:-1]]
+        starts = np.flatnonzero(change)
+        self.po = e_po[starts]
+        self.status = e_status[starts]
+        self.start = e_ts[starts]
+        self.actor = approvals["actor_user_id"][rows[starts]]
+        last = np.r_[self.po[1:] != self.po[:-1], True]
+        self.end = np.where(last, OPEN, np.r_[self.start[1:], 0])
+        self.events = len(rows)
+        self._indexes: Dict[int, IntervalIndex] = {}
+
+        # the leader who acts on each PO: its own division_leader_id, else its division's leader
+        self.leader = np.full(po.size, -1, dtype=np.int32)
+        if "division_leaders" in store.tables:
+            leaders = store["division_leaders"]
+            by_division = np.full(store["divisions"].size + 1, -1, dtype=np.int32)
+            active = np.flatnonzero(leaders["is_active"] & (leaders["division_id"] >= 0))
+            by_division[leaders["division_id"][active]] = active
+            self.leader = by_division[po["division_id"]]
+            if "division_leader_id" in po.columns:
+                own = po["division_leader_id"]
+                self.leader = np.where(own >= 0, own, self.leader).astype(np.int32)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def index(self, status: int) -> IntervalIndex:
+        if status not in self._indexes:
+            ids = np.flatnonzero(self.status == status)
+            self._indexes[status] = IntervalIndex(self.start[ids], self.end[ids], ids)
+        return self._indexes[status]
+
+    def durations(self, as_of: int, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Seconds in status as of as_of (open intervals run to as_of, future ones count 0)"""
+        start, end = (self.start, self.end) if ids is None else (self.start[ids], self.end[ids])
+        return np.maximum(np.minimum(end, as_of) - start, 0)
+
+    def time_in_status(self, as_of: int) -> np.ndarray:
+        """Seconds each PO (row) spent in each status (column, STATUSES order) up to as_of"""
+        size = self.store["po_headers"].size
+        cells = self.po.astype(np.int64) * len(STATUSES) + self.status
+        totals = np.bincount(cells, weights=self.durations(as_of), minlength=size * len(STATUSES))
+        return totals.reshape(size, len(STATUSES))
+
+    # ------------------------------------------------------------------ queries
+
+    def stuck(self, status: int, days: float, as_of: int, limit: int = 10) -> List[Dict]:
+        """POs in status for more than days at as_of, per acting division leader, most POs first"""
+        po, leaders, divs = self.store["po_headers"], self.store.tables.get("division_leaders"), \
+            self.store["divisions"]
+        ids = self.index(status).at(as_of)
+        ids = ids[as_of - self.start[ids] > days * DAY]
+        pos = self.po[ids]
+        age = (as_of - self.start[ids]) / DAY
+        amount = po["total_amount"][pos]
+        # leaderless POs are grouped per division, after the leaders
+        n_leaders = leaders.size if leaders is not None else 0
+        group = np.where(self.leader[pos] >= 0, self.leader[pos], n_leaders + 1 + po["division_id"][pos])
+        result = []
+        order = np.lexsort((-age, group))
+        bounds = np.r_[0, np.flatnonzero(np.diff(group[order])) + 1, len(order)]
+        for s, e in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            members = order[s:e]
+            g = int(group[members[0]])
+            if g < n_leaders:
+                d = int(leaders["division_id"][g])
+                name = leaders.value("name", g)
+            else:
+                d = g - n_leaders - 1
+                name = None
+            result.append({
+                "leader": name,
+                "leaderId": leaders.value("id", g) if g < n_leaders else None,
+                "division": divs.value("division_code", d) if d >= 0 else None,
+                "count": len(members),
+                "totalAmount": float(amount[members].sum()) / 100,
+                "oldestDays": float(age[members[0]]),
+                "medianDays": float(np.median(age[members])),
+                "pos": [{"poNumber": po.value("po_number", int(pos[i])), "since": _iso(int(self.start[ids[i]])),
+                         "days": round(float(age[i]), 1), "amount": float(amount[i]) / 100}
+                        for i in members[:limit].tolist()],
+            })
+        result.sort(key=lambda r: (-r["count"], -r["oldestDays"]))
+        return result
+
+    def dwell(self, status: int, as_of: int, by: Optional[str] = None, start: Optional[int] = None,
+              end: Optional[int] = None, percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+              include_open: bool = False) -> List[Dict]:
+        """Dwell-time percentiles (days) of intervals in status that ended in start..end (by as_of)"""
+        index = self.index(status)
+        window_end = as_of if end is None else min(end, as_of)
+        if include_open:
+            ids = index.overlapping(NULL_TS + 1 if start is None else start, window_end + 1)
+        else:
+            done = index.end <= window_end
+            if start is not None:
+                done &= index.end >= start
+            ids = index.ids[done]
+        seconds = self.durations(as_of, ids)
+        pos = self.po[ids]
+        po = self.store["po_headers"]
+        if by == "division":
+            table, labels = self.store["divisions"], "division_code"
+            keys = po["division_id"][pos]
+        elif by == "leader":
+            table, labels = self.store["division_leaders"], "name"
+            keys = self.leader[pos]
+        else:
+            table, labels, keys = None, None, np.zeros(len(ids), dtype=np.int64)
+        size = table.size + 1 if table is not None else 1
+        groups = np.where(keys >= 0, keys, size - 1).astype(np.int64)
+        values = _grouped_percentiles(groups, seconds, size, percentiles) / DAY
+        counts = np.bincount(groups, minlength=size)
+        sums = np.bincount(groups, weights=seconds, minlength=size) / DAY
+        rows = []
+        for g in np.flatnonzero(counts).tolist():
+            label = table.value(labels, g) if table is not None and g < table.size else None
+            rows.append({
+                "status": STATUSES[status], "group": label if table is not None else "all",
+                "count": int(counts[g]), "meanDays": float(sums[g] / counts[g]),
+                "percentiles": {f"p{q:g}": float(v) for q, v in zip(percentiles, values[g])},
+            })
+        return rows
+
+    def timeline(self, po_row: int) -> List[Dict]:
+        lo, hi = np.searchsorted(self.po, [po_row, po_row + 1])
+        users = self.store["users"]
+        out = []
+        for i in range(int(lo), int(hi)):
+            actor = int(self.actor[i])
+            out.append({"status": STATUSES[self.status[i]], "from": _iso(int(self.start[i])),
+                        "to": _iso(int(self.end[i])) if self.end[i] != OPEN else None,
+                        "by": users.value("email", actor) if actor >= 0 else None})
+        return out
+
+
+def _print_stuck(rows: List[Dict], status: str, days: float):
+    total = sum(r["count"] for r in rows)
+    print(f"\n⏳ {total:,} POs in {status} for more than {days:g} days")
+    for r in rows:
+        who = r["leader"] or "(no division leader)"
+        print(f"   {who:<28} {r['division'] or '':<4} {r['count']:>7,} POs  ${r['totalAmount']:>14,.2f}"
+              f"  oldest {r['oldestDays']:7.1f}d  median {r['medianDays']:6.1f}d")
+        for p in r["pos"]:
+            print(f"      {p['poNumber']:<20} since {p['since'][:10]}  {p['days']:7.1f}d  ${p['amount']:>12,.2f}")
+
+
+def _print_dwell(rows: List[Dict]):
+    if not rows:
+        return
+    names = list(rows[0]["percentiles"])
+    print(f"\n⏱️  {'status':<10} {'group':<28} {'count':>9} {'mean':>8} " + " ".join(f"{n:>8}" for n in names))
+    for r in rows:
+        print(f"   {r['status']:<10} {str(r['group']):<28} {r['count']:>9,} {r['meanDays']:>7.2f}d "
+              + " ".join(f"{v:>7.2f}d" for v in r["percentiles"].values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Status intervals and dwell times over the PO audit trail")
+    parser.add_argument("source", help="COPY directory, SQLite file, .npz snapshot or postgresql:// URL")
+    parser.add_argument("--query", choices=["stuck", "dwell", "timeline", "all"], default="all",
+                        help="What to answer (default: stuck and dwell)")
+    parser.add_argument("--status", default="Submitted", choices=STATUSES,
+                        help="Status for stuck, and for dwell when grouping (default: Submitted)")
+    parser.add_argument("--days", type=float, default=7, help="Stuck threshold in days (default: 7)")
+    parser.add_argument("--as-of", type=_date_arg, help="Point in time to evaluate at (default: current time)")
+    parser.add_argument("--start", type=_date_arg, help="Dwell: intervals completed from this date")
+    parser.add_argument("--end", type=_date_arg, help="Dwell: intervals completed up to this date")
+    parser.add_argument("--by", choices=["division", "leader"], help="Dwell: group by division or leader")
+    parser.add_argument("--percentiles", default=",".join(map(str, DEFAULT_PERCENTILES)),
+                        help="Dwell percentiles, comma separated (default: 50,90,99)")
+    parser.add_argument("--include-open", action="store_true",
+                        help="Dwell: count intervals still open at --as-of (censored there)")
+    parser.add_argument("--po", help="Timeline: PO number or id")
+    parser.add_argument("--limit", type=int, default=5, help="Stuck: POs listed per leader (default: 5)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+    log = sys.stderr if args.json else sys.stdout
+    as_of = int(time.time()) if args.as_of is None else args.as_of
+    status = STATUS_CODE[args.status]
+    percentiles = [float(p) for p in args.percentiles.split(",") if p.strip()]
+    if args.query == "timeline" and not args.po:
+        parser.error("--query timeline needs --po")
+
+    t0 = time.perf_counter()
+    store = ColumnStore.load(args.source)
+    t1 = time.perf_counter()
+    intervals = StatusIntervals(store)
+    t2 = time.perf_counter()
+    print(f"📥 Loaded {args.source} in {t1 - t0:.2f}s; {intervals.events:,} events -> {len(intervals):,} "
+          f"intervals in {(t2 - t1) * 1000:.0f} ms", file=log)
+
+    results: Dict[str, object] = {}
+    if args.query in ("stuck", "all"):
+        t = time.perf_counter()
+        results["stuck"] = intervals.stuck(status, args.days, as_of, args.limit)
+        print(f"🔎 stuck query {(time.perf_counter() - t) * 1000:.1f} ms", file=log)
+    if args.query in ("dwell", "all"):
+        t = time.perf_counter()
+        if args.by:
+            rows = intervals.dwell(status, as_of, args.by, args.start, args.end, percentiles, args.include_open)
+        else:
+            rows = [row for code in range(len(STATUSES)) for row in
+                    intervals.dwell(code, as_of, None, args.start, args.end, percentiles, args.include_open)]
+        results["dwell"] = rows
+        print(f"🔎 dwell query {(time.perf_counter() - t) * 1000:.1f} ms", file=log)
+    if args.po:
+        row = _resolve(store, "po_headers", args.po, "po_number")
+        results["timeline"] = intervals.timeline(row)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    if "stuck" in results:
+        _print_stuck(results["stuck"], args.status, args.days)
+    if "dwell" in results:
+        _print_dwell(results["dwell"])
+    if "timeline" in results:
+        print(f"\n🧾 {args.po}")
+        for step in results["timeline"]:
+            print(f"   {step['status']:<10} {step['from']}  ->  {step['to'] or 'now':<24} {step['by'] or ''}")
+
+
+if __name__ == "__main__":
+    main()
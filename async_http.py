@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Minimal asyncio HTTP/1.1 client with keep-alive connection pooling
+Shared by the Render deploy monitor, health prober and load tools
+
+Standard library only. Every response carries a timing breakdown
+(DNS, TCP connect, TLS handshake, time to first byte, total) so callers
+can separate network setup cost from server latency.
+
+Usage:
+    client = AsyncHTTPClient(limit_per_host=20)
+    response = await client.request("GET", "https://example.com/api/health")
+    print(response.status, response.timings["ttfb_ms"])
+    await client.close()
+"""
+
+import asyncio
+import json
+import socket
+import ssl
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+DEFAULT_TIMEOUT = 30  # seconds
+DEFAULT_LIMIT_PER_HOST = 20
+MAX_HEADER_BYTES = 64 * 1024
+USER_AGENT = "ASR-PO-System-Monitor/1.0"
+
+
+class HTTPError(Exception):
+    """Transport or protocol failure (not raised for HTTP error statuses)"""
+
+
+class HTTPResponse:
+    def __init__(self, status: int, reason: str, headers: Dict[str, str],
+                 body: bytes, timings: Dict, url: str):
+        self.status = status
+        self.reason = reason
+        self.headers = headers  # lower-cased header names
+        self.body = body
+        self.timings = timings
+        self.url = url
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8")) if self.body else None
+
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.requests_served = 0
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+    @property
+    def is_closing(self) -> bool:
+        return self.writer.is_closing() or self.reader.at_eof()
+
+
+class AsyncHTTPClient:
+    """HTTP/1.1 client that reuses connections per (scheme, host, port)"""
+
+    def __init__(self, limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 headers: Optional[Dict[str, str]] = None,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.default_headers = {"User-Agent": USER_AGENT, "Accept": "*/*"}
+        self.default_headers.update(headers or {})
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._idle: Dict[Tuple[str, str, int], List[_Connection]] = {}
+        self._limits: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self.connections_opened = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def get(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def request(self, method: str, url: str,
+                      headers: Optional[Dict[str, str]] = None,
+                      params: Optional[Dict] = None,
+                      body: Optional[bytes] = None,
+                      timeout: Optional[float] = None) -> HTTPResponse:
+        """Send one request; waits for a pooled connection slot if the host is busy"""
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        host = parts.hostname
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        query = parts.query
+        if params:
+            extra = urlencode({k: v for k, v in params.items() if v is not None})
+            query = f"{query}&{extra}" if query else extra
+        target = f"{path}?{query}" if query else path
+
+        key = (scheme, host, port)
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = self._limits[key] = asyncio.Semaphore(self.limit_per_host)
+
+        request_headers = dict(self.default_headers)
+        request_headers.update(headers or {})
+        default_port = 443 if scheme == "https" else 80
+        request_headers.setdefault("Host", host if port == default_port else f"{host}:{port}")
+        if body is not None:
+            request_headers["Content-Length"] = str(len(body))
+
+        async with limit:
+            return await asyncio.wait_for(
+                self._send(key, method, target, request_headers, body, url),
+                timeout or self.timeout
+            )
+
+    async def _send(self, key, method, target, headers, body, url) -> HTTPResponse:
+        started = time.perf_counter()
+        timings = {"dns_ms": 0.0, "connect_ms": 0.0, "tls_ms": 0.0, "reused": True}
+
+        connection = self._take_idle(key)
+        if connection is None:
+            connection = await self._open(key, timings)
+
+        try:
+            payload = [f"{method} {target} HTTP/1.1\r\n"]
+            payload.extend(f"{name}: {value}\r\n" for name, value in headers.items())
+            payload.append("\r\n")
+            connection.writer.write("".join(payload).encode("latin-1") + (body or b""))
+            await connection.writer.drain()
+            sent = time.perf_counter()
+
+            status_line = await connection.reader.readline()
+            first_byte = time.perf_counter()
+            if not status_line:
+                raise HTTPError("connection closed before response")
+            status, reason, response_headers = await self._read_head(status_line, connection.reader)
+            response_body = await self._read_body(method, status, response_headers, connection.reader)
+        except asyncio.IncompleteReadError as e:
+            connection.close()
+            raise HTTPError(f"connection closed after {len(e.partial)} of {e.expected} bytes") from None
+        except (asyncio.LimitOverrunError, ValueError) as e:  # readline() over the stream limit, bad chunk size
+            connection.close()
+            raise HTTPError(f"malformed response: {e}") from None
+        except BaseException:  # includes the CancelledError of a wait_for timeout: never reuse a half-read connection
+            connection.close()
+            raise
+
+        finished = time.perf_counter()
+        timings.update({
+            "ttfb_ms": (first_byte - sent) * 1000,
+            "total_ms": (finished - started) * 1000,
+        })
+
+        connection.requests_served += 1
+        if response_headers.get("connection", "").lower() == "close" or connection.is_closing:
+            connection.close()
+        else:
+            self._idle.setdefault(key, []).append(connection)
+
+        return HTTPResponse(status, reason, response_headers, response_body, timings, url)
+
+    def _take_idle(self, key) -> Optional[_Connection]:
+        idle = self._idle.get(key)
+        while idle:
+            connection = idle.pop()
+            if not connection.is_closing:
+                return connection
+            connection.close()
+        return None
+
+    async def _open(self, key, timings: Dict) -> _Connection:
+        scheme, host, port = key
+        loop = asyncio.get_running_loop()
+        timings["reused"] = False
+
+        start = time.perf_counter()
+        addresses = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        family, _, _, _, address = addresses[0]
+        timings["dns_ms"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        use_tls = scheme == "https"
+        can_upgrade = hasattr(asyncio.StreamWriter, "start_tls")  # Python 3.11+
+        if use_tls and not can_upgrade:
+            # TCP and TLS setup happen together; report them as connect time
+            reader, writer = await asyncio.open_connection(
+                address[0], address[1], ssl=self.ssl_context, server_hostname=host)
+            timings["connect_ms"] = (time.perf_counter() - start) * 1000
+        else:
+            reader, writer = await asyncio.open_connection(address[0], address[1], family=family)
+            timings["connect_ms"] = (time.perf_counter() - start) * 1000
+            if use_tls:
+                start = time.perf_counter()
+                await writer.start_tls(self.ssl_context, server_hostname=host)
+                timings["tls_ms"] = (time.perf_counter() - start) * 1000
+
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    @staticmethod
+    async def _read_head(status_line: bytes, reader: asyncio.StreamReader):
+        try:
+            _, status, *reason = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+            status = int(status)
+        except ValueError:
+            raise HTTPError(f"malformed status line: {status_line[:80]!r}")
+
+        headers = {}
+        total = len(status_line)
+        while True:
+            line = await reader.readline()
+            total += len(line)
+            if total > MAX_HEADER_BYTES:
+                raise HTTPError("response headers too large")
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+        return status, (reason[0] if reason else ""), headers
+
+    @staticmethod
+    async def _read_body(method: str, status: int, headers: Dict[str, str],
+                         reader: asyncio.StreamReader) -> bytes:
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            return b""
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    # Skip trailers up to the terminating blank line
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return b"".join(chunks)
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+        if "content-length" in headers:
+            return await reader.readexactly(int(headers["content-length"]))
+        headers["connection"] = "close"
+        return await reader.read()
+
+    async def close(self):
+        """Close all idle pooled connections"""
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
@@ -0,0 +1,663 @@
+#!/usr/bin/env python3
+"""
+Deduplicating backup repository for PO database dumps
+
+Every night backup-automation.sh (and db_backup.py) stores a complete
+compressed dump, although most of po_headers, po_line_items and
+po_approvals is the same as the night before. This repository stores each
+distinct piece of dump output once:
+
+    chunking   dump files are cut where a rolling hash of the last 32 bytes
+               (a gear hash, computed with numpy over whole blocks) hits a
+               bit pattern, with min/avg/max sizes of 4/16/64 KiB by
+               default. Cut points depend only on nearby content, so a row
+               changed in the middle of a table changes the chunk around it
+               and leaves every other chunk, and so their ids, as they were
+    chunks     are identified by BLAKE2b-256; a chunk already in the index is
+               only referenced, new chunks are compressed on a thread pool
+               and packed into ~16 MiB pack files that are uploaded as they
+               fill. Only new chunks are ever stored or transferred
+    index      each backup writes one index file for the packs it created
+               (chunk id -> pack, offset, stored and raw length), then its
+               snapshot (files as lists of chunk ids); the snapshot is the
+               commit point, so an interrupted backup leaves only unused
+               packs that the next prune removes
+    pruning    forgetting a snapshot deletes one small file. prune then
+               works from the snapshots and the index alone: packs with no
+               live chunk are deleted without being read, and only packs
+               that are mostly garbage (--repack) are rewritten, by copying
+               their live, already compressed chunks
+
+Dumps must be uncompressed (pg_dump -Z0, plain or directory format):
+compressed output changes throughout when any input byte changes. --dump
+runs pg_dump --format=directory --jobs=N --compress=0 itself.
+
+Layout (a local directory or s3://BUCKET/PREFIX, as in db_backup.py):
+    config.json                 chunker parameters, gear seed and codec
+    snapshots/NAME.json.gz      files -> chunk ids, sizes, SHA-256
+    index/ID.json.gz            pack -> chunk entries
+    packs/XX/PACK               compressed chunks back to back
+    locks/NAME.json             a backup in progress (prune waits)
+
+Usage:
+    python backup_repo.py init /var/backups/asr-po-repo
+    python backup_repo.py backup /var/backups/asr-po-repo --dump "$DATABASE_URL" --jobs 8
+    pg_dump -Z0 "$DATABASE_URL" | python backup_repo.py backup s3://asr-backups/repo - --stdin-name asr_po.sql
+    python backup_repo.py snapshots /var/backups/asr-po-repo
+    python backup_repo.py restore /var/backups/asr-po-repo latest ./dump && pg_restore -j 8 -d "$SCRATCH_URL" ./dump
+    python backup_repo.py forget /var/backups/asr-po-repo --keep-days 30 --prune
+    python backup_repo.py check /var/backups/asr-po-repo --read-data
+
+Requirements:
+    pip install numpy
+    pg_dump (--dump only), boto3 (s3:// only), zstandard (--codec zstd only)
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    raise SystemExit("❌ backup_repo.py needs numpy: pip install numpy")
+
+from db_backup import DEFAULT_UPLOAD_JOBS, EXCLUDE_TABLE_DATA, _codec, _size, _tool, open_destination
+from sql_schema import mask_url
+
+FORMAT_VERSION = 1
+MIN_CHUNK = 4 << 10
+AVG_CHUNK = 16 << 10
+MAX_CHUNK = 64 << 10
+PACK_SIZE = 16 << 20
+READ_BLOCK = 8 << 20
+SEGMENT = 1 << 20         # bytes hashed per chunker task
+WINDOW = 32               # bytes the rolling hash covers
+RANGE_GAP = 1 << 20       # restore reads neighbouring chunks of a pack in one request across gaps up to this
+DEFAULT_JOBS = os.cpu_count() or 2
+DEFAULT_REPACK = 0.5      # rewrite packs that are at least this fraction garbage
+
+# chunk id -> (pack, offset, stored length, raw length)
+Entry = Tuple[str, int, int, int]
+
+
+def _chunk_id(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=32).digest()
+
+
+class Chunker:
+    """Content-defined cut points from a 32-byte gear hash, vectorised over whole blocks"""
+
+    def __init__(self, seed: int, min_size: int = MIN_CHUNK, avg_size: int = AVG_CHUNK, max_size: int = MAX_CHUNK,
+                 pool: Optional[ThreadPoolExecutor] = None):
+        if not 64 <= min_size < avg_size < max_size:
+            raise ValueError("chunk sizes must satisfy 64 <= min < avg < max")
+        self.min_size, self.max_size = min_size, max_size
+        self.gear = np.random.default_rng(seed).integers(0, 1 << 32, 256, dtype=np.uint64).astype(np.uint32)
+        # past the minimum, a cut is expected every 2**bits bytes
+        bits = max(1, round(math.log2(avg_size - min_size)))
+        self.mask = np.uint32(((1 << bits) - 1) << (32 - bits))
+        self.pool = pool
+
+    def _candidates(self, data: bytes, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """Positions in [start, end) whose hash over the 32 bytes ending there has the mask bits clear"""
+        end = len(data) if end is None else end
+        lead = min(start, WINDOW - 1)
+        h = self.gear[np.frombuffer(data, dtype=np.uint8, count=end - start + lead, offset=start - lead)]
+        tmp = np.empty_like(h)
+        n = len(h)
+        # h_2s(i) = h_s(i) + h_s(i - s) << s: five doublings give the 32-byte window
+        for shift in (1, 2, 4, 8, 16):
+            np.left_shift(h[:n - shift], np.uint32(shift), out=tmp[:n - shift])
+            np.add(h[shift:], tmp[:n - shift], out=h[shift:])
+        return np.flatnonzero((h[lead:] & self.mask) == 0) + start
+
+    def _all_candidates(self, data: bytes) -> np.ndarray:
+        if self.pool is None or len(data) <= SEGMENT:
+            return self._candidates(data)
+        # numpy releases the GIL: segments (each re-reading the 31 bytes before it) hash in parallel
+        bounds = range(0, len(data), SEGMENT)
+        parts = self.pool.map(lambda s: self._candidates(data, s, min(s + SEGMENT, len(data))), bounds)
+        return np.concatenate(list(parts))
+
+    def cuts(self, data: bytes, final: bool) -> List[int]:
+        """Chunk end offsets in data; without final the bytes after the last cut wait for more input"""
+        candidates = self._all_candidates(data)
+        cuts, pos, size = [], 0, len(data)
+        while True:
+            j = np.searchsorted(candidates, pos + self.min_size - 1)
+            if j < len(candidates) and candidates[j] + 1 - pos <= self.max_size:
+                pos = int(candidates[j]) + 1
+            elif size - pos >= self.max_size:
+                pos += self.max_size
+            else:
+                break
+            cuts.append(pos)
+        if final and pos < size:
+            cuts.append(size)
+        return cuts
+
+    def split(self, stream: BinaryIO) -> Iterator[memoryview]:
+        carry = b""
+        while True:
+            block = stream.read(READ_BLOCK)
+            data = carry + block if carry else block
+            view = memoryview(data)
+            start = 0
+            for end in self.cuts(data, not block):
+                yield view[start:end]
+                start = end
+            if not block:
+                return
+            carry = data[start:]
+
+
+class _Packer:
+    """Collects compressed chunks into packs and uploads each pack as it fills"""
+
+    def __init__(self, dest, uploads: ThreadPoolExecutor, limit: int):
+        self.dest = dest
+        self.uploads = uploads
+        self.slots = threading.BoundedSemaphore(limit)
+        self.blobs: List[bytes] = []
+        self.entries: List[Tuple[bytes, int, int, int]] = []
+        self.size = 0
+        self.packs: Dict[str, List] = {}
+        self.futures = []
+        self.stored = 0
+
+    def add(self, chunk_id: bytes, blob: bytes, raw: int):
+        self.entries.append((chunk_id, self.size, len(blob), raw))
+        self.blobs.append(blob)
+        self.size += len(blob)
+        if self.size >= PACK_SIZE:
+            self.seal()
+
+    def seal(self):
+        if not self.blobs:
+            return
+        data = b"".join(self.blobs)
+        pack = hashlib.sha256(data).hexdigest()
+        self.packs[pack] = [[cid.hex(), off, stored, raw] for cid, off, stored, raw in self.entries]
+        self.stored += len(data)
+        self.slots.acquire()
+        self.futures.append(self.uploads.submit(self._upload, f"packs/{pack[:2]}/{pack}", data))
+        self.blobs, self.entries, self.size = [], [], 0
+
+    def _upload(self, key: str, data: bytes):
+        try:
+            self.dest.put(key, data)
+        finally:
+            self.slots.release()
+
+    def finish(self):
+        self.seal()
+        for future in self.futures:
+            future.result()
+
+
+class Repository:
+    def __init__(self, dest):
+        self.dest = dest
+        try:
+            self.config = json.loads(dest.get("config.json"))
+        except Exception:
+            raise SystemExit(f"❌ {dest.name} is not a backup repository (run init first)")
+        if self.config["version"] != FORMAT_VERSION:
+            raise SystemExit(f"❌ Repository format {self.config['version']} is not supported")
+        c = self.config["chunker"]
+        self.chunker = Chunker(c["seed"], c["min"], c["avg"], c["max"])
+        _, self.compress, self.decompress = _codec(self.config["codec"], self.config.get("level"))
+
+    @staticmethod
+    def init(dest, codec: str = "gzip", level: Optional[int] = None, avg: int = AVG_CHUNK) -> "Repository":
+        try:
+            dest.get("config.json")
+        except Exception:
+            pass
+        else:
+            raise SystemExit(f"❌ {dest.name} already holds a repository")
+        _codec(codec, level)
+        config = {"version": FORMAT_VERSION, "codec": codec, "level": level,
+                  "chunker": {"seed": int.from_bytes(os.urandom(8), "little"), "min": max(64, avg // 4),
+                              "avg": avg, "max": avg * 4}}
+        dest.put("config.json", json.dumps(config, indent=1).encode("utf-8"))
+        return Repository(dest)
+
+    # -- metadata ------------------------------------------------------------
+
+    def _get_json(self, key: str):
+        return json.loads(gzip.decompress(self.dest.get(key)))
+
+    def _put_json(self, key: str, value):
+        self.dest.put(key, gzip.compress(json.dumps(value, separators=(",", ":")).encode("utf-8")))
+
+    def load_index(self) -> Dict[bytes, Entry]:
+        index: Dict[bytes, Entry] = {}
+        for key in self.dest.list("index/"):
+            for pack, entries in self._get_json(key)["packs"].items():
+                for cid, off, stored, raw in entries:
+                    index[bytes.fromhex(cid)] = (pack, off, stored, raw)
+        return index
+
+    def snapshots(self) -> List[Dict]:
+        out = [self._get_json(key) for key in self.dest.list("snapshots/") if key.endswith(".json.gz")]
+        return sorted(out, key=lambda s: s["created_at"])
+
+    def snapshot(self, name: str) -> Dict:
+        if name == "latest":
+            snaps = self.snapshots()
+            if not snaps:
+                raise SystemExit(f"❌ No snapshots in {self.dest.name}")
+            return snaps[-1]
+        try:
+            return self._get_json(f"snapshots/{name}.json.gz")
+        except Exception:
+            raise SystemExit(f"❌ No snapshot '{name}' in {self.dest.name}")
+
+    @staticmethod
+    def _ids(entry: Dict) -> List[bytes]:
+        hexes = entry["chunks"]
+        return [bytes.fromhex(hexes[i:i + 64]) for i in range(0, len(hexes), 64)]
+
+    # -- backup --------------------------------------------------------------
+
+    def backup(self, sources: List[Tuple[str, str]], name: Optional[str] = None, source: str = "",
+               jobs: int = DEFAULT_JOBS, upload_jobs: int = DEFAULT_UPLOAD_JOBS, progress=None) -> Dict:
+        """Store (path in snapshot, local path or '-' for stdin) pairs as one snapshot; returns it"""
+        started = time.perf_counter()
+        created = datetime.now(timezone.utc)
+        name = name or f"asr-po-{created.strftime('%Y%m%d_%H%M%S')}"
+        if f"snapshots/{name}.json.gz" in self.dest.list("snapshots/"):
+            raise SystemExit(f"❌ Snapshot '{name}' already exists")
+        lock = f"locks/{name}.json"
+        self.dest.put(lock, json.dumps({"snapshot": name, "created_at": created.isoformat()}).encode("utf-8"))
+        try:
+            known = set(self.load_index())
+            compressors = ThreadPoolExecutor(jobs, thread_name_prefix="compress")
+            self.chunker.pool = ThreadPoolExecutor(jobs, thread_name_prefix="chunk") if jobs > 1 else None
+            uploads = ThreadPoolExecutor(upload_jobs, thread_name_prefix="upload")
+            packer = _Packer(self.dest, uploads, upload_jobs * 2)
+            queue = deque()
+            files = []
+            totals = {"bytes": 0, "chunks": 0, "new_chunks": 0, "new_bytes": 0}
+
+            def drain(limit: int):
+                while len(queue) > limit:
+                    cid, raw, future = queue.popleft()
+                    packer.add(cid, future.result(), raw)
+
+            try:
+                for path, local in sources:
+                    digest = hashlib.sha256()
+                    ids = []
+                    size = 0
+                    stream = sys.stdin.buffer if local == "-" else open(local, "rb")
+                    try:
+                        for chunk in self.chunker.split(stream):
+                            digest.update(chunk)
+                            cid = _chunk_id(chunk)
+                            ids.append(cid.hex())
+                            size += len(chunk)
+                            if cid not in known:
+                                known.add(cid)
+                                totals["new_chunks"] += 1
+                                totals["new_bytes"] += len(chunk)
+                                queue.append((cid, len(chunk), compressors.submit(self.compress, bytes(chunk))))
+                                drain(jobs * 4)
+                    finally:
+                        if stream is not sys.stdin.buffer:
+                            stream.close()
+                    totals["bytes"] += size
+                    totals["chunks"] += len(ids)
+                    files.append({"path": path, "size": size, "sha256": digest.hexdigest(), "chunks": "".join(ids)})
+                    if progress:
+                        progress(path, size, totals)
+                drain(0)
+                packer.finish()
+            finally:
+                compressors.shutdown()
+                uploads.shutdown()
+                if self.chunker.pool:
+                    self.chunker.pool.shutdown()
+                    self.chunker.pool = None
+
+            if packer.packs:
+                self._put_json(f"index/{name}-{uuid.uuid4().hex[:8]}.json.gz", {"packs": packer.packs})
+            totals.update(stored=packer.stored, packs=len(packer.packs),
+                          seconds=round(time.perf_counter() - started, 3))
+            snap = {"name": name, "created_at": created.isoformat(), "source": source, "files": files,
+                    "stats": totals}
+            self._put_json(f"snapshots/{name}.json.gz", snap)
+            return snap
+        finally:
+            self.dest.delete([lock])
+
+    # -- restore -------------------------------------------------------------
+
+    def restore(self, name: str, target: str, jobs: int = DEFAULT_UPLOAD_JOBS, verify: bool = True) -> Dict:
+        """Write a snapshot's files under the target directory"""
+        snap = self.snapshot(name)
+        index = self.load_index()
+        occurrences: Dict[bytes, List[Tuple[int, int]]] = {}
+        handles, paths = [], []
+        try:
+            for entry in snap["files"]:
+                path = os.path.join(target, entry["path"])
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                os.ftruncate(fd, entry["size"])
+                handles.append(fd)
+                paths.append(path)
+                offset = 0
+                for cid in self._ids(entry):
+                    if cid not in index:
+                        raise SystemExit(f"❌ Chunk {cid.hex()[:16]} of {entry['path']} is missing from the index")
+                    occurrences.setdefault(cid, []).append((fd, offset))
+                    offset += index[cid][3]
+
+            by_pack: Dict[str, List[Tuple[int, int, bytes]]] = {}
+            for cid in occurrences:
+                pack, off, stored, _ = index[cid]
+                by_pack.setdefault(pack, []).append((off, stored, cid))
+
+            def fetch_pack(pack: str, blobs: List[Tuple[int, int, bytes]]) -> int:
+                blobs.sort()
+                written = 0
+                i = 0
+                while i < len(blobs):
+                    # one ranged read for a run of chunks separated by small gaps
+                    j = i + 1
+                    while j < len(blobs) and blobs[j][0] - (blobs[j - 1][0] + blobs[j - 1][1]) <= RANGE_GAP \
+                            and blobs[j][0] + blobs[j][1] - blobs[i][0] <= PACK_SIZE * 2:
+                        j += 1
+                    start = blobs[i][0]
+                    data = self.dest.get_range(f"packs/{pack[:2]}/{pack}", start,
+                                               blobs[j - 1][0] + blobs[j - 1][1] - start)
+                    for off, stored, cid in blobs[i:j]:
+                        raw = self.decompress(data[off - start:off - start + stored])
+                        if _chunk_id(raw) != cid:
+                            raise SystemExit(f"❌ Chunk {cid.hex()[:16]} in pack {pack[:16]} is corrupt")
+                        for fd, offset in occurrences[cid]:
+                            os.pwrite(fd, raw, offset)
+                            written += len(raw)
+                    i = j
+                return written
+
+            with ThreadPoolExecutor(jobs, thread_name_prefix="fetch") as pool:
+                written = sum(f.result() for f in [pool.submit(fetch_pack, p, b) for p, b in by_pack.items()])
+        finally:
+            for fd in handles:
+                os.close(fd)
+
+        if verify:
+            for entry, path in zip(snap["files"], paths):
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(READ_BLOCK), b""):
+                        digest.update(block)
+                if digest.hexdigest() != entry["sha256"]:
+                    raise SystemExit(f"❌ {path} does not match the snapshot's SHA-256")
+        return {"snapshot": snap["name"], "files": len(paths), "bytes": written, "packs": len(by_pack)}
+
+    # -- retention -----------------------------------------------------------
+
+    def forget(self, names: List[str]):
+        for name in names:
+            self.dest.delete([f"snapshots/{name}.json.gz"])
+
+    def prune(self, repack: float = DEFAULT_REPACK, force: bool = False) -> Dict:
+        """Drop unreferenced chunks using only the snapshots and index; returns what was done"""
+        locks = self.dest.list("locks/")
+        if locks and not force:
+            raise SystemExit(f"❌ A backup is in progress ({', '.join(locks)}); use --force for stale locks")
+        live = set()
+        snaps = self.snapshots()
+        for snap in snaps:
+            for entry in snap["files"]:
+                live.update(self._ids(entry))
+
+        index_keys = self.dest.list("index/")
+        packs: Dict[str, List] = {}
+        for key in index_keys:
+            for pack, entries in self._get_json(key)["packs"].items():
+                packs.setdefault(pack, []).extend(entries)
+        pack_keys = {key.rsplit("/", 1)[1]: key for key in self.dest.list("packs/")}
+
+        keep: Dict[str, List] = {}
+        delete, rewrite = [], []
+        freed = 0
+        for pack, entries in packs.items():
+            seen = set()
+            entries = [e for e in entries if not (e[0] in seen or seen.add(e[0]))]
+            alive = [e for e in entries if bytes.fromhex(e[0]) in live]
+            total = sum(e[2] for e in entries)
+            dead = total - sum(e[2] for e in alive)
+            if pack not in pack_keys:
+                continue
+            if not alive:
+                delete.append(pack)
+                freed += total
+            elif dead and dead >= total * repack:
+                rewrite.append((pack, alive))
+                freed += dead
+            else:
+                keep[pack] = alive
+        orphans = [p for p in pack_keys if p not in packs]
+
+        # repack: copy the live compressed chunks of mostly-garbage packs into new packs
+        uploads = ThreadPoolExecutor(DEFAULT_UPLOAD_JOBS, thread_name_prefix="upload")
+        packer = _Packer(self.dest, uploads, DEFAULT_UPLOAD_JOBS * 2)
+        try:
+            for pack, alive in rewrite:
+                data = self.dest.get(pack_keys[pack])
+                for cid, off, stored, raw in sorted(alive, key=lambda e: e[1]):
+                    packer.add(bytes.fromhex(cid), data[off:off + stored], raw)
+            packer.finish()
+        finally:
+            uploads.shutdown()
+        keep.update(packer.packs)
+
+        # new index first, then the old ones, then the packs: a crash at any point leaves a readable repository
+        if keep:
+            self._put_json(f"index/pruned-{uuid.uuid4().hex}.json.gz", {"packs": keep})
+        self.dest.delete(index_keys)
+        self.dest.delete([pack_keys[p] for p in delete + [p for p, _ in rewrite] + orphans])
+        return {"snapshots": len(snaps), "packs_deleted": len(delete), "packs_repacked": len(rewrite),
+                "orphans": len(orphans), "packs": len(keep), "freed": freed}
+
+    def check(self, read_data: bool = False, jobs: int = DEFAULT_UPLOAD_JOBS) -> List[str]:
+        """Every snapshot chunk indexed, every indexed pack present (and, with read_data, intact)"""
+        problems = []
+        index = self.load_index()
+        for snap in self.snapshots():
+            missing = sum(1 for entry in snap["files"] for cid in self._ids(entry) if cid not in index)
+            if missing:
+                problems.append(f"snapshot {snap['name']}: {missing} chunks not in the index")
+        pack_keys = {key.rsplit("/", 1)[1]: key for key in self.dest.list("packs/")}
+        by_pack: Dict[str, List] = {}
+        for cid, (pack, off, stored, raw) in index.items():
+            by_pack.setdefault(pack, []).append((off, stored, raw, cid))
+        for pack in by_pack:
+            if pack not in pack_keys:
+                problems.append(f"pack {pack[:16]} is in the index but missing")
+        if read_data:
+            def read(pack: str) -> List[str]:
+                data = self.dest.get(pack_keys[pack])
+                if hashlib.sha256(data).hexdigest() != pack:
+                    return [f"pack {pack[:16]} does not match its hash"]
+                return [f"chunk {cid.hex()[:16]} in pack {pack[:16]} is corrupt"
+                        for off, stored, raw, cid in by_pack[pack]
+                        if _chunk_id(self.decompress(data[off:off + stored])) != cid]
+            with ThreadPoolExecutor(jobs) as pool:
+                for found in pool.map(read, [p for p in by_pack if p in pack_keys]):
+                    problems.extend(found)
+        return problems
+
+
+def _dump(url: str, jobs: int, exclude_data: List[str]) -> str:
+    """pg_dump --format=directory --compress=0 into a temporary directory"""
+    staging = tempfile.mkdtemp(prefix="backup_repo_")
+    directory = os.path.join(staging, "dump")
+    cmd = [_tool("pg_dump"), "--format=directory", f"--jobs={jobs}", "--compress=0", "--no-password",
+           "--encoding=UTF8", f"--file={directory}"] + [f"--exclude-table-data={t}" for t in exclude_data]
+    result = subprocess.run(cmd + [f"--dbname={url}"], stderr=subprocess.PIPE, text=True,
+                            env=dict(os.environ, PGTZ="UTC"))
+    if result.returncode:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise SystemExit(f"❌ pg_dump failed:\n{result.stderr[-4000:]}")
+    return staging
+
+
+def _sources(paths: List[str], stdin_name: str) -> List[Tuple[str, str]]:
+    out = []
+    for path in paths:
+        if path == "-":
+            out.append((stdin_name, "-"))
+        elif os.path.isdir(path):
+            for folder, _, names in sorted(os.walk(path)):
+                for file_name in sorted(names):
+                    local = os.path.join(folder, file_name)
+                    out.append((os.path.relpath(local, path).replace(os.sep, "/"), local))
+        elif os.path.isfile(path):
+            out.append((os.path.basename(path), path))
+        else:
+            raise SystemExit(f"❌ No such file or directory: {path}")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deduplicating backup repository for PO database dumps")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    i = sub.add_parser("init", help="Create a repository")
+    i.add_argument("repository", help="s3://BUCKET/PREFIX or a local directory")
+    i.add_argument("--codec", choices=["gzip", "xz", "zstd"], default="gzip")
+    i.add_argument("--level", type=int, help="Compression level (default: the codec's)")
+    i.add_argument("--avg-kb", type=int, default=AVG_CHUNK >> 10,
+                   help=f"Average chunk size; min is a quarter, max four times (default: {AVG_CHUNK >> 10})")
+
+    b = sub.add_parser("backup", help="Store dump files, directories or stdin as a snapshot")
+    b.add_argument("repository")
+    b.add_argument("paths", nargs="*", help="Files or directories of uncompressed dump output, '-' for stdin")
+    b.add_argument("--dump", metavar="DATABASE_URL", help="Run pg_dump -Fd -Z0 and store its output")
+    b.add_argument("--stdin-name", default="dump.sql", help="File name for '-' in the snapshot")
+    b.add_argument("--name", help="Snapshot name (default: asr-po-YYYYmmdd_HHMMSS)")
+    b.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="pg_dump and compression workers")
+
+    s = sub.add_parser("snapshots", help="List snapshots with their deduplication")
+    s.add_argument("repository")
+
+    r = sub.add_parser("restore", help="Rebuild a snapshot's files")
+    r.add_argument("repository")
+    r.add_argument("name", help="Snapshot name or 'latest'")
+    r.add_argument("target", help="Directory to write the snapshot's files into")
+    r.add_argument("--no-verify", action="store_true", help="Skip the SHA-256 check of the restored files")
+
+    f = sub.add_parser("forget", help="Remove snapshots (and optionally prune)")
+    f.add_argument("repository")
+    f.add_argument("names", nargs="*")
+    f.add_argument("--keep-last", type=int, help="Keep only the newest N snapshots")
+    f.add_argument("--keep-days", type=int, help="Forget snapshots older than D days (the newest is always kept)")
+    f.add_argument("--prune", action="store_true")
+
+    p = sub.add_parser("prune", help="Delete data no snapshot references")
+    p.add_argument("repository")
+
+    for cmd in (f, p):
+        cmd.add_argument("--repack", type=float, default=DEFAULT_REPACK,
+                         help=f"Rewrite packs at least this fraction garbage (default: {DEFAULT_REPACK})")
+        cmd.add_argument("--force", action="store_true", help="Prune despite backup locks (stale after a crash)")
+
+    c = sub.add_parser("check", help="Verify the repository's structure (and data)")
+    c.add_argument("repository")
+    c.add_argument("--read-data", action="store_true", help="Download every pack and verify every chunk")
+
+    for cmd in (b, r, f, p, c):
+        cmd.add_argument("--upload-jobs", type=int, default=DEFAULT_UPLOAD_JOBS, help="Concurrent transfers")
+    args = parser.parse_args()
+
+    dest = open_destination(args.repository, getattr(args, "upload_jobs", DEFAULT_UPLOAD_JOBS))
+    if args.command == "init":
+        repo = Repository.init(dest, args.codec, args.level, args.avg_kb << 10)
+        c = repo.config["chunker"]
+        print(f"✅ Repository created in {dest.name} (chunks {c['min'] >> 10}/{c['avg'] >> 10}/{c['max'] >> 10} KiB, "
+              f"{args.codec})")
+        return
+
+    repo = Repository(dest)
+    if args.command == "backup":
+        if bool(args.paths) == bool(args.dump):
+            raise SystemExit("❌ Give dump files/directories (or '-') or --dump DATABASE_URL")
+        staging = _dump(args.dump, args.jobs, EXCLUDE_TABLE_DATA) if args.dump else None
+        try:
+            sources = _sources([os.path.join(staging, "dump")] if staging else args.paths, args.stdin_name)
+
+            def progress(path, size, totals):
+                print(f"   {path:<28} {_size(size):>11}  new so far {_size(totals['new_bytes'])}")
+            snap = repo.backup(sources, args.name, mask_url(args.dump) if args.dump else ", ".join(args.paths),
+                               args.jobs, args.upload_jobs, progress)
+        finally:
+            if staging:
+                shutil.rmtree(staging, ignore_errors=True)
+        st = snap["stats"]
+        print(f"✅ {snap['name']}: {_size(st['bytes'])} in {st['chunks']:,} chunks, {st['new_chunks']:,} new "
+              f"({_size(st['new_bytes'])}) stored as {_size(st['stored'])} in {st['packs']} packs, {st['seconds']:.1f}s")
+    elif args.command == "snapshots":
+        for snap in repo.snapshots():
+            st = snap["stats"]
+            print(f"{snap['name']:<28} {snap['created_at'][:19]}  {len(snap['files']):>4} files "
+                  f"{_size(st['bytes']):>11}  new {_size(st['new_bytes']):>11}  stored {_size(st['stored']):>11}")
+        packs = dest.list("packs/")
+        print(f"📦 {len(packs)} packs")
+    elif args.command == "restore":
+        t0 = time.perf_counter()
+        done = repo.restore(args.name, args.target, args.upload_jobs, not args.no_verify)
+        print(f"✅ {done['snapshot']}: {done['files']} files, {_size(done['bytes'])} from {done['packs']} packs "
+              f"into {args.target} in {time.perf_counter() - t0:.1f}s")
+    elif args.command == "forget":
+        snaps = repo.snapshots()
+        names = set(args.names)
+        if args.keep_last is not None:
+            names.update(s["name"] for s in snaps[:max(0, len(snaps) - args.keep_last)])
+        if args.keep_days is not None:
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=args.keep_days)).isoformat()
+            names.update(s["name"] for s in snaps[:-1] if s["created_at"] < cutoff)
+        unknown = names - {s["name"] for s in snaps}
+        if unknown:
+            raise SystemExit(f"❌ No snapshot {', '.join(sorted(unknown))}")
+        repo.forget(sorted(names))
+        for name in sorted(names):
+            print(f"🗑️  {name}")
+        print(f"✅ {len(names)} snapshots forgotten")
+    if args.command == "prune" or (args.command == "forget" and args.prune):
+        t0 = time.perf_counter()
+        done = repo.prune(args.repack, args.force)
+        print(f"✅ Pruned: {done['packs_deleted']} packs deleted, {done['packs_repacked']} repacked, "
+              f"{done['orphans']} orphans removed, {_size(done['freed'])} freed; {done['packs']} packs serve "
+              f"{done['snapshots']} snapshots ({time.perf_counter() - t0:.1f}s)")
+    elif args.command == "check":
+        problems = repo.check(args.read_data, args.upload_jobs)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            sys.exit(1)
+        print("✅ Repository is consistent" + (" and every chunk reads back intact" if args.read_data else ""))
+
+
+if __name__ == "__main__":
+    main()
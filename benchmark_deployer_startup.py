@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the AWS deployer (deploy-aws.py)
+Compares lazy client construction against building every client up front
+
+Usage:
+    python benchmark_deployer_startup.py
+    python benchmark_deployer_startup.py --repeat 5
+
+Requirements:
+    pip install boto3  (client timings are skipped without it)
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEPLOY_SCRIPT = os.path.join(SCRIPT_DIR, 'deploy-aws.py')
+
+
+def load_deploy_module():
+    """Import deploy-aws.py (the hyphenated name rules out a plain import)"""
+    spec = importlib.util.spec_from_file_location('deploy_aws', DEPLOY_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def time_cli_help(repeat: int) -> list:
+    """Wall time of `deploy-aws.py --help` in a fresh interpreter"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, DEPLOY_SCRIPT, '--help'],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def time_eager_clients(region: str) -> float:
+    """Previous behaviour: eight boto3.client() calls without a shared session"""
+    import boto3
+    start = time.perf_counter()
+    for service in ('ec2', 'rds', 'elasticache', 'ecr', 'apprunner',
+                    'secretsmanager', 's3', 'route53'):
+        boto3.client(service, region_name=region)
+    return time.perf_counter() - start
+
+
+def format_ms(samples: list) -> str:
+    if len(samples) == 1:
+        return f"{samples[0] * 1000:8.1f} ms"
+    return (f"{statistics.median(samples) * 1000:8.1f} ms median "
+            f"(min {min(samples) * 1000:.1f}, max {max(samples) * 1000:.1f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark AWS deployer startup')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of fresh-interpreter runs (default: 3)')
+    parser.add_argument('--region', default='us-east-2',
+                        help='AWS region used for client construction (default: us-east-2)')
+    args = parser.parse_args()
+
+    print("AWS deployer startup benchmark")
+    print("-" * 50)
+
+    print(f"CLI --help (fresh process):   {format_ms(time_cli_help(args.repeat))}")
+
+    deploy_aws = load_deploy_module()
+
+    start = time.perf_counter()
+    deployer = deploy_aws.AWSDeployer(region=args.region)
+    print(f"AWSDeployer() construction:   {format_ms([time.perf_counter() - start])}")
+
+    try:
+        import boto3  # noqa: F401
+    except ImportError:
+        print("boto3 not installed - skipping client construction timings")
+        return
+
+    start = time.perf_counter()
+    deployer.ec2
+    print(f"First client (ec2, lazy):     {format_ms([time.perf_counter() - start])}")
+
+    start = time.perf_counter()
+    deployer.ec2
+    print(f"Cached client (ec2):          {format_ms([time.perf_counter() - start])}")
+
+    print(f"Eager eight-client startup:   {format_ms([time_eager_clients(args.region)])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Parallel codemod runner for the ASR PO System web app
+
+Generalises fix_dynamic_exports.py: targets are discovered by glob
+instead of a hard-coded list, transforms are pluggable classes that work
+on the token/module index from ts_tokenizer.py (so multi-line imports,
+comments and strings are handled correctly), and files are processed
+across a process pool. Writes are atomic (temp file + rename in the same
+directory); --dry-run prints unified diffs instead of writing. Files
+already known to be compliant are skipped via codemod_cache.py.
+
+A transform is a Transform subclass with a name, a version and a
+transform(path, source) method returning the new source, or None when
+the file needs no change. Built-in transforms are listed by --list;
+others are loaded as "package.module:ClassName".
+
+Usage:
+    python codemod.py add-dynamic-export --dry-run
+    python codemod.py add-dynamic-export --root web/src/app/api --glob "**/route.ts"
+    python codemod.py add-dynamic-export --option value=force-static --check
+
+    # pre-commit: unchanged files are skipped from .codemod-cache.sqlite
+    python codemod.py add-dynamic-export --check --quiet
+    python codemod.py mypkg.transforms:RenameImport --root web/src --glob "**/*.ts" --glob "**/*.tsx"
+"""
+
+import argparse
+import difflib
+import importlib
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from codemod_cache import DEFAULT_CACHE_PATH, CodemodCache, content_digest, transform_key
+from ts_tokenizer import COMMENT, STRING, ModuleInfo, scan_module
+
+DEFAULT_ROOT = "web/src/app/api"
+DEFAULT_GLOBS = ("**/route.ts",)
+DEFAULT_EXCLUDES = ("node_modules", ".next", "dist", "build", "coverage")
+# Below this many files the pool's start-up cost outweighs the parallelism
+MIN_FILES_FOR_POOL = 64
+CHUNK_SIZE = 16
+
+
+class Transform:
+    """Base class for codemods; bump version whenever the output changes
+
+    Transforms must be idempotent: the cache records a file the transform
+    just rewrote as compliant.
+    """
+
+    name = "transform"
+    version = "1"
+    description = ""
+
+    def __init__(self, **options):
+        self.options = options
+
+    def transform(self, path: str, source: str) -> Optional[str]:
+        """Return the new source, or None to leave the file unchanged"""
+        raise NotImplementedError
+
+
+def statement_end(source: str, offset: int) -> int:
+    """Offset just past the line that contains offset"""
+    newline = source.find("\n", offset)
+    return len(source) if newline == -1 else newline + 1
+
+
+def insert_after_imports(info: ModuleInfo, block: str) -> str:
+    """Insert block (whole lines) after the last top-level import, one blank line either side
+
+    Without imports the block goes after any leading comments and
+    directives such as 'use server'.
+    """
+    source = info.source
+    newline = "\r\n" if "\r\n" in source else "\n"
+    if info.imports:
+        position = statement_end(source, info.imports_end())
+    else:
+        position = 0
+        for token in info.tokens:
+            if token.start < position:
+                continue
+            if token.kind == COMMENT or (token.kind == STRING and token.text[1:-1].startswith("use ")):
+                position = statement_end(source, token.end)
+                continue
+            break
+    before = source[:position].rstrip("\r\n")
+    after = source[position:].lstrip("\r\n")
+    text = block.replace("\n", newline)
+    if before:
+        text = before + newline * 2 + text
+    if after:
+        text += newline + after
+    return text
+
+
+class AddDynamicExport(Transform):
+    """Add `export const dynamic = '<value>'` to Next.js route handlers that lack it"""
+
+    name = "add-dynamic-export"
+    version = "2"
+    description = "Add export const dynamic = 'force-dynamic' after the imports"
+
+    def transform(self, path: str, source: str) -> Optional[str]:
+        info = scan_module(source)
+        if "dynamic" in info.exported_names():
+            return None
+        value = self.options.get("value", "force-dynamic")
+        # Match the file's quote style, taken from its import specifiers
+        quote = "'"
+        if info.imports:
+            last = source[info.imports[-1].start:info.imports[-1].end]
+            quote = '"' if last.count('"') > last.count("'") else "'"
+        block = (f"// Force dynamic rendering for API route\n"
+                 f"export const dynamic = {quote}{value}{quote};\n")
+        return insert_after_imports(info, block)
+
+
+TRANSFORMS = {cls.name: cls for cls in (AddDynamicExport,)}
+
+
+def load_transform(spec: str, options: Optional[Dict] = None) -> Transform:
+    """A built-in transform name or "module:ClassName" """
+    options = options or {}
+    if spec in TRANSFORMS:
+        return TRANSFORMS[spec](**options)
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"unknown transform '{spec}' (built-in: {', '.join(TRANSFORMS)}; "
+                         f"or use module:ClassName)")
+    cls = getattr(importlib.import_module(module_name), class_name)
+    if not (isinstance(cls, type) and issubclass(cls, Transform)):
+        raise ValueError(f"{spec} is not a Transform subclass")
+    return cls(**options)
+
+
+def discover(root: str, globs: Iterable[str] = DEFAULT_GLOBS,
+             excludes: Iterable[str] = DEFAULT_EXCLUDES) -> List[str]:
+    """Sorted, de-duplicated files under root matching any glob"""
+    excluded = set(excludes)
+    found = set()
+    for pattern in globs:
+        for path in Path(root).glob(pattern):
+            if path.is_file() and not excluded.intersection(path.parts):
+                found.add(str(path))
+    return sorted(found)
+
+
+def atomic_write(path: str, data: bytes):
+    """Write via a temp file in the same directory, then rename over the original"""
+    directory = os.path.dirname(path) or "."
+    mode = os.stat(path).st_mode & 0o7777 if os.path.exists(path) else 0o644
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def unified_diff(path: str, before: str, after: str) -> str:
+    return "".join(difflib.unified_diff(before.splitlines(keepends=True), after.splitlines(keepends=True),
+                                        fromfile=f"a/{path}", tofile=f"b/{path}"))
+
+
+# Per-process transform, set by the pool initializer (or directly when running inline)
+_worker_transform: Optional[Transform] = None
+
+
+def _init_worker(spec: str, options: Dict):
+    global _worker_transform
+    _worker_transform = load_transform(spec, options)
+
+
+def process_file(path: str, dry_run: bool = False, transform: Optional[Transform] = None,
+                 known_digest: Optional[str] = None) -> Dict:
+    """Apply the transform to one file; returns a result dict (never raises)
+
+    If the content hash equals known_digest (from the cache) the transform
+    is not run. The result carries the size, mtime and digest of the file
+    as it is on disk afterwards, for the cache.
+    """
+    transform = transform or _worker_transform
+    started = time.perf_counter()
+    result = {"path": path, "status": "unchanged", "diff": None, "error": None, "cached": False}
+    try:
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            raw = f.read()
+        digest = content_digest(raw)
+        result.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, digest=digest)
+        if known_digest is not None and digest == known_digest:
+            result["cached"] = True
+        else:
+            source = raw.decode("utf-8")
+            updated = transform.transform(path, source)
+            if updated is not None and updated != source:
+                result["status"] = "changed"
+                if dry_run:
+                    result["diff"] = unified_diff(path, source, updated)
+                else:
+                    data = updated.encode("utf-8")
+                    atomic_write(path, data)
+                    stat = os.stat(path)
+                    result.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, digest=content_digest(data))
+    except Exception as e:  # one bad file must not abort the run
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def run_codemod(paths: List[str], spec: str, options: Optional[Dict] = None, dry_run: bool = False,
+                workers: Optional[int] = None, cache: Optional[CodemodCache] = None) -> List[Dict]:
+    """Run a transform over paths, in a process pool when it pays off
+
+    With a cache, files last seen compliant with unchanged size and mtime
+    are skipped without being read, and files whose content hash matches
+    are skipped without running the transform.
+    """
+    options = options or {}
+    workers = workers or os.cpu_count() or 1
+    transform = load_transform(spec, options)
+    key = transform_key(transform)
+    if cache is not None:
+        todo, known = cache.partition(paths, key)
+    else:
+        todo, known = paths, {}
+    digests = [known.get(path) for path in todo]
+
+    if workers <= 1 or len(todo) < MIN_FILES_FOR_POOL:
+        results = [process_file(path, dry_run, transform, digest) for path, digest in zip(todo, digests)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(spec, options)) as pool:
+            results = list(pool.map(process_file, todo, [dry_run] * len(todo), [None] * len(todo),
+                                    digests, chunksize=CHUNK_SIZE))
+
+    if cache is not None:
+        for result in results:
+            if result["status"] == "unchanged" or (result["status"] == "changed" and not dry_run):
+                cache.record(key, result["path"], result["size"], result["mtime_ns"], result["digest"])
+            else:
+                cache.forget(key, result["path"])
+        cache.prune(key)
+        cache.flush()
+        processed = set(todo)
+        results += [{"path": path, "status": "unchanged", "diff": None, "error": None, "cached": True}
+                    for path in paths if path not in processed]
+    return results
+
+
+def parse_options(values: List[str]) -> Dict[str, str]:
+    options = {}
+    for value in values:
+        key, sep, option = value.partition("=")
+        if not sep:
+            raise ValueError(f"option '{value}' must be KEY=VALUE")
+        options[key] = option
+    return options
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a codemod over the ASR PO System web sources")
+    parser.add_argument("transform", nargs="?", help="Built-in transform name or module:ClassName")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help=f"Directory to search (default: {DEFAULT_ROOT})")
+    parser.add_argument("--glob", action="append", default=[],
+                        help=f"Glob relative to --root; repeatable (default: {DEFAULT_GLOBS[0]})")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help=f"Directory name to skip; repeatable (default: {', '.join(DEFAULT_EXCLUDES)})")
+    parser.add_argument("--option", action="append", default=[], metavar="KEY=VALUE",
+                        help="Option passed to the transform; repeatable")
+    parser.add_argument("--dry-run", action="store_true", help="Print diffs instead of writing files")
+    parser.add_argument("--check", action="store_true",
+                        help="Dry run that exits 1 if any file would change (for CI / pre-commit)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--list", action="store_true", help="List built-in transforms")
+    parser.add_argument("--quiet", action="store_true", help="Only print the summary")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH,
+                        help=f"Content-hash cache file (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="Process every file")
+    parser.add_argument("--clear-cache", action="store_true", help="Empty the cache before running")
+    args = parser.parse_args()
+
+    if args.list or not args.transform:
+        for name, cls in TRANSFORMS.items():
+            print(f"{name:<24} v{cls.version}  {cls.description}")
+        return
+
+    try:
+        options = parse_options(args.option)
+        load_transform(args.transform, options)
+    except (ValueError, ImportError, AttributeError) as e:
+        parser.error(str(e))
+
+    if not os.path.isdir(args.root):
+        print(f"❌ {args.root} does not exist")
+        sys.exit(1)
+
+    dry_run = args.dry_run or args.check
+    started = time.perf_counter()
+    paths = discover(args.root, args.glob or DEFAULT_GLOBS, args.exclude or DEFAULT_EXCLUDES)
+    cache = None if args.no_cache else CodemodCache(args.cache)
+    try:
+        if cache is not None and args.clear_cache:
+            cache.clear()
+        results = run_codemod(paths, args.transform, options, dry_run, args.workers, cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    elapsed = time.perf_counter() - started
+
+    counts = {"changed": 0, "unchanged": 0, "error": 0}
+    cached = sum(1 for result in results if result["cached"])
+    for result in results:
+        counts[result["status"]] += 1
+        if result["status"] == "error":
+            print(f"ERROR: {result['path']} - {result['error']}")
+        elif result["status"] == "changed" and not args.quiet:
+            if result["diff"]:
+                print(result["diff"], end="")
+            else:
+                print(f"FIXED: {result['path']}")
+
+    verb = "would change" if dry_run else "changed"
+    print(f"\n{args.transform}: {counts['changed']} {verb}, {counts['unchanged']} unchanged, "
+          f"{counts['error']} errors ({len(paths)} files, {cached} from cache, in {elapsed:.2f}s)")
+
+    if counts["error"] or (args.check and counts["changed"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
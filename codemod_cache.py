@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Persistent content-hash cache for codemod.py
+
+Remembers, per transform (name, version and options), which files were
+last seen compliant: their path, size, mtime and BLAKE2 content hash.
+On the next run a file whose size and mtime are unchanged is skipped
+without being opened; one whose stat changed but whose content hash
+still matches (a touch, a checkout of identical content) is skipped
+after hashing, without running the transform. Bumping a transform's
+version invalidates its entries.
+
+As in git's index, entries for files modified within the last couple of
+seconds are stored without a trusted mtime ("racy" entries), because a
+second write in the same mtime tick would otherwise go unnoticed; they
+are verified by hash next time.
+
+Usage:
+    cache = CodemodCache(".codemod-cache.sqlite")
+    todo, known = cache.partition(paths, transform_key(transform))
+    ...
+    cache.record(transform_key(transform), path, size, mtime_ns, digest)
+    cache.close()
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = ".codemod-cache.sqlite"
+RACY_WINDOW_NS = 2_000_000_000  # mtimes this close to "now" are not trusted
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    transform  TEXT NOT NULL,
+    path       TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    mtime_ns   INTEGER NOT NULL,
+    digest     TEXT NOT NULL,
+    PRIMARY KEY (transform, path)
+);
+"""
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def transform_key(transform) -> str:
+    """Identity of a transform's output: name, version and options"""
+    options = json.dumps(transform.options, sort_keys=True, default=str)
+    return f"{transform.name}@{transform.version}:{options}"
+
+
+class CodemodCache:
+    """SQLite-backed (transform, path) -> (size, mtime_ns, digest) map"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self._pending: List[Tuple] = []
+        self._stale: List[Tuple[str, str]] = []
+
+    def entries(self, key: str) -> Dict[str, Tuple[int, int, str]]:
+        rows = self.db.execute("SELECT path, size, mtime_ns, digest FROM entries WHERE transform = ?", (key,))
+        return {path: (size, mtime_ns, digest) for path, size, mtime_ns, digest in rows}
+
+    def partition(self, paths: List[str], key: str) -> Tuple[List[str], Dict[str, Optional[str]]]:
+        """Split paths into those to process and a map of those to check
+
+        Returns (to_process, known_digests): paths whose size and mtime match
+        their entry are left out of to_process entirely; the rest map to the
+        cached digest (or None) so workers can skip unchanged content.
+        """
+        entries = self.entries(key)
+        to_process, known = [], {}
+        for path in paths:
+            entry = entries.get(path)
+            if entry is not None:
+                size, mtime_ns, digest = entry
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    stat = None  # let the worker report it
+                if stat is not None and mtime_ns and stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+                    continue
+                known[path] = digest
+            else:
+                known[path] = None
+            to_process.append(path)
+        return to_process, known
+
+    def record(self, key: str, path: str, size: int, mtime_ns: int, digest: str):
+        """Mark path compliant as of the given stat and content"""
+        if time.time_ns() - mtime_ns < RACY_WINDOW_NS:
+            mtime_ns = 0  # racy: verify by hash next time
+        self._pending.append((key, path, size, mtime_ns, digest))
+
+    def forget(self, key: str, path: str):
+        self._stale.append((key, path))
+
+    def prune(self, key: str):
+        """Drop entries for files that no longer exist"""
+        self._stale.extend((key, path) for path in self.entries(key) if not os.path.exists(path))
+
+    def flush(self):
+        with self.db:
+            if self._stale:
+                self.db.executemany("DELETE FROM entries WHERE transform = ? AND path = ?", self._stale)
+            if self._pending:
+                self.db.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", self._pending)
+        self._pending.clear()
+        self._stale.clear()
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM entries")
+
+    def close(self):
+        self.flush()
+        self.db.close()
@@ -0,0 +1,121 @@
+-- ============================================================================
+-- ASR PO System - Representative query corpus
+-- ============================================================================
+-- Hot read paths of the dashboard, approval and report routes (the ones the
+-- load-testing scenarios hit), written the way Prisma issues them. Input for
+-- schema_advisor.py:
+--
+--     python schema_advisor.py database/query-patterns.sql
+--
+-- "-- calls: N" weights the statement that follows (default 1); "-- route:"
+-- is informational. Real traffic can be analysed instead by pointing the
+-- advisor at a PostgreSQL log (log_min_duration_statement = 0) or a Prisma
+-- query log.
+-- ============================================================================
+
+-- route: GET /api/dashboard/pending-approvals
+-- calls: 1200
+SELECT "public"."po_headers"."id", "public"."po_headers"."po_number", "public"."po_headers"."total_amount",
+       "public"."po_headers"."division_id", "public"."po_headers"."vendor_id", "public"."po_headers"."created_at"
+FROM "public"."po_headers"
+WHERE ("public"."po_headers"."status" = 'Submitted' AND "public"."po_headers"."deleted_at" IS NULL)
+ORDER BY "public"."po_headers"."created_at" DESC
+LIMIT 50;
+
+-- route: GET /api/dashboard/pending-approvals (approval history per PO)
+-- calls: 1200
+SELECT "public"."po_approvals"."id", "public"."po_approvals"."po_id", "public"."po_approvals"."action",
+       "public"."po_approvals"."timestamp"
+FROM "public"."po_approvals"
+WHERE "public"."po_approvals"."po_id" IN ($1, $2, $3, $4, $5)
+ORDER BY "public"."po_approvals"."timestamp" DESC;
+
+-- route: GET /api/po/pending
+-- calls: 600
+SELECT id, po_number, total_amount, division_id, vendor_id, created_at
+FROM po_headers
+WHERE status = 'Submitted' AND deleted_at IS NULL
+ORDER BY total_amount DESC, created_at ASC;
+
+-- route: GET /api/dashboard/kpis
+-- calls: 900
+SELECT COUNT(*) FROM po_headers
+WHERE deleted_at IS NULL AND status NOT IN ('Cancelled', 'Paid');
+
+-- route: GET /api/dashboard/kpis
+-- calls: 900
+SELECT COUNT(*) FROM po_approvals WHERE "timestamp" >= $1;
+
+-- route: GET /api/dashboard/po-summary
+-- calls: 800
+SELECT vendor_id, COUNT(*), SUM(total_amount)
+FROM po_headers
+WHERE division_id = $1 AND deleted_at IS NULL AND created_at >= $2 AND created_at < $3
+GROUP BY vendor_id;
+
+-- route: GET /api/po (list, filtered by division and status)
+-- calls: 1500
+SELECT id, po_number, status, total_amount, vendor_id, project_id, created_at
+FROM po_headers
+WHERE division_id = $1 AND status = $2 AND deleted_at IS NULL
+ORDER BY created_at DESC
+LIMIT 50 OFFSET 0;
+
+-- route: GET /api/po (list, all divisions)
+-- calls: 700
+SELECT id, po_number, status, total_amount, vendor_id, project_id, created_at
+FROM po_headers
+WHERE deleted_at IS NULL
+ORDER BY created_at DESC
+LIMIT 50 OFFSET $1;
+
+-- route: POST /api/po (purchase sequence per work order)
+-- calls: 150
+SELECT COUNT(*) FROM po_headers WHERE work_order_id = $1;
+
+-- route: GET /api/reports/vendor-analysis
+-- calls: 60
+SELECT v.vendor_name, COUNT(ph.id), SUM(ph.total_amount)
+FROM po_headers ph
+JOIN vendors v ON v.id = ph.vendor_id
+WHERE ph.deleted_at IS NULL AND ph.status IN ('Approved', 'Issued', 'Received', 'Invoiced', 'Paid')
+  AND ph.created_at BETWEEN $1 AND $2
+GROUP BY v.vendor_name;
+
+-- route: GET /api/reports/budget-vs-actual
+-- calls: 40
+SELECT ph.project_id, SUM(ph.total_amount)
+FROM po_headers ph
+WHERE ph.deleted_at IS NULL AND ph.project_id = $1 AND ph.status <> 'Cancelled'
+GROUP BY ph.project_id;
+
+-- route: GET /api/reports/gl-analysis
+-- calls: 40
+SELECT li.gl_account_number, SUM(li.line_subtotal)
+FROM po_line_items li
+JOIN po_headers ph ON ph.id = li.po_id
+WHERE ph.deleted_at IS NULL AND ph.created_at >= $1
+GROUP BY li.gl_account_number;
+
+-- route: GET /api/audit-trail
+-- calls: 300
+SELECT a.id, a.po_id, a.action, a.actor_user_id, a.status_before, a.status_after, a."timestamp"
+FROM po_approvals a
+WHERE a.actor_user_id = $1 AND a."timestamp" >= $2
+ORDER BY a."timestamp" DESC
+LIMIT 100;
+
+-- route: GET /api/projects/[id] (delete guard)
+-- calls: 20
+SELECT COUNT(*) FROM po_headers WHERE project_id = $1 AND deleted_at IS NULL;
+
+-- route: POST /api/po (division leader lookup)
+-- calls: 150
+SELECT * FROM division_leaders WHERE division_id = $1 AND is_active = true LIMIT 1;
+
+-- route: GET /api/vendors
+-- calls: 400
+SELECT id, vendor_code, vendor_name, vendor_type
+FROM vendors
+WHERE is_active = true
+ORDER BY vendor_name ASC;
@@ -297,6 +297,24 @@ CREATE TABLE work_order_sequences (
 
 COMMENT ON TABLE work_order_sequences IS 'Tracks next work order number per division per year';
 
+-- Blocks of sequence numbers leased by sequence_allocator.py: 'active' (held,
+-- renewed by heartbeat until expires_at), 'consumed' (issued, or used by a
+-- holder that died) or 'returned' (never issued, taken by the next lease)
+CREATE TABLE sequence_leases (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    division_id UUID NOT NULL REFERENCES divisions(id),
+    year INTEGER NOT NULL,
+    range_start INTEGER NOT NULL,
+    range_end INTEGER NOT NULL,
+    state VARCHAR(10) NOT NULL DEFAULT 'active',
+    holder VARCHAR(100),
+    leased_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE,
+    closed_at TIMESTAMP WITH TIME ZONE
+);
+
+COMMENT ON TABLE sequence_leases IS 'Work order sequence ranges leased in blocks per division per year';
+
 -- =====================================================
 -- INDEXES
 -- =====================================================
@@ -335,6 +353,7 @@ CREATE INDEX idx_po_headers_work_order ON po_headers(work_order_id);
 CREATE INDEX idx_po_headers_status ON po_headers(status);
 CREATE INDEX idx_po_headers_created ON po_headers(created_at);
 CREATE INDEX idx_po_headers_leader_code ON po_headers(po_leader_code);
+CREATE INDEX idx_po_headers_updated ON po_headers(updated_at);
 
 -- PO line items indexes
 CREATE INDEX idx_po_line_items_po ON po_line_items(po_id);
@@ -346,6 +365,9 @@ CREATE INDEX idx_po_approvals_actor ON po_approvals(actor_user_id);
 CREATE INDEX idx_po_approvals_action ON po_approvals(action);
 CREATE INDEX idx_po_approvals_timestamp ON po_approvals(timestamp);
 
+-- Sequence lease indexes
+CREATE INDEX idx_sequence_leases_state ON sequence_leases(division_id, year, state);
+
 -- =====================================================
 -- FUNCTIONS
 -- =====================================================
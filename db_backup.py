@@ -0,0 +1,698 @@
+#!/usr/bin/env python3
+"""
+Parallel, streaming backup and restore of the PO database with verification
+
+deployment/backup-automation.sh runs pg_dump with two jobs, then gzips the
+finished dump on one core, then uploads it as one object: three passes over
+the whole backup, one after the other, and only the first uses more than a
+core. This engine overlaps them:
+
+    dump      pg_dump --format=directory --jobs=N (one worker per table,
+              all on one synchronized snapshot) into a staging directory,
+              uncompressed
+    compress  each table file is read while pg_dump is still writing it,
+              cut into fixed-size chunks and compressed on a thread pool
+              (zlib, lzma and zstd release the GIL, so N threads use N
+              cores); every chunk is a complete gzip member / xz stream /
+              zstd frame, so the parts of a file concatenate into one
+              valid compressed file
+    upload    chunks go to the destination (S3 or a local directory) as
+              they are compressed, several at a time; a table file is
+              deleted from staging as soon as pg_dump reports it finished,
+              and the chunks in flight are bounded, so memory stays flat
+    manifest  written last: every part with its plain offset and SHA-256,
+              and per table the row count and an order-independent row
+              checksum (sums of per-row CRC-32 and Adler-32) taken from
+              the dump stream
+
+Restore downloads and decompresses the parts in parallel straight into
+their offsets, rebuilds the directory archive and runs pg_restore --jobs
+into the target. With --verify the restored tables are read back with COPY
+and their row counts and checksums compared with the manifest, so a backup
+is only called good once it has been restored.
+
+Destinations:
+    s3://BUCKET/PREFIX        (STANDARD_IA, like backup-automation.sh)
+    /var/backups/asr-po       (any other value: a local directory)
+
+Usage:
+    python db_backup.py backup "$DATABASE_URL" s3://asr-backups/asr-po-backups --jobs 8
+    python db_backup.py backup "$DATABASE_URL" /var/backups/asr-po --codec zstd
+    python db_backup.py backup --archive ./dump-dir /var/backups/asr-po   # ship an existing -Fd dump
+    python db_backup.py list /var/backups/asr-po
+    python db_backup.py restore /var/backups/asr-po latest "$SCRATCH_URL" --verify
+    python db_backup.py restore s3://asr-backups/asr-po-backups asr-po-backup_20261019_020000 --to-dir ./dump
+    python db_backup.py prune /var/backups/asr-po --keep-days 30
+
+Requirements:
+    pg_dump / pg_restore       (PostgreSQL client tools, matching the server)
+    pip install 'psycopg[binary]'  (--verify and table statistics)
+    pip install boto3          (s3:// destinations only)
+    pip install zstandard      (--codec zstd only)
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sql_schema import connect_postgres, mask_url
+
+BACKUP_PREFIX = "asr-po-backup"
+DEFAULT_CHUNK = 8 << 20
+DEFAULT_JOBS = os.cpu_count() or 2
+DEFAULT_UPLOAD_JOBS = 8
+# Same data exclusions as backup-automation.sh
+EXCLUDE_TABLE_DATA = ["audit_log", "temp_files", "session_store"]
+# Session settings pg_dump uses for COPY output (plus the ones this tool forces),
+# so restored tables read back byte-for-byte like the dump
+COPY_SETTINGS = ["SET client_encoding = 'UTF8'", "SET TimeZone = 'UTC'", "SET DateStyle = ISO",
+                 "SET IntervalStyle = postgres", "SET extra_float_digits = 3",
+                 "SET synchronize_seqscans = off"]
+_FINISHED = re.compile(r"finished item (\d+) TABLE DATA")
+_TOC_LINE = re.compile(r"^(\d+); \d+ \d+ TABLE DATA (\S+) (\S+)")
+
+
+# ---------------------------------------------------------------------------
+# Codecs: every chunk compresses independently, so parts concatenate
+# ---------------------------------------------------------------------------
+
+def _codec(name: str, level: Optional[int] = None) -> Tuple[str, Callable, Callable]:
+    """(suffix, compress, decompress) for a chunk"""
+    if name == "gzip":
+        level = 6 if level is None else level
+
+        def compress(data: bytes) -> bytes:
+            packer = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip member
+            return packer.compress(data) + packer.flush()
+        return ".gz", compress, gzip.decompress
+    if name == "xz":
+        preset = 3 if level is None else level
+        return ".xz", lambda data: lzma.compress(data, preset=preset), lzma.decompress
+    if name == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit("❌ --codec zstd needs zstandard: pip install zstandard")
+        level = 3 if level is None else level
+        # compressor and decompressor objects are not thread-safe: one per chunk
+        return (".zst", lambda data: zstandard.ZstdCompressor(level=level).compress(data),
+                lambda data: zstandard.ZstdDecompressor().decompress(data))
+    raise SystemExit(f"❌ Unknown codec '{name}' (gzip, xz or zstd)")
+
+
+def row_checksum(lines) -> int:
+    """Order-independent checksum of COPY text rows: the sums of their CRC-32s and Adler-32s, 32 bits each"""
+    return ((sum(map(zlib.crc32, lines)) & 0xFFFFFFFF) << 32) | (sum(map(zlib.adler32, lines)) & 0xFFFFFFFF)
+
+
+def _add(a: int, b: int) -> int:
+    """Combine two row_checksum values"""
+    return ((((a >> 32) + (b >> 32)) & 0xFFFFFFFF) << 32) | (((a & 0xFFFFFFFF) + (b & 0xFFFFFFFF)) & 0xFFFFFFFF)
+
+
+class RowCounter:
+    """Counts and checksums the rows of a COPY text stream fed in arbitrary pieces"""
+
+    def __init__(self):
+        self.rows = 0
+        self.checksum = 0
+        self.carry = b""
+        self.ended = False  # past the \\. terminator of a pg_dump data file
+
+    def write(self, data: bytes):
+        if self.ended:
+            return
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        lines = (self.carry + bytes(data)).split(b"\n")
+        self.carry = lines.pop()
+        if b"\\." in lines:
+            lines = lines[:lines.index(b"\\.")]
+            self.ended = True
+        self.rows += len(lines)
+        self.checksum = _add(self.checksum, row_checksum(lines))
+
+    def close(self):
+        if self.carry and not self.ended and self.carry != b"\\.":
+            self.write(b"\n")
+
+
+# ---------------------------------------------------------------------------
+# Destinations
+# ---------------------------------------------------------------------------
+
+class LocalDestination:
+    def __init__(self, root: str):
+        self.root = root
+        self.name = root
+
+    def put(self, key: str, data: bytes):
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+
+    def get(self, key: str) -> bytes:
+        with open(os.path.join(self.root, key), "rb") as f:
+            return f.read()
+
+    def get_range(self, key: str, start: int, length: int) -> bytes:
+        with open(os.path.join(self.root, key), "rb") as f:
+            f.seek(start)
+            return f.read(length)
+
+    def list(self, prefix: str = "") -> List[str]:
+        base = os.path.join(self.root, prefix)
+        if not os.path.isdir(base):
+            return []
+        out = []
+        for folder, _, files in os.walk(base):
+            for name in files:
+                if not name.endswith(".tmp"):
+                    out.append(os.path.relpath(os.path.join(folder, name), self.root).replace(os.sep, "/"))
+        return sorted(out)
+
+    def delete(self, keys: List[str]):
+        for key in keys:
+            os.remove(os.path.join(self.root, key))
+            try:
+                os.removedirs(os.path.dirname(os.path.join(self.root, key)))
+            except OSError:
+                pass
+
+
+class S3Destination:
+    def __init__(self, url: str, pool: int = DEFAULT_UPLOAD_JOBS):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise SystemExit("❌ s3:// destinations need boto3: pip install boto3")
+        self.name = url
+        self.bucket, _, prefix = url[len("s3://"):].partition("/")
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        region = os.environ.get("BACKUP_S3_REGION", "us-west-2")
+        self.client = boto3.client("s3", region_name=region, config=Config(max_pool_connections=pool + 4))
+
+    def put(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data, StorageClass="STANDARD_IA")
+
+    def get(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"].read()
+
+    def get_range(self, key: str, start: int, length: int) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key,
+                                      Range=f"bytes={start}-{start + length - 1}")["Body"].read()
+
+    def list(self, prefix: str = "") -> List[str]:
+        out = []
+        for page in self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket,
+                                                                          Prefix=self.prefix + prefix):
+            out.extend(obj["Key"][len(self.prefix):] for obj in page.get("Contents", []))
+        return sorted(out)
+
+    def delete(self, keys: List[str]):
+        for i in range(0, len(keys), 1000):
+            self.client.delete_objects(Bucket=self.bucket, Delete={
+                "Objects": [{"Key": self.prefix + k} for k in keys[i:i + 1000]], "Quiet": True})
+
+
+def open_destination(spec: str, pool: int = DEFAULT_UPLOAD_JOBS):
+    if spec.startswith("s3://"):
+        return S3Destination(spec, pool)
+    return LocalDestination(spec)
+
+
+def _tool(name: str) -> str:
+    path = shutil.which(name)
+    if not path:
+        raise SystemExit(f"❌ {name} not found. Please install PostgreSQL client tools.")
+    return path
+
+
+def _toc_tables(directory: str) -> Dict[str, str]:
+    """data file -> schema.table, from pg_restore --list; empty without pg_restore"""
+    if not shutil.which("pg_restore"):
+        return {}
+    listing = subprocess.run([_tool("pg_restore"), "--list", directory], capture_output=True, text=True, check=True)
+    out = {}
+    for line in listing.stdout.splitlines():
+        match = _TOC_LINE.match(line)
+        if match:
+            out[f"{match.group(1)}.dat"] = f"{match.group(2)}.{match.group(3)}"
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Backup
+# ---------------------------------------------------------------------------
+
+class _Tail:
+    """A data file pg_dump is still writing: consumed in whole chunks until it is finished"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.handle = open(path, "rb")
+        self.offset = 0
+        self.parts = 0
+        self.counter = RowCounter()
+
+    def read(self, chunk: int, final: bool):
+        """Yield (index, offset, bytes) for every whole chunk available (and the tail when final)"""
+        while True:
+            size = os.fstat(self.handle.fileno()).st_size - self.offset
+            if size <= 0 or (size < chunk and not final):
+                return
+            self.handle.seek(self.offset)
+            data = self.handle.read(min(size, chunk))
+            if not data:
+                return
+            self.counter.write(data)
+            yield self.parts, self.offset, data
+            self.parts += 1
+            self.offset += len(data)
+
+    def close(self):
+        self.counter.close()
+        self.handle.close()
+
+
+class Uploader:
+    """Compresses chunks on one pool and uploads them on another, with a bound on chunks in flight"""
+
+    def __init__(self, dest, name: str, codec: str, level: Optional[int], jobs: int, upload_jobs: int):
+        self.dest = dest
+        self.name = name
+        self.suffix, self.compress, _ = _codec(codec, level)
+        self.compressors = ThreadPoolExecutor(jobs, thread_name_prefix="compress")
+        self.uploaders = ThreadPoolExecutor(upload_jobs, thread_name_prefix="upload")
+        self.slots = threading.BoundedSemaphore(jobs * 2 + upload_jobs)
+        self.lock = threading.Lock()
+        self.parts: Dict[str, List[Dict]] = {}
+        self.pending = []
+        self.error: Optional[BaseException] = None
+        self.plain = 0
+        self.stored = 0
+
+    def submit(self, file_name: str, index: int, offset: int, data: bytes):
+        if self.error:
+            raise self.error
+        self.slots.acquire()
+        self.pending.append(self.compressors.submit(self._compress, file_name, index, offset, data))
+
+    def _compress(self, file_name: str, index: int, offset: int, data: bytes):
+        try:
+            packed = self.compress(data)
+            part = {"index": index, "key": f"{self.name}/{file_name}.part{index:05d}{self.suffix}",
+                    "offset": offset, "size": len(data), "stored": len(packed),
+                    "sha256": hashlib.sha256(data).hexdigest()}
+            return self.uploaders.submit(self._upload, file_name, part, packed).result()
+        except BaseException as e:
+            self.error = self.error or e
+            self.slots.release()
+            raise
+
+    def _upload(self, file_name: str, part: Dict, packed: bytes):
+        try:
+            self.dest.put(part["key"], packed)
+        finally:
+            self.slots.release()
+        with self.lock:
+            self.parts.setdefault(file_name, []).append(part)
+            self.plain += part["size"]
+            self.stored += part["stored"]
+
+    def finish(self):
+        for future in as_completed(self.pending):
+            future.result()
+        self.compressors.shutdown()
+        self.uploaders.shutdown()
+
+
+def _source_stats(url: str) -> Dict[str, Dict]:
+    """schema.table -> estimated rows and size, for the report"""
+    try:
+        conn = connect_postgres(url)
+    except ImportError:
+        return {}
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT n.nspname || '.' || c.relname, c.reltuples::bigint, pg_total_relation_size(c.oid) "
+                        "FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                        "WHERE c.relkind = 'r' AND n.nspname NOT IN ('pg_catalog', 'information_schema')")
+            return {name: {"estimated_rows": rows, "relation_bytes": size} for name, rows, size in cur.fetchall()}
+    finally:
+        conn.close()
+
+
+def backup(source: Optional[str], dest, jobs: int = DEFAULT_JOBS, upload_jobs: int = DEFAULT_UPLOAD_JOBS,
+           codec: str = "gzip", level: Optional[int] = None, chunk: int = DEFAULT_CHUNK,
+           archive: Optional[str] = None, exclude_data: List[str] = EXCLUDE_TABLE_DATA,
+           name: Optional[str] = None, progress=print) -> Dict:
+    """Dump source (or ship an existing directory archive) to dest; returns the manifest"""
+    started = time.perf_counter()
+    created = datetime.now(timezone.utc)
+    name = name or f"{BACKUP_PREFIX}_{created.strftime('%Y%m%d_%H%M%S')}"
+    uploader = Uploader(dest, name, codec, level, jobs, upload_jobs)
+    staging = None
+    proc = None
+    tails: Dict[str, _Tail] = {}
+    stats: Dict[str, Dict] = {}
+    done: Dict[str, Dict] = {}
+    finished = set()
+    log_lines: List[str] = []
+
+    def drain(file_name: str, final: bool):
+        tail = tails.get(file_name)
+        if tail is None:
+            tail = tails[file_name] = _Tail(os.path.join(directory, file_name))
+        for index, offset, data in tail.read(chunk, final):
+            uploader.submit(file_name, index, offset, data)
+        if final:
+            tail.close()
+            done[file_name] = {"bytes": tail.offset, "rows": tail.counter.rows,
+                               "row_checksum": f"{tail.counter.checksum:016x}"}
+            del tails[file_name]
+
+    try:
+        if archive:
+            directory = archive
+            if not os.path.isfile(os.path.join(directory, "toc.dat")):
+                raise SystemExit(f"❌ {directory} is not a pg_dump directory archive (no toc.dat)")
+        else:
+            staging = tempfile.mkdtemp(prefix="db_backup_")
+            directory = os.path.join(staging, "dump")
+            stats = _source_stats(source)
+            cmd = [_tool("pg_dump"), "--format=directory", f"--jobs={jobs}", "--compress=0", "--verbose",
+                   "--no-password", "--encoding=UTF8", f"--file={directory}"]
+            cmd += [f"--exclude-table-data={table}" for table in exclude_data]
+            cmd.append(f"--dbname={source}")
+            env = dict(os.environ, PGTZ="UTC")
+            proc = subprocess.Popen(cmd, stderr=subprocess.PIPE, text=True, env=env)
+
+            def read_log():
+                for line in proc.stderr:
+                    log_lines.append(line.rstrip())
+                    match = _FINISHED.search(line)
+                    if match:
+                        finished.add(f"{match.group(1)}.dat")
+            reader = threading.Thread(target=read_log, daemon=True)
+            reader.start()
+            while proc.poll() is None:
+                for file_name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+                    if file_name.endswith(".dat") and file_name != "toc.dat" and file_name not in done:
+                        complete = file_name in finished
+                        drain(file_name, complete)
+                        if complete:
+                            os.remove(os.path.join(directory, file_name))
+                time.sleep(0.1)
+            reader.join()
+            if proc.returncode:
+                raise SystemExit("❌ pg_dump failed:\n" + "\n".join(log_lines[-20:]))
+
+        for file_name in sorted(os.listdir(directory)):
+            if file_name.endswith(".dat") and file_name != "toc.dat" and file_name not in done:
+                drain(file_name, True)
+        uploader.finish()
+
+        # toc.dat and any other small metadata files (blobs.toc) go whole, uncompressed
+        extra = {}
+        for file_name in sorted(os.listdir(directory)):
+            if file_name not in done:
+                with open(os.path.join(directory, file_name), "rb") as f:
+                    data = f.read()
+                dest.put(f"{name}/{file_name}", data)
+                extra[file_name] = {"key": f"{name}/{file_name}", "size": len(data),
+                                    "sha256": hashlib.sha256(data).hexdigest()}
+
+        tables = _toc_tables(directory)
+        files = {}
+        for file_name, info in sorted(done.items()):
+            info["table"] = tables.get(file_name)
+            info["parts"] = sorted(uploader.parts.get(file_name, []), key=lambda p: p["index"])
+            info["stored"] = sum(p["stored"] for p in info["parts"])
+            info.update(stats.get(info["table"], {}))
+            files[file_name] = info
+        manifest = {"name": name, "format": "pg_dump-directory", "created_at": created.isoformat(),
+                    "source": mask_url(source) if source else f"archive:{archive}", "codec": codec,
+                    "chunk": chunk, "jobs": jobs, "files": files, "metadata": extra,
+                    "bytes": uploader.plain, "stored": uploader.stored,
+                    "seconds": round(time.perf_counter() - started, 3)}
+        dest.put(f"{name}/manifest.json", json.dumps(manifest, indent=1).encode("utf-8"))
+        return manifest
+    except BaseException:
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+        raise
+    finally:
+        for tail in tails.values():
+            tail.handle.close()
+        if staging:
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Restore and verification
+# ---------------------------------------------------------------------------
+
+def list_backups(dest) -> List[Dict]:
+    out = []
+    for key in dest.list():
+        if key.endswith("/manifest.json"):
+            out.append(json.loads(dest.get(key)))
+    return sorted(out, key=lambda m: m["created_at"])
+
+
+def load_manifest(dest, name: str) -> Dict:
+    if name == "latest":
+        backups = list_backups(dest)
+        if not backups:
+            raise SystemExit(f"❌ No backups in {dest.name}")
+        return backups[-1]
+    try:
+        return json.loads(dest.get(f"{name}/manifest.json"))
+    except (OSError, KeyError) as e:
+        raise SystemExit(f"❌ No backup '{name}' in {dest.name}: {e}")
+
+
+def fetch(dest, manifest: Dict, directory: str, jobs: int = DEFAULT_UPLOAD_JOBS) -> int:
+    """Download and decompress a backup into a pg_dump directory archive; returns bytes written"""
+    _, _, decompress = _codec(manifest["codec"])
+    os.makedirs(directory, exist_ok=True)
+    for file_name, meta in manifest["metadata"].items():
+        data = dest.get(meta["key"])
+        if hashlib.sha256(data).hexdigest() != meta["sha256"]:
+            raise SystemExit(f"❌ {meta['key']} is corrupt (SHA-256 mismatch)")
+        with open(os.path.join(directory, file_name), "wb") as f:
+            f.write(data)
+
+    handles = {}
+    for file_name, info in manifest["files"].items():
+        fd = os.open(os.path.join(directory, file_name), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.ftruncate(fd, info["bytes"])
+        handles[file_name] = fd
+
+    def one(file_name: str, part: Dict) -> int:
+        data = decompress(dest.get(part["key"]))
+        if len(data) != part["size"] or hashlib.sha256(data).hexdigest() != part["sha256"]:
+            raise SystemExit(f"❌ {part['key']} is corrupt (SHA-256 mismatch)")
+        os.pwrite(handles[file_name], data, part["offset"])
+        return len(data)
+
+    try:
+        with ThreadPoolExecutor(jobs, thread_name_prefix="fetch") as pool:
+            futures = [pool.submit(one, file_name, part) for file_name, info in manifest["files"].items()
+                       for part in info["parts"]]
+            return sum(f.result() for f in as_completed(futures))
+    finally:
+        for fd in handles.values():
+            os.close(fd)
+
+
+def pg_restore(directory: str, target: str, jobs: int):
+    conn = connect_postgres(target)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT count(*) FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                        "WHERE c.relkind = 'r' AND n.nspname NOT IN ('pg_catalog', 'information_schema')")
+            if cur.fetchone()[0]:
+                raise SystemExit(f"❌ {mask_url(target)} already has tables; restore into an empty scratch database")
+    finally:
+        conn.close()
+    result = subprocess.run([_tool("pg_restore"), f"--jobs={jobs}", "--no-owner", "--no-privileges",
+                             "--exit-on-error", f"--dbname={target}", directory],
+                            stderr=subprocess.PIPE, text=True)
+    if result.returncode:
+        raise SystemExit(f"❌ pg_restore failed:\n{result.stderr[-4000:]}")
+
+
+def _table_checksum(target: str, table: str) -> Tuple[int, int]:
+    """(rows, row checksum) of a restored table, read with the dump's COPY settings and column list"""
+    conn = connect_postgres(target)
+    try:
+        with conn.cursor() as cur:
+            for statement in COPY_SETTINGS:
+                cur.execute(statement)
+            cur.execute("SELECT quote_ident(attname) FROM pg_attribute WHERE attrelid = %s::regclass "
+                        "AND attnum > 0 AND NOT attisdropped AND attgenerated = '' ORDER BY attnum", (table,))
+            columns = ", ".join(r[0] for r in cur.fetchall())
+            schema, _, relation = table.partition(".")
+            sql = f'COPY "{schema}"."{relation}" ({columns}) TO STDOUT'
+            counter = RowCounter()
+            if hasattr(cur, "copy"):
+                with cur.copy(sql) as copy:
+                    for data in copy:
+                        counter.write(data)
+            else:
+                cur.copy_expert(sql, counter)
+            counter.close()
+            return counter.rows, counter.checksum
+    finally:
+        conn.close()
+
+
+def verify(target: str, manifest: Dict, jobs: int = DEFAULT_JOBS) -> List[Tuple[str, str]]:
+    """Compare every table's rows and checksum with the manifest; returns (table, problem) pairs"""
+    tables = [(info["table"], info) for info in manifest["files"].values() if info.get("table")]
+    if not tables:
+        raise SystemExit("❌ The manifest maps no data files to tables (backup made without pg_restore)")
+    problems = []
+    with ThreadPoolExecutor(jobs, thread_name_prefix="verify") as pool:
+        futures = {pool.submit(_table_checksum, target, table): (table, info) for table, info in tables}
+        for future in as_completed(futures):
+            table, info = futures[future]
+            rows, checksum = future.result()
+            if rows != info["rows"]:
+                problems.append((table, f"{rows:,} rows restored, {info['rows']:,} dumped"))
+            elif f"{checksum:016x}" != info["row_checksum"]:
+                problems.append((table, "row checksum differs"))
+    return problems
+
+
+def prune(dest, keep_days: int, keep_min: int = 1) -> List[str]:
+    """Delete backups older than keep_days, always keeping the newest keep_min; returns names deleted"""
+    backups = list_backups(dest)
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=keep_days)).isoformat()
+    doomed = [m["name"] for m in backups[:max(0, len(backups) - keep_min)] if m["created_at"] < cutoff]
+    for name in doomed:
+        keys = dest.list(name + "/")
+        # the manifest goes first: a backup without one is never listed or restored
+        dest.delete([k for k in keys if k.endswith("/manifest.json")])
+        dest.delete([k for k in keys if not k.endswith("/manifest.json")])
+    return doomed
+
+
+def _size(n: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if n < 1024 or unit == "GiB":
+            return f"{n:,.1f} {unit}"
+        n /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel streaming backup and verified restore of the PO database")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    b = sub.add_parser("backup", help="Dump, compress and upload in one streaming pass")
+    b.add_argument("source", nargs="?", help="postgresql:// URL of the database to back up")
+    b.add_argument("destination", help="s3://BUCKET/PREFIX or a local directory")
+    b.add_argument("--archive", metavar="DIR", help="Ship an existing pg_dump --format=directory dump instead")
+    b.add_argument("--codec", choices=["gzip", "xz", "zstd"], default="gzip")
+    b.add_argument("--level", type=int, help="Compression level (default: gzip 6, xz 3, zstd 3)")
+    b.add_argument("--chunk-mb", type=int, default=DEFAULT_CHUNK >> 20, help="Plain bytes per part (default: 8)")
+    b.add_argument("--exclude-table-data", action="append", metavar="TABLE",
+                   help=f"Dump only the definition of TABLE (default: {', '.join(EXCLUDE_TABLE_DATA)})")
+
+    r = sub.add_parser("restore", help="Download, decompress and pg_restore a backup")
+    r.add_argument("destination")
+    r.add_argument("name", help="Backup name, or 'latest'")
+    r.add_argument("target", nargs="?", help="postgresql:// URL of an empty scratch database")
+    r.add_argument("--to-dir", metavar="DIR", help="Keep the rebuilt directory archive here")
+    r.add_argument("--verify", action="store_true", help="Check row counts and checksums after restoring")
+
+    for p in (b, r):
+        p.add_argument("--jobs", type=int, default=DEFAULT_JOBS,
+                       help=f"pg_dump/pg_restore and compression workers (default: cores, {DEFAULT_JOBS})")
+        p.add_argument("--upload-jobs", type=int, default=DEFAULT_UPLOAD_JOBS,
+                       help=f"Concurrent part transfers (default: {DEFAULT_UPLOAD_JOBS})")
+
+    ls = sub.add_parser("list", help="Backups in a destination")
+    ls.add_argument("destination")
+    pr = sub.add_parser("prune", help="Delete backups past the retention period")
+    pr.add_argument("destination")
+    pr.add_argument("--keep-days", type=int, default=int(os.environ.get("BACKUP_RETENTION_DAYS", 30)))
+    args = parser.parse_args()
+
+    dest = open_destination(args.destination, getattr(args, "upload_jobs", DEFAULT_UPLOAD_JOBS))
+    if args.command == "backup":
+        if bool(args.source) == bool(args.archive):
+            raise SystemExit("❌ Give either a source database URL or --archive DIR")
+        print(f"📦 Backing up {mask_url(args.source) if args.source else args.archive} to {dest.name} "
+              f"({args.jobs} jobs, {args.codec}, {args.upload_jobs} concurrent uploads)")
+        manifest = backup(args.source, dest, args.jobs, args.upload_jobs, args.codec, args.level,
+                          args.chunk_mb << 20, args.archive,
+                          EXCLUDE_TABLE_DATA if args.exclude_table_data is None else args.exclude_table_data)
+        for file_name, info in sorted(manifest["files"].items(), key=lambda kv: -kv[1]["bytes"])[:10]:
+            print(f"   {info.get('table') or file_name:<36} {info['rows']:>12,} rows {_size(info['bytes']):>12} "
+                  f"-> {_size(info['stored']):>11} in {len(info['parts'])} parts")
+        seconds = manifest["seconds"]
+        print(f"✅ {manifest['name']}: {_size(manifest['bytes'])} -> {_size(manifest['stored'])} "
+              f"in {seconds:.1f}s ({_size(manifest['bytes'] / max(seconds, 1e-9))}/s)")
+    elif args.command == "list":
+        for m in list_backups(dest):
+            rows = sum(f["rows"] for f in m["files"].values())
+            print(f"{m['name']:<36} {m['created_at'][:19]}  {rows:>12,} rows  {_size(m['stored']):>11}  {m['codec']}")
+    elif args.command == "prune":
+        doomed = prune(dest, args.keep_days)
+        for name in doomed:
+            print(f"🗑️  {name}")
+        print(f"✅ {len(doomed)} backups older than {args.keep_days} days removed")
+    else:
+        if not args.target and not args.to_dir:
+            raise SystemExit("❌ Give a target database URL and/or --to-dir")
+        if args.verify and not args.target:
+            raise SystemExit("❌ --verify needs a target database")
+        manifest = load_manifest(dest, args.name)
+        directory = args.to_dir or tempfile.mkdtemp(prefix="db_restore_")
+        try:
+            t0 = time.perf_counter()
+            written = fetch(dest, manifest, directory, args.upload_jobs)
+            print(f"📥 {manifest['name']}: {_size(written)} fetched into {directory} in {time.perf_counter() - t0:.1f}s")
+            if args.target:
+                t0 = time.perf_counter()
+                pg_restore(directory, args.target, args.jobs)
+                print(f"🔁 Restored into {mask_url(args.target)} in {time.perf_counter() - t0:.1f}s")
+            if args.verify:
+                t0 = time.perf_counter()
+                problems = verify(args.target, manifest, args.jobs)
+                if problems:
+                    for table, problem in sorted(problems):
+                        print(f"❌ {table}: {problem}")
+                    sys.exit(1)
+                tables = sum(1 for f in manifest["files"].values() if f.get("table"))
+                print(f"✅ {tables} tables match the dump's row counts and checksums "
+                      f"({time.perf_counter() - t0:.1f}s)")
+        except ImportError as e:
+            raise SystemExit(f"❌ {e}")
+        finally:
+            if not args.to_dir:
+                shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,34 +11,326 @@ Requirements:
 Usage:
     python deploy-aws.py --phase 1  # Infrastructure setup
     python deploy-aws.py --phase 2  # Application deployment
+
+boto3 is imported and AWS clients are built on first use, so argument
+parsing and other paths that never touch AWS stay fast. See
+benchmark_deployer_startup.py for startup timings.
+
+All clients share one botocore Config (connection pool size, adaptive
+retries); --rate-limit adds a client-side token bucket for a service on
+top of that. Per-operation call, retry, throttle and latency metrics are
+printed at the end of a phase:
+    python deploy-aws.py --phase 1 --max-pool-connections 50 --rate-limit ec2=20
+
+Environment matrix: deploy the same resources to several (region,
+environment) targets in parallel, each with its own state file
+(aws-infrastructure-config.<env>.<region>.json):
+    python deploy-aws.py --phase 1 --target us-east-2:staging --target us-west-2:dr
 """
 
-import boto3
 import json
 import sys
 import time
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_REGION = 'us-east-2'
+
+# Client defaults: boto3 otherwise uses 10 pooled connections and legacy retries
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+DEFAULT_MAX_ATTEMPTS = 10
+
+# Short names used in resource identifiers, e.g. asr-po-system-prod
+ENVIRONMENT_SUFFIXES = {
+    'production': 'prod',
+    'staging': 'staging',
+    'dr': 'dr',
+}
+
+# Error codes AWS services use to signal request throttling
+THROTTLE_ERROR_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'RequestLimitExceeded',
+    'RequestThrottled',
+    'SlowDown',
+    'BandwidthLimitExceeded',
+    'PriorRequestNotComplete',
+    'EC2ThrottledException',
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate * 2)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens, sleeping as needed. Returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class APIMetrics:
+    """Per-operation counters for calls, errors, retries, throttles and latency"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.operations = {}
+
+    def _entry(self, service: str, operation: str) -> Dict:
+        key = (service, operation)
+        entry = self.operations.get(key)
+        if entry is None:
+            entry = {'calls': 0, 'errors': 0, 'retries': 0, 'throttles': 0,
+                     'throttle_wait_s': 0.0, 'latencies_ms': []}
+            self.operations[key] = entry
+        return entry
+
+    def record_wait(self, service: str, operation: str, waited: float):
+        with self.lock:
+            self._entry(service, operation)['throttle_wait_s'] += waited
+
+    def record_throttle(self, service: str, operation: str):
+        with self.lock:
+            self._entry(service, operation)['throttles'] += 1
+
+    def record_call(self, service: str, operation: str, latency_ms: float,
+                    retries: int, error: bool = False):
+        with self.lock:
+            entry = self._entry(service, operation)
+            entry['calls'] += 1
+            entry['retries'] += retries
+            entry['latencies_ms'].append(latency_ms)
+            if error:
+                entry['errors'] += 1
+
+    def summary(self) -> Dict:
+        """Summary keyed by 'service.Operation' with latency percentiles"""
+        with self.lock:
+            result = {}
+            for (service, operation), entry in sorted(self.operations.items()):
+                latencies = sorted(entry['latencies_ms'])
+                result[f'{service}.{operation}'] = {
+                    'calls': entry['calls'],
+                    'errors': entry['errors'],
+                    'retries': entry['retries'],
+                    'throttles': entry['throttles'],
+                    'throttle_wait_s': round(entry['throttle_wait_s'], 3),
+                    'p50_ms': _percentile(latencies, 50),
+                    'p95_ms': _percentile(latencies, 95),
+                    'max_ms': round(latencies[-1], 1) if latencies else None,
+                }
+            return result
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print("\nAWS API metrics:")
+        print(f"   {'operation':<45} {'calls':>5} {'retry':>5} {'thrtl':>5} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, entry in summary.items():
+            print(f"   {name:<45} {entry['calls']:>5} {entry['retries']:>5} "
+                  f"{entry['throttles']:>5} {entry['p50_ms'] or 0:>8.1f} {entry['p95_ms'] or 0:>8.1f}")
+
+
+def _percentile(sorted_values: list, pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return round(sorted_values[index], 1)
+
+
+class _LazyClient:
+    """Descriptor that builds the named boto3 client on first access"""
+
+    def __set_name__(self, owner, name):
+        self.service_name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return instance.client(self.service_name)
+
 
 class AWSDeployer:
-    def __init__(self, region: str = 'us-east-2'):
+    # AWS clients, created lazily from one shared boto3 Session
+    ec2 = _LazyClient()
+    rds = _LazyClient()
+    elasticache = _LazyClient()
+    ecr = _LazyClient()
+    apprunner = _LazyClient()
+    secretsmanager = _LazyClient()
+    s3 = _LazyClient()
+    route53 = _LazyClient()
+
+    def __init__(self, region: str = DEFAULT_REGION,
+                 max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 client_config=None,
+                 environment: str = 'production',
+                 name_suffix: Optional[str] = None,
+                 state_file: Optional[str] = None,
+                 rate_buckets: Optional[Dict[str, Optional[TokenBucket]]] = None,
+                 progress_callback: Optional[Callable[[str], None]] = None,
+                 quiet: bool = False):
         self.region = region
         self.project_name = 'asr-po-system'
 
-        # Initialize AWS clients
-        self.ec2 = boto3.client('ec2', region_name=region)
-        self.rds = boto3.client('rds', region_name=region)
-        self.elasticache = boto3.client('elasticache', region_name=region)
-        self.ecr = boto3.client('ecr', region_name=region)
-        self.apprunner = boto3.client('apprunner', region_name=region)
-        self.secretsmanager = boto3.client('secretsmanager', region_name=region)
-        self.s3 = boto3.client('s3', region_name=region)
-        self.route53 = boto3.client('route53', region_name=region)
+        # Environment naming: production keeps the original '-prod' names
+        self.environment = environment
+        env_short = ENVIRONMENT_SUFFIXES.get(environment, environment)
+        self.name_suffix = name_suffix or env_short
+        # Region-scoped names and Name tags start with this. Production keeps
+        # the original unscoped names (asr-po-system-vpc, ...) so existing
+        # resources are not renamed; other environments, and production
+        # outside the default region, are scoped so they can share a region
+        if environment == 'production' and self.name_suffix == env_short:
+            self.resource_prefix = self.project_name
+        else:
+            self.resource_prefix = f'{self.project_name}-{self.name_suffix}'
+        # A plain single-target production run keeps the original state file
+        if state_file is None:
+            if environment == 'production' and name_suffix is None:
+                state_file = 'aws-infrastructure-config.json'
+            else:
+                state_file = f'aws-infrastructure-config.{env_short}.{region}.json'
+        self.state_file = state_file
+        self.progress_callback = progress_callback
+        self.quiet = quiet
+        self.log_lines = []
+
+        self.max_pool_connections = max_pool_connections
+        self.max_attempts = max_attempts
+        # Requests per second per service; services not listed (or 0) are not limited
+        self.rate_limits = rate_limits or {}
+        self._client_config = client_config
+        self._rate_buckets = rate_buckets if rate_buckets is not None else {}
+        self.metrics = APIMetrics()
+
+        self._session = None
+        self._clients = {}
+        # boto3 Sessions are not thread-safe when creating clients
+        self._client_lock = threading.Lock()
+
+    @property
+    def client_config(self):
+        """Shared botocore Config: pooled connections and adaptive retries"""
+        if self._client_config is None:
+            from botocore.config import Config
+            self._client_config = Config(
+                region_name=self.region,
+                max_pool_connections=self.max_pool_connections,
+                retries={'mode': 'adaptive', 'max_attempts': self.max_attempts}
+            )
+        return self._client_config
+
+    @property
+    def session(self):
+        """Shared boto3 Session (boto3 is imported on first use)"""
+        if self._session is None:
+            with self._client_lock:
+                if self._session is None:
+                    import boto3
+                    self._session = boto3.session.Session(region_name=self.region)
+        return self._session
+
+    def client(self, service_name: str):
+        """Return the cached client for a service, creating it if needed"""
+        client = self._clients.get(service_name)
+        if client is None:
+            session = self.session
+            with self._client_lock:
+                client = self._clients.get(service_name)
+                if client is None:
+                    client = session.client(service_name, config=self.client_config)
+                    self._instrument_client(service_name, client)
+                    self._clients[service_name] = client
+        return client
+
+    def _rate_bucket(self, service_name: str) -> Optional[TokenBucket]:
+        # setdefault keeps a bucket shared when deployers in one region race
+        if service_name not in self._rate_buckets:
+            rate = self.rate_limits.get(service_name, 0)
+            self._rate_buckets.setdefault(service_name, TokenBucket(rate) if rate > 0 else None)
+        return self._rate_buckets[service_name]
+
+    def log(self, message: str):
+        """Print progress detail, or keep it for the state file when quiet"""
+        self.log_lines.append(message)
+        if not self.quiet:
+            print(message)
+
+    def _progress(self, step: str):
+        if self.progress_callback is not None:
+            self.progress_callback(step)
+
+    def _instrument_client(self, service_name: str, client):
+        """Attach rate limiting and metrics hooks to a client's event system"""
+        bucket = self._rate_bucket(service_name)
+        metrics = self.metrics
+
+        def before_call(model, context, **kwargs):
+            if bucket is not None:
+                waited = bucket.acquire()
+                if waited:
+                    metrics.record_wait(service_name, model.name, waited)
+            context['asr_started'] = time.perf_counter()
+
+        def needs_retry(response, operation, **kwargs):
+            # Observe each attempt; returning None leaves retry decisions to botocore
+            if response is not None:
+                code = response[1].get('Error', {}).get('Code')
+                if code in THROTTLE_ERROR_CODES:
+                    metrics.record_throttle(service_name, operation.name)
+
+        def after_call(http_response, parsed, model, context, **kwargs):
+            # Also emitted for AWS error responses, just before ClientError is raised
+            started = context.get('asr_started', time.perf_counter())
+            retries = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+            metrics.record_call(service_name, model.name,
+                                (time.perf_counter() - started) * 1000, retries,
+                                error=http_response.status_code >= 300)
+
+        def after_call_error(exception, context, event_name, **kwargs):
+            # Transport-level failures (connection errors, retries exhausted)
+            started = context.get('asr_started', time.perf_counter())
+            metrics.record_call(service_name, event_name.rsplit('.', 1)[-1],
+                                (time.perf_counter() - started) * 1000, 0, error=True)
+
+        events = client.meta.events
+        event_prefix = client.meta.service_model.service_id.hyphenize()
+        events.register(f'before-call.{event_prefix}', before_call)
+        events.register(f'needs-retry.{event_prefix}', needs_retry)
+        events.register(f'after-call.{event_prefix}', after_call)
+        events.register(f'after-call-error.{event_prefix}', after_call_error)
 
     def create_vpc(self) -> Dict:
         """Create VPC with public and private subnets"""
-        print("Creating VPC for ASR PO System...")
+        self.log("Creating VPC for ASR PO System...")
 
         # Create VPC
         vpc_response = self.ec2.create_vpc(
@@ -46,14 +338,14 @@ class AWSDeployer:
             TagSpecifications=[{
                 'ResourceType': 'vpc',
                 'Tags': [
-                    {'Key': 'Name', 'Value': f'{self.project_name}-vpc'},
+                    {'Key': 'Name', 'Value': f'{self.resource_prefix}-vpc'},
                     {'Key': 'Project', 'Value': 'ASR-PO-System'},
-                    {'Key': 'Environment', 'Value': 'production'}
+                    {'Key': 'Environment', 'Value': self.environment}
                 ]
             }]
         )
         vpc_id = vpc_response['Vpc']['VpcId']
-        print(f"Created VPC: {vpc_id}")
+        self.log(f"Created VPC: {vpc_id}")
 
         # Wait for VPC to be available
         self.ec2.get_waiter('vpc_available').wait(VpcIds=[vpc_id])
@@ -63,66 +355,60 @@ class AWSDeployer:
 
         return {'vpc_id': vpc_id}
 
+    def _create_subnet(self, vpc_id: str, az_name: str, cidr: str,
+                       subnet_type: str, index: int) -> str:
+        """Create one tagged subnet and return its ID"""
+        subnet_response = self.ec2.create_subnet(
+            VpcId=vpc_id,
+            CidrBlock=cidr,
+            AvailabilityZone=az_name,
+            TagSpecifications=[{
+                'ResourceType': 'subnet',
+                'Tags': [
+                    {'Key': 'Name', 'Value': f'{self.resource_prefix}-{subnet_type.lower()}-{index}'},
+                    {'Key': 'Type', 'Value': subnet_type},
+                    {'Key': 'Project', 'Value': 'ASR-PO-System'}
+                ]
+            }]
+        )
+        subnet_id = subnet_response['Subnet']['SubnetId']
+        self.log(f"Created {subnet_type.lower()} subnet {index}: {subnet_id}")
+        return subnet_id
+
     def create_subnets(self, vpc_id: str) -> Dict:
         """Create public and private subnets in multiple AZs"""
-        print("Creating subnets...")
-
-        subnets = {}
+        self.log("Creating subnets...")
 
         # Get availability zones
         azs = self.ec2.describe_availability_zones()['AvailabilityZones']
 
-        # Create public subnets
-        for i, az in enumerate(azs[:2]):  # Use first 2 AZs
-            subnet_response = self.ec2.create_subnet(
-                VpcId=vpc_id,
-                CidrBlock=f'10.0.{i+1}.0/24',
-                AvailabilityZone=az['ZoneName'],
-                TagSpecifications=[{
-                    'ResourceType': 'subnet',
-                    'Tags': [
-                        {'Key': 'Name', 'Value': f'{self.project_name}-public-{i+1}'},
-                        {'Key': 'Type', 'Value': 'Public'},
-                        {'Key': 'Project', 'Value': 'ASR-PO-System'}
-                    ]
-                }]
-            )
-            subnets[f'public_{i+1}'] = subnet_response['Subnet']['SubnetId']
-            print(f"Created public subnet {i+1}: {subnet_response['Subnet']['SubnetId']}")
-
-        # Create private subnets
+        # Public subnets 10.0.1-2.0/24, private 10.0.10-11.0/24 in the first 2 AZs.
+        # The create calls are independent, so issue them concurrently.
+        subnet_specs = {}
         for i, az in enumerate(azs[:2]):
-            subnet_response = self.ec2.create_subnet(
-                VpcId=vpc_id,
-                CidrBlock=f'10.0.{i+10}.0/24',
-                AvailabilityZone=az['ZoneName'],
-                TagSpecifications=[{
-                    'ResourceType': 'subnet',
-                    'Tags': [
-                        {'Key': 'Name', 'Value': f'{self.project_name}-private-{i+1}'},
-                        {'Key': 'Type', 'Value': 'Private'},
-                        {'Key': 'Project', 'Value': 'ASR-PO-System'}
-                    ]
-                }]
-            )
-            subnets[f'private_{i+1}'] = subnet_response['Subnet']['SubnetId']
-            print(f"Created private subnet {i+1}: {subnet_response['Subnet']['SubnetId']}")
+            subnet_specs[f'public_{i+1}'] = (az['ZoneName'], f'10.0.{i+1}.0/24', 'Public', i + 1)
+            subnet_specs[f'private_{i+1}'] = (az['ZoneName'], f'10.0.{i+10}.0/24', 'Private', i + 1)
+
+        with ThreadPoolExecutor(max_workers=len(subnet_specs)) as executor:
+            futures = {key: executor.submit(self._create_subnet, vpc_id, *args)
+                       for key, args in subnet_specs.items()}
+            subnets = {key: futures[key].result() for key in sorted(futures)}
 
         return subnets
 
     def create_security_groups(self, vpc_id: str) -> Dict:
         """Create security groups for different components"""
-        print("Creating security groups...")
+        self.log("Creating security groups...")
 
         # App Runner security group
         app_sg = self.ec2.create_security_group(
-            GroupName=f'{self.project_name}-app',
+            GroupName=f'{self.resource_prefix}-app',
             Description='Security group for App Runner service',
             VpcId=vpc_id,
             TagSpecifications=[{
                 'ResourceType': 'security-group',
                 'Tags': [
-                    {'Key': 'Name', 'Value': f'{self.project_name}-app-sg'},
+                    {'Key': 'Name', 'Value': f'{self.resource_prefix}-app-sg'},
                     {'Key': 'Project', 'Value': 'ASR-PO-System'}
                 ]
             }]
@@ -131,13 +417,13 @@ class AWSDeployer:
 
         # RDS security group
         rds_sg = self.ec2.create_security_group(
-            GroupName=f'{self.project_name}-rds',
+            GroupName=f'{self.resource_prefix}-rds',
             Description='Security group for RDS PostgreSQL',
             VpcId=vpc_id,
             TagSpecifications=[{
                 'ResourceType': 'security-group',
                 'Tags': [
-                    {'Key': 'Name', 'Value': f'{self.project_name}-rds-sg'},
+                    {'Key': 'Name', 'Value': f'{self.resource_prefix}-rds-sg'},
                     {'Key': 'Project', 'Value': 'ASR-PO-System'}
                 ]
             }]
@@ -157,13 +443,13 @@ class AWSDeployer:
 
         # Redis security group
         redis_sg = self.ec2.create_security_group(
-            GroupName=f'{self.project_name}-redis',
+            GroupName=f'{self.resource_prefix}-redis',
             Description='Security group for ElastiCache Redis',
             VpcId=vpc_id,
             TagSpecifications=[{
                 'ResourceType': 'security-group',
                 'Tags': [
-                    {'Key': 'Name', 'Value': f'{self.project_name}-redis-sg'},
+                    {'Key': 'Name', 'Value': f'{self.resource_prefix}-redis-sg'},
                     {'Key': 'Project', 'Value': 'ASR-PO-System'}
                 ]
             }]
@@ -181,10 +467,10 @@ class AWSDeployer:
             }]
         )
 
-        print(f"Created security groups:")
-        print(f"   App Runner: {app_sg_id}")
-        print(f"   RDS: {rds_sg_id}")
-        print(f"   Redis: {redis_sg_id}")
+        self.log("Created security groups:")
+        self.log(f"   App Runner: {app_sg_id}")
+        self.log(f"   RDS: {rds_sg_id}")
+        self.log(f"   Redis: {redis_sg_id}")
 
         return {
             'app_sg_id': app_sg_id,
@@ -194,10 +480,10 @@ class AWSDeployer:
 
     def create_rds_instance(self, subnet_ids: list, security_group_id: str) -> Dict:
         """Create RDS PostgreSQL instance"""
-        print("Creating RDS PostgreSQL instance...")
+        self.log("Creating RDS PostgreSQL instance...")
 
         # Create DB subnet group
-        subnet_group_name = f'{self.project_name}-db-subnet-group'
+        subnet_group_name = f'{self.resource_prefix}-db-subnet-group'
         self.rds.create_db_subnet_group(
             DBSubnetGroupName=subnet_group_name,
             DBSubnetGroupDescription='Subnet group for ASR PO System RDS',
@@ -209,7 +495,7 @@ class AWSDeployer:
         )
 
         # Create RDS instance
-        db_instance_id = f'{self.project_name}-prod'
+        db_instance_id = f'{self.project_name}-{self.name_suffix}'
         self.rds.create_db_instance(
             DBInstanceIdentifier=db_instance_id,
             DBInstanceClass='db.t3.micro',
@@ -233,20 +519,20 @@ class AWSDeployer:
             Tags=[
                 {'Key': 'Name', 'Value': db_instance_id},
                 {'Key': 'Project', 'Value': 'ASR-PO-System'},
-                {'Key': 'Environment', 'Value': 'production'}
+                {'Key': 'Environment', 'Value': self.environment}
             ]
         )
 
-        print(f"Created RDS instance: {db_instance_id}")
-        print("RDS instance creation in progress (10-15 minutes)...")
+        self.log(f"Created RDS instance: {db_instance_id}")
+        self.log("RDS instance creation in progress (10-15 minutes)...")
 
         return {'db_instance_id': db_instance_id}
 
     def create_s3_bucket(self) -> Dict:
         """Create S3 bucket for exports"""
-        print("Creating S3 bucket for exports...")
+        self.log("Creating S3 bucket for exports...")
 
-        bucket_name = f'{self.project_name}-exports-prod'
+        bucket_name = f'{self.project_name}-exports-{self.name_suffix}'
 
         # Create bucket
         if self.region == 'us-east-1':
@@ -291,52 +577,69 @@ class AWSDeployer:
             LifecycleConfiguration=lifecycle_config
         )
 
-        print(f"Created S3 bucket: {bucket_name}")
+        self.log(f"Created S3 bucket: {bucket_name}")
 
         return {'bucket_name': bucket_name}
 
-    def phase_1_infrastructure(self):
-        """Execute Phase 1: Infrastructure setup"""
-        print("Starting Phase 1: AWS Infrastructure Setup")
-        print(f"Region: {self.region}")
-        print("-" * 50)
+    def provision_infrastructure(self) -> Dict:
+        """Create the Phase 1 resource graph, save it to the state file and return it"""
+        # Create VPC
+        self._progress('vpc')
+        vpc_info = self.create_vpc()
+        vpc_id = vpc_info['vpc_id']
 
-        try:
-            # Create VPC
-            vpc_info = self.create_vpc()
-            vpc_id = vpc_info['vpc_id']
+        # Create subnets
+        self._progress('subnets')
+        subnets = self.create_subnets(vpc_id)
+
+        # Create security groups
+        self._progress('security_groups')
+        security_groups = self.create_security_groups(vpc_id)
 
-            # Create subnets
-            subnets = self.create_subnets(vpc_id)
+        # Create RDS instance
+        self._progress('rds')
+        rds_info = self.create_rds_instance(
+            [subnets['private_1'], subnets['private_2']],
+            security_groups['rds_sg_id']
+        )
 
-            # Create security groups
-            security_groups = self.create_security_groups(vpc_id)
+        # Create S3 bucket
+        self._progress('s3')
+        s3_info = self.create_s3_bucket()
+
+        # Save configuration
+        config = {
+            'vpc_id': vpc_id,
+            'subnets': subnets,
+            'security_groups': security_groups,
+            'rds': rds_info,
+            's3': s3_info,
+            'region': self.region,
+            'environment': self.environment,
+            'created_at': datetime.now().isoformat(),
+            'api_metrics': self.metrics.summary(),
+            'log': self.log_lines
+        }
 
-            # Create RDS instance
-            rds_info = self.create_rds_instance(
-                [subnets['private_1'], subnets['private_2']],
-                security_groups['rds_sg_id']
-            )
+        with open(self.state_file, 'w') as f:
+            json.dump(config, f, indent=2)
 
-            # Create S3 bucket
-            s3_info = self.create_s3_bucket()
+        self._progress('complete')
+        return config
 
-            # Save configuration
-            config = {
-                'vpc_id': vpc_id,
-                'subnets': subnets,
-                'security_groups': security_groups,
-                'rds': rds_info,
-                's3': s3_info,
-                'region': self.region,
-                'created_at': datetime.now().isoformat()
-            }
+    def phase_1_infrastructure(self):
+        """Execute Phase 1: Infrastructure setup"""
+        print("Starting Phase 1: AWS Infrastructure Setup")
+        print(f"Region: {self.region}")
+        if self.environment != 'production':
+            print(f"Environment: {self.environment}")
+        print("-" * 50)
 
-            with open('aws-infrastructure-config.json', 'w') as f:
-                json.dump(config, f, indent=2)
+        try:
+            self.provision_infrastructure()
 
             print("\nPhase 1 Infrastructure Setup Complete!")
-            print("Configuration saved to: aws-infrastructure-config.json")
+            print(f"Configuration saved to: {self.state_file}")
             print("\nNext steps:")
             print("1. Wait for RDS instance to be available (10-15 minutes)")
             print("2. Configure secrets in AWS Secrets Manager")
@@ -345,17 +648,149 @@ class AWSDeployer:
         except Exception as e:
             print(f"Error in Phase 1: {e}")
             sys.exit(1)
+        finally:
+            self.metrics.print_summary()
+
+
+class DeploymentMatrix:
+    """Run Phase 1 for several (region, environment) targets in parallel
+
+    Each target gets its own deployer, boto3 session and state file.
+    Targets in the same region share per-service token buckets, since AWS
+    API limits apply per account and region.
+    """
+
+    STEPS = ['pending', 'vpc', 'subnets', 'security_groups', 'rds', 's3', 'complete']
+
+    def __init__(self, targets: List[Tuple[str, str]], **deployer_options):
+        self.targets = targets
+        self.deployer_options = deployer_options
+        self.status = {target: 'pending' for target in targets}
+        self.errors = {}
+        self.lock = threading.Lock()
+        self._region_buckets = {region: {} for region, _ in targets}
+
+    def _name_suffix(self, region: str, environment: str) -> str:
+        """Environment suffix, plus the region when an environment spans regions
+
+        Production in the default region keeps the plain suffix, and with it
+        the original resource names.
+        """
+        suffix = ENVIRONMENT_SUFFIXES.get(environment, environment)
+        if environment == 'production' and region == DEFAULT_REGION:
+            return suffix
+        regions = {r for r, e in self.targets if e == environment}
+        return f'{suffix}-{region}' if len(regions) > 1 else suffix
+
+    def _update(self, target: Tuple[str, str], step: str):
+        with self.lock:
+            self.status[target] = step
+            self.print_progress()
+
+    def print_progress(self):
+        """Print one consolidated progress line per target"""
+        print(f"\n{'environment':<12} {'region':<15} {'step':<16} progress")
+        for (region, environment), step in self.status.items():
+            if step in self.STEPS:
+                done = self.STEPS.index(step)
+                bar = '#' * done + '.' * (len(self.STEPS) - 1 - done)
+            else:
+                bar = '!' * (len(self.STEPS) - 1)
+            print(f"{environment:<12} {region:<15} {step:<16} [{bar}]")
+
+    def _deploy(self, target: Tuple[str, str]) -> Dict:
+        region, environment = target
+        deployer = AWSDeployer(
+            region=region,
+            environment=environment,
+            name_suffix=self._name_suffix(region, environment),
+            rate_buckets=self._region_buckets[region],
+            progress_callback=lambda step: self._update(target, step),
+            quiet=True,
+            **self.deployer_options
+        )
+        try:
+            return deployer.provision_infrastructure()
+        except Exception as e:
+            with self.lock:
+                self.errors[target] = str(e)
+            self._update(target, 'failed')
+            raise
+
+    def run(self) -> Dict:
+        """Deploy every target concurrently; returns results keyed by 'environment/region'"""
+        print(f"Starting Phase 1 for {len(self.targets)} targets")
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(self.targets)) as executor:
+            futures = {executor.submit(self._deploy, target): target for target in self.targets}
+            for future in as_completed(futures):
+                region, environment = futures[future]
+                try:
+                    results[f'{environment}/{region}'] = future.result()
+                except Exception:
+                    results[f'{environment}/{region}'] = None
+
+        print("\nDeployment matrix summary:")
+        for (region, environment) in self.targets:
+            error = self.errors.get((region, environment))
+            outcome = f"FAILED: {error}" if error else "complete"
+            print(f"   {environment}/{region}: {outcome}")
+        return results
+
 
 def main():
     parser = argparse.ArgumentParser(description='Deploy ASR PO System to AWS')
     parser.add_argument('--phase', type=int, choices=[1, 2], required=True,
                         help='Deployment phase: 1 (infrastructure) or 2 (application)')
-    parser.add_argument('--region', default='us-east-2',
-                        help='AWS region (default: us-east-2)')
+    parser.add_argument('--region', default=DEFAULT_REGION,
+                        help=f'AWS region (default: {DEFAULT_REGION})')
+    parser.add_argument('--environment', default='production',
+                        help='Environment name used in resource names and tags (default: production)')
+    parser.add_argument('--target', action='append', default=[], metavar='REGION:ENVIRONMENT',
+                        help='Deploy to a (region, environment) target; repeat for a parallel '
+                             'matrix deployment (overrides --region/--environment)')
+    parser.add_argument('--max-pool-connections', type=int, default=DEFAULT_MAX_POOL_CONNECTIONS,
+                        help=f'HTTP connections per AWS client (default: {DEFAULT_MAX_POOL_CONNECTIONS})')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f'Adaptive retry attempts per API call (default: {DEFAULT_MAX_ATTEMPTS})')
+    parser.add_argument('--rate-limit', action='append', default=[], metavar='SERVICE=RATE',
+                        help='Client-side requests/second for a service (default: no limit, '
+                             'adaptive retries back off on throttling); repeatable')
 
     args = parser.parse_args()
 
-    deployer = AWSDeployer(region=args.region)
+    rate_limits = {}
+    for item in args.rate_limit:
+        service, _, rate = item.partition('=')
+        try:
+            rate_limits[service.strip()] = float(rate)
+        except ValueError:
+            parser.error(f"invalid --rate-limit '{item}', expected SERVICE=RATE")
+
+    client_options = {
+        'max_pool_connections': args.max_pool_connections,
+        'max_attempts': args.max_attempts,
+        'rate_limits': rate_limits
+    }
+
+    if args.target:
+        targets = []
+        for item in args.target:
+            region, _, environment = item.partition(':')
+            if not region or not environment:
+                parser.error(f"invalid --target '{item}', expected REGION:ENVIRONMENT")
+            targets.append((region.strip(), environment.strip()))
+        if len(set(targets)) != len(targets):
+            parser.error("duplicate --target entries")
+        if args.phase != 1:
+            parser.error("--target matrix deployments only support --phase 1")
+
+        results = DeploymentMatrix(targets, **client_options).run()
+        if any(result is None for result in results.values()):
+            sys.exit(1)
+        return
+
+    deployer = AWSDeployer(region=args.region, environment=args.environment, **client_options)
 
     if args.phase == 1:
         deployer.phase_1_infrastructure()
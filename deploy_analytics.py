@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Deploy history analytics for the ASR PO System Render services
+
+Pages through a service's full deploy history with cursor pagination and
+caches every deploy in a local SQLite database. Later runs are
+incremental: paging stops at the first page that reaches deploys already
+cached in a finished state, and only deploys that were still in progress
+last time are re-fetched individually. An interrupted first backfill
+resumes from the last cursor it saved.
+
+From the cache it reports build-duration distributions (createdAt ->
+finishedAt), failure rates by status, and per-day/week/month trends with
+a least-squares slope, to show whether builds are getting slower.
+
+Usage:
+    export RENDER_API_KEY="your_api_key_here"
+    python deploy_analytics.py                                 # sync + report
+    python deploy_analytics.py --service srv-aaa --service srv-bbb --days 180
+    python deploy_analytics.py --offline --bucket month --json # cached data only
+
+    # Against the local stub
+    python render_api_stub.py --port 8765 --history 500
+    RENDER_API_KEY=test python deploy_analytics.py --base-url http://127.0.0.1:8765/v1
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from monitor_render_deployment import (BASE_URL, IN_PROGRESS_STATUSES, SERVICE_ID, RateLimited,
+                                       RenderAPIMonitor, parse_timestamp, requests, unwrap_deploy)
+
+DEFAULT_DB = "deploy-history.sqlite"
+HISTORY_PAGE_SIZE = 100  # Render's maximum page size
+MAX_RATE_LIMIT_RETRIES = 5
+DEFAULT_COMPARE_DAYS = 30
+HISTOGRAM_BINS = 10
+
+# Outcome groups for analytics; "deactivated" is a deploy that went live
+# and was later replaced, so it counts as a success here
+SUCCESS_STATUSES = ("live", "deactivated")
+FAILURE_STATUSES = ("build_failed", "update_failed", "pre_deploy_failed")
+CANCELED_STATUSES = ("canceled",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deploys (
+    service_id   TEXT NOT NULL,
+    deploy_id    TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    commit_sha   TEXT,
+    trigger      TEXT,
+    created_at   TEXT,
+    finished_at  TEXT,
+    created_ts   REAL,
+    duration_s   REAL,
+    raw          TEXT NOT NULL,
+    PRIMARY KEY (service_id, deploy_id)
+);
+CREATE INDEX IF NOT EXISTS idx_deploys_service_created ON deploys (service_id, created_ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    service_id       TEXT PRIMARY KEY,
+    backfill_done    INTEGER NOT NULL DEFAULT 0,
+    backfill_cursor  TEXT,
+    last_synced_at   TEXT
+);
+"""
+
+
+def is_terminal(status: str) -> bool:
+    return status not in IN_PROGRESS_STATUSES
+
+
+class DeployHistoryCache:
+    """SQLite cache of deploy records and per-service sync progress"""
+
+    def __init__(self, path: str = DEFAULT_DB):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def upsert(self, service_id: str, deploys: List[Dict]) -> int:
+        """Insert or refresh deploys; returns how many were not cached before"""
+        known = self.deploy_ids(service_id, [d["id"] for d in deploys])
+        rows = []
+        for deploy in deploys:
+            created = parse_timestamp(deploy.get("createdAt"))
+            finished = parse_timestamp(deploy.get("finishedAt"))
+            status = deploy.get("status", "unknown")
+            duration = (finished - created).total_seconds() if created and finished and is_terminal(status) else None
+            rows.append((service_id, deploy["id"], status, (deploy.get("commit") or {}).get("sha"),
+                         deploy.get("trigger"), deploy.get("createdAt"), deploy.get("finishedAt"),
+                         created.timestamp() if created else None, duration, json.dumps(deploy)))
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO deploys VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(deploys) - len(known)
+
+    def deploy_ids(self, service_id: str, deploy_ids: List[str], terminal_only: bool = False) -> set:
+        """The subset of deploy_ids already cached (optionally only finished ones)"""
+        if not deploy_ids:
+            return set()
+        placeholders = ",".join("?" * len(deploy_ids))
+        rows = self.db.execute(f"SELECT deploy_id, status FROM deploys WHERE service_id = ? "
+                               f"AND deploy_id IN ({placeholders})", [service_id, *deploy_ids])
+        return {row["deploy_id"] for row in rows if not terminal_only or is_terminal(row["status"])}
+
+    def in_progress_ids(self, service_id: str) -> List[str]:
+        placeholders = ",".join("?" * len(IN_PROGRESS_STATUSES))
+        rows = self.db.execute(f"SELECT deploy_id FROM deploys WHERE service_id = ? "
+                               f"AND status IN ({placeholders})", [service_id, *IN_PROGRESS_STATUSES])
+        return [row["deploy_id"] for row in rows]
+
+    def sync_state(self, service_id: str) -> Dict:
+        row = self.db.execute("SELECT * FROM sync_state WHERE service_id = ?", (service_id,)).fetchone()
+        if row is None:
+            return {"service_id": service_id, "backfill_done": 0, "backfill_cursor": None, "last_synced_at": None}
+        return dict(row)
+
+    def save_sync_state(self, service_id: str, **fields):
+        state = {**self.sync_state(service_id), **fields}
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                            (service_id, state["backfill_done"], state["backfill_cursor"],
+                             state["last_synced_at"]))
+
+    def reset(self, service_id: str):
+        with self.db:
+            self.db.execute("DELETE FROM deploys WHERE service_id = ?", (service_id,))
+            self.db.execute("DELETE FROM sync_state WHERE service_id = ?", (service_id,))
+
+    def deploys(self, service_id: str, since: Optional[float] = None) -> List[sqlite3.Row]:
+        """Cached deploys for a service, oldest first"""
+        return self.db.execute("SELECT * FROM deploys WHERE service_id = ? AND created_ts >= ? "
+                               "ORDER BY created_ts", (service_id, since or 0)).fetchall()
+
+    def close(self):
+        self.db.close()
+
+
+def rate_limited(call: Callable):
+    """Run one API call, waiting out 429/503 responses; None once the retries are used up"""
+    for _ in range(MAX_RATE_LIMIT_RETRIES):
+        try:
+            return call()
+        except RateLimited as e:
+            delay = e.retry_after or 5
+            print(f"   ⏳ Rate limited, retrying in {delay:.0f}s")
+            time.sleep(delay)
+    return None
+
+
+def fetch_page(api: RenderAPIMonitor, cursor: Optional[str]) -> Optional[List[Dict]]:
+    """One page of the deploy list, waiting out 429/503 responses"""
+    return rate_limited(lambda: api.get_deployments(limit=HISTORY_PAGE_SIZE, cursor=cursor))
+
+
+def sync_service(api: RenderAPIMonitor, cache: DeployHistoryCache) -> Dict:
+    """Bring the cache up to date with the service's deploy history"""
+    service_id = api.service_id
+    state = cache.sync_state(service_id)
+    backfill_done = bool(state["backfill_done"])
+    cursor, resumed = None, False
+    seen = set()
+    stats = {"service_id": service_id, "pages": 0, "fetched": 0, "new": 0, "refreshed": 0, "complete": True}
+
+    while True:
+        page = fetch_page(api, cursor)
+        if page is None:
+            stats["complete"] = False
+            break
+        stats["pages"] += 1
+        deploys = [unwrap_deploy(item) for item in page]
+        seen.update(d["id"] for d in deploys)
+        overlaps = bool(cache.deploy_ids(service_id, [d["id"] for d in deploys], terminal_only=True))
+        stats["fetched"] += len(deploys)
+        stats["new"] += cache.upsert(service_id, deploys)
+
+        last_page = len(page) < HISTORY_PAGE_SIZE or not isinstance(page[-1], dict) or not page[-1].get("cursor")
+        if last_page:
+            cache.save_sync_state(service_id, backfill_done=1, backfill_cursor=None)
+            break
+        if overlaps and backfill_done:
+            break  # everything older is already cached
+        if overlaps and state["backfill_cursor"] and not resumed:
+            # Caught up with the newest cached deploys; jump to where the backfill stopped
+            cursor, resumed = state["backfill_cursor"], True
+            continue
+        cursor = page[-1]["cursor"]
+        if not backfill_done:
+            cache.save_sync_state(service_id, backfill_cursor=cursor)
+
+    # Deploys that were in progress last time and are older than the pages just read
+    for deploy_id in cache.in_progress_ids(service_id):
+        if deploy_id in seen:
+            continue
+        deploy = rate_limited(lambda: api.get_deployment(deploy_id))
+        if deploy is None:
+            stats["complete"] = False  # failed or still rate limited; refreshed on the next sync
+            continue
+        cache.upsert(service_id, [deploy])
+        stats["refreshed"] += 1
+
+    cache.save_sync_state(service_id, last_synced_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    return stats
+
+
+def distribution(values: List[float]) -> Dict:
+    """count/mean/min/max and percentiles of a sample"""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 1),
+        "min": round(ordered[0], 1),
+        "p50": round(cuts[49], 1),
+        "p90": round(cuts[89], 1),
+        "p95": round(cuts[94], 1),
+        "p99": round(cuts[98], 1),
+        "max": round(ordered[-1], 1),
+    }
+
+
+def histogram(values: List[float], bins: int = HISTOGRAM_BINS) -> List[Dict]:
+    """Equal-width bins between the smallest and largest value"""
+    if not values:
+        return []
+    low, high = min(values), max(values)
+    width = (high - low) / bins or 1.0
+    counts = [0] * bins
+    for value in values:
+        counts[min(bins - 1, int((value - low) / width))] += 1
+    return [{"from": round(low + i * width, 1), "to": round(low + (i + 1) * width, 1), "count": count}
+            for i, count in enumerate(counts)]
+
+
+def bucket_start(ts: float, bucket: str) -> str:
+    day = datetime.fromtimestamp(ts, timezone.utc).date()
+    if bucket == "day":
+        return day.isoformat()
+    if bucket == "week":
+        return (day - timedelta(days=day.weekday())).isoformat()
+    return day.replace(day=1).isoformat()
+
+
+def failure_rate(statuses: List[str]) -> Optional[float]:
+    """Failed / (succeeded + failed); canceled and in-progress deploys are excluded"""
+    failed = sum(1 for s in statuses if s in FAILURE_STATUSES)
+    decided = failed + sum(1 for s in statuses if s in SUCCESS_STATUSES)
+    return round(failed / decided, 4) if decided else None
+
+
+def analyze(rows: List[sqlite3.Row], bucket: str = "week",
+            compare_days: int = DEFAULT_COMPARE_DAYS) -> Dict:
+    """Duration distributions, status breakdown and trends for one service"""
+    statuses = [row["status"] for row in rows]
+    successful = [row for row in rows if row["status"] in SUCCESS_STATUSES and row["duration_s"] is not None]
+    failed = [row for row in rows if row["status"] in FAILURE_STATUSES and row["duration_s"] is not None]
+    durations = [row["duration_s"] for row in successful]
+
+    by_status: Dict[str, int] = {}
+    for status in statuses:
+        by_status[status] = by_status.get(status, 0) + 1
+
+    trend_rows: Dict[str, List[sqlite3.Row]] = {}
+    for row in rows:
+        if row["created_ts"] is not None:
+            trend_rows.setdefault(bucket_start(row["created_ts"], bucket), []).append(row)
+    trends = []
+    for start, bucket_rows in sorted(trend_rows.items()):
+        bucket_durations = [r["duration_s"] for r in bucket_rows
+                            if r["status"] in SUCCESS_STATUSES and r["duration_s"] is not None]
+        dist = distribution(bucket_durations)
+        trends.append({"start": start, "deploys": len(bucket_rows),
+                       "failure_rate": failure_rate([r["status"] for r in bucket_rows]),
+                       "p50_s": dist.get("p50"), "p90_s": dist.get("p90")})
+
+    # Least-squares slope of successful build durations against time
+    slope = None
+    if len(successful) >= 3 and successful[-1]["created_ts"] > successful[0]["created_ts"]:
+        weeks = [row["created_ts"] / (7 * 86400) for row in successful]
+        slope = round(statistics.linear_regression(weeks, durations).slope, 2)
+
+    recent_cutoff = time.time() - compare_days * 86400
+    recent = [r["duration_s"] for r in successful if r["created_ts"] >= recent_cutoff]
+    previous = [r["duration_s"] for r in successful
+                if recent_cutoff - compare_days * 86400 <= r["created_ts"] < recent_cutoff]
+
+    return {
+        "deploys": len(rows),
+        "first_deploy": rows[0]["created_at"] if rows else None,
+        "last_deploy": rows[-1]["created_at"] if rows else None,
+        "build_duration_s": distribution(durations),
+        "failed_build_duration_s": distribution([row["duration_s"] for row in failed]),
+        "histogram": histogram(durations),
+        "by_status": dict(sorted(by_status.items(), key=lambda item: -item[1])),
+        "failure_rate": failure_rate(statuses),
+        "trends": trends,
+        "slope_s_per_week": slope,
+        "recent_vs_previous": {
+            "days": compare_days,
+            "recent_p50_s": distribution(recent).get("p50"),
+            "previous_p50_s": distribution(previous).get("p50"),
+        },
+    }
+
+
+def format_seconds(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.0f}s" if value < 120 else f"{value / 60:.1f}m"
+
+
+def print_report(service_id: str, report: Dict, bucket: str):
+    print(f"\n📊 {service_id}: {report['deploys']} deploys "
+          f"({report['first_deploy'] or '-'} → {report['last_deploy'] or '-'})")
+    if not report["deploys"]:
+        return
+
+    dist = report["build_duration_s"]
+    if dist["count"]:
+        print(f"⏱️  Build duration (successful, n={dist['count']}): "
+              f"p50 {format_seconds(dist['p50'])}  p90 {format_seconds(dist['p90'])}  "
+              f"p95 {format_seconds(dist['p95'])}  p99 {format_seconds(dist['p99'])}  "
+              f"max {format_seconds(dist['max'])}")
+        peak = max(b["count"] for b in report["histogram"])
+        for b in report["histogram"]:
+            bar = "█" * round(30 * b["count"] / peak) if peak else ""
+            print(f"   {format_seconds(b['from']):>7} - {format_seconds(b['to']):<7} {bar} {b['count']}")
+    failed_dist = report["failed_build_duration_s"]
+    if failed_dist["count"]:
+        print(f"   Failed builds (n={failed_dist['count']}): p50 {format_seconds(failed_dist['p50'])} "
+              f"before failing")
+
+    rate = report["failure_rate"]
+    print(f"🚦 Failure rate: {rate * 100:.1f}%" if rate is not None else "🚦 Failure rate: -")
+    for status, count in report["by_status"].items():
+        print(f"   {status:<20} {count:>5}  {count / report['deploys'] * 100:5.1f}%")
+
+    print(f"📈 Trend by {bucket}:")
+    print(f"   {'start':<12} {'deploys':>7} {'fail %':>7} {'p50':>8} {'p90':>8}")
+    for row in report["trends"]:
+        fail = f"{row['failure_rate'] * 100:.0f}%" if row["failure_rate"] is not None else "-"
+        print(f"   {row['start']:<12} {row['deploys']:>7} {fail:>7} "
+              f"{format_seconds(row['p50_s']):>8} {format_seconds(row['p90_s']):>8}")
+
+    slope = report["slope_s_per_week"]
+    if slope is not None and abs(slope) < 0.05:
+        print("✅ Build duration is flat over the period")
+    elif slope is not None:
+        direction = "slower" if slope > 0 else "faster"
+        print(f"{'⚠️ ' if slope > 0 else '✅'} Builds are getting {direction} by {abs(slope):.1f}s per week")
+    comparison = report["recent_vs_previous"]
+    if comparison["recent_p50_s"] is not None and comparison["previous_p50_s"] is not None:
+        print(f"   p50 last {comparison['days']}d {format_seconds(comparison['recent_p50_s'])} vs "
+              f"previous {comparison['days']}d {format_seconds(comparison['previous_p50_s'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deploy history analytics for Render services")
+    parser.add_argument("--service", action="append", default=[],
+                        help=f"Render service ID; repeatable (default: {SERVICE_ID})")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"SQLite cache file (default: {DEFAULT_DB})")
+    parser.add_argument("--base-url", default=os.environ.get("RENDER_API_BASE_URL", BASE_URL),
+                        help="Render API base URL (default: $RENDER_API_BASE_URL or the public API)")
+    parser.add_argument("--offline", action="store_true", help="Report from the cache without syncing")
+    parser.add_argument("--full-resync", action="store_true",
+                        help="Drop cached deploys for the services and page the full history again")
+    parser.add_argument("--days", type=float, help="Only analyse deploys created in the last N days")
+    parser.add_argument("--bucket", choices=("day", "week", "month"), default="week",
+                        help="Trend bucket size (default: week)")
+    parser.add_argument("--compare-days", type=int, default=DEFAULT_COMPARE_DAYS,
+                        help=f"Window for the recent vs previous p50 comparison (default: {DEFAULT_COMPARE_DAYS})")
+    parser.add_argument("--json", action="store_true", help="Print the reports as JSON")
+    args = parser.parse_args()
+    services = args.service or [SERVICE_ID]
+
+    api_key = os.environ.get("RENDER_API_KEY")
+    if not args.offline:
+        if not api_key:
+            print("❌ RENDER_API_KEY environment variable not set (use --offline for cached data)")
+            sys.exit(1)
+        if requests is None:
+            print("❌ The requests package is required: pip install requests")
+            sys.exit(1)
+
+    cache = DeployHistoryCache(args.db)
+    reports = {}
+    sync_failed = False
+    try:
+        for service_id in services:
+            if not args.offline:
+                if args.full_resync:
+                    cache.reset(service_id)
+                api = RenderAPIMonitor(api_key, service_id, "", args.base_url)
+                started = time.perf_counter()
+                stats = sync_service(api, cache)
+                sync_failed |= not stats["complete"]
+                print(f"🔄 {service_id}: {stats['new']} new deploys "
+                      f"({stats['fetched']} fetched in {stats['pages']} pages, "
+                      f"{stats['refreshed']} refreshed) in {time.perf_counter() - started:.1f}s"
+                      f"{'' if stats['complete'] else ' — incomplete, will resume next run'}",
+                      file=sys.stderr if args.json else sys.stdout)
+            since = time.time() - args.days * 86400 if args.days else None
+            reports[service_id] = analyze(cache.deploys(service_id, since), args.bucket, args.compare_days)
+    finally:
+        cache.close()
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for service_id, report in reports.items():
+            print_report(service_id, report, args.bucket)
+
+    if sync_failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
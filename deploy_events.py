@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Structured NDJSON event stream for the ASR PO System deploy monitor
+
+Events are plain dicts with a timestamp, run ID, sequence number and an
+event type, written one JSON object per line. emit() only enqueues; a
+background thread drains the queue in batches and writes to the sinks,
+so a slow disk or collector never stalls the polling loop. If the queue
+fills up, new events are dropped and counted rather than blocking.
+
+Sinks:
+    StreamSink      - a text stream such as stdout
+    FileSink        - append to an NDJSON file
+    CollectorSink   - POST batches of NDJSON lines to a local collector
+
+Usage:
+    events = EventEmitter([FileSink("deploy-events.ndjson")])
+    events.emit("poll", service_id="srv-...", status="build_in_progress")
+    events.close()
+"""
+
+import json
+import queue
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 0.5  # seconds
+COLLECTOR_TIMEOUT = 5  # seconds
+
+
+class StreamSink:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write_batch(self, lines: List[str]):
+        self.stream.write("".join(lines))
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+
+    def write_batch(self, lines: List[str]):
+        self.file.write("".join(lines))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class CollectorSink:
+    """POST NDJSON batches to an HTTP collector (e.g. a local Vector/Fluent Bit input)"""
+
+    def __init__(self, url: str, retries: int = 2):
+        self.url = url
+        self.retries = retries
+        self.failed_batches = 0
+
+    def write_batch(self, lines: List[str]):
+        body = "".join(lines).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, method="POST",
+                                         headers={"Content-Type": "application/x-ndjson"})
+        for attempt in range(self.retries + 1):
+            try:
+                with urllib.request.urlopen(request, timeout=COLLECTOR_TIMEOUT) as response:
+                    response.read()
+                return
+            except (urllib.error.URLError, OSError):
+                time.sleep(0.2 * (2 ** attempt))
+        self.failed_batches += 1
+
+    def close(self):
+        pass
+
+
+class EventEmitter:
+    """Non-blocking event emitter with a background batching writer"""
+
+    def __init__(self, sinks: List, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 run_id: Optional[str] = None):
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.dropped = 0
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue(maxsize=queue_size)
+        self._writer = threading.Thread(target=self._drain, name="event-writer", daemon=True)
+        self._writer.start()
+
+    def emit(self, event: str, **fields) -> Dict:
+        """Record an event; never blocks the caller"""
+        with self._seq_lock:
+            self._seq += 1
+            seq = self._seq
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "run_id": self.run_id,
+            "seq": seq,
+            "event": event,
+        }
+        record.update(fields)
+        try:
+            self._queue.put_nowait(json.dumps(record, default=str) + "\n")
+        except queue.Full:
+            self.dropped += 1
+        return record
+
+    def _drain(self):
+        closing = False
+        while not closing:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    closing = True
+                else:
+                    batch.append(item)
+                if closing or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                for sink in self.sinks:
+                    try:
+                        sink.write_batch(batch)
+                    except Exception as e:  # a broken sink must not kill the writer
+                        print(f"⚠️  Event sink {type(sink).__name__} failed: {e}", file=sys.stderr)
+
+    def close(self):
+        """Flush queued events and close sinks"""
+        if self.dropped:
+            self.emit("events_dropped", count=self.dropped)
+        self._queue.put(None)
+        self._writer.join()
+        for sink in self.sinks:
+            sink.close()
+
+
+class NullEmitter:
+    """Stand-in used when no event stream is configured"""
+
+    run_id = None
+    dropped = 0
+
+    def emit(self, event: str, **fields) -> Dict:
+        return {}
+
+    def close(self):
+        pass
+
+
+NULL_EMITTER = NullEmitter()
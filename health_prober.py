@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Concurrent health-check prober for the ASR PO System
+Hits each health endpoint many times over keep-alive connections
+
+Every endpoint gets latency histograms for total time and time to first
+byte, plus DNS / TCP connect / TLS handshake histograms for the requests
+that had to open a new connection. A few seconds of probing gives
+p50/p95/p99 figures instead of a single noisy sample.
+
+Usage:
+    python health_prober.py --url https://asr-po-system-enterprise.onrender.com --samples 50
+    python health_prober.py --url http://127.0.0.1:8765 --samples 200 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Dict, List, Optional
+
+from async_http import AsyncHTTPClient
+from latency_histogram import LatencyHistogram
+
+APP_URL = "https://asr-po-system-enterprise.onrender.com"
+HEALTH_ENDPOINTS = [
+    "/api/health",
+    "/api/health/database",
+    "/api/health/detailed",
+    "/api/auth/providers",
+]
+DEFAULT_SAMPLES = 20
+DEFAULT_CONCURRENCY = 8
+TIMING_PHASES = ("total", "ttfb", "dns", "connect", "tls")
+
+
+class EndpointStats:
+    """Histograms and status counts for one endpoint"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.histograms = {phase: LatencyHistogram() for phase in TIMING_PHASES}
+        self.status_counts: Dict[int, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.new_connections = 0
+
+    def record(self, status: int, timings: Dict):
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        self.histograms["total"].record(timings["total_ms"])
+        self.histograms["ttfb"].record(timings["ttfb_ms"])
+        if not timings["reused"]:
+            self.new_connections += 1
+            for phase in ("dns", "connect", "tls"):
+                self.histograms[phase].record(timings[f"{phase}_ms"])
+
+    def record_error(self, error: Exception):
+        name = type(error).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    @property
+    def successes(self) -> int:
+        return self.status_counts.get(200, 0)
+
+    @property
+    def attempts(self) -> int:
+        return sum(self.status_counts.values()) + sum(self.errors.values())
+
+    def to_dict(self) -> Dict:
+        total = self.histograms["total"]
+        median = total.percentile(50)
+        return {
+            "success": self.attempts > 0 and self.successes == self.attempts,
+            "status_code": max(self.status_counts, key=self.status_counts.get) if self.status_counts else None,
+            "response_time_ms": round(median, 2) if median is not None else None,
+            "samples": self.attempts,
+            "successes": self.successes,
+            "status_counts": self.status_counts,
+            "errors": self.errors,
+            "new_connections": self.new_connections,
+            "latency": {phase: hist.summary() for phase, hist in self.histograms.items()},
+        }
+
+
+class HealthProber:
+    """Probe endpoints concurrently, `samples` times each, through one connection pool"""
+
+    def __init__(self, base_url: str = APP_URL, endpoints: Optional[List[str]] = None,
+                 samples: int = DEFAULT_SAMPLES, concurrency: int = DEFAULT_CONCURRENCY,
+                 timeout: float = 30):
+        self.base_url = base_url.rstrip("/")
+        self.endpoints = endpoints or HEALTH_ENDPOINTS
+        self.samples = samples
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    async def _probe(self, client: AsyncHTTPClient, stats: EndpointStats):
+        try:
+            response = await client.get(f"{self.base_url}{stats.endpoint}")
+            stats.record(response.status, response.timings)
+        except Exception as e:  # connection errors, timeouts, protocol errors
+            stats.record_error(e)
+
+    async def probe(self, client: Optional[AsyncHTTPClient] = None) -> Dict[str, EndpointStats]:
+        """Run all probes; pass a client to reuse an existing connection pool"""
+        stats = {endpoint: EndpointStats(endpoint) for endpoint in self.endpoints}
+        owns_client = client is None
+        if owns_client:
+            client = AsyncHTTPClient(limit_per_host=self.concurrency, timeout=self.timeout)
+        try:
+            # Interleave endpoints so a slow one does not monopolise the pool
+            await asyncio.gather(*(self._probe(client, stats[endpoint])
+                                   for _ in range(self.samples) for endpoint in self.endpoints))
+        finally:
+            if owns_client:
+                await client.close()
+        return stats
+
+    def run(self) -> Dict[str, Dict]:
+        """Synchronous entry point; returns per-endpoint result dictionaries"""
+        return {endpoint: s.to_dict() for endpoint, s in asyncio.run(self.probe()).items()}
+
+
+def format_result(endpoint: str, result: Dict) -> str:
+    """One-line human summary of an endpoint's probe results"""
+    latency = result["latency"]
+    total, ttfb = latency["total"], latency["ttfb"]
+    icon = "✅" if result["success"] else "❌"
+    if not total["count"]:
+        return f"{icon} {endpoint}: no responses ({result['errors']})"
+    line = (f"{icon} {endpoint}: {result['successes']}/{result['samples']} OK  "
+            f"p50 {total['p50_ms']:.1f}ms  p95 {total['p95_ms']:.1f}ms  p99 {total['p99_ms']:.1f}ms  "
+            f"(ttfb p50 {ttfb['p50_ms']:.1f}ms")
+    if latency["connect"]["count"]:
+        line += (f", connect p50 {latency['connect']['p50_ms']:.1f}ms"
+                 f", tls p50 {latency['tls']['p50_ms']:.1f}ms over {result['new_connections']} conn")
+    return line + ")"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe ASR PO System health endpoints concurrently")
+    parser.add_argument("--url", default=APP_URL, help=f"Application base URL (default: {APP_URL})")
+    parser.add_argument("--endpoint", action="append", default=[],
+                        help="Endpoint path to probe; repeatable (default: the /api/health* set)")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES,
+                        help=f"Requests per endpoint (default: {DEFAULT_SAMPLES})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Keep-alive connections to open (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--json", action="store_true", help="Print full results as JSON")
+    args = parser.parse_args()
+
+    prober = HealthProber(args.url, args.endpoint or None, args.samples, args.concurrency)
+    started = time.perf_counter()
+    results = prober.run()
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"🏥 Probed {len(results)} endpoints x {args.samples} samples in {elapsed:.1f}s")
+        for endpoint, result in results.items():
+            print(f"   {format_result(endpoint, result)}")
+
+    if not all(result["success"] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Incremental KPI aggregates for the dashboard, driven by the po_approvals log
+
+vw_division_spending and vw_project_po_summary (database/schema.sql)
+re-aggregate every PO on each read. This aggregator keeps the same numbers
+in a small SQLite state store and brings them up to date from what changed
+since the last run, so a refresh costs O(changes) instead of a full scan.
+
+Change detection:
+    - po_approvals rows newer than the watermark name the POs whose status
+      moved (every workflow action is logged there)
+    - po_headers.updated_at catches edits outside the workflow (amount
+      recalculated by the line-item trigger, soft deletes, reassignment)
+    - the watermark is re-read with an overlap window, because NOW() is the
+      transaction start time and a slow transaction can commit rows older
+      than rows already seen; re-applying a PO is idempotent
+
+For each changed PO the store keeps its last contribution (division,
+project, status, amount, live); the aggregates get the old contribution
+subtracted and the current one added. status_before/status_after are not
+trusted for this: they can disagree with the row after direct updates, and
+the row is the source of truth the views read.
+
+Hard deletes (ON DELETE CASCADE removes the audit rows too) cannot be seen
+incrementally; `verify` compares the store with a full GROUP BY and
+`rebuild` recomputes it from scratch.
+
+State (one SQLite file, updated in a single transaction per refresh):
+    po_state(po_id, division_id, project_id, status, amount_cents, live)
+    status_totals(scope, key, status, po_count, amount_cents)
+    divisions / projects (names, codes, budgets for the view columns)
+    meta(watermark, last refresh stats)
+
+Usage:
+    python kpi_aggregator.py standin.db rebuild --state kpi-state.sqlite
+    python kpi_aggregator.py "$DATABASE_URL" refresh --state kpi-state.sqlite
+    python kpi_aggregator.py "$DATABASE_URL" refresh --follow 30        # tail every 30s
+    python kpi_aggregator.py "$DATABASE_URL" verify
+    python kpi_aggregator.py "$DATABASE_URL" show --scope project
+
+    kpis = KPIStore("kpi-state.sqlite")
+    kpis.division_spending()          # rows shaped like vw_division_spending
+
+Requirements:
+    pip install psycopg[binary]       (PostgreSQL sources only)
+"""
+
+import argparse
+import datetime
+import json
+import sqlite3
+import sys
+import time
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sql_schema import connect_postgres, mask_url
+
+DEFAULT_STATE_PATH = "kpi-state.sqlite"
+DEFAULT_OVERLAP_SECONDS = 300
+ID_BATCH = 500
+COMMITTED_STATUSES = ("Approved", "Issued", "Received")  # as vw_division_spending
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key    TEXT PRIMARY KEY,
+    value  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS po_state (
+    po_id         TEXT PRIMARY KEY,
+    division_id   TEXT,
+    project_id    TEXT,
+    status        TEXT,
+    amount_cents  INTEGER NOT NULL,
+    live          INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS status_totals (
+    scope         TEXT NOT NULL,     -- 'division' or 'project'
+    key           TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    po_count      INTEGER NOT NULL,
+    amount_cents  INTEGER NOT NULL,
+    PRIMARY KEY (scope, key, status)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS divisions (
+    id             TEXT PRIMARY KEY,
+    division_name  TEXT,
+    division_code  TEXT
+);
+CREATE TABLE IF NOT EXISTS projects (
+    id                  TEXT PRIMARY KEY,
+    project_code        TEXT,
+    project_name        TEXT,
+    status              TEXT,
+    budget_total_cents  INTEGER
+);
+"""
+
+# A PO's contribution: (division_id, project_id, status, amount_cents); live POs only
+Contribution = Tuple[Optional[str], Optional[str], Optional[str], int]
+
+
+def _cents(value) -> int:
+    return 0 if value is None else int((Decimal(str(value)) * 100).to_integral_value())
+
+
+def _utc(value) -> Optional[datetime.datetime]:
+    """Timestamps from either driver as aware UTC datetimes"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+
+class Source:
+    """The PO database, SQLite stand-in or PostgreSQL, behind one query method"""
+
+    name = ""
+
+    def query(self, sql: str, params: Iterable = ()) -> List[Tuple]:
+        raise NotImplementedError
+
+    def stream(self, sql: str, params: Iterable = (), size: int = 10_000) -> Iterator[List[Tuple]]:
+        raise NotImplementedError
+
+    def timestamp(self, moment: datetime.datetime):
+        """A watermark as a query parameter"""
+        return moment
+
+    def finish(self):
+        """End the read so a --follow loop does not hold a transaction open"""
+
+    def close(self):
+        pass
+
+
+class SQLiteSource(Source):
+    def __init__(self, path: str):
+        self.name = f"sqlite:{path}"
+        self.db = sqlite3.connect(path)
+
+    def query(self, sql: str, params: Iterable = ()) -> List[Tuple]:
+        return self.db.execute(sql.replace("%s", "?"), tuple(params)).fetchall()
+
+    def stream(self, sql: str, params: Iterable = (), size: int = 10_000) -> Iterator[List[Tuple]]:
+        cursor = self.db.execute(sql.replace("%s", "?"), tuple(params))
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                return
+            yield rows
+
+    def timestamp(self, moment: datetime.datetime):
+        # the stand-in stores 'YYYY-MM-DD HH:MM:SS' text, which compares correctly as a string
+        return moment.astimezone(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    def close(self):
+        self.db.close()
+
+
+class PostgresSource(Source):
+    def __init__(self, url: str):
+        self.name = mask_url(url)
+        self.conn = connect_postgres(url)
+        self._cursors = 0
+
+    def query(self, sql: str, params: Iterable = ()) -> List[Tuple]:
+        with self.conn.cursor() as cur:
+            cur.execute(sql, tuple(params))
+            return cur.fetchall()
+
+    def stream(self, sql: str, params: Iterable = (), size: int = 10_000) -> Iterator[List[Tuple]]:
+        self._cursors += 1
+        with self.conn.cursor(name=f"kpi_aggregator_{self._cursors}") as cur:
+            cur.execute(sql, tuple(params))
+            while True:
+                rows = cur.fetchmany(size)
+                if not rows:
+                    return
+                yield rows
+
+    def finish(self):
+        self.conn.rollback()
+
+    def close(self):
+        self.conn.rollback()
+        self.conn.close()
+
+
+def open_source(spec: str) -> Source:
+    if spec.startswith(("postgres://", "postgresql://")):
+        return PostgresSource(spec)
+    return SQLiteSource(spec[len("sqlite:"):] if spec.startswith("sqlite:") else spec)
+
+
+class KPIStore:
+    """SQLite state: per-PO contributions and per-(scope, key, status) totals"""
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(STATE_SCHEMA)
+
+    # ------------------------------------------------------------------ meta
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def watermark(self) -> Optional[datetime.datetime]:
+        value = self.get_meta("watermark")
+        return _utc(value) if value else None
+
+    # ------------------------------------------------------------------ updates
+
+    def contributions(self, po_ids: List[str]) -> Dict[str, Contribution]:
+        found = {}
+        for i in range(0, len(po_ids), ID_BATCH):
+            batch = po_ids[i:i + ID_BATCH]
+            rows = self.db.execute(
+                f"SELECT po_id, division_id, project_id, status, amount_cents, live FROM po_state "
+                f"WHERE po_id IN ({', '.join('?' * len(batch))})", batch)
+            for po_id, division, project, status, cents, live in rows:
+                if live:
+                    found[po_id] = (division, project, status, cents)
+        return found
+
+    def apply(self, changes: Dict[str, Optional[Contribution]], previous: Dict[str, Contribution]) -> int:
+        """Replace the contributions of changed POs (None = gone); returns how many moved a total"""
+        deltas: Dict[Tuple[str, str, str], List[int]] = {}
+
+        def add(contribution: Contribution, sign: int):
+            division, project, status, cents = contribution
+            status = status or "Unknown"
+            for scope, key in (("division", division), ("project", project)):
+                if key is not None:
+                    delta = deltas.setdefault((scope, key, status), [0, 0])
+                    delta[0] += sign
+                    delta[1] += sign * cents
+
+        moved = 0
+        for po_id, current in changes.items():
+            old = previous.get(po_id)
+            if old == current:
+                continue
+            moved += 1
+            if old is not None:
+                add(old, -1)
+            if current is not None:
+                add(current, +1)
+        self.db.executemany(
+            "INSERT INTO status_totals (scope, key, status, po_count, amount_cents) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (scope, key, status) DO UPDATE SET po_count = po_count + excluded.po_count, "
+            "amount_cents = amount_cents + excluded.amount_cents",
+            [(scope, key, status, count, cents) for (scope, key, status), (count, cents) in deltas.items()
+             if count or cents])
+        self.db.execute("DELETE FROM status_totals WHERE po_count = 0 AND amount_cents = 0")
+        self.db.executemany(
+            "INSERT OR REPLACE INTO po_state (po_id, division_id, project_id, status, amount_cents, live) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(po_id, *(c if c is not None else (None, None, None, 0)), int(c is not None))
+             for po_id, c in changes.items()])
+        return moved
+
+    def reset(self):
+        self.db.execute("DELETE FROM po_state")
+        self.db.execute("DELETE FROM status_totals")
+        self.db.execute("DELETE FROM meta")
+
+    # ------------------------------------------------------------------ reads
+
+    def totals(self, scope: str) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        rows = self.db.execute("SELECT key, status, po_count, amount_cents FROM status_totals WHERE scope = ?",
+                               (scope,))
+        return {(key, status): (count, cents) for key, status, count, cents in rows}
+
+    def status_counts(self, scope: str, key: str) -> Dict[str, Dict[str, float]]:
+        rows = self.db.execute("SELECT status, po_count, amount_cents FROM status_totals "
+                               "WHERE scope = ? AND key = ? ORDER BY status", (scope, key))
+        return {status: {"count": count, "amount": cents / 100} for status, count, cents in rows}
+
+    def division_spending(self) -> List[Dict]:
+        """vw_division_spending from the state store"""
+        committed = ", ".join("?" * len(COMMITTED_STATUSES))
+        rows = self.db.execute(f"""
+            SELECT d.id, d.division_name, d.division_code,
+                   COALESCE(SUM(t.po_count), 0),
+                   COALESCE(SUM(CASE WHEN t.status = 'Draft' THEN t.po_count END), 0),
+                   COALESCE(SUM(CASE WHEN t.status = 'Approved' THEN t.po_count END), 0),
+                   COALESCE(SUM(CASE WHEN t.status = 'Issued' THEN t.po_count END), 0),
+                   SUM(t.amount_cents),
+                   SUM(CASE WHEN t.status IN ({committed}) THEN t.amount_cents ELSE 0 END)
+            FROM divisions d
+            LEFT JOIN status_totals t ON t.scope = 'division' AND t.key = d.id
+            GROUP BY d.id, d.division_name, d.division_code
+            ORDER BY d.division_name""", COMMITTED_STATUSES)
+        return [{"division_id": r[0], "division_name": r[1], "division_code": r[2], "po_count": r[3],
+                 "draft_count": r[4], "approved_count": r[5], "issued_count": r[6],
+                 "total_spend": r[7] / 100 if r[7] is not None else None,
+                 "committed_spend": r[8] / 100 if r[8] is not None else None} for r in rows]
+
+    def project_po_summary(self) -> List[Dict]:
+        """vw_project_po_summary from the state store"""
+        rows = self.db.execute("""
+            SELECT p.id, p.project_code, p.project_name, p.status, p.budget_total_cents,
+                   COALESCE(SUM(t.po_count), 0), SUM(t.amount_cents)
+            FROM projects p
+            LEFT JOIN status_totals t ON t.scope = 'project' AND t.key = p.id
+            GROUP BY p.id, p.project_code, p.project_name, p.status, p.budget_total_cents
+            ORDER BY p.project_code""")
+        result = []
+        for pid, code, name, status, budget, count, cents in rows:
+            result.append({"project_id": pid, "project_code": code, "project_name": name,
+                           "project_status": status, "budget_total": budget / 100 if budget is not None else None,
+                           "po_count": count, "total_po_amount": cents / 100 if cents is not None else None,
+                           "budget_remaining": (budget - (cents or 0)) / 100 if budget is not None else None})
+        return result
+
+    def close(self):
+        self.db.close()
+
+
+class KPIAggregator:
+    """Keeps a KPIStore in step with a Source"""
+
+    HEADER_COLUMNS = "id, division_id, project_id, status, total_amount, deleted_at, updated_at"
+
+    def __init__(self, source: Source, store: KPIStore, overlap_seconds: int = DEFAULT_OVERLAP_SECONDS):
+        self.source = source
+        self.store = store
+        self.overlap = datetime.timedelta(seconds=overlap_seconds)
+
+    @staticmethod
+    def _contribution(row: Tuple) -> Optional[Contribution]:
+        _, division, project, status, amount, deleted_at, _ = row
+        if deleted_at is not None:
+            return None
+        return (str(division) if division is not None else None, str(project) if project is not None else None,
+                str(status) if status is not None else None, _cents(amount))
+
+    def _sync_dimensions(self, since: Optional[datetime.datetime]):
+        where, params = ("", ()) if since is None else (" WHERE updated_at > %s", (self.source.timestamp(since),))
+        divisions = self.source.query(f"SELECT id, division_name, division_code FROM divisions{where}", params)
+        self.store.db.executemany("INSERT OR REPLACE INTO divisions VALUES (?, ?, ?)",
+                                  [(str(i), n, c) for i, n, c in divisions])
+        projects = self.source.query(
+            f"SELECT id, project_code, project_name, status, budget_total FROM projects{where}", params)
+        self.store.db.executemany("INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?)",
+                                  [(str(i), c, n, s, _cents(b) if b is not None else None)
+                                   for i, c, n, s, b in projects])
+
+    def refresh(self) -> Dict:
+        """Apply the changes since the watermark; rebuilds if the store is empty"""
+        watermark = self.store.watermark
+        if watermark is None:
+            return self.rebuild()
+        started = time.perf_counter()
+        since = watermark - self.overlap
+        param = self.source.timestamp(since)
+        newest = watermark
+
+        changed: Dict[str, Optional[Contribution]] = {}
+        for row in self.source.query(f"SELECT {self.HEADER_COLUMNS} FROM po_headers WHERE updated_at > %s", (param,)):
+            changed[str(row[0])] = self._contribution(row)
+            newest = max(newest, _utc(row[6]))
+        # no GROUP BY / po_id filter here: either steers planners off the timestamp index
+        logged = set()
+        for po_id, logged_at in self.source.query("SELECT po_id, timestamp FROM po_approvals WHERE timestamp > %s",
+                                                  (param,)):
+            newest = max(newest, _utc(logged_at))
+            if po_id is not None:
+                logged.add(str(po_id))
+        missing = [po_id for po_id in logged if po_id not in changed]
+        for i in range(0, len(missing), ID_BATCH):
+            batch = missing[i:i + ID_BATCH]
+            rows = self.source.query(f"SELECT {self.HEADER_COLUMNS} FROM po_headers "
+                                     f"WHERE id IN ({', '.join(['%s'] * len(batch))})", batch)
+            found = {str(row[0]): self._contribution(row) for row in rows}
+            for po_id in batch:
+                changed[po_id] = found.get(po_id)  # absent = hard-deleted
+
+        with self.store.db:
+            self._sync_dimensions(since)
+            moved = self.store.apply(changed, self.store.contributions(list(changed)))
+            self.store.set_meta("watermark", newest.isoformat())
+            stats = {"mode": "refresh", "changed_pos": len(changed), "moved_pos": moved,
+                     "logged_pos": len(logged), "watermark": newest.isoformat(),
+                     "seconds": round(time.perf_counter() - started, 3)}
+            self.store.set_meta("last_refresh", json.dumps(stats))
+        self.source.finish()
+        return stats
+
+    def rebuild(self) -> Dict:
+        """Recompute the store from a full scan of po_headers"""
+        started = time.perf_counter()
+        newest = EPOCH
+        with self.store.db:
+            self.store.reset()
+            self._sync_dimensions(None)
+            total = 0
+            for rows in self.source.stream(f"SELECT {self.HEADER_COLUMNS} FROM po_headers"):
+                changes = {}
+                for row in rows:
+                    changes[str(row[0])] = self._contribution(row)
+                    if row[6] is not None:
+                        newest = max(newest, _utc(row[6]))
+                self.store.apply(changes, {})
+                total += len(rows)
+            latest = self.source.query("SELECT MAX(timestamp) FROM po_approvals")[0][0]
+            if latest is not None:
+                newest = max(newest, _utc(latest))
+            self.store.set_meta("watermark", newest.isoformat())
+            stats = {"mode": "rebuild", "scanned_pos": total, "watermark": newest.isoformat(),
+                     "seconds": round(time.perf_counter() - started, 3)}
+            self.store.set_meta("last_refresh", json.dumps(stats))
+        self.source.finish()
+        return stats
+
+    def verify(self) -> List[str]:
+        """Differences between the store and a full GROUP BY on the source"""
+        problems = []
+        for scope, column in (("division", "division_id"), ("project", "project_id")):
+            expected = {}
+            for key, status, count, amount in self.source.query(
+                    f"SELECT {column}, status, COUNT(*), SUM(total_amount) FROM po_headers "
+                    f"WHERE deleted_at IS NULL AND {column} IS NOT NULL GROUP BY {column}, status"):
+                expected[(str(key), status or "Unknown")] = (count, _cents(amount))
+            actual = self.store.totals(scope)
+            for key in sorted(set(expected) | set(actual)):
+                if expected.get(key) != actual.get(key):
+                    problems.append(f"{scope} {key[0]} {key[1]}: expected {expected.get(key)}, "
+                                    f"store has {actual.get(key)}")
+        self.source.finish()
+        return problems
+
+
+def _print_rows(rows: List[Dict], columns: List[str]):
+    widths = [max(len(c), *(len(f"{r[c]}") for r in rows)) if rows else len(c) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(f"{row[c]}".ljust(w) for c, w in zip(columns, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental dashboard KPI aggregates from the po_approvals log")
+    parser.add_argument("source", help="sqlite:PATH (or a path) or postgresql://...")
+    parser.add_argument("command", nargs="?", default="refresh", choices=["refresh", "rebuild", "verify", "show"])
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help=f"State store (default: {DEFAULT_STATE_PATH})")
+    parser.add_argument("--overlap", type=int, default=DEFAULT_OVERLAP_SECONDS,
+                        help="Seconds re-read before the watermark to catch late commits")
+    parser.add_argument("--follow", type=float, metavar="SECONDS", help="Keep refreshing at this interval")
+    parser.add_argument("--scope", choices=["division", "project"], default="division", help="What `show` prints")
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args()
+
+    try:
+        source = open_source(args.source)
+    except ImportError as e:
+        raise SystemExit(f"❌ {e}")
+    store = KPIStore(args.state)
+    aggregator = KPIAggregator(source, store, args.overlap)
+    try:
+        if args.command == "show":
+            rows = store.division_spending() if args.scope == "division" else store.project_po_summary()
+            if args.json:
+                print(json.dumps(rows, indent=2))
+            elif args.scope == "division":
+                _print_rows(rows, ["division_code", "division_name", "po_count", "draft_count", "approved_count",
+                                   "issued_count", "total_spend", "committed_spend"])
+            else:
+                _print_rows(rows, ["project_code", "project_status", "po_count", "total_po_amount", "budget_remaining"])
+        elif args.command == "verify":
+            problems = aggregator.verify()
+            for problem in problems[:50]:
+                print(f"  ⚠️  {problem}")
+            if problems:
+                print(f"❌ {len(problems)} aggregate(s) differ from {source.name}; run `rebuild`")
+                sys.exit(1)
+            print(f"✅ State store matches {source.name}")
+        else:
+            while True:
+                stats = aggregator.rebuild() if args.command == "rebuild" else aggregator.refresh()
+                if args.json:
+                    print(json.dumps(stats))
+                elif stats["mode"] == "rebuild":
+                    print(f"🔨 Rebuilt from {stats['scanned_pos']:,} POs in {stats['seconds']}s "
+                          f"(watermark {stats['watermark']})")
+                else:
+                    print(f"🔄 {stats['changed_pos']:,} changed PO(s), {stats['moved_pos']:,} moved a total, "
+                          f"in {stats['seconds'] * 1000:.0f} ms (watermark {stats['watermark']})")
+                if not args.follow or args.command == "rebuild":
+                    break
+                time.sleep(args.follow)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+        source.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+HDR-style latency histogram for the ASR PO System monitoring tools
+
+Log-linear buckets give a fixed relative precision (about 1% with two
+significant figures) from 1 microsecond up to one hour. The whole range
+fits in a few thousand integer counters, so memory stays constant no
+matter how many samples are recorded. Histograms can be merged, which
+makes per-worker recording cheap.
+
+Usage:
+    histogram = LatencyHistogram()
+    histogram.record(12.5)          # milliseconds
+    histogram.percentile(99)        # -> 12.5 (within bucket precision)
+"""
+
+import math
+from array import array
+from typing import Dict, Iterable, Optional
+
+DEFAULT_PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+class LatencyHistogram:
+    """Fixed-memory histogram of millisecond latencies"""
+
+    def __init__(self, significant_figures: int = 2, highest_ms: float = 3_600_000):
+        self.significant_figures = significant_figures
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_figures))
+        self.sub_bucket_count = 1 << self.sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count // 2
+        self.highest_us = int(highest_ms * 1000)
+
+        top_exponent = max(0, self.highest_us.bit_length() - self.sub_bucket_bits)
+        self.counts = array("q", [0]) * (self.sub_bucket_count + top_exponent * self.sub_bucket_half)
+        self.total_count = 0
+        self.min_us: Optional[int] = None
+        self.max_us: Optional[int] = None
+        self.sum_us = 0
+
+    def _index(self, value_us: int) -> int:
+        if value_us < self.sub_bucket_count:
+            return value_us
+        exponent = value_us.bit_length() - self.sub_bucket_bits
+        sub_bucket = value_us >> exponent
+        return self.sub_bucket_count + (exponent - 1) * self.sub_bucket_half + (sub_bucket - self.sub_bucket_half)
+
+    def _value_at(self, index: int) -> float:
+        """Midpoint (in microseconds) of the values that map to a bucket"""
+        if index < self.sub_bucket_count:
+            return float(index)
+        offset = index - self.sub_bucket_count
+        exponent = offset // self.sub_bucket_half + 1
+        sub_bucket = offset % self.sub_bucket_half + self.sub_bucket_half
+        low = sub_bucket << exponent
+        return low + ((1 << exponent) - 1) / 2
+
+    def record(self, value_ms: float, count: int = 1):
+        value_us = min(self.highest_us, max(0, int(round(value_ms * 1000))))
+        self.counts[self._index(value_us)] += count
+        self.total_count += count
+        self.sum_us += value_us * count
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = value_us if self.max_us is None else max(self.max_us, value_us)
+
+    def record_many(self, values_ms: Iterable[float]):
+        for value in values_ms:
+            self.record(value)
+
+    def merge(self, other: "LatencyHistogram"):
+        if len(other.counts) != len(self.counts):
+            raise ValueError("cannot merge histograms with different precision or range")
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total_count += other.total_count
+        self.sum_us += other.sum_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+            self.max_us = other.max_us if self.max_us is None else max(self.max_us, other.max_us)
+
+    def reset(self):
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self.total_count = 0
+        self.sum_us = 0
+        self.min_us = self.max_us = None
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency in milliseconds at or below which pct% of samples fall"""
+        if not self.total_count:
+            return None
+        target = max(1, math.ceil(pct / 100 * self.total_count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                value_us = min(max(self._value_at(index), self.min_us), self.max_us)
+                return value_us / 1000
+        return self.max_us / 1000
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum_us / self.total_count / 1000 if self.total_count else None
+
+    def buckets(self):
+        """(bucket midpoint ms, count) for every non-empty bucket, in order"""
+        for index, count in enumerate(self.counts):
+            if count:
+                yield self._value_at(index) / 1000, count
+
+    def summary(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict:
+        result = {
+            "count": self.total_count,
+            "min_ms": self.min_us / 1000 if self.min_us is not None else None,
+            "mean_ms": round(self.mean, 3) if self.mean is not None else None,
+            "max_ms": self.max_us / 1000 if self.max_us is not None else None,
+        }
+        for pct in percentiles:
+            value = self.percentile(pct)
+            result[f"p{pct:g}_ms"] = round(value, 3) if value is not None else None
+        return result
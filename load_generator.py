@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Python load generator for the ASR PO System
+Replays the Artillery scenarios in load-testing/artillery-config.yml
+
+Parses the Artillery config (phases, scenario weights, flows with
+get/post/put/patch/delete steps and think times, default headers and
+ensure thresholds) and drives an open-model arrival process: virtual users
+arrive as a Poisson process at each phase's arrivalRate (linearly ramped
+when rampTo is set) whether or not earlier users have finished, exactly as
+Artillery does. Virtual users are asyncio tasks sharing one keep-alive
+connection pool, so thousands can be in flight per core.
+
+Processor hooks (beforeRequest, function steps) are JavaScript-only and
+are skipped.
+
+Usage:
+    python load_generator.py                                 # config target
+    python load_generator.py --target http://127.0.0.1:8765  # local stub
+    python load_generator.py --duration-scale 0.1 --rate-scale 2 --json report.json
+
+    # Stub server for local runs
+    python render_api_stub.py --port 8765 --latency-ms 20
+
+Requirements:
+    pip install pyyaml
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+from async_http import AsyncHTTPClient
+from latency_histogram import LatencyHistogram
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG = os.path.join(SCRIPT_DIR, "load-testing", "artillery-config.yml")
+DEFAULT_MAX_CONNECTIONS = 512
+PROGRESS_INTERVAL = 10  # seconds
+HTTP_METHODS = ("get", "post", "put", "patch", "delete")
+
+
+def load_artillery_config(path: str) -> Dict:
+    """Read an Artillery YAML file into the structure the runner expects"""
+    import yaml
+
+    with open(path, "r", encoding="utf-8") as f:
+        raw = yaml.safe_load(f)
+
+    config = raw.get("config", {})
+    phases = []
+    for i, phase in enumerate(config.get("phases", [])):
+        duration = float(phase.get("duration", 0))
+        if "arrivalCount" in phase:
+            rate = float(phase["arrivalCount"]) / duration if duration else 0.0
+            ramp_to = rate
+        else:
+            rate = float(phase.get("arrivalRate", 0))
+            ramp_to = float(phase.get("rampTo", rate))
+        if "pause" in phase:
+            duration, rate, ramp_to = float(phase["pause"]), 0.0, 0.0
+        phases.append({"name": phase.get("name", f"Phase {i + 1}"), "duration": duration,
+                       "arrival_rate": rate, "ramp_to": ramp_to})
+
+    scenarios = []
+    for i, scenario in enumerate(raw.get("scenarios", [])):
+        steps = []
+        for step in scenario.get("flow", []):
+            if "think" in step:
+                steps.append({"think": float(step["think"])})
+                continue
+            method = next((m for m in HTTP_METHODS if m in step), None)
+            if method is None:
+                continue  # function / log / loop steps are not supported
+            request = step[method]
+            body = None
+            if "json" in request:
+                body = json.dumps(request["json"]).encode("utf-8")
+            elif "body" in request:
+                body = str(request["body"]).encode("utf-8")
+            steps.append({"method": method.upper(), "url": request["url"],
+                          "headers": request.get("headers", {}), "body": body})
+        scenarios.append({"name": scenario.get("name", f"Scenario {i + 1}"),
+                          "weight": float(scenario.get("weight", 1)), "steps": steps})
+
+    ensure = dict(config.get("ensure") or {})
+    # Newer Artillery versions use `thresholds: [{p95: 2000}, ...]`
+    for threshold in ensure.pop("thresholds", []) or []:
+        ensure.update(threshold)
+
+    return {
+        "target": config.get("target", "http://localhost:3000"),
+        "phases": phases,
+        "headers": (config.get("defaults") or {}).get("headers", {}),
+        "ensure": ensure,
+        "scenarios": scenarios,
+    }
+
+
+class LoadMetrics:
+    """Aggregate and per-endpoint latency histograms plus counters"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.by_endpoint: Dict[str, LatencyHistogram] = {}
+        self.requests = 0
+        self.errors = 0
+        self.status_counts: Dict[int, int] = {}
+        self.error_types: Dict[str, int] = {}
+        self.vusers_created = 0
+        self.vusers_completed = 0
+        self.vusers_failed = 0
+        self.window = LatencyHistogram()
+        self.window_requests = 0
+
+    def record(self, endpoint: str, status: int, latency_ms: float):
+        self.requests += 1
+        self.window_requests += 1
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        if status >= 400:
+            self.errors += 1
+        self.latency.record(latency_ms)
+        self.window.record(latency_ms)
+        histogram = self.by_endpoint.get(endpoint)
+        if histogram is None:
+            histogram = self.by_endpoint[endpoint] = LatencyHistogram()
+        histogram.record(latency_ms)
+
+    def record_error(self, error: Exception):
+        self.requests += 1
+        self.window_requests += 1
+        self.errors += 1
+        name = type(error).__name__
+        self.error_types[name] = self.error_types.get(name, 0) + 1
+
+    @property
+    def error_rate(self) -> float:
+        """Error percentage, matching Artillery's maxErrorRate units"""
+        return 100.0 * self.errors / self.requests if self.requests else 0.0
+
+    def report(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate_pct": round(self.error_rate, 3),
+            "status_counts": self.status_counts,
+            "error_types": self.error_types,
+            "vusers": {"created": self.vusers_created, "completed": self.vusers_completed,
+                       "failed": self.vusers_failed},
+            "latency": self.latency.summary(),
+            "endpoints": {endpoint: hist.summary((50, 95, 99))
+                          for endpoint, hist in sorted(self.by_endpoint.items())},
+        }
+
+
+def check_ensure(ensure: Dict, metrics: LoadMetrics) -> List[str]:
+    """Return a failure message for every violated ensure threshold"""
+    failures = []
+    for key, limit in ensure.items():
+        if key == "maxErrorRate":
+            if metrics.error_rate > float(limit):
+                failures.append(f"error rate {metrics.error_rate:.2f}% > {limit}%")
+            continue
+        if key in ("min", "max", "median") or (key.startswith("p") and key[1:].replace(".", "").isdigit()):
+            if key == "min":
+                value = metrics.latency.min_us / 1000 if metrics.latency.min_us is not None else None
+            elif key == "max":
+                value = metrics.latency.max_us / 1000 if metrics.latency.max_us is not None else None
+            else:
+                value = metrics.latency.percentile(50 if key == "median" else float(key[1:]))
+            if value is not None and value > float(limit):
+                failures.append(f"{key} {value:.1f}ms > {limit}ms")
+    return failures
+
+
+class LoadGenerator:
+    """Open-model virtual user scheduler"""
+
+    def __init__(self, config: Dict, target: Optional[str] = None,
+                 duration_scale: float = 1.0, rate_scale: float = 1.0,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 think_scale: float = 1.0, seed: Optional[int] = None,
+                 progress_interval: float = PROGRESS_INTERVAL):
+        self.config = config
+        self.target = (target or config["target"]).rstrip("/")
+        self.duration_scale = duration_scale
+        self.rate_scale = rate_scale
+        self.think_scale = think_scale
+        self.max_connections = max_connections
+        self.progress_interval = progress_interval
+        self.random = random.Random(seed)
+        self.metrics = LoadMetrics()
+        self.phase_reports = []
+        self._tasks = set()
+
+        scenarios = [s for s in config["scenarios"] if s["steps"] and s["weight"] > 0]
+        if not scenarios:
+            raise ValueError("config has no runnable scenarios")
+        self.scenarios = scenarios
+        self.weights = [s["weight"] for s in scenarios]
+
+    async def _virtual_user(self, client: AsyncHTTPClient, scenario: Dict):
+        self.metrics.vusers_created += 1
+        failed = False
+        for step in scenario["steps"]:
+            if "think" in step:
+                await asyncio.sleep(step["think"] * self.think_scale)
+                continue
+            headers = dict(self.config["headers"], **step["headers"])
+            endpoint = f"{step['method']} {step['url'].split('?', 1)[0]}"
+            started = time.perf_counter()
+            try:
+                response = await client.request(step["method"], self.target + step["url"],
+                                                headers=headers, body=step["body"])
+                self.metrics.record(endpoint, response.status, (time.perf_counter() - started) * 1000)
+                failed |= response.status >= 400
+            except Exception as e:  # connection errors and timeouts count as failed requests
+                self.metrics.record_error(e)
+                failed = True
+                break
+        if failed:
+            self.metrics.vusers_failed += 1
+        else:
+            self.metrics.vusers_completed += 1
+
+    def _spawn(self, client: AsyncHTTPClient):
+        scenario = self.random.choices(self.scenarios, self.weights)[0]
+        task = asyncio.ensure_future(self._virtual_user(client, scenario))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_phase(self, client: AsyncHTTPClient, phase: Dict):
+        duration = phase["duration"] * self.duration_scale
+        start_rate = phase["arrival_rate"] * self.rate_scale
+        end_rate = phase["ramp_to"] * self.rate_scale
+        requests_before = self.metrics.requests
+        print(f"▶️  {phase['name']}: {duration:.0f}s at {start_rate:g}"
+              f"{f'->{end_rate:g}' if end_rate != start_rate else ''} arrivals/s")
+
+        loop = asyncio.get_running_loop()
+        phase_start = loop.time()
+        next_progress = phase_start + self.progress_interval
+        now = phase_start
+        while True:
+            elapsed = now - phase_start
+            if elapsed >= duration:
+                break
+            rate = start_rate + (end_rate - start_rate) * (elapsed / duration if duration else 0)
+            if rate <= 0:
+                await asyncio.sleep(min(1.0, duration - elapsed))
+                now = loop.time()
+                continue
+            # Poisson arrivals: exponential inter-arrival gaps, scheduled against the clock
+            now += self.random.expovariate(rate)
+            delay = now - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if now - phase_start < duration:
+                self._spawn(client)
+            if loop.time() >= next_progress:
+                self._print_progress()
+                next_progress += self.progress_interval
+
+        self.phase_reports.append({"name": phase["name"], "duration_s": duration,
+                                   "requests": self.metrics.requests - requests_before})
+
+    def _print_progress(self):
+        window = self.metrics.window
+        p95 = window.percentile(95)
+        print(f"   {self.metrics.window_requests / self.progress_interval:7.1f} req/s  "
+              f"p95 {p95 or 0:8.1f}ms  in-flight VUs {len(self._tasks):5d}  "
+              f"errors {self.metrics.errors}")
+        window.reset()
+        self.metrics.window_requests = 0
+
+    async def run(self) -> Dict:
+        started = time.perf_counter()
+        async with AsyncHTTPClient(limit_per_host=self.max_connections) as client:
+            for phase in self.config["phases"]:
+                await self._run_phase(client, phase)
+            if self._tasks:
+                print(f"⏳ Waiting for {len(self._tasks)} in-flight virtual users...")
+                await asyncio.gather(*list(self._tasks), return_exceptions=True)
+            connections = client.connections_opened
+
+        report = self.metrics.report()
+        report["elapsed_s"] = round(time.perf_counter() - started, 2)
+        report["connections_opened"] = connections
+        report["phases"] = self.phase_reports
+        report["ensure_failures"] = check_ensure(self.config["ensure"], self.metrics)
+        return report
+
+
+def print_report(report: Dict):
+    latency = report["latency"]
+    print(f"\n📊 Load test summary ({report['elapsed_s']}s):")
+    print(f"   Requests: {report['requests']}  errors: {report['errors']} ({report['error_rate_pct']}%)")
+    print(f"   Virtual users: {report['vusers']['created']} created, "
+          f"{report['vusers']['completed']} completed, {report['vusers']['failed']} failed")
+    if latency["count"]:
+        print(f"   Latency: p50 {latency['p50_ms']:.1f}ms  p95 {latency['p95_ms']:.1f}ms  "
+              f"p99 {latency['p99_ms']:.1f}ms  max {latency['max_ms']:.1f}ms")
+    print(f"   {'endpoint':<60} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for endpoint, stats in report["endpoints"].items():
+        print(f"   {endpoint[:60]:<60} {stats['count']:>7} {stats['p50_ms']:>8.1f}ms "
+              f"{stats['p95_ms']:>8.1f}ms {stats['p99_ms']:>8.1f}ms")
+    if report["ensure_failures"]:
+        print("❌ Thresholds failed:")
+        for failure in report["ensure_failures"]:
+            print(f"   - {failure}")
+    else:
+        print("✅ All ensure thresholds met")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay Artillery scenarios with an asyncio load generator")
+    parser.add_argument("--config", default=DEFAULT_CONFIG,
+                        help="Artillery config file (default: load-testing/artillery-config.yml)")
+    parser.add_argument("--target", help="Override config.target, e.g. http://127.0.0.1:8765")
+    parser.add_argument("--duration-scale", type=float, default=1.0,
+                        help="Multiply every phase duration (default: 1.0)")
+    parser.add_argument("--rate-scale", type=float, default=1.0,
+                        help="Multiply every arrival rate (default: 1.0)")
+    parser.add_argument("--think-scale", type=float, default=1.0,
+                        help="Multiply every think time (default: 1.0)")
+    parser.add_argument("--max-connections", type=int, default=DEFAULT_MAX_CONNECTIONS,
+                        help=f"Keep-alive connections to the target (default: {DEFAULT_MAX_CONNECTIONS})")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible arrivals")
+    parser.add_argument("--json", help="Write the full report to this file")
+    args = parser.parse_args()
+
+    config = load_artillery_config(args.config)
+    generator = LoadGenerator(config, args.target, args.duration_scale, args.rate_scale,
+                              args.max_connections, args.think_scale, args.seed)
+    print(f"🎯 Target: {generator.target}  scenarios: "
+          + ", ".join(f"{s['name']} ({s['weight']:g})" for s in generator.scenarios))
+
+    report = asyncio.run(generator.run())
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.json}")
+
+    if report["ensure_failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
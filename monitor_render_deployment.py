@@ -3,10 +3,27 @@
 Render API Deployment Monitor for ASR PO System
 Monitors deployment status for commit 2b4b722 (NextAuth fix)
 
+Polling is adaptive: conditional requests (ETag / Last-Modified), small
+deploy pages with cursor paging, intervals tuned to the expected build
+finish, and Retry-After / backoff on throttling. render_api_stub.py
+provides a local Render API for testing.
+
 Usage:
     export RENDER_API_KEY="your_api_key_here"
     python monitor_render_deployment.py
 
+    # Watch several services/commits at once from one process
+    python monitor_render_deployment.py --target srv-aaa:2b4b722 --target srv-bbb:9f1c0de
+    python monitor_render_deployment.py --targets-file fleet.json
+
+    fleet.json: [{"service_id": "srv-aaa", "commit": "2b4b722"}, ...]
+
+    # Structured NDJSON events (polls, state transitions, API calls, health
+    # results, final outcome) for CI or a local log collector
+    python monitor_render_deployment.py --events - 2>monitor.log | jq .
+    python monitor_render_deployment.py --events deploy-events.ndjson \
+        --events-collector http://127.0.0.1:8686/events
+
 Requirements:
     pip install requests
 """
@@ -15,9 +32,22 @@ import os
 import sys
 import json
 import time
-import requests
-from datetime import datetime
-from typing import Dict, Optional, List
+import argparse
+import asyncio
+import contextlib
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import requests
+except ImportError:  # Only the single-target monitor needs requests
+    requests = None
+
+from async_http import AsyncHTTPClient, HTTPError
+from deploy_events import NULL_EMITTER, CollectorSink, EventEmitter, FileSink, StreamSink
+from health_prober import APP_URL, HEALTH_ENDPOINTS, HealthProber, format_result
 
 # Configuration
 SERVICE_ID = "srv-d5girrp4tr6s73ed7d1g"
@@ -25,10 +55,146 @@ TARGET_COMMIT = "2b4b722"
 BASE_URL = "https://api.render.com/v1"
 POLL_INTERVAL = 10  # seconds
 MAX_POLLS = 180  # 30 minutes total
+MAX_WAIT_SECONDS = MAX_POLLS * POLL_INTERVAL
+
+# Adaptive polling bounds and deploy list paging
+MIN_POLL_INTERVAL = 3  # seconds, used around the expected finish time
+MAX_POLL_INTERVAL = 60  # seconds, used early in long builds
+DEPLOY_PAGE_SIZE = 10
+DEPLOY_SEARCH_PAGES = 5
+HEALTH_SAMPLES = 20  # probes per health endpoint after a deploy goes live
+
+# Render deploy statuses grouped by monitor state
+IN_PROGRESS_STATUSES = ["created", "build_in_progress", "update_in_progress"]
+FAILED_STATUSES = ["build_failed", "update_failed", "canceled", "deactivated"]
+
+
+def unwrap_deploy(item: Dict) -> Dict:
+    """The deploys endpoint returns {"deploy": {...}, "cursor": ...} items"""
+    return item.get("deploy", item) if isinstance(item, dict) else item
+
+class ConditionalCache:
+    """Remembers ETag/Last-Modified validators and bodies for conditional GETs"""
+
+    def __init__(self):
+        self.entries = {}
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict] = None) -> str:
+        items = sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)
+        return url + ("?" + "&".join(f"{k}={v}" for k, v in items) if items else "")
+
+    def request_headers(self, key: str) -> Dict[str, str]:
+        entry = self.entries.get(key)
+        if not entry:
+            return {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, key: str, headers, data):
+        # requests and async_http both expose case-insensitive lookups via .get
+        etag = headers.get("ETag") or headers.get("etag")
+        last_modified = headers.get("Last-Modified") or headers.get("last-modified")
+        if etag or last_modified:
+            self.entries[key] = {"etag": etag, "last_modified": last_modified, "data": data}
+
+    def cached(self, key: str):
+        return self.entries[key]["data"]
+
+
+class RateLimited(Exception):
+    """Raised for 429/503 responses; carries the server's Retry-After delay"""
+
+    def __init__(self, status: int, retry_after: Optional[float]):
+        super().__init__(f"HTTP {status}, retry after {retry_after}s")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def estimate_build_duration(deployments: List[Dict]) -> Optional[float]:
+    """Median createdAt -> finishedAt seconds of recent successful deploys"""
+    durations = []
+    for deploy in map(unwrap_deploy, deployments):
+        created = parse_timestamp(deploy.get("createdAt"))
+        finished = parse_timestamp(deploy.get("finishedAt"))
+        if created and finished and deploy.get("status") in ("live", "deactivated"):
+            durations.append((finished - created).total_seconds())
+    if not durations:
+        return None
+    durations.sort()
+    return durations[len(durations) // 2]
+
+
+class AdaptivePollPolicy:
+    """Chooses the delay before the next poll of an in-progress deploy
+
+    Polls are spaced by a quarter of the distance from the expected finish
+    time (the median of recent build durations): sparse early in a long
+    build, every min_interval seconds around the expected finish, and
+    backing off again if the build runs long.
+    """
+
+    def __init__(self, min_interval: float = MIN_POLL_INTERVAL,
+                 max_interval: float = MAX_POLL_INTERVAL,
+                 default_interval: float = POLL_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.default_interval = default_interval
+        self.expected_duration = None
+
+    def next_interval(self, created_at: Optional[str], now: Optional[datetime] = None) -> float:
+        created = parse_timestamp(created_at)
+        if self.expected_duration is None or created is None:
+            return self.default_interval
+        now = now or datetime.now(timezone.utc)
+        remaining = self.expected_duration - (now - created).total_seconds()
+        return min(self.max_interval, max(self.min_interval, abs(remaining) / 4))
+
+    def error_backoff(self, failures: int, retry_after: Optional[float] = None) -> float:
+        """Honour Retry-After, otherwise exponential backoff with jitter"""
+        if retry_after is not None:
+            return retry_after
+        delay = min(self.max_interval, self.min_interval * (2 ** failures))
+        return delay * random.uniform(0.5, 1.0)
+
 
 class RenderAPIMonitor:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, service_id: str = SERVICE_ID,
+                 target_commit: str = TARGET_COMMIT, base_url: str = BASE_URL,
+                 events=NULL_EMITTER):
         self.api_key = api_key
+        self.events = events
+        self.service_id = service_id
+        self.target_commit = target_commit
+        self.base_url = base_url.rstrip("/")
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Accept": "application/json",
@@ -37,59 +203,123 @@ class RenderAPIMonitor:
         self.session = requests.Session()
         self.session.headers.update(self.headers)
 
+        self.cache = ConditionalCache()
+        self.poll_policy = AdaptivePollPolicy()
+        self.deploy_id = None  # set once the target deploy has been located
+        self.last_status = None
+        self.api_calls = 0
+        self.not_modified = 0
+
+    def _get_json(self, path: str, params: Optional[Dict] = None):
+        """GET with conditional headers; 304 responses reuse the cached body"""
+        url = f"{self.base_url}{path}"
+        key = self.cache.key(url, params)
+        self.api_calls += 1
+        started = time.perf_counter()
+        response = self.session.get(url, params=params, headers=self.cache.request_headers(key), timeout=30)
+        self.events.emit("api_request", path=path, params=params, status_code=response.status_code,
+                         duration_ms=round((time.perf_counter() - started) * 1000, 2))
+
+        if response.status_code == 304:
+            self.not_modified += 1
+            return self.cache.cached(key)
+        if response.status_code in (429, 503):
+            raise RateLimited(response.status_code, parse_retry_after(response.headers.get("Retry-After")))
+        response.raise_for_status()
+
+        data = response.json()
+        self.cache.store(key, response.headers, data)
+        return data
+
     def get_service_info(self) -> Optional[Dict]:
         """Get basic service information"""
         try:
-            url = f"{BASE_URL}/services/{SERVICE_ID}"
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._get_json(f"/services/{self.service_id}")
+        except (requests.exceptions.RequestException, RateLimited) as e:
             print(f"❌ Error getting service info: {e}")
             return None
 
-    def get_deployments(self) -> Optional[List[Dict]]:
-        """Get list of recent deployments"""
+    def get_deployments(self, limit: Optional[int] = None,
+                        cursor: Optional[str] = None) -> Optional[List[Dict]]:
+        """Get list of recent deployments (newest first)"""
         try:
-            url = f"{BASE_URL}/services/{SERVICE_ID}/deploys"
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._get_json(f"/services/{self.service_id}/deploys",
+                                  {"limit": limit, "cursor": cursor})
         except requests.exceptions.RequestException as e:
             print(f"❌ Error getting deployments: {e}")
             return None
 
+    def get_deployment(self, deploy_id: str) -> Optional[Dict]:
+        """Get a single deployment by ID"""
+        try:
+            return unwrap_deploy(self._get_json(f"/services/{self.service_id}/deploys/{deploy_id}"))
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error getting deployment {deploy_id}: {e}")
+            return None
+
     def find_target_deployment(self, deployments: List[Dict]) -> Optional[Dict]:
         """Find deployment matching our target commit"""
-        for deploy in deployments:
-            commit = deploy.get("commit", {})
+        for deploy in map(unwrap_deploy, deployments):
+            commit = deploy.get("commit") or {}
             sha = commit.get("sha", "")
 
-            if sha.startswith(TARGET_COMMIT):
+            if sha.startswith(self.target_commit):
                 return deploy
 
         return None
 
+    def locate_target_deployment(self) -> Dict:
+        """Page through the newest deploys (by cursor) until the target commit is found"""
+        cursor = None
+        for _ in range(DEPLOY_SEARCH_PAGES):
+            page = self.get_deployments(limit=DEPLOY_PAGE_SIZE, cursor=cursor)
+            if page is None:
+                return {"success": False, "error": "Failed to fetch deployments", "transient": True}
+            if cursor is None and self.poll_policy.expected_duration is None:
+                self.poll_policy.expected_duration = estimate_build_duration(page)
+
+            target_deploy = self.find_target_deployment(page)
+            if target_deploy:
+                return {"success": True, "deploy": target_deploy}
+            if len(page) < DEPLOY_PAGE_SIZE or not isinstance(page[-1], dict) or not page[-1].get("cursor"):
+                break
+            cursor = page[-1]["cursor"]
+
+        return {"success": False, "error": f"Deployment for commit {self.target_commit} not found"}
+
     def check_deployment_status(self) -> Dict:
         """Check current deployment status"""
-        print(f"🔍 Checking deployment status for commit {TARGET_COMMIT}...")
-
-        # Get deployments
-        deployments = self.get_deployments()
-        if not deployments:
-            return {"success": False, "error": "Failed to fetch deployments"}
+        print(f"🔍 Checking deployment status for commit {self.target_commit}...")
 
-        # Find our target deployment
-        target_deploy = self.find_target_deployment(deployments)
-        if not target_deploy:
-            return {"success": False, "error": f"Deployment for commit {TARGET_COMMIT} not found"}
+        # Once located, poll the single deploy instead of the deploy list
+        try:
+            if self.deploy_id:
+                target_deploy = self.get_deployment(self.deploy_id)
+                if not target_deploy:
+                    return {"success": False, "error": "Failed to fetch deployment", "transient": True}
+            else:
+                located = self.locate_target_deployment()
+                if not located["success"]:
+                    return located
+                target_deploy = located["deploy"]
+        except RateLimited as e:
+            return {"success": False, "error": str(e), "transient": True, "retry_after": e.retry_after}
 
         # Extract deployment info
         status = target_deploy.get("status", "unknown")
         created_at = target_deploy.get("createdAt", "")
         finished_at = target_deploy.get("finishedAt", "")
         deploy_id = target_deploy.get("id", "")
-        commit = target_deploy.get("commit", {})
+        commit = target_deploy.get("commit") or {}
+        self.deploy_id = deploy_id or None
+
+        self.events.emit("poll", service_id=self.service_id, commit=self.target_commit,
+                         deploy_id=deploy_id, status=status, created_at=created_at,
+                         finished_at=finished_at or None)
+        if status != self.last_status:
+            self.events.emit("state_transition", service_id=self.service_id, commit=self.target_commit,
+                             deploy_id=deploy_id, from_status=self.last_status, to_status=status)
+            self.last_status = status
 
         print(f"📋 Deployment Details:")
         print(f"   ID: {deploy_id}")
@@ -109,99 +339,406 @@ class RenderAPIMonitor:
         }
 
     def monitor_deployment(self) -> Dict:
-        """Monitor deployment until completion"""
-        print(f"🚀 Starting deployment monitor for commit {TARGET_COMMIT}")
-        print(f"⏱️  Polling every {POLL_INTERVAL}s (max {MAX_POLLS * POLL_INTERVAL // 60} minutes)")
-
-        for attempt in range(MAX_POLLS):
+        """Monitor deployment until completion, polling adaptively"""
+        print(f"🚀 Starting deployment monitor for commit {self.target_commit}")
+        print(f"⏱️  Adaptive polling every {self.poll_policy.min_interval}-{self.poll_policy.max_interval}s "
+              f"(max {MAX_WAIT_SECONDS // 60} minutes)")
+
+        started = time.monotonic()
+        deadline = started + MAX_WAIT_SECONDS
+        failures = 0
+        attempt = 0
+
+        def finish(outcome: Dict) -> Dict:
+            self.events.emit("monitor_result", service_id=self.service_id, commit=self.target_commit,
+                             result=outcome["result"], status=outcome.get("status"), attempts=attempt,
+                             api_calls=self.api_calls, not_modified=self.not_modified,
+                             elapsed_s=round(time.monotonic() - started, 1))
+            return outcome
+
+        while time.monotonic() < deadline:
+            attempt += 1
             result = self.check_deployment_status()
 
             if not result["success"]:
-                return result
+                if not result.get("transient"):
+                    return finish({**result, "result": "failed"})
+                delay = self.poll_policy.error_backoff(failures, result.get("retry_after"))
+                failures += 1
+                print(f"⚠️  {result['error']} - retrying in {delay:.0f}s (attempt {attempt})")
+                self.events.emit("poll_error", service_id=self.service_id, error=result["error"],
+                                 retry_in_s=round(delay, 2), attempt=attempt)
+                time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+                continue
+            failures = 0
 
             status = result["status"]
 
             # Check for terminal states
             if status == "live":
-                print(f"✅ DEPLOYMENT SUCCEEDED! (attempt {attempt + 1})")
-                return {"success": True, "status": status, "result": "success"}
-
-            elif status in ["build_failed", "update_failed", "canceled", "deactivated"]:
-                print(f"❌ DEPLOYMENT FAILED: {status} (attempt {attempt + 1})")
-                return {"success": False, "status": status, "result": "failed"}
+                print(f"✅ DEPLOYMENT SUCCEEDED! (attempt {attempt}, {self.api_calls} API calls)")
+                return finish({"success": True, "status": status, "result": "success"})
 
-            elif status in ["created", "build_in_progress", "update_in_progress"]:
-                print(f"⏳ Deployment in progress: {status} (attempt {attempt + 1}/{MAX_POLLS})")
-                if attempt < MAX_POLLS - 1:  # Don't sleep on last attempt
-                    time.sleep(POLL_INTERVAL)
-                continue
+            elif status in FAILED_STATUSES:
+                print(f"❌ DEPLOYMENT FAILED: {status} (attempt {attempt})")
+                return finish({"success": False, "status": status, "result": "failed"})
 
+            delay = self.poll_policy.next_interval(result["created_at"])
+            if status in IN_PROGRESS_STATUSES:
+                print(f"⏳ Deployment in progress: {status} (attempt {attempt}, next poll in {delay:.0f}s)")
             else:
-                print(f"❓ Unknown status: {status} (attempt {attempt + 1})")
-                if attempt < MAX_POLLS - 1:
-                    time.sleep(POLL_INTERVAL)
-                continue
+                print(f"❓ Unknown status: {status} (attempt {attempt})")
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
 
-        print(f"⏱️ TIMEOUT: Deployment monitoring exceeded {MAX_POLLS * POLL_INTERVAL // 60} minutes")
-        return {"success": None, "status": "timeout", "result": "timeout"}
+        print(f"⏱️ TIMEOUT: Deployment monitoring exceeded {MAX_WAIT_SECONDS // 60} minutes")
+        return finish({"success": None, "status": "timeout", "result": "timeout"})
 
-    def verify_application_health(self) -> Dict:
-        """Verify application health endpoints"""
-        print(f"\n🏥 Testing application health...")
+    def verify_application_health(self, app_url: str = APP_URL,
+                                  samples: int = HEALTH_SAMPLES) -> Dict:
+        """Verify application health endpoints with concurrent repeated probes"""
+        print(f"\n🏥 Testing application health ({samples} samples per endpoint)...")
 
-        base_app_url = "https://asr-po-system-enterprise.onrender.com"
-        health_endpoints = [
-            "/api/health",
-            "/api/health/database",
-            "/api/health/detailed",
-            "/api/auth/providers"
-        ]
+        results = HealthProber(app_url, HEALTH_ENDPOINTS, samples=samples).run()
+        for endpoint, result in results.items():
+            print(f"   {format_result(endpoint, result)}")
+            self.events.emit("health_result", app_url=app_url, endpoint=endpoint, **result)
 
-        results = {}
+        return results
 
-        for endpoint in health_endpoints:
-            url = f"{base_app_url}{endpoint}"
-            try:
-                print(f"   Testing {endpoint}...")
-                response = requests.get(url, timeout=30)
+class DeployTarget:
+    """State machine for one (service, commit) pair
+
+    waiting -> created -> build_in_progress -> update_in_progress -> live | failed
+    Stages may be skipped between polls, but a target never moves backwards.
+    """
+
+    STATE_RANK = {
+        "waiting": 0,
+        "created": 1,
+        "build_in_progress": 2,
+        "update_in_progress": 3,
+        "live": 4,
+        "failed": 4,
+        "timeout": 4,
+    }
+    TERMINAL_STATES = ("live", "failed", "timeout")
+
+    def __init__(self, service_id: str, commit: str):
+        self.service_id = service_id
+        self.commit = commit
+        self.state = "waiting"
+        self.status = None  # raw Render status
+        self.deploy_id = ""
+        self.service_name = service_id
+        self.polls = 0
+        self.started = time.monotonic()
+        self.history = [("waiting", datetime.now().isoformat())]
+
+    @property
+    def done(self) -> bool:
+        return self.state in self.TERMINAL_STATES
+
+    @property
+    def label(self) -> str:
+        return f"{self.service_id}@{self.commit}"
+
+    @staticmethod
+    def state_for_status(status: str) -> Optional[str]:
+        if status == "live":
+            return "live"
+        if status in FAILED_STATUSES:
+            return "failed"
+        if status in IN_PROGRESS_STATUSES:
+            return status
+        return None
 
-                results[endpoint] = {
-                    "status_code": response.status_code,
-                    "success": response.status_code == 200,
-                    "response_time_ms": round(response.elapsed.total_seconds() * 1000, 2)
-                }
+    def observe(self, deploy: Optional[Dict]) -> bool:
+        """Apply a polled deploy record; returns True when the state changed"""
+        self.polls += 1
+        if deploy is None or self.done:
+            return False
 
-                if response.status_code == 200:
-                    print(f"   ✅ {endpoint}: OK ({results[endpoint]['response_time_ms']}ms)")
-                else:
-                    print(f"   ❌ {endpoint}: {response.status_code}")
+        self.deploy_id = deploy.get("id", self.deploy_id)
+        self.status = deploy.get("status", "unknown")
+        new_state = self.state_for_status(self.status)
+        if new_state is None or self.STATE_RANK[new_state] <= self.STATE_RANK[self.state]:
+            return False
 
-            except requests.exceptions.RequestException as e:
-                results[endpoint] = {"error": str(e), "success": False}
-                print(f"   ❌ {endpoint}: {e}")
+        self.state = new_state
+        self.history.append((new_state, datetime.now().isoformat()))
+        return True
 
-        return results
+    def mark_timeout(self):
+        if not self.done:
+            self.state = "timeout"
+            self.history.append(("timeout", datetime.now().isoformat()))
 
-def main():
-    # Check for API key
-    api_key = os.environ.get("RENDER_API_KEY")
-    if not api_key:
-        print("❌ RENDER_API_KEY environment variable not set")
-        print("\n🔧 To fix this:")
-        print("1. Go to Render Dashboard → Account Settings → API Keys")
-        print("2. Create a new API key")
-        print("3. Run: export RENDER_API_KEY='your_api_key_here'")
-        print("4. Run this script again")
-        sys.exit(1)
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def to_dict(self) -> Dict:
+        return {
+            "service_id": self.service_id,
+            "commit": self.commit,
+            "state": self.state,
+            "status": self.status,
+            "deploy_id": self.deploy_id,
+            "polls": self.polls,
+            "elapsed_s": round(self.elapsed(), 1),
+            "history": self.history,
+        }
+
+
+class AsyncRenderAPI:
+    """Render REST API over a shared, pooled AsyncHTTPClient"""
+
+    def __init__(self, api_key: str, client: AsyncHTTPClient, base_url: str = BASE_URL):
+        self.client = client
+        self.base_url = base_url.rstrip("/")
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Accept": "application/json",
+        }
+        self.cache = ConditionalCache()
+        self.api_calls = 0
+        self.not_modified = 0
+
+    async def _get_json(self, path: str, params: Optional[Dict] = None):
+        url = f"{self.base_url}{path}"
+        key = self.cache.key(url, params)
+        headers = dict(self.headers, **self.cache.request_headers(key))
+        self.api_calls += 1
+        response = await self.client.get(url, headers=headers, params=params)
+
+        if response.status == 304:
+            self.not_modified += 1
+            return self.cache.cached(key)
+        if response.status in (429, 503):
+            raise RateLimited(response.status, parse_retry_after(response.headers.get("retry-after")))
+        if not response.ok:
+            raise HTTPError(f"GET {path} returned {response.status}")
+
+        data = response.json()
+        self.cache.store(key, response.headers, data)
+        return data
+
+    async def get_service_info(self, service_id: str) -> Dict:
+        return await self._get_json(f"/services/{service_id}")
+
+    async def get_deployments(self, service_id: str, limit: Optional[int] = None) -> List[Dict]:
+        deploys, _ = await self.get_deployment_page(service_id, limit)
+        return deploys
+
+    async def get_deployment_page(self, service_id: str, limit: Optional[int] = None,
+                                  cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """One page of deploys (newest first) and the cursor of the next page"""
+        items = await self._get_json(f"/services/{service_id}/deploys", {"limit": limit, "cursor": cursor})
+        items = items or []
+        last = items[-1] if items and isinstance(items[-1], dict) else {}
+        return [unwrap_deploy(item) for item in items], last.get("cursor")
+
+    async def get_deployment(self, service_id: str, deploy_id: str) -> Dict:
+        return unwrap_deploy(await self._get_json(f"/services/{service_id}/deploys/{deploy_id}"))
+
+
+class FleetMonitor:
+    """Watch many services and commits concurrently from one process
+
+    Targets that share a service are served by a single poll loop, so each
+    service costs one API request per interval regardless of how many
+    commits are being tracked on it.
+    """
+
+    def __init__(self, api_key: str, targets: List[DeployTarget],
+                 poll_interval: float = POLL_INTERVAL, max_polls: int = MAX_POLLS,
+                 base_url: str = BASE_URL, max_connections: int = 10,
+                 events=NULL_EMITTER):
+        self.api_key = api_key
+        self.events = events
+        self.targets = targets
+        self.poll_interval = poll_interval
+        self.max_polls = max_polls
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.live_table = sys.stdout.isatty()
+        self._table_lines = 0
+        self.api_calls = 0
+
+    def _targets_by_service(self) -> Dict[str, List[DeployTarget]]:
+        grouped = {}
+        for target in self.targets:
+            grouped.setdefault(target.service_id, []).append(target)
+        return grouped
+
+    async def _watch_service(self, api: AsyncRenderAPI, service_id: str,
+                             targets: List[DeployTarget]):
+        try:
+            info = await api.get_service_info(service_id)
+            for target in targets:
+                target.service_name = info.get("name", service_id)
+        except (HTTPError, RateLimited, OSError, asyncio.TimeoutError, ValueError):
+            pass  # name is cosmetic; deploy polling reports real failures
+
+        policy = AdaptivePollPolicy(default_interval=self.poll_interval)
+        deadline = time.monotonic() + self.max_polls * self.poll_interval
+        failures = 0
+
+        while time.monotonic() < deadline:
+            pending = [t for t in targets if not t.done]
+            if not pending:
+                return
+            try:
+                found, deployments = await self._poll_targets(api, service_id, pending)
+                failures = 0
+            except (RateLimited, HTTPError, OSError, asyncio.TimeoutError, ValueError) as e:
+                delay = policy.error_backoff(failures, getattr(e, "retry_after", None))
+                if not isinstance(e, RateLimited):
+                    print(f"⚠️  {service_id}: poll failed ({e})")
+                self.events.emit("poll_error", service_id=service_id, error=str(e) or type(e).__name__,
+                                 retry_in_s=round(delay, 2))
+                await asyncio.sleep(delay)
+                failures += 1
+                continue
 
-    monitor = RenderAPIMonitor(api_key)
+            if policy.expected_duration is None and deployments:
+                policy.expected_duration = estimate_build_duration(deployments)
+
+            changed = False
+            delays = []
+            for target, deploy in zip(pending, found):
+                previous = target.state
+                self.events.emit("poll", service_id=service_id, commit=target.commit,
+                                 deploy_id=deploy.get("id") if deploy else None,
+                                 status=deploy.get("status") if deploy else None)
+                if target.observe(deploy):
+                    changed = True
+                    self.events.emit("state_transition", service_id=service_id, commit=target.commit,
+                                     deploy_id=target.deploy_id, from_state=previous, to_state=target.state,
+                                     status=target.status, elapsed_s=round(target.elapsed(), 1))
+                delays.append(policy.next_interval(deploy.get("createdAt") if deploy else None))
+            if changed:
+                self.render_table()
+
+            # The service loop polls as often as its most urgent target needs
+            if any(not t.done for t in targets):
+                await asyncio.sleep(min(min(delays), max(0.0, deadline - time.monotonic())))
+
+        for target in targets:
+            if not target.done:
+                target.mark_timeout()
+                self.events.emit("state_transition", service_id=service_id, commit=target.commit,
+                                 deploy_id=target.deploy_id, to_state="timeout",
+                                 elapsed_s=round(target.elapsed(), 1))
+        self.render_table()
+
+    async def _poll_targets(self, api: AsyncRenderAPI, service_id: str,
+                            pending: List[DeployTarget]) -> Tuple[List[Optional[Dict]], Optional[List[Dict]]]:
+        """The deploy of each pending target, and the newest page of deploys if one was fetched
+
+        A target whose deploy is known is polled by id. The others are looked
+        up by paging (by cursor) through the newest deploys, so a burst of
+        deploys larger than one page does not hide them.
+        """
+        found: List[Optional[Dict]] = [None] * len(pending)
+        for i, target in enumerate(pending):
+            if target.deploy_id:
+                found[i] = await api.get_deployment(service_id, target.deploy_id)
+        missing = [i for i, target in enumerate(pending) if not target.deploy_id]
+        newest, cursor = None, None
+        for _ in range(DEPLOY_SEARCH_PAGES):
+            if not missing:
+                break
+            page, cursor = await api.get_deployment_page(service_id, DEPLOY_PAGE_SIZE, cursor)
+            if newest is None:
+                newest = page
+            for i in list(missing):
+                deploy = next((d for d in page
+                               if ((d.get("commit") or {}).get("sha") or "").startswith(pending[i].commit)), None)
+                if deploy:
+                    found[i] = deploy
+                    missing.remove(i)
+            if len(page) < DEPLOY_PAGE_SIZE or not cursor:
+                break
+        return found, newest
+
+    def render_table(self):
+        """Print the aggregated status table (redrawn in place on a terminal)"""
+        icons = {"waiting": "…", "created": "⏳", "build_in_progress": "🔨",
+                 "update_in_progress": "🚚", "live": "✅", "failed": "❌", "timeout": "⏱️"}
+        lines = [f"{'SERVICE':<32} {'COMMIT':<9} {'STATE':<22} {'DEPLOY':<24} {'ELAPSED':>8} {'POLLS':>5}"]
+        for t in self.targets:
+            state = f"{icons.get(t.state, '?')} {t.state}"
+            lines.append(f"{t.service_name[:32]:<32} {t.commit[:8]:<9} {state:<22} "
+                         f"{t.deploy_id[:24]:<24} {t.elapsed():>7.0f}s {t.polls:>5}")
+        counts = {}
+        for t in self.targets:
+            counts[t.state] = counts.get(t.state, 0) + 1
+        lines.append("  ".join(f"{state}: {n}" for state, n in sorted(counts.items())))
+
+        if self.live_table and self._table_lines:
+            sys.stdout.write(f"\033[{self._table_lines}F\033[J")
+        print("\n".join(lines), flush=True)
+        self._table_lines = len(lines)
+
+    async def run(self) -> Dict:
+        """Monitor every target until it is live, failed or timed out"""
+        async with AsyncHTTPClient(limit_per_host=self.max_connections) as client:
+            api = AsyncRenderAPI(self.api_key, client, self.base_url)
+            self.render_table()
+            await asyncio.gather(*(self._watch_service(api, service_id, targets)
+                                   for service_id, targets in self._targets_by_service().items()))
+            self.api_calls = api.api_calls
+        for target in self.targets:
+            self.events.emit("target_result", **target.to_dict())
+        return {t.label: t.to_dict() for t in self.targets}
+
+
+def load_targets(target_args: List[str], targets_file: Optional[str]) -> List[DeployTarget]:
+    """Build targets from SERVICE_ID:COMMIT arguments and/or a JSON file"""
+    pairs = []
+    for item in target_args:
+        service_id, _, commit = item.partition(":")
+        if not service_id or not commit:
+            raise ValueError(f"invalid target '{item}', expected SERVICE_ID:COMMIT")
+        pairs.append((service_id, commit))
+    if targets_file:
+        with open(targets_file, "r", encoding="utf-8") as f:
+            for entry in json.load(f):
+                pairs.append((entry["service_id"], entry["commit"]))
+    return [DeployTarget(service_id, commit) for service_id, commit in dict.fromkeys(pairs)]
+
+
+def run_fleet(api_key: str, targets: List[DeployTarget], base_url: str = BASE_URL,
+              events=NULL_EMITTER) -> Dict:
+    """Monitor a fleet of targets; fails if any target did not go live"""
+    print(f"🚀 Monitoring {len(targets)} deployment(s) across "
+          f"{len({t.service_id for t in targets})} service(s)")
+    fleet = FleetMonitor(api_key, targets, base_url=base_url, events=events)
+    results = asyncio.run(fleet.run())
+
+    print(f"\n📊 FLEET RESULTS ({fleet.api_calls} API calls):")
+    for label, result in results.items():
+        print(f"   {label}: {result['state']} ({result['status'] or 'not found'})")
+    states = [result["state"] for result in results.values()]
+    return {
+        "mode": "fleet",
+        "outcome": "live" if all(state == "live" for state in states) else "not_live",
+        "states": {state: states.count(state) for state in set(states)},
+        "api_calls": fleet.api_calls,
+        "exit_code": 0 if all(state == "live" for state in states) else 1,
+    }
+
+
+def run_single_target(monitor: RenderAPIMonitor, app_url: str, health_samples: int) -> Dict:
+    """Check one service/commit, monitor it if in progress, then verify health"""
+    outcome = {"mode": "single", "service_id": monitor.service_id, "commit": monitor.target_commit}
 
     # Test API connection first
     print("🔌 Testing Render API connection...")
     service_info = monitor.get_service_info()
     if not service_info:
         print("❌ Failed to connect to Render API. Check your API key.")
-        sys.exit(1)
+        return {**outcome, "outcome": "api_unreachable", "exit_code": 1}
 
     print(f"✅ Connected to Render API")
     print(f"📊 Service: {service_info.get('name', 'Unknown')}")
@@ -212,14 +749,16 @@ def main():
 
     if not status_result["success"]:
         print(f"❌ {status_result['error']}")
-        sys.exit(1)
+        return {**outcome, "outcome": "status_unavailable", "error": status_result["error"], "exit_code": 1}
 
     current_status = status_result["status"]
+    outcome["deploy_id"] = status_result["deploy_id"]
+    outcome["deploy_status"] = current_status
 
     # Decide on next action based on current status
     if current_status == "live":
         print(f"\n✅ Deployment is already LIVE! Proceeding to health verification...")
-        health_results = monitor.verify_application_health()
+        health_results = monitor.verify_application_health(app_url, health_samples)
 
         # Summary
         print(f"\n📊 FINAL RESULTS:")
@@ -232,34 +771,119 @@ def main():
             print(f"🎉 ASR PO System is fully operational!")
         else:
             print(f"⚠️  Some health checks failed. Review results above.")
+        return {**outcome, "outcome": "live", "healthy_endpoints": healthy_endpoints,
+                "total_endpoints": total_endpoints, "exit_code": 0}
 
-    elif current_status in ["created", "build_in_progress", "update_in_progress"]:
+    elif current_status in IN_PROGRESS_STATUSES:
         print(f"\n⏳ Deployment is in progress. Starting continuous monitoring...")
         monitor_result = monitor.monitor_deployment()
+        outcome["deploy_status"] = monitor_result.get("status")
 
         if monitor_result["result"] == "success":
             print(f"\n🎉 Deployment completed successfully! Testing application health...")
-            health_results = monitor.verify_application_health()
+            health_results = monitor.verify_application_health(app_url, health_samples)
             print(f"\n✅ Monitoring complete - ASR PO System is operational!")
+            healthy_endpoints = sum(1 for r in health_results.values() if r.get('success', False))
+            return {**outcome, "outcome": "live", "healthy_endpoints": healthy_endpoints,
+                    "total_endpoints": len(health_results), "exit_code": 0}
         elif monitor_result["result"] == "failed":
             print(f"\n❌ Deployment failed. Check Render dashboard for error details.")
-            sys.exit(1)
+            return {**outcome, "outcome": "failed", "exit_code": 1}
         else:
             print(f"\n⏱️ Monitoring timed out. Check Render dashboard manually.")
-            sys.exit(1)
+            return {**outcome, "outcome": "timeout", "exit_code": 1}
 
-    elif current_status in ["build_failed", "update_failed", "canceled", "deactivated"]:
+    elif current_status in FAILED_STATUSES:
         print(f"\n❌ Deployment has FAILED with status: {current_status}")
         print(f"🔧 Next steps:")
         print(f"1. Check Render dashboard deploy logs for error details")
         print(f"2. Look for new static generation errors")
         print(f"3. Fix any issues and push new commit")
-        sys.exit(1)
+        return {**outcome, "outcome": "failed", "exit_code": 1}
 
     else:
         print(f"\n❓ Unknown deployment status: {current_status}")
         print(f"🔧 Check Render dashboard manually for details")
+        return {**outcome, "outcome": "unknown_status", "exit_code": 1}
+
+
+def build_event_emitter(events_path: Optional[str], collector_url: Optional[str]):
+    """NDJSON to a file or stdout ('-') and/or a collector URL; no-op when unset"""
+    sinks = []
+    if events_path == "-":
+        sinks.append(StreamSink(sys.stdout))
+    elif events_path:
+        sinks.append(FileSink(events_path))
+    if collector_url:
+        sinks.append(CollectorSink(collector_url))
+    return EventEmitter(sinks) if sinks else NULL_EMITTER
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitor Render deployments for the ASR PO System")
+    parser.add_argument("--target", action="append", default=[], metavar="SERVICE_ID:COMMIT",
+                        help="Service and commit prefix to watch; repeat to monitor a fleet")
+    parser.add_argument("--targets-file",
+                        help="JSON list of {\"service_id\": ..., \"commit\": ...} targets")
+    parser.add_argument("--service-id", default=SERVICE_ID,
+                        help=f"Service for single-target monitoring (default: {SERVICE_ID})")
+    parser.add_argument("--commit", default=TARGET_COMMIT,
+                        help=f"Commit prefix for single-target monitoring (default: {TARGET_COMMIT})")
+    parser.add_argument("--base-url", default=os.environ.get("RENDER_API_BASE_URL", BASE_URL),
+                        help="Render API base URL, e.g. a local render_api_stub.py "
+                             "(default: $RENDER_API_BASE_URL or the public API)")
+    parser.add_argument("--app-url", default=APP_URL,
+                        help=f"Application URL for health verification (default: {APP_URL})")
+    parser.add_argument("--health-samples", type=int, default=HEALTH_SAMPLES,
+                        help=f"Probes per health endpoint (default: {HEALTH_SAMPLES})")
+    parser.add_argument("--events", metavar="PATH",
+                        help="Write NDJSON events to PATH, or '-' for stdout "
+                             "(human-readable output then goes to stderr)")
+    parser.add_argument("--events-collector", metavar="URL",
+                        help="POST batched NDJSON events to a local collector")
+    args = parser.parse_args()
+
+    # Check for API key
+    api_key = os.environ.get("RENDER_API_KEY")
+    if not api_key:
+        print("❌ RENDER_API_KEY environment variable not set")
+        print("\n🔧 To fix this:")
+        print("1. Go to Render Dashboard → Account Settings → API Keys")
+        print("2. Create a new API key")
+        print("3. Run: export RENDER_API_KEY='your_api_key_here'")
+        print("4. Run this script again")
         sys.exit(1)
 
+    targets = None
+    if args.target or args.targets_file:
+        try:
+            targets = load_targets(args.target, args.targets_file)
+        except (ValueError, KeyError, OSError) as e:
+            parser.error(str(e))
+    elif requests is None:
+        print("❌ The requests package is required: pip install requests")
+        sys.exit(1)
+
+    events = build_event_emitter(args.events, args.events_collector)
+    human_output = sys.stderr if args.events == "-" else sys.stdout
+    started = time.monotonic()
+    try:
+        with contextlib.redirect_stdout(human_output):
+            events.emit("run_started", mode="fleet" if targets else "single", base_url=args.base_url)
+            if targets:
+                outcome = run_fleet(api_key, targets, args.base_url, events)
+            else:
+                monitor = RenderAPIMonitor(api_key, args.service_id, args.commit, args.base_url, events)
+                outcome = run_single_target(monitor, args.app_url, args.health_samples)
+    except BaseException as e:  # Ctrl+C included: the sink still gets the final event and is flushed
+        events.emit("run_failed", elapsed_s=round(time.monotonic() - started, 1),
+                    error=f"{type(e).__name__}: {e}")
+        raise
+    else:
+        events.emit("run_complete", elapsed_s=round(time.monotonic() - started, 1), **outcome)
+    finally:
+        events.close()
+    sys.exit(outcome["exit_code"])
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,984 @@
+#!/usr/bin/env python3
+"""
+Synthetic PO dataset generator for scale testing
+
+Generates data shaped like database/schema.sql (divisions, users, division
+leaders, vendors, projects, GL accounts, work orders, PO headers, line
+items, approvals and work order sequences) at millions of rows, for
+exercising the dashboards, reports and exports at realistic volume.
+
+Everything is vectorised with NumPy and produced in chunks of work orders,
+so memory stays flat however many rows are generated: each chunk's work
+orders, POs, line items and approval history are built as column arrays,
+written out and dropped. Row ids are derived from (table, row number,
+seed) rather than stored, so foreign keys never need a lookup table.
+
+The data is skewed the way the real system is: volume grows over time and
+falls off at weekends, divisions and vendors follow power-law popularity
+(each division has its own favourite vendors), PO status depends on age
+(recent POs are still Draft/Submitted, old ones Paid), approval history
+is consistent with status, including rejections and the odd PO left in
+Submitted, and PO totals are computed exactly as the calculate_po_totals
+trigger would, so the trigger can stay disabled during bulk loads. PO
+numbers use the application's v2 format (01CP0012-1).
+
+Output goes to:
+    - a directory of PostgreSQL COPY text files plus load.sql
+    - a SQLite stand-in (created from schema.sql if needed)
+    - PostgreSQL directly via COPY FROM STDIN (needs psycopg)
+
+The same arguments and --seed always produce the same data; pass --end as
+well when the output must match across days.
+
+Usage:
+    python po_dataset.py --line-items 10000000 --out /data/po-copy
+    cd /data/po-copy && psql "$DATABASE_URL" -f load.sql
+
+    python po_dataset.py --line-items 200000 --sqlite standin.db --seed 7
+    python po_dataset.py --line-items 1000000 --postgres "$DATABASE_URL" --end 2026-06-30
+
+Requirements:
+    pip install numpy            (and psycopg for --postgres)
+"""
+
+import argparse
+import datetime
+import gzip
+import io
+import os
+import sqlite3
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from sql_schema import SCHEMA_PATH, connect_postgres, load_schema
+
+DAY = 86_400
+MEAN_LINES_PER_PO = 3.5
+MEAN_POS_PER_WORK_ORDER = 2.5
+MAX_LINES_PER_PO = 60
+MAX_POS_PER_WORK_ORDER = 15
+CHUNK_WORK_ORDERS = 4_000
+VOLUME_GROWTH = np.log(2.0)  # volume doubles over the generated history
+VENDOR_ZIPF = 1.1
+PROJECT_ZIPF = 0.8
+
+# (division_name, division_code, cost_center_prefix, share of work), as in web/prisma/seed.ts
+DIVISIONS = [
+    ("CAPEX", "O1", "CP", 0.28),
+    ("Repairs", "O2", "RP", 0.24),
+    ("Roofing", "O3", "RF", 0.18),
+    ("General Contracting", "O4", "GC", 0.14),
+    ("Subcontractor Management", "O5", "SM", 0.10),
+    ("Specialty Trades", "O6", "ST", 0.06),
+]
+
+# (gl_code_short, gl_account_number, gl_account_name, category, weight, unit, median unit price $)
+GL_ACCOUNTS = [
+    ("10", "5010", "Roofing Materials", "COGS", 14, "SQ", 95),
+    ("17", "6170", "Equipment Rental", "OpEx", 8, "DAY", 350),
+    ("20", "5020", "Wages Direct Labor", "COGS", 6, "HR", 55),
+    ("25", "6090", "Building Supplies", "OpEx", 30, "EA", 40),
+    ("30", "6750", "Subcontractors", "OpEx", 12, "LS", 4500),
+    ("35", "6935", "Small Tools", "OpEx", 9, "EA", 25),
+    ("40", "6100", "Safety Equipment", "OpEx", 6, "EA", 30),
+    ("50", "6290", "Rent", "OpEx", 1, "MO", 2500),
+    ("55", "6550", "Office Expense", "OpEx", 4, "EA", 40),
+    ("60", "6270", "Professional Fees", "OpEx", 2, "LS", 1500),
+    ("70", "6390", "Utilities", "OpEx", 2, "MO", 400),
+    ("75", "6110", "Insurance", "OpEx", 1, "MO", 2000),
+    ("80", "6530", "Advertising", "OpEx", 1, "LS", 800),
+    ("95", "5111", "Tax Charged", "COGS", 4, "EA", 20),
+]
+# Division-specific boosts on top of the GL weights (Roofing buys roofing materials, ...)
+GL_DIVISION_BOOST = {("O3", "10"): 8.0, ("O5", "30"): 5.0, ("O4", "20"): 3.0, ("O6", "17"): 3.0}
+
+ITEM_DESCRIPTIONS = {
+    "10": ["Architectural shingles", "Synthetic underlayment", "Ice and water shield", "Ridge cap shingles",
+           "Drip edge 10ft", "TPO membrane 60mil", "Roof coating 5gal", "Flashing coil aluminum"],
+    "17": ["Scissor lift rental", "Skid steer rental", "Boom lift 45ft rental", "Dumpster 20yd",
+           "Generator 7kW rental", "Scaffolding set rental"],
+    "20": ["Carpenter labor", "Laborer general", "Electrician journeyman", "Plumber journeyman",
+           "Overtime labor"],
+    "25": ["2x4x8 SPF stud", "Drywall 1/2in 4x8", "Joint compound 4.5gal", "Deck screws 5lb",
+           "Concrete mix 80lb", "PVC pipe 3/4in 10ft", "Paint interior 5gal", "Caulk silicone clear",
+           "Plywood 3/4in CDX", "Insulation R-19 batt"],
+    "30": ["Electrical subcontract", "Plumbing subcontract", "HVAC subcontract", "Concrete flatwork",
+           "Painting subcontract", "Demolition subcontract"],
+    "35": ["Cordless drill kit", "Utility knife blades", "Tape measure 25ft", "Circular saw blade",
+           "Level 48in", "Hammer framing"],
+    "40": ["Hard hats", "Safety glasses", "Hi-vis vests", "Fall protection harness", "Nitrile gloves"],
+    "50": ["Yard rent", "Storage container rent"],
+    "55": ["Printer paper", "Toner cartridge", "Job folders", "Postage"],
+    "60": ["Engineering review", "Permit expediting", "Legal review", "Survey services"],
+    "70": ["Temporary power", "Site water", "Portable toilets"],
+    "75": ["Builders risk premium", "General liability premium"],
+    "80": ["Yard signs", "Online listing"],
+    "95": ["Sales tax adjustment"],
+}
+
+FIRST_NAMES = ["James", "Maria", "Robert", "Linda", "Michael", "Patricia", "David", "Jennifer", "Carlos",
+               "Elizabeth", "Daniel", "Susan", "Jose", "Karen", "Thomas", "Nancy", "Kevin", "Lisa", "Brian",
+               "Angela", "Luis", "Michelle", "Mark", "Sandra", "Steven", "Laura", "Paul", "Rosa", "Andrew",
+               "Emily"]
+LAST_NAMES = ["Smith", "Garcia", "Johnson", "Martinez", "Brown", "Lopez", "Davis", "Hernandez", "Miller",
+              "Gonzalez", "Wilson", "Perez", "Anderson", "Sanchez", "Taylor", "Ramirez", "Moore", "Torres",
+              "Jackson", "Flores", "White", "Rivera", "Harris", "Gomez", "Clark", "Diaz", "Lewis", "Reyes"]
+VENDOR_WORDS = ["Pacific", "Golden State", "Summit", "Coastal", "Valley", "Sierra", "Mission", "Harbor",
+                "Redwood", "Canyon", "Premier", "Allied", "Western", "Sunrise", "Metro", "Keystone"]
+VENDOR_TRADES = ["Supply", "Roofing Supply", "Lumber", "Building Materials", "Equipment Rental",
+                 "Electric", "Plumbing", "Construction", "Tool Co", "Safety Products"]
+VENDOR_SUFFIXES = ["Inc", "LLC", "Co", "Corp", "Group"]
+VENDOR_TYPES = (["Material", "Labor", "Equipment", "Subcontractor", "Other"], [0.55, 0.10, 0.12, 0.18, 0.05])
+PAYMENT_TERMS = (["Net30", "Net15", "Net45", "Net60", "COD", "Due on Receipt"], [0.62, 0.12, 0.10, 0.06, 0.05, 0.05])
+CITIES = [("Los Angeles", "CA", "900"), ("San Diego", "CA", "921"), ("Riverside", "CA", "925"),
+          ("Anaheim", "CA", "928"), ("Long Beach", "CA", "908"), ("Irvine", "CA", "926"),
+          ("Ontario", "CA", "917"), ("Pasadena", "CA", "911"), ("Santa Ana", "CA", "927"),
+          ("Bakersfield", "CA", "933"), ("Phoenix", "AZ", "850"), ("Las Vegas", "NV", "891")]
+STREETS = ["Main St", "Oak Ave", "Mission Blvd", "Harbor Dr", "Sunset Blvd", "Palm Ave", "Ocean Ave",
+           "Foothill Blvd", "Central Ave", "Valley View Rd", "Grand Ave", "Lincoln Ave"]
+PROJECT_KINDS = ["Apartments", "Office Park", "Retail Center", "School", "Warehouse", "Medical Plaza",
+                 "Condominiums", "Community Center"]
+DISTRICTS = [("NE", "Northeast"), ("NW", "Northwest"), ("SE", "Southeast"), ("SW", "Southwest"),
+             ("CT", "Central"), ("IE", "Inland Empire"), ("OC", "Orange County")]
+TRADES = ["Roofing", "Framing", "Electrical", "Plumbing", "HVAC", "Drywall", "Painting", "Concrete",
+          "General", "Landscaping"]
+WORK_SCOPES = ["Repair", "Replacement", "Tenant Improvement", "Inspection Follow-up", "Emergency Response",
+               "Phase 1", "Phase 2", "Punch List", "Warranty Work", "Upgrade"]
+REJECTION_NOTES = ["Over budget - revise quantities", "Wrong vendor for this work order",
+                   "Missing quote attachment", "Split across work orders", "Use preferred supplier"]
+USER_AGENTS = ["Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/124.0 Safari/537.36",
+               "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148",
+               "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_4) AppleWebKit/605.1.15 Version/17.4 Safari/605.1.15"]
+
+PO_STATUSES = ["Draft", "Submitted", "Approved", "Issued", "Received", "Invoiced", "Paid", "Cancelled"]
+CANCELLED = 7
+# Status mix by PO age; rows are AGE_EDGES buckets (days), columns PO_STATUSES
+AGE_EDGES = np.array([2, 7, 21, 60, 180])
+STATUS_BY_AGE = np.array([
+    [0.35, 0.40, 0.15, 0.07, 0.00, 0.00, 0.00, 0.03],
+    [0.08, 0.22, 0.20, 0.35, 0.10, 0.00, 0.00, 0.05],
+    [0.03, 0.06, 0.06, 0.30, 0.30, 0.15, 0.05, 0.05],
+    [0.01, 0.02, 0.02, 0.10, 0.20, 0.30, 0.30, 0.05],
+    [0.005, 0.01, 0.005, 0.02, 0.05, 0.10, 0.75, 0.06],
+    [0.002, 0.003, 0.0, 0.005, 0.01, 0.02, 0.90, 0.06],
+])
+WORK_ORDER_STATUSES = ["Pending", "InProgress", "Completed", "OnHold", "Cancelled"]
+WORK_ORDER_AGE_EDGES = np.array([30, 180])
+WORK_ORDER_STATUS_BY_AGE = np.array([
+    [0.40, 0.55, 0.00, 0.05, 0.00],
+    [0.02, 0.40, 0.48, 0.05, 0.05],
+    [0.00, 0.02, 0.88, 0.04, 0.06],
+])
+
+ACTIONS = ["Created", "Submitted", "Approved", "Rejected", "Issued", "Received", "Invoiced", "Paid",
+           "Cancelled", "WO_Created"]
+A = {name: code for code, name in enumerate(ACTIONS)}
+PATH = np.array([A["Created"], A["Submitted"], A["Approved"], A["Issued"], A["Received"], A["Invoiced"], A["Paid"]])
+PATH_REJECTED = np.array([A["Created"], A["Submitted"], A["Rejected"], A["Submitted"], A["Approved"], A["Issued"],
+                          A["Received"], A["Invoiced"], A["Paid"]])
+STATUS_AFTER = np.array(["Draft", "Submitted", "Approved", "Draft", "Issued", "Received", "Invoiced", "Paid",
+                         "Cancelled", ""])
+# Median days from the previous step to this one, and log-normal spread
+DWELL_DAYS = np.array([0.0, 0.2, 1.0, 0.8, 0.3, 9.0, 6.0, 25.0, 3.0, 0.0])
+DWELL_SIGMA = np.array([0.0, 1.0, 1.3, 1.0, 0.8, 0.7, 0.7, 0.5, 1.0, 0.0])
+REJECTION_RATE = 0.06
+APPROVAL_LIMIT_CENTS = 2_500_000  # division_leaders.approval_limit default; above it the owner approves
+
+TABLE_TAGS = {"divisions": 1, "users": 2, "division_leaders": 3, "vendors": 4, "projects": 5,
+              "gl_account_mappings": 6, "work_orders": 7, "po_headers": 8, "po_line_items": 9,
+              "po_approvals": 10, "work_order_sequences": 11}
+LOAD_ORDER = list(TABLE_TAGS)
+
+CODE_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+MAX_VENDORS = len(CODE_ALPHABET) ** 2  # vendor_code is VARCHAR(2) UNIQUE
+HEX = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finaliser: a bijection on uint64"""
+    with np.errstate(over="ignore"):
+        z = x + _GOLDEN
+        z = (z ^ (z >> np.uint64(30))) * _M1
+        z = (z ^ (z >> np.uint64(27))) * _M2
+        return z ^ (z >> np.uint64(31))
+
+
+def _hex_digits(values: np.ndarray, digits: int) -> np.ndarray:
+    shifts = np.arange(4 * (digits - 1), -1, -4, dtype=np.uint64)
+    return HEX[((values[:, None] >> shifts) & np.uint64(0xF)).astype(np.intp)]
+
+
+def row_ids(seed: int, table: str, index: np.ndarray) -> np.ndarray:
+    """Deterministic, unique version-4 UUID strings for rows of a table
+
+    All 64 bits of the mixed (seed, table, row) key survive into the UUID
+    (the version and variant bits displace only random bits), so ids are
+    unique within and across tables.
+    """
+    key = (np.uint64(seed & 0xFFFF) << np.uint64(52)) | (np.uint64(TABLE_TAGS[table]) << np.uint64(44))
+    a = _mix64(index.astype(np.uint64) | key)
+    hi = ((a >> np.uint64(16)) << np.uint64(16)) | np.uint64(0x4000) | (a & np.uint64(0xFFF))
+    lo = (np.uint64(0x8) << np.uint64(60)) | (_mix64(a) & np.uint64(0x3FFFFFFFFFFFFFF0)) \
+        | ((a >> np.uint64(12)) & np.uint64(0xF))
+    out = np.empty((len(index), 36), dtype=np.uint8)
+    out[:, [8, 13, 18, 23]] = ord("-")
+    digits = np.concatenate([_hex_digits(hi, 16), _hex_digits(lo, 16)], axis=1)
+    out[:, np.r_[0:8, 9:13, 14:18, 19:23, 24:36]] = digits
+    return out.view("S36").ravel().astype("U36")
+
+
+def _choose(rng: np.random.Generator, weights, size: int) -> np.ndarray:
+    cdf = np.cumsum(np.asarray(weights, dtype=float))
+    return np.minimum(np.searchsorted(cdf / cdf[-1], rng.random(size), side="right"), len(cdf) - 1)
+
+
+def _choose_rows(rng: np.random.Generator, matrix: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Per-element categorical draw where each element uses its own row of probabilities"""
+    cdf = np.cumsum(matrix / matrix.sum(axis=1, keepdims=True), axis=1)
+    u = rng.random(len(rows))
+    return np.minimum((u[:, None] >= cdf[rows]).sum(axis=1), matrix.shape[1] - 1)
+
+
+def _zipf_weights(n: int, exponent: float) -> np.ndarray:
+    return 1.0 / np.arange(1, n + 1) ** exponent
+
+
+def _group_starts(counts: np.ndarray) -> np.ndarray:
+    return np.cumsum(counts) - counts
+
+
+def _group_arange(counts: np.ndarray) -> np.ndarray:
+    """0, 1, ... within each group of a flattened np.repeat"""
+    return np.arange(counts.sum()) - np.repeat(_group_starts(counts), counts)
+
+
+def _group_cumsum(values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    total = np.cumsum(values)
+    starts = _group_starts(counts)
+    return total - np.repeat(total[starts] - values[starts], counts)
+
+
+def _lognormal(rng: np.random.Generator, median, sigma, size: int) -> np.ndarray:
+    return np.exp(np.log(median) + sigma * rng.standard_normal(size))
+
+
+class Batch:
+    """Column arrays for a slice of one table
+
+    Column kinds: uuid/text (strings), freetext (strings escaped for COPY),
+    int, money (cents), qty (hundredths), rate (ten-thousandths),
+    ts (epoch seconds), date (epoch days), bool.
+    """
+
+    def __init__(self, table: str, size: int):
+        self.table = table
+        self.size = size
+        self.columns: List[Tuple[str, str, np.ndarray, Optional[np.ndarray]]] = []
+
+    def add(self, name: str, kind: str, values, nulls: Optional[np.ndarray] = None):
+        values = np.asarray(values)
+        if values.ndim == 0:
+            values = np.full(self.size, values)
+        if nulls is not None and not nulls.any():
+            nulls = None
+        self.columns.append((name, kind, values, nulls))
+
+    @property
+    def names(self) -> List[str]:
+        return [name for name, _, _, _ in self.columns]
+
+    def rows(self, dialect: str) -> Iterator[Tuple]:
+        return zip(*(format_column(kind, values, nulls, dialect) for _, kind, values, nulls in self.columns))
+
+    def copy_text(self) -> str:
+        if not self.size:
+            return ""
+        return "\n".join(map("\t".join, self.rows("copy"))) + "\n"
+
+
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _decimal_text(values: np.ndarray, places: int) -> np.ndarray:
+    scale = 10 ** places
+    magnitude = np.abs(values)
+    whole = np.char.add(np.where(values < 0, "-", ""), (magnitude // scale).astype(str))
+    frac = np.char.zfill((magnitude % scale).astype(str), places)
+    return np.char.add(np.char.add(whole, "."), frac)
+
+
+def format_column(kind: str, values: np.ndarray, nulls: Optional[np.ndarray], dialect: str) -> list:
+    """Column values as COPY text ("copy") or Python values for sqlite3 ("sqlite")
+
+    Text pools contain no tabs, newlines or backslashes, so only freetext is COPY-escaped.
+    """
+    if kind in ("uuid", "text"):
+        out = values.tolist()
+    elif kind == "freetext":
+        out = values.tolist()
+        if dialect == "copy":
+            out = [v.translate(COPY_ESCAPES) for v in out]
+    elif kind == "int":
+        out = values.astype(str).tolist() if dialect == "copy" else values.tolist()
+    elif kind == "money" or kind == "qty":
+        out = _decimal_text(values, 2).tolist()
+    elif kind == "rate":
+        out = _decimal_text(values, 4).tolist()
+    elif kind == "ts":
+        text = np.datetime_as_string(values.astype("datetime64[s]"), unit="s")
+        out = (np.char.add(text, "+00") if dialect == "copy" else np.char.replace(text, "T", " ")).tolist()
+    elif kind == "date":
+        out = np.datetime_as_string(values.astype("datetime64[D]"), unit="D").tolist()
+    elif kind == "bool":
+        out = np.where(values, "t", "f").tolist() if dialect == "copy" else values.astype(int).tolist()
+    else:
+        raise ValueError(f"unknown column kind {kind!r}")
+    if nulls is not None:
+        null = "\\N" if dialect == "copy" else None
+        for i in np.flatnonzero(nulls).tolist():
+            out[i] = null
+    return out
+
+
+class DatasetGenerator:
+    """Yields Batches for every table, dimension tables first, then work order chunks"""
+
+    def __init__(self, line_items: int, seed: int = 42, years: float = 3.0,
+                 end: Optional[datetime.date] = None, chunk_work_orders: int = CHUNK_WORK_ORDERS):
+        self.seed = seed
+        self.chunk_work_orders = chunk_work_orders
+        self.target_pos = max(1, round(line_items / MEAN_LINES_PER_PO))
+        self.n_work_orders = max(1, round(self.target_pos / MEAN_POS_PER_WORK_ORDER))
+        self.n_vendors = int(min(MAX_VENDORS, max(40, self.target_pos // 400)))
+        self.n_projects = int(max(20, self.target_pos // 300))
+        self.n_requesters = int(min(60, max(3, self.target_pos // 25_000)))  # per division
+        self.n_accounting = 3
+
+        end = end or datetime.date.today()
+        self.end_ts = int(datetime.datetime(end.year, end.month, end.day, tzinfo=datetime.timezone.utc).timestamp())
+        self.start_ts = self.end_ts - int(years * 365 * DAY)
+
+        days = (self.end_ts - self.start_ts) // DAY
+        day_index = np.arange(days)
+        weekday = (self.start_ts // DAY + day_index + 3) % 7  # 1970-01-01 was a Thursday; 0 = Monday
+        weights = np.exp(VOLUME_GROWTH * day_index / max(1, days)) * np.array([1, 1, 1, 1, 0.9, 0.15, 0.05])[weekday]
+        self._day_cdf = np.cumsum(weights) / weights.sum()
+
+        gl_weights = np.array([g[4] for g in GL_ACCOUNTS], dtype=float)
+        self.division_gl_weights = np.tile(gl_weights, (len(DIVISIONS), 1))
+        for (division_code, gl_code), boost in GL_DIVISION_BOOST.items():
+            d = [x[1] for x in DIVISIONS].index(division_code)
+            self.division_gl_weights[d, [g[0] for g in GL_ACCOUNTS].index(gl_code)] *= boost
+
+        descriptions, offsets, sizes = [], [], []
+        for gl in GL_ACCOUNTS:
+            offsets.append(len(descriptions))
+            sizes.append(len(ITEM_DESCRIPTIONS[gl[0]]))
+            descriptions.extend(ITEM_DESCRIPTIONS[gl[0]])
+        self.descriptions = np.array(descriptions)
+        self.description_offsets = np.array(offsets)
+        self.description_sizes = np.array(sizes)
+
+        self.wo_counter = np.zeros(len(DIVISIONS), dtype=np.int64)
+        self.wo_sequences: Dict[Tuple[int, int], int] = {}
+        self.po_offset = 0
+        self.line_offset = 0
+        self.approval_offset = 0
+        self.counts: Dict[str, int] = {table: 0 for table in LOAD_ORDER}
+
+    def rng(self, *stream: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, *stream])
+
+    def ids(self, table: str, index) -> np.ndarray:
+        return row_ids(self.seed, table, np.asarray(index, dtype=np.int64))
+
+    def time_at(self, rng: np.random.Generator, quantiles: np.ndarray) -> np.ndarray:
+        """Epoch seconds following the volume curve, during business hours"""
+        day = np.searchsorted(self._day_cdf, quantiles, side="right")
+        hours = np.clip(rng.normal(10.5, 2.5, len(quantiles)), 6.0, 19.0)
+        return self.start_ts + day * DAY + (hours * 3600).astype(np.int64)
+
+    def batches(self) -> Iterator[Batch]:
+        for batch in self._dimensions():
+            yield self._count(batch)
+        for chunk, start in enumerate(range(0, self.n_work_orders, self.chunk_work_orders)):
+            stop = min(self.n_work_orders, start + self.chunk_work_orders)
+            for batch in self._work_order_chunk(chunk, start, stop):
+                yield self._count(batch)
+        yield self._count(self._work_order_sequences())
+
+    def _count(self, batch: Batch) -> Batch:
+        self.counts[batch.table] += batch.size
+        return batch
+
+    # ------------------------------------------------------------------ dimensions
+
+    def _dimensions(self) -> Iterator[Batch]:
+        rng = self.rng(0)
+        n_div = len(DIVISIONS)
+        created = np.full(n_div, self.start_ts - 30 * DAY)
+
+        batch = Batch("divisions", n_div)
+        batch.add("id", "uuid", self.ids("divisions", np.arange(n_div)))
+        batch.add("division_name", "text", [d[0] for d in DIVISIONS])
+        batch.add("division_code", "text", [d[1] for d in DIVISIONS])
+        batch.add("qb_class_name", "text", [d[0] for d in DIVISIONS])
+        batch.add("cost_center_prefix", "text", [d[2] for d in DIVISIONS])
+        batch.add("is_active", "bool", True)
+        batch.add("created_at", "ts", created)
+        batch.add("updated_at", "ts", created)
+        yield batch
+
+        # users: 0 owner, 1..n_div division leaders, then accounting, then requesters by division
+        n_users = self.first_requester + n_div * self.n_requesters
+        index = np.arange(n_users)
+        role = np.full(n_users, "OPERATIONS_MANAGER", dtype="U20")
+        role[0] = "MAJORITY_OWNER"
+        role[1:1 + n_div] = "DIVISION_LEADER"
+        role[1 + n_div:self.first_requester] = "ACCOUNTING"
+        division = np.full(n_users, -1)
+        division[1:1 + n_div] = np.arange(n_div)
+        division[self.first_requester:] = np.repeat(np.arange(n_div), self.n_requesters)
+        first = np.array(FIRST_NAMES)[rng.integers(len(FIRST_NAMES), size=n_users)]
+        last = np.array(LAST_NAMES)[rng.integers(len(LAST_NAMES), size=n_users)]
+        email = np.char.add(np.char.add(np.char.lower(np.char.add(np.char.add(first, "."), last)), index.astype(str)),
+                            "@asr-example.com")
+        self.user_emails = email
+        self.user_names = np.char.add(np.char.add(first, " "), last)
+        user_created = self.start_ts - rng.integers(1, 400, n_users) * DAY
+        batch = Batch("users", n_users)
+        batch.add("id", "uuid", self.ids("users", index))
+        batch.add("email", "text", email)
+        batch.add("first_name", "text", first)
+        batch.add("last_name", "text", last)
+        batch.add("phone", "text", np.char.add("(555) 01", np.char.zfill((index % 100).astype(str), 2)))
+        batch.add("role", "text", role)
+        batch.add("division_id", "uuid", self.ids("divisions", np.maximum(division, 0)), nulls=division < 0)
+        batch.add("is_active", "bool", rng.random(n_users) > 0.04)
+        batch.add("last_login_at", "ts", self.end_ts - rng.integers(3600, 30 * DAY, n_users))
+        batch.add("created_at", "ts", user_created)
+        batch.add("updated_at", "ts", user_created)
+        yield batch
+
+        batch = Batch("division_leaders", n_div)
+        batch.add("id", "uuid", self.ids("division_leaders", np.arange(n_div)))
+        batch.add("user_id", "uuid", self.ids("users", 1 + np.arange(n_div)))
+        batch.add("name", "text", self.user_names[1:1 + n_div])
+        batch.add("email", "text", self.user_emails[1:1 + n_div])
+        batch.add("division_code", "text", [d[1] for d in DIVISIONS])
+        batch.add("division_id", "uuid", self.ids("divisions", np.arange(n_div)))
+        batch.add("qb_class_name", "text", [d[0] for d in DIVISIONS])
+        batch.add("approval_limit", "money", APPROVAL_LIMIT_CENTS)
+        batch.add("is_active", "bool", True)
+        batch.add("created_at", "ts", created)
+        batch.add("updated_at", "ts", created)
+        yield batch
+
+        n = self.n_vendors
+        index = np.arange(n)
+        names = np.char.add(np.char.add(np.char.add(np.char.add(
+            np.array(VENDOR_WORDS)[rng.integers(len(VENDOR_WORDS), size=n)], " "),
+            np.array(VENDOR_TRADES)[rng.integers(len(VENDOR_TRADES), size=n)]), " "),
+            np.array(VENDOR_SUFFIXES)[rng.integers(len(VENDOR_SUFFIXES), size=n)])
+        codes = np.char.add(np.array(list(CODE_ALPHABET))[index // len(CODE_ALPHABET)],
+                            np.array(list(CODE_ALPHABET))[index % len(CODE_ALPHABET)])
+        vendor_type = np.array(VENDOR_TYPES[0])[_choose(rng, VENDOR_TYPES[1], n)]
+        terms = np.array(PAYMENT_TERMS[0])[_choose(rng, PAYMENT_TERMS[1], n)]
+        city = rng.integers(len(CITIES), size=n)
+        self.vendor_emails = np.char.add(np.char.add("orders@vendor", index.astype(str)), ".example.com")
+        self.vendor_terms = terms
+        self.vendor_codes = codes
+        # every division has its own ranking of favourite vendors
+        self.vendor_rank = np.stack([rng.permutation(n) for _ in range(n_div)])
+        self.vendor_weights = _zipf_weights(n, VENDOR_ZIPF)
+        vendor_created = self.start_ts - rng.integers(1, 700, n) * DAY
+        batch = Batch("vendors", n)
+        batch.add("id", "uuid", self.ids("vendors", index))
+        batch.add("vendor_name", "text", names)
+        batch.add("vendor_code", "text", codes)
+        batch.add("vendor_type", "text", vendor_type)
+        batch.add("contact_name", "text", np.array(FIRST_NAMES)[rng.integers(len(FIRST_NAMES), size=n)])
+        batch.add("contact_phone", "text", np.char.add("(555) 02", np.char.zfill((index % 100).astype(str), 2)))
+        batch.add("contact_email", "text", self.vendor_emails)
+        batch.add("address_line_1", "text", np.char.add(np.char.add(
+            rng.integers(100, 9999, n).astype(str), " "), np.array(STREETS)[rng.integers(len(STREETS), size=n)]))
+        batch.add("city", "text", np.array([c[0] for c in CITIES])[city])
+        batch.add("state", "text", np.array([c[1] for c in CITIES])[city])
+        batch.add("zip", "text", np.char.add(np.array([c[2] for c in CITIES])[city],
+                                             np.char.zfill(rng.integers(0, 100, n).astype(str), 2)))
+        batch.add("payment_terms_default", "text", terms)
+        batch.add("is_active", "bool", rng.random(n) > 0.08)
+        batch.add("is_1099_required", "bool", np.isin(vendor_type, ["Labor", "Subcontractor"]))
+        batch.add("w9_on_file", "bool", rng.random(n) > 0.2)
+        batch.add("created_at", "ts", vendor_created)
+        batch.add("updated_at", "ts", vendor_created)
+        yield batch
+
+        n = self.n_projects
+        index = np.arange(n)
+        start = self.start_ts - 180 * DAY + np.sort(rng.integers(0, self.end_ts - self.start_ts + 180 * DAY, n))
+        duration = rng.integers(60, 720, n) * DAY
+        finished = start + duration < self.end_ts
+        status = np.where(finished, "Completed", "Active").astype("U10")
+        status[rng.random(n) < 0.04] = "OnHold"
+        status[rng.random(n) < 0.03] = "Cancelled"
+        district = rng.integers(len(DISTRICTS), size=n)
+        self.project_weights = _zipf_weights(n, PROJECT_ZIPF)
+        self.project_order = rng.permutation(n)
+        batch = Batch("projects", n)
+        batch.add("id", "uuid", self.ids("projects", index))
+        batch.add("project_code", "text", np.char.add("PRJ-", np.char.zfill((index + 1).astype(str), 6)))
+        batch.add("project_name", "text", np.char.add(np.char.add(
+            np.array(STREETS)[rng.integers(len(STREETS), size=n)], " "),
+            np.array(PROJECT_KINDS)[rng.integers(len(PROJECT_KINDS), size=n)]))
+        batch.add("property_address", "text", np.char.add(np.char.add(
+            rng.integers(100, 9999, n).astype(str), " "), np.array(STREETS)[rng.integers(len(STREETS), size=n)]))
+        batch.add("district_code", "text", np.array([d[0] for d in DISTRICTS])[district])
+        batch.add("district_name", "text", np.array([d[1] for d in DISTRICTS])[district])
+        batch.add("primary_division_id", "uuid",
+                  self.ids("divisions", _choose(rng, [d[3] for d in DIVISIONS], n)))
+        batch.add("status", "text", status)
+        batch.add("start_date", "date", start // DAY)
+        batch.add("end_date", "date", (start + duration) // DAY)
+        batch.add("budget_total", "money", (_lognormal(rng, 250_000, 1.0, n) * 100).astype(np.int64))
+        batch.add("created_at", "ts", start - 14 * DAY)
+        batch.add("updated_at", "ts", np.minimum(start + duration, self.end_ts))
+        yield batch
+
+        n = len(GL_ACCOUNTS)
+        batch = Batch("gl_account_mappings", n)
+        batch.add("id", "uuid", self.ids("gl_account_mappings", np.arange(n)))
+        batch.add("gl_code_short", "text", [g[0] for g in GL_ACCOUNTS])
+        batch.add("gl_account_number", "text", [g[1] for g in GL_ACCOUNTS])
+        batch.add("gl_account_name", "text", [g[2] for g in GL_ACCOUNTS])
+        batch.add("gl_account_category", "text", [g[3] for g in GL_ACCOUNTS])
+        batch.add("is_taxable_default", "bool", [g[0] != "95" for g in GL_ACCOUNTS])
+        batch.add("qb_sync_enabled", "bool", True)
+        batch.add("is_active", "bool", True)
+        batch.add("created_at", "ts", np.full(n, self.start_ts - 30 * DAY))
+        batch.add("updated_at", "ts", np.full(n, self.start_ts - 30 * DAY))
+        yield batch
+
+    @property
+    def first_requester(self) -> int:
+        return 1 + len(DIVISIONS) + self.n_accounting
+
+    # ------------------------------------------------------------------ work order chunks
+
+    def _work_order_chunk(self, chunk: int, start: int, stop: int) -> Iterator[Batch]:
+        rng = self.rng(TABLE_TAGS["work_orders"], chunk)
+        n = stop - start
+        wo_index = np.arange(start, stop)
+        # stratified quantiles keep creation times (and so WO numbers) rising with the index
+        wo_created = self.time_at(rng, (wo_index + rng.random(n)) / self.n_work_orders)
+        division = _choose(rng, [d[3] for d in DIVISIONS], n)
+        wo_number = np.empty(n, dtype=np.int64)
+        years = wo_created.astype("datetime64[s]").astype("datetime64[Y]").astype(int) + 1970
+        for d in range(len(DIVISIONS)):
+            mask = division == d
+            wo_number[mask] = self.wo_counter[d] + 1 + np.arange(mask.sum())
+            self.wo_counter[d] += mask.sum()
+            for year in np.unique(years[mask]).tolist():
+                self.wo_sequences[(d, year)] = int(wo_number[mask & (years == year)].max())
+        project = self.project_order[_choose(rng, self.project_weights, n)]
+        creator = self.first_requester + division * self.n_requesters + rng.integers(self.n_requesters, size=n)
+        age_days = (self.end_ts - wo_created) / DAY
+        wo_status = _choose_rows(rng, WORK_ORDER_STATUS_BY_AGE, np.searchsorted(WORK_ORDER_AGE_EDGES, age_days))
+        planned_start = wo_created // DAY + rng.integers(0, 14, n)
+        planned_end = planned_start + rng.integers(5, 60, n)
+        started = wo_status >= 1
+        completed = wo_status == 2
+        trade = rng.integers(len(TRADES), size=n)
+
+        batch = Batch("work_orders", n)
+        batch.add("id", "uuid", self.ids("work_orders", wo_index))
+        batch.add("work_order_number", "text", np.char.add("WO-", np.char.zfill(wo_number.astype(str), 4)))
+        batch.add("division_id", "uuid", self.ids("divisions", division))
+        batch.add("project_id", "uuid", self.ids("projects", project))
+        batch.add("title", "text", np.char.add(np.char.add(np.array(TRADES)[trade], " - "),
+                                               np.array(WORK_SCOPES)[rng.integers(len(WORK_SCOPES), size=n)]))
+        batch.add("primary_trade", "text", np.array(TRADES)[trade])
+        batch.add("status", "text", np.array(WORK_ORDER_STATUSES)[wo_status])
+        batch.add("budget_estimate", "money", (_lognormal(rng, 8_000, 1.1, n) * 100).astype(np.int64))
+        batch.add("start_date_planned", "date", planned_start)
+        batch.add("start_date_actual", "date", planned_start + rng.integers(-2, 5, n), nulls=~started)
+        batch.add("end_date_planned", "date", planned_end)
+        batch.add("end_date_actual", "date",
+                  np.minimum(planned_end + rng.integers(-5, 15, n), self.end_ts // DAY), nulls=~completed)
+        batch.add("created_by_user_id", "uuid", self.ids("users", creator))
+        batch.add("created_at", "ts", wo_created)
+        batch.add("updated_at", "ts", wo_created)
+        yield batch
+
+        # ---- POs: 1..k per work order, numbered within it
+        per_wo = np.minimum(rng.geometric(1 / MEAN_POS_PER_WORK_ORDER, n), MAX_POS_PER_WORK_ORDER)
+        po_wo = np.repeat(np.arange(n), per_wo)
+        seq = _group_arange(per_wo) + 1
+        gaps = _lognormal(rng, 2.0, 1.2, len(po_wo)) * DAY
+        po_created = wo_created[po_wo] + _group_cumsum(gaps, per_wo).astype(np.int64)
+        keep = po_created < self.end_ts - 3600
+        po_wo, seq, po_created = po_wo[keep], seq[keep], po_created[keep]
+        m = len(po_wo)
+        po_index = self.po_offset + np.arange(m)
+        self.po_offset += m
+        if not m:
+            yield self._wo_created_approvals(rng, wo_index, division, creator, wo_created)
+            return
+
+        po_division = division[po_wo]
+        vendor = self.vendor_rank[po_division, _choose(rng, self.vendor_weights, m)]
+        requester = np.where(rng.random(m) < 0.8, creator[po_wo],
+                             self.first_requester + po_division * self.n_requesters
+                             + rng.integers(self.n_requesters, size=m))
+        age_days = (self.end_ts - po_created) / DAY
+        status = _choose_rows(rng, STATUS_BY_AGE, np.searchsorted(AGE_EDGES, age_days))
+        tax_rate = np.where(rng.random(m) < 0.85, 775, 800)  # ten-thousandths
+
+        # ---- line items and trigger-exact totals
+        per_po = np.minimum(rng.geometric(1 / MEAN_LINES_PER_PO, m), MAX_LINES_PER_PO)
+        line_po = np.repeat(np.arange(m), per_po)
+        k = len(line_po)
+        line_starts = _group_starts(per_po)
+        gl = _choose_rows(rng, self.division_gl_weights, po_division[line_po])
+        units = np.array([g[5] for g in GL_ACCOUNTS])[gl]
+        whole_units = np.isin(units, ["EA", "MO", "LS"])
+        quantity = np.where(whole_units, np.minimum(rng.geometric(0.25, k), 500) * 100,
+                            np.maximum(1, (_lognormal(rng, 8.0, 0.9, k) * 100).astype(np.int64)))
+        quantity = np.where(units == "LS", 100, quantity)
+        median_price = np.array([g[6] for g in GL_ACCOUNTS], dtype=float)[gl]
+        unit_price = np.clip((_lognormal(rng, median_price, 0.8, k) * 100).astype(np.int64), 1, 5_000_000)
+        line_subtotal = (quantity * unit_price + 50) // 100
+        taxable = np.array([g[0] != "95" for g in GL_ACCOUNTS])[gl]
+        subtotal = np.add.reduceat(line_subtotal, line_starts)
+        tax = (np.add.reduceat(line_subtotal * taxable, line_starts) * tax_rate + 5000) // 10000
+        total = subtotal + tax
+
+        # ---- approval history consistent with status
+        rank = np.minimum(status, 6)
+        cancelled = status == CANCELLED
+        rank = np.where(cancelled, _choose(rng, [0.40, 0.45, 0.15], m), rank)
+        rejected = (rank >= 1) & (rng.random(m) < REJECTION_RATE)
+        steps = rank + 1 + 2 * rejected + cancelled
+        step_po = np.repeat(np.arange(m), steps)
+        step = _group_arange(steps)
+        action = np.where(rejected[step_po], PATH_REJECTED[np.minimum(step, len(PATH_REJECTED) - 1)],
+                          PATH[np.minimum(step, len(PATH) - 1)])
+        last_step = _group_starts(steps) + steps - 1
+        action[last_step[cancelled]] = A["Cancelled"]
+        dwell = _lognormal(rng, np.maximum(DWELL_DAYS[action], 1e-3), DWELL_SIGMA[action], len(action)) * DAY
+        dwell[step == 0] = 0
+        elapsed = _group_cumsum(dwell, steps)
+        # squeeze histories that would run past the end of the dataset
+        room = (self.end_ts - 60 - po_created).astype(float)
+        scale = np.minimum(1.0, room / np.maximum(elapsed[last_step], 1.0))
+        stamp = po_created[step_po] + (elapsed * scale[step_po]).astype(np.int64)
+
+        leader_user = 1 + po_division
+        approver = np.where(total > APPROVAL_LIMIT_CENTS, 0, leader_user)
+        accounting = 1 + len(DIVISIONS) + rng.integers(self.n_accounting, size=len(action))
+        actor = requester[step_po]
+        is_approval = np.isin(action, [A["Approved"], A["Rejected"]])
+        actor = np.where(is_approval, approver[step_po], actor)
+        actor = np.where(np.isin(action, [A["Invoiced"], A["Paid"]]), accounting, actor)
+        actor_division = np.where(actor >= 1, np.where(actor <= len(DIVISIONS), actor - 1, po_division[step_po]), -1)
+        actor_division = np.where((actor > len(DIVISIONS)) & (actor < self.first_requester), -1, actor_division)
+        status_after = STATUS_AFTER[action]
+        status_before = np.empty_like(status_after)
+        status_before[1:] = status_after[:-1]
+        first_step = step == 0
+
+        def stamp_of(code: int) -> Tuple[np.ndarray, np.ndarray]:
+            out = np.zeros(m, dtype=np.int64)
+            hit = action == code
+            out[step_po[hit]] = stamp[hit]
+            missing = np.ones(m, dtype=bool)
+            missing[step_po[hit]] = False
+            return out, missing
+
+        approved_at, not_approved = stamp_of(A["Approved"])
+        issued_at, not_issued = stamp_of(A["Issued"])
+        received_at, not_received = stamp_of(A["Received"])
+        updated_at = stamp[last_step]
+        deleted = (np.isin(status, [0, CANCELLED])) & (rng.random(m) < 0.05)
+
+        prefix = np.array([f"{int(d[1][1:]):02d}{d[2]}" for d in DIVISIONS])
+        po_number = np.char.add(np.char.add(np.char.add(prefix[po_division],
+                                                        np.char.zfill(wo_number[po_wo].astype(str), 4)), "-"),
+                                seq.astype(str))
+
+        batch = Batch("po_headers", m)
+        batch.add("id", "uuid", self.ids("po_headers", po_index))
+        batch.add("po_number", "text", po_number)
+        batch.add("po_number_sequence", "int", seq)
+        batch.add("division_leader_id", "uuid", self.ids("division_leaders", po_division))
+        batch.add("division_id", "uuid", self.ids("divisions", po_division))
+        batch.add("project_id", "uuid", self.ids("projects", project[po_wo]))
+        batch.add("work_order_id", "uuid", self.ids("work_orders", wo_index[po_wo]))
+        batch.add("vendor_id", "uuid", self.ids("vendors", vendor))
+        batch.add("po_leader_code", "text", np.array([f"{int(d[1][1:]):02d}" for d in DIVISIONS])[po_division])
+        batch.add("po_gl_code", "text", np.array([g[0] for g in GL_ACCOUNTS])[gl[line_starts]])
+        batch.add("po_work_order_num", "int", wo_number[po_wo])
+        batch.add("po_vendor_code", "text", self.vendor_codes[vendor])
+        batch.add("cost_center_code", "text", np.char.add(np.array([d[2] for d in DIVISIONS])[po_division],
+                                                          np.char.zfill(wo_number[po_wo].astype(str), 4)))
+        batch.add("terms_code", "text", self.vendor_terms[vendor])
+        batch.add("tax_rate", "rate", tax_rate)
+        batch.add("subtotal_amount", "money", subtotal)
+        batch.add("tax_amount", "money", tax)
+        batch.add("total_amount", "money", total)
+        batch.add("status", "text", np.array(PO_STATUSES)[status])
+        batch.add("required_by_date", "date", po_created // DAY + rng.integers(3, 30, m))
+        batch.add("requested_by_user_id", "uuid", self.ids("users", requester))
+        batch.add("approved_by_user_id", "uuid", self.ids("users", approver), nulls=not_approved)
+        batch.add("approved_at", "ts", approved_at, nulls=not_approved)
+        batch.add("issued_at", "ts", issued_at, nulls=not_issued)
+        batch.add("issued_to_vendor_email", "text", self.vendor_emails[vendor], nulls=not_issued)
+        batch.add("created_at", "ts", po_created)
+        batch.add("updated_at", "ts", updated_at)
+        batch.add("deleted_at", "ts", np.minimum(updated_at + DAY, self.end_ts - 1), nulls=~deleted)
+        yield batch
+
+        line_status = np.select([cancelled, status >= 4, (status == 3) & (rng.random(m) < 0.3)],
+                                [3, 2, 1], 0)[line_po]
+        quantity_received = np.select([line_status == 2, line_status == 1], [quantity, quantity // 200 * 100], 0)
+        line_received = received_at[line_po]
+        batch = Batch("po_line_items", k)
+        batch.add("id", "uuid", self.ids("po_line_items", self.line_offset + np.arange(k)))
+        batch.add("po_id", "uuid", self.ids("po_headers", po_index[line_po]))
+        batch.add("line_number", "int", _group_arange(per_po) + 1)
+        batch.add("item_description", "text",
+                  self.descriptions[self.description_offsets[gl] + rng.integers(0, 1 << 30, k) % self.description_sizes[gl]])
+        batch.add("quantity", "qty", quantity)
+        batch.add("unit_of_measure", "text", units)
+        batch.add("unit_price", "money", unit_price)
+        batch.add("line_subtotal", "money", line_subtotal)
+        batch.add("gl_account_code", "text", np.array([g[0] for g in GL_ACCOUNTS])[gl])
+        batch.add("gl_account_number", "text", np.array([g[1] for g in GL_ACCOUNTS])[gl])
+        batch.add("gl_account_name", "text", np.array([g[2] for g in GL_ACCOUNTS])[gl])
+        batch.add("is_taxable", "bool", taxable)
+        batch.add("status", "text", np.array(["Pending", "PartialReceived", "Received", "Cancelled"])[line_status])
+        batch.add("quantity_received", "qty", quantity_received)
+        batch.add("received_at", "ts", line_received, nulls=(line_status != 2) | not_received[line_po])
+        batch.add("created_at", "ts", po_created[line_po])
+        batch.add("updated_at", "ts", np.where(line_status == 2, line_received, po_created[line_po]))
+        self.line_offset += k
+        yield batch
+
+        n_steps = len(action)
+        notes = np.where(action == A["Rejected"],
+                         np.array(REJECTION_NOTES)[rng.integers(len(REJECTION_NOTES), size=n_steps)], "")
+        batch = Batch("po_approvals", n_steps)
+        batch.add("id", "uuid", self.ids("po_approvals", self.approval_offset + np.arange(n_steps)))
+        batch.add("po_id", "uuid", self.ids("po_headers", po_index[step_po]))
+        batch.add("action", "text", np.array(ACTIONS)[action])
+        batch.add("actor_user_id", "uuid", self.ids("users", actor))
+        batch.add("actor_division_id", "uuid", self.ids("divisions", np.maximum(actor_division, 0)),
+                  nulls=actor_division < 0)
+        batch.add("status_before", "text", status_before, nulls=first_step)
+        batch.add("status_after", "text", status_after)
+        batch.add("notes", "text", notes, nulls=notes == "")
+        batch.add("ip_address", "text", np.char.add("10.20.", np.char.add(
+            (actor % 250).astype(str), np.char.add(".", (actor // 250 % 250 + 1).astype(str)))))
+        batch.add("user_agent", "text", np.array(USER_AGENTS)[actor % len(USER_AGENTS)])
+        batch.add("timestamp", "ts", stamp)
+        self.approval_offset += n_steps
+        yield batch
+
+        yield self._wo_created_approvals(rng, wo_index, division, creator, wo_created)
+
+    def _wo_created_approvals(self, rng, wo_index, division, creator, wo_created) -> Batch:
+        n = len(wo_index)
+        batch = Batch("po_approvals", n)
+        batch.add("id", "uuid", self.ids("po_approvals", self.approval_offset + np.arange(n)))
+        batch.add("po_id", "uuid", np.full(n, ""), nulls=np.ones(n, dtype=bool))
+        batch.add("work_order_id", "uuid", self.ids("work_orders", wo_index))
+        batch.add("action", "text", "WO_Created")
+        batch.add("actor_user_id", "uuid", self.ids("users", creator))
+        batch.add("actor_division_id", "uuid", self.ids("divisions", division))
+        batch.add("timestamp", "ts", wo_created)
+        self.approval_offset += n
+        return batch
+
+    def _work_order_sequences(self) -> Batch:
+        keys = sorted(self.wo_sequences)
+        batch = Batch("work_order_sequences", len(keys))
+        batch.add("id", "uuid", self.ids("work_order_sequences", np.arange(len(keys))))
+        batch.add("division_id", "uuid", self.ids("divisions", [d for d, _ in keys]))
+        batch.add("year", "int", np.array([y for _, y in keys], dtype=np.int64))
+        batch.add("last_sequence", "int", np.array([self.wo_sequences[k] for k in keys], dtype=np.int64))
+        batch.add("updated_at", "ts", np.full(len(keys), self.end_ts))
+        return batch
+
+
+class CopyDirectorySink:
+    """One COPY text file per table plus a load.sql that loads them in foreign-key order"""
+
+    def __init__(self, path: str, compress: bool = False):
+        self.path = path
+        self.compress = compress
+        self.files: Dict[str, io.TextIOBase] = {}
+        self.columns: Dict[str, List[str]] = {}
+        os.makedirs(path, exist_ok=True)
+
+    def filename(self, table: str) -> str:
+        return f"{table}.copy.gz" if self.compress else f"{table}.copy"
+
+    def write(self, batch: Batch):
+        if not batch.size:
+            return
+        names = batch.names
+        if batch.table not in self.files:
+            target = os.path.join(self.path, self.filename(batch.table))
+            self.files[batch.table] = (gzip.open(target, "wt", compresslevel=1, encoding="utf-8", newline="")
+                                       if self.compress else open(target, "w", encoding="utf-8", newline=""))
+            self.columns[batch.table] = names
+        if names != self.columns[batch.table]:
+            # rows with a different column set (WO_Created approvals) go to their own file
+            key = f"{batch.table}:{','.join(names)}"
+            if key not in self.files:
+                suffix = len([k for k in self.files if k.startswith(batch.table)])
+                target = os.path.join(self.path, self.filename(f"{batch.table}_{suffix}"))
+                self.files[key] = (gzip.open(target, "wt", compresslevel=1, encoding="utf-8", newline="")
+                                   if self.compress else open(target, "w", encoding="utf-8", newline=""))
+                self.columns[key] = names
+            self.files[key].write(batch.copy_text())
+            return
+        self.files[batch.table].write(batch.copy_text())
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        lines = ["-- Generated by po_dataset.py. Run from this directory:",
+                 "--     psql \"$DATABASE_URL\" -f load.sql",
+                 "\\set ON_ERROR_STOP on",
+                 "BEGIN;",
+                 "-- totals are precomputed; skip the per-row calculate_po_totals trigger",
+                 "ALTER TABLE po_line_items DISABLE TRIGGER USER;"]
+        keys = sorted(self.files, key=lambda k: (LOAD_ORDER.index(k.split(":")[0]), k))
+        for key in keys:
+            table = key.split(":")[0]
+            f = self.files[key]
+            filename = os.path.basename(f.name if isinstance(f.name, str) else f.filename)
+            source = f"PROGRAM 'gzip -dc {filename}'" if self.compress else f"'{filename}'"
+            lines.append(f"\\copy {table} ({', '.join(self.columns[key])}) FROM {source}")
+        lines += ["ALTER TABLE po_line_items ENABLE TRIGGER USER;", "COMMIT;", "ANALYZE;", ""]
+        with open(os.path.join(self.path, "load.sql"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+
+class SQLiteSink:
+    """Bulk inserts into a SQLite stand-in, creating it from schema.sql if needed"""
+
+    def __init__(self, path: str, schema_path: str = SCHEMA_PATH):
+        self.db = sqlite3.connect(path)
+        if not self.db.execute("SELECT 1 FROM sqlite_master WHERE name = 'po_headers'").fetchone():
+            self.db.close()
+            self.db = load_schema(schema_path).create_sqlite(path)
+        self.db.execute("PRAGMA foreign_keys = OFF")
+        self.db.execute("PRAGMA journal_mode = OFF")
+        self.db.execute("PRAGMA synchronous = OFF")
+
+    def write(self, batch: Batch):
+        if not batch.size:
+            return
+        sql = (f"INSERT INTO {batch.table} ({', '.join(batch.names)}) "
+               f"VALUES ({', '.join('?' * len(batch.columns))})")
+        with self.db:
+            self.db.executemany(sql, batch.rows("sqlite"))
+
+    def close(self):
+        self.db.execute("ANALYZE")
+        self.db.commit()
+        self.db.close()
+
+
+class PostgresSink:
+    """COPY FROM STDIN into PostgreSQL in one transaction, with the totals trigger disabled"""
+
+    def __init__(self, url: str):
+        self.conn = connect_postgres(url)
+        self.cur = self.conn.cursor()
+        self.cur.execute("ALTER TABLE po_line_items DISABLE TRIGGER USER")
+
+    def write(self, batch: Batch):
+        if not batch.size:
+            return
+        sql = f"COPY {batch.table} ({', '.join(batch.names)}) FROM STDIN"
+        text = batch.copy_text()
+        if hasattr(self.cur, "copy"):
+            with self.cur.copy(sql) as copy:
+                copy.write(text)
+        else:
+            self.cur.copy_expert(sql, io.StringIO(text))
+
+    def close(self):
+        self.cur.execute("ALTER TABLE po_line_items ENABLE TRIGGER USER")
+        self.conn.commit()
+        self.cur.execute("ANALYZE")
+        self.conn.commit()
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic ASR PO dataset at scale")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", metavar="DIR", help="Write COPY files and load.sql to DIR")
+    target.add_argument("--sqlite", metavar="PATH", help="Load into a SQLite stand-in")
+    target.add_argument("--postgres", metavar="URL", help="COPY straight into PostgreSQL")
+    parser.add_argument("--line-items", type=int, default=1_000_000,
+                        help="Approximate number of PO line items (default: 1,000,000)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--years", type=float, default=3.0, help="Years of history (default: 3)")
+    parser.add_argument("--end", type=datetime.date.fromisoformat, help="Last day of history (default: today)")
+    parser.add_argument("--gzip", action="store_true", help="Compress COPY files (with --out)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_WORK_ORDERS,
+                        help=f"Work orders per chunk (default: {CHUNK_WORK_ORDERS:,}); changes the data")
+    args = parser.parse_args()
+
+    generator = DatasetGenerator(args.line_items, seed=args.seed, years=args.years, end=args.end,
+                                 chunk_work_orders=args.chunk)
+    if args.out:
+        sink = CopyDirectorySink(args.out, compress=args.gzip)
+        destination = args.out
+    elif args.sqlite:
+        sink = SQLiteSink(args.sqlite)
+        destination = args.sqlite
+    else:
+        try:
+            sink = PostgresSink(args.postgres)
+        except ImportError as e:
+            raise SystemExit(f"❌ {e}")
+        destination = "PostgreSQL"
+
+    print(f"🏗️  Generating ~{args.line_items:,} line items ({generator.n_work_orders:,} work orders, "
+          f"{generator.n_vendors:,} vendors, {generator.n_projects:,} projects) into {destination}")
+    started = last_report = time.monotonic()
+    try:
+        for batch in generator.batches():
+            sink.write(batch)
+            now = time.monotonic()
+            if now - last_report >= 5:
+                lines = generator.counts["po_line_items"]
+                print(f"   ⏳ {lines:,} line items, {generator.counts['po_headers']:,} POs "
+                      f"({lines / (now - started):,.0f} line items/s)")
+                last_report = now
+    finally:
+        sink.close()
+
+    elapsed = time.monotonic() - started
+    total = sum(generator.counts.values())
+    print(f"✅ {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    for table in LOAD_ORDER:
+        print(f"   {table:<22} {generator.counts[table]:>12,}")
+    if args.out:
+        print(f"📦 Load with: cd {args.out} && psql \"$DATABASE_URL\" -f load.sql")
+
+
+if __name__ == "__main__":
+    main()
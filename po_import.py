@@ -0,0 +1,734 @@
+#!/usr/bin/env python3
+"""
+Bulk import of historical POs with COPY and the totals trigger deferred
+
+Loading POs through the application (or an import-projects.js style
+script) inserts line items one by one, and calculate_po_totals fires after
+every insert: it re-sums the PO's lines and rewrites the header, so a PO
+with N lines costs N trigger runs and N header updates. For a QuickBooks
+history of a few hundred thousand lines that dominates the load.
+
+This tool does the work up front instead:
+
+    1. reads a flat CSV (one row per line item, PO columns repeated, the
+       shape QuickBooks exports) and stages it as column arrays
+    2. validates it: required fields, numbers, lengths and enum values,
+       PO columns that disagree between a PO's rows, duplicate line
+       numbers, division/project/vendor/work order/GL/user codes that do
+       not resolve, and PO numbers that already exist; a PO with any error
+       is rejected whole
+    3. computes line subtotals and PO subtotal/tax/total with integer
+       arithmetic exactly as PostgreSQL would (numeric(12,2) rounds half
+       away from zero), vectorised over all POs
+    4. loads headers, line items and a 'Created' audit row per PO with
+       COPY, in batches of whole POs, each batch its own transaction, with
+       the totals trigger off for this session only
+    5. reconciles: for a sample of the imported POs it fires the real
+       trigger (a no-op UPDATE of their line items), compares the totals it
+       writes with the imported ones, and rolls back
+
+Trigger modes (PostgreSQL):
+    replica   SET session_replication_role = replica for the import
+              session. No table lock, other sessions keep their triggers,
+              but it also skips foreign-key triggers (staging has already
+              resolved every reference) and needs a superuser or
+              rds_superuser.
+    table     ALTER TABLE po_line_items DISABLE TRIGGER for the totals
+              insert trigger inside each batch transaction, as
+              po_dataset.py's loader does. Works for the table owner, but
+              locks po_line_items for the length of each batch.
+
+A SQLite stand-in (no triggers) is loaded with batched inserts and
+reconciled against the trigger's arithmetic restated in SQL.
+
+CSV columns (header row required; * = required):
+    po_number*, division* (code, e.g. O3), project* (project_code),
+    vendor* (vendor_code or exact name), work_order (number in the division),
+    status (default Draft), tax_rate (0.0775 or 7.75%), required_by_date,
+    created_at (ISO or MM/DD/YYYY, UTC), requested_by (user email),
+    terms_code, notes_internal, notes_vendor,
+    line_number (default: order in the file), item_description*,
+    quantity*, unit_of_measure (default EA), unit_price*, line_subtotal
+    (checked against quantity x unit_price), gl_account (number or short
+    code), is_taxable (default: the GL account's default, else true)
+
+Usage:
+    python po_import.py "$DATABASE_URL" qb-history.csv --dry-run
+    python po_import.py "$DATABASE_URL" qb-history.csv --skip-invalid --errors rejected.csv
+    python po_import.py "$DATABASE_URL" qb-history.csv --trigger-mode table --batch 20000
+    python po_import.py standin.db qb-history.csv --reconcile 0
+
+Requirements:
+    pip install numpy            (and psycopg for PostgreSQL targets)
+"""
+
+import argparse
+import csv
+import datetime
+import gc
+import io
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from po_dataset import Batch
+from sql_schema import connect_postgres, mask_url
+
+PO_STATUSES = ("Draft", "Submitted", "Approved", "Issued", "Received", "Invoiced", "Paid", "Cancelled")
+PO_COLUMNS = ("division", "project", "vendor", "work_order", "status", "tax_rate", "required_by_date",
+              "created_at", "requested_by", "terms_code", "notes_internal", "notes_vendor")
+REQUIRED = ("po_number", "division", "project", "vendor", "item_description", "quantity", "unit_price")
+MAX_LENGTH = {"po_number": 15, "item_description": 500, "unit_of_measure": 20, "terms_code": 20}
+MAX_QUANTITY = 10 ** 10  # hundredths; quantity is DECIMAL(10, 2)
+MAX_MONEY = 10 ** 12  # cents; money columns are DECIMAL(12, 2)
+MAX_RATE = 10 ** 4  # ten-thousandths; tax_rate is DECIMAL(5, 4)
+DEFAULT_TAX_RATE = "0.0800"  # po_headers.tax_rate default
+DEFAULT_BATCH_LINES = 50_000
+DEFAULT_RECONCILE = 500
+TOTALS_TRIGGER = "recalculate_po_totals_insert"
+# Staged arrays: one entry per PO, and per line item (grouped by PO)
+PO_ARRAYS = ("po_id", "po_number", "first_line", "division_id", "project_id", "vendor_id", "leader_id",
+             "work_order_id", "requested_by", "status", "tax_rate", "created_at", "required_by", "required_null",
+             "terms", "notes_internal", "notes_vendor", "subtotal", "tax", "total")
+LINE_ARRAYS = ("line_number", "description", "quantity", "unit", "unit_price", "line_subtotal", "taxable",
+               "gl_short", "gl_number", "gl_name")
+NULL_DATE = np.iinfo(np.int64).min
+TRUE_TEXT = {"t", "true", "y", "yes", "1"}
+FALSE_TEXT = {"f", "false", "n", "no", "0"}
+
+
+def _fixed(text: str, places: int) -> int:
+    """'$1,234.5' -> integer units of 10**-places; extra digits round half away from zero, like numeric"""
+    text = text.strip().replace(",", "").replace("$", "")
+    if text.endswith("%"):
+        return _fixed(text[:-1], places - 2)
+    negative = text.startswith("-")
+    whole, _, frac = text.lstrip("+-").partition(".")
+    if not (whole or frac) or (whole and not whole.isdigit()) or (frac and not frac.isdigit()):
+        raise ValueError(text)
+    value = int((whole or "0") + frac[:places].ljust(places, "0"))
+    if len(frac) > places and frac[places] >= "5":
+        value += 1
+    return -value if negative else value
+
+
+def _half_away(numerator: np.ndarray, denominator: int) -> np.ndarray:
+    """numerator / denominator rounded half away from zero, in integers"""
+    return np.sign(numerator) * ((np.abs(numerator) + denominator // 2) // denominator)
+
+
+def _moment(text: str, date_only: bool = False) -> int:
+    """Epoch seconds (or days) of an ISO or MM/DD/YYYY value; naive times are UTC"""
+    text = text.strip()
+    if re.fullmatch(r"\d{1,2}/\d{1,2}/\d{4}", text):
+        month, day, year = map(int, text.split("/"))
+        moment = datetime.datetime(year, month, day, tzinfo=datetime.timezone.utc)
+    else:
+        moment = datetime.datetime.fromisoformat(text.replace("Z", "+00:00"))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=datetime.timezone.utc)
+    seconds = int(moment.timestamp())
+    return seconds // 86_400 if date_only else seconds
+
+
+def _uuid4(n: int) -> np.ndarray:
+    raw = np.frombuffer(os.urandom(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = raw[:, 6] & 0x0F | 0x40
+    raw[:, 8] = raw[:, 8] & 0x3F | 0x80
+    text = raw.tobytes().hex()
+    return np.array([f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+                     for h in (text[i:i + 32] for i in range(0, 32 * n, 32))], dtype="U36")
+
+
+class _Column:
+    """A CSV column dictionary-encoded: a code per row into its distinct (stripped) values
+
+    Parsing and lookups then run once per distinct value, which for real
+    exports (repeated prices, codes, dates) is a small fraction of the rows.
+    """
+
+    def __init__(self, values: Sequence[str], size: int):
+        distinct = {v: i for i, v in enumerate(dict.fromkeys(values))}
+        raw = np.fromiter(map(distinct.__getitem__, values), dtype=np.int64, count=len(values))
+        stripped: Dict[str, int] = {}
+        remap = np.array([stripped.setdefault(v.strip(), len(stripped)) for v in distinct], dtype=np.int64)
+        self.values = list(stripped)
+        self.codes = remap[raw] if len(values) else np.full(size, -1, dtype=np.int64)
+        self.blank_code = stripped.get("", -1)
+
+    def value(self, row: int) -> str:
+        code = int(self.codes[row])
+        return self.values[code] if code >= 0 else ""
+
+    def blank(self) -> np.ndarray:
+        return (self.codes == self.blank_code) | (self.codes < 0)
+
+    def map(self, fn, dtype) -> np.ndarray:
+        """fn of each row's value, computed once per distinct value ("" for a missing column)"""
+        return np.array([fn(v) for v in self.values] + [fn("")], dtype=dtype)[self.codes]
+
+    def text(self, default: str = "") -> np.ndarray:
+        return np.array([v or default for v in self.values] + [default], dtype=object)[self.codes]
+
+    def parse(self, fn, per: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(fn(value) as int64, parsed ok) per row, or per entry of `per` (codes); failures are 0"""
+        out, ok = [], []
+        for v in self.values + [""]:
+            try:
+                out.append(fn(v))
+                ok.append(True)
+            except ValueError:
+                out.append(0)
+                ok.append(False)
+        codes = self.codes if per is None else per
+        return np.array(out, dtype=np.int64)[codes], np.array(ok, dtype=bool)[codes]
+
+
+class Lookups:
+    """Reference data the CSV codes resolve against, loaded once from the target"""
+
+    def __init__(self, target: "ImportTarget"):
+        q = target.query
+        self.divisions = {code: str(i) for i, code in q("SELECT id, division_code FROM divisions")}
+        self.leaders: Dict[str, str] = {}
+        for i, division in q("SELECT id, division_id FROM division_leaders WHERE is_active ORDER BY created_at"):
+            self.leaders.setdefault(str(division), str(i))
+        self.projects = {code: str(i) for i, code in q("SELECT id, project_code FROM projects")}
+        self.vendors: Dict[str, str] = {}
+        self.vendor_terms: Dict[str, Optional[str]] = {}
+        for i, code, name, terms in q("SELECT id, vendor_code, vendor_name, payment_terms_default FROM vendors"):
+            self.vendors.setdefault(name, str(i))
+            self.vendors[code] = str(i)
+            self.vendor_terms[str(i)] = terms
+        self.work_orders = {(str(division), number): str(i) for i, division, number in
+                            q("SELECT id, division_id, work_order_number FROM work_orders")}
+        self.gl: Dict[str, Tuple[str, str, str, bool]] = {}
+        for short, number, name, taxable in q("SELECT gl_code_short, gl_account_number, gl_account_name, "
+                                              "is_taxable_default FROM gl_account_mappings"):
+            entry = (short, number, name, taxable is None or bool(taxable))
+            self.gl.setdefault(short, entry)
+            self.gl[number] = entry
+        self.users = {email.lower(): str(i) for i, email in q("SELECT id, email FROM users") if email}
+
+
+class Staging:
+    """The CSV as validated column arrays: one entry per PO and per line item"""
+
+    def __init__(self, path: str, lookups: Lookups, default_tax_rate: str = DEFAULT_TAX_RATE,
+                 now: Optional[int] = None):
+        self.path = path
+        self.now = int(time.time()) if now is None else now
+        self.errors: List[Tuple[int, str, str]] = []
+        # millions of short-lived row lists make the cyclic GC rescan the heap over and over
+        gc.disable()
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                reader = csv.reader(f)
+                header = [h.strip().lower() for h in next(reader, [])]
+                missing = [c for c in REQUIRED if c not in header]
+                if missing:
+                    raise SystemExit(f"❌ {path} lacks required columns: {', '.join(missing)}")
+                rows, csv_lines = [], []
+                for row in reader:
+                    if any(row):
+                        rows.append(row if len(row) >= len(header) else row + [""] * (len(header) - len(row)))
+                        csv_lines.append(reader.line_num)
+            n = self.rows = len(rows)
+            self.csv_line = np.array(csv_lines, dtype=np.int64)
+            columns = {name: _Column(values, n) for name, values in zip(header, zip(*rows))}
+            del rows
+        finally:
+            gc.enable()
+        blank_column = _Column((), n)
+
+        def col(name: str) -> "_Column":
+            return columns.get(name, blank_column)
+
+        numbers = col("po_number")
+        bad = np.zeros(n, dtype=bool)
+
+        def fail(at, message: str):
+            for r in np.asarray(at, dtype=np.int64).tolist():
+                self.errors.append((int(self.csv_line[r]), numbers.value(r), message))
+                bad[r] = True
+
+        for name in REQUIRED:
+            fail(np.flatnonzero(col(name).blank()), f"{name} is required")
+        for name, limit in MAX_LENGTH.items():
+            fail(np.flatnonzero(col(name).map(len, np.int64) > limit), f"{name} is longer than {limit} characters")
+
+        # ---- POs in first-seen order (the po_number codes); PO columns must agree across a PO's rows
+        line_po = numbers.codes
+        n_po = len(numbers.values)
+        self.po_number = np.array(numbers.values, dtype=str)
+        first_row = np.full(n_po, n, dtype=np.int64)
+        first_row[line_po[::-1]] = np.arange(n)[::-1]
+        chosen: Dict[str, np.ndarray] = {}
+        for name in PO_COLUMNS:
+            column = col(name)
+            filled = ~column.blank()
+            first = np.full(n_po, -1, dtype=np.int64)
+            rows_ = np.flatnonzero(filled)
+            first[line_po[rows_[::-1]]] = rows_[::-1]
+            code = np.where(first >= 0, column.codes[np.maximum(first, 0)], column.blank_code)
+            chosen[name] = code
+            for r in np.flatnonzero(filled & (column.codes != code[line_po])).tolist():
+                fail([r], f"{name} {column.value(r)!r} disagrees with "
+                          f"{column.values[code[line_po[r]]]!r} on an earlier row of this PO")
+
+        def po_text(name: str) -> List[str]:
+            values = col(name).values + [""]
+            return [values[c] for c in chosen[name].tolist()]
+
+        def po_fail(at, message: str):
+            fail(first_row[np.asarray(at, dtype=np.int64)], message)
+
+        # ---- PO references and values, each distinct value resolved once
+        def resolve(name: str, table: Dict[str, str], key=lambda v: v) -> np.ndarray:
+            column = col(name)
+            ids = np.array([table.get(key(v), "") if v else "" for v in column.values] + [""], dtype="U36")
+            resolved = ids[chosen[name]]
+            unknown = np.flatnonzero((chosen[name] >= 0) & (chosen[name] != column.blank_code) & (resolved == ""))
+            for p in unknown.tolist():
+                po_fail([p], f"unknown {name} {column.values[chosen[name][p]]!r}")
+            return resolved
+
+        self.division_id = resolve("division", lookups.divisions)
+        self.project_id = resolve("project", lookups.projects)
+        self.vendor_id = resolve("vendor", lookups.vendors)
+        self.requested_by = resolve("requested_by", lookups.users, str.lower)
+        self.leader_id = np.array([lookups.leaders.get(d, "") for d in self.division_id.tolist()], dtype="U36")
+        work_orders = po_text("work_order")
+        self.work_order_id = np.array([lookups.work_orders.get((d, w), "") if w else ""
+                                       for d, w in zip(self.division_id.tolist(), work_orders)], dtype="U36")
+        for p in np.flatnonzero((np.array(work_orders, dtype=object) != "") & (self.work_order_id == "")).tolist():
+            po_fail([p], f"unknown work_order {work_orders[p]!r} in division {po_text('division')[p]!r}")
+        self.status = np.array([v or "Draft" for v in po_text("status")], dtype=str)
+        for p in np.flatnonzero(~np.isin(self.status, PO_STATUSES)).tolist():
+            po_fail([p], f"status {str(self.status[p])!r} is not one of {', '.join(PO_STATUSES)}")
+        rate, ok = col("tax_rate").parse(lambda v: _fixed(v or default_tax_rate, 4), per=chosen["tax_rate"])
+        po_fail(np.flatnonzero(~ok), "tax_rate is not a number")
+        po_fail(np.flatnonzero(ok & ((rate < 0) | (rate >= MAX_RATE))), "tax_rate must be between 0 and 0.9999")
+        self.tax_rate = rate
+        created, ok = col("created_at").parse(lambda v: _moment(v) if v else self.now, per=chosen["created_at"])
+        po_fail(np.flatnonzero(~ok), "created_at is not an ISO or MM/DD/YYYY date")
+        self.created_at = created
+        required, ok = col("required_by_date").parse(lambda v: _moment(v, date_only=True) if v else NULL_DATE,
+                                                     per=chosen["required_by_date"])
+        po_fail(np.flatnonzero(~ok), "required_by_date is not an ISO or MM/DD/YYYY date")
+        self.required_by, self.required_null = required, required == NULL_DATE
+        self.terms = np.array([t or lookups.vendor_terms.get(v) or "Net30"
+                               for t, v in zip(po_text("terms_code"), self.vendor_id.tolist())], dtype=object)
+        self.notes_internal = np.array(po_text("notes_internal"), dtype=object)
+        self.notes_vendor = np.array(po_text("notes_vendor"), dtype=object)
+
+        # ---- line items
+        quantity, ok_q = col("quantity").parse(lambda v: _fixed(v, 2))
+        price, ok_p = col("unit_price").parse(lambda v: _fixed(v, 2))
+        given, ok_g = col("line_subtotal").parse(lambda v: _fixed(v, 2))
+        line_number, ok_n = col("line_number").parse(int)
+        has_given, has_number = ~col("line_subtotal").blank(), ~col("line_number").blank()
+        fail(np.flatnonzero(~(ok_q & ok_p & (ok_g | ~has_given) & (ok_n | ~has_number))),
+             "quantity, unit_price, line_subtotal or line_number is not a number")
+        fail(np.flatnonzero(~bad & ((quantity <= 0) | (quantity >= MAX_QUANTITY))),
+             "quantity must be positive and below 100,000,000")
+        fail(np.flatnonzero(~bad & (np.abs(price) >= MAX_MONEY)), "unit_price is too large")
+        # quantity (hundredths) x unit_price (cents) is in ten-thousandths of a dollar; round to cents
+        too_big = np.abs(quantity.astype(float) * price) >= (MAX_MONEY - 1) * 100
+        fail(np.flatnonzero(~bad & too_big), "quantity x unit_price is too large")
+        computed = _half_away(np.where(too_big, 0, quantity) * price, 100)
+        fail(np.flatnonzero(~bad & has_given & (np.abs(given - computed) > 1)),
+             "line_subtotal does not match quantity x unit_price")
+
+        gl_column = col("gl_account")
+        gl_entries = [lookups.gl.get(v) if v else None for v in gl_column.values] + [None]
+        gl_index = np.array([i if e is not None else -1 for i, e in enumerate(gl_entries)], dtype=np.int64)
+        gl = gl_index[gl_column.codes]
+        fail(np.flatnonzero(~gl_column.blank() & (gl < 0)), "unknown gl_account")
+        flag = col("is_taxable").map(lambda v: 1 if v.lower() in TRUE_TEXT else 0 if v.lower() in FALSE_TEXT
+                                     else -1 if not v else -2, np.int64)
+        fail(np.flatnonzero(flag == -2), "is_taxable is not true/false")
+        gl_taxable = np.array([e[3] if e is not None else True for e in gl_entries], dtype=bool)[gl]
+        taxable = np.where(flag >= 0, flag == 1, gl_taxable)
+
+        # line numbers default to the order within the PO; duplicates are errors
+        order = np.argsort(line_po, kind="stable")
+        counts = np.bincount(line_po, minlength=n_po)
+        position = np.empty(n, dtype=np.int64)
+        position[order] = np.arange(n) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        line_number = np.where(has_number & ok_n, line_number, position)
+        by_line = np.lexsort((line_number, line_po))
+        dup = np.flatnonzero((line_po[by_line][1:] == line_po[by_line][:-1])
+                             & (line_number[by_line][1:] == line_number[by_line][:-1]))
+        fail(by_line[dup + 1].tolist(), "duplicate line_number in this PO")
+
+        # ---- stage lines grouped by PO, reject whole POs, then compute totals over what is left
+        self.po_id = _uuid4(n_po)
+        self.first_line = self.csv_line[first_row]
+        self.line_po = line_po[order]
+        self.line_number = line_number[order]
+        self.description = col("item_description").text()[order]
+        self.quantity = quantity[order]
+        self.unit = col("unit_of_measure").text("EA")[order]
+        self.unit_price = price[order]
+        self.line_subtotal = np.where(has_given, given, computed)[order]
+        self.taxable = taxable[order]
+        for i, name in enumerate(("gl_short", "gl_number", "gl_name")):
+            labels = np.array([e[i] if e is not None else "" for e in gl_entries], dtype=object)
+            setattr(self, name, labels[gl[order]])
+        po_bad = np.zeros(n_po, dtype=bool)
+        po_bad[line_po[bad]] = True
+        self.rejected_pos = 0
+        self.drop(po_bad)
+        self.compute_totals()
+
+    def compute_totals(self):
+        """calculate_po_totals for every PO at once: lines are grouped by PO, so sums are reduceat"""
+        counts = np.bincount(self.line_po, minlength=len(self.po_number))
+        starts = np.cumsum(counts) - counts
+        if len(self.line_po):
+            self.subtotal = np.add.reduceat(self.line_subtotal, starts)
+            taxable_sum = np.add.reduceat(self.line_subtotal * self.taxable, starts)
+        else:
+            self.subtotal = taxable_sum = np.zeros(0, dtype=np.int64)
+        self.tax = _half_away(taxable_sum * self.tax_rate, 10_000)
+        self.total = self.subtotal + self.tax
+        over = np.abs(self.total) >= MAX_MONEY
+        for p in np.flatnonzero(over).tolist():
+            self.errors.append((int(self.first_line[p]), str(self.po_number[p]), "PO total exceeds DECIMAL(12, 2)"))
+        if over.any():
+            self.drop(over)
+
+    def drop(self, mask: np.ndarray):
+        """Remove POs (a mask over the staged POs) and their lines"""
+        keep = np.flatnonzero(~mask)
+        remap = np.full(len(mask), -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        for name in PO_ARRAYS:
+            if hasattr(self, name):
+                setattr(self, name, getattr(self, name)[keep])
+        lines = ~mask[self.line_po]
+        for name in LINE_ARRAYS:
+            setattr(self, name, getattr(self, name)[lines])
+        self.line_po = remap[self.line_po[lines]]
+        self.rejected_pos += int(mask.sum())
+
+    def reject_existing(self, existing: Sequence[str]):
+        if not len(existing):
+            return
+        mask = np.isin(self.po_number, list(existing))
+        for p in np.flatnonzero(mask).tolist():
+            self.errors.append((int(self.first_line[p]), str(self.po_number[p]),
+                                "po_number already exists in the target"))
+        self.drop(mask)
+
+    def batches(self, batch_lines: int, source: str) -> Iterator[List[Batch]]:
+        """Whole POs per batch, about batch_lines line items each: headers, lines, audit rows"""
+        counts = np.bincount(self.line_po, minlength=len(self.po_number))
+        line_starts = np.r_[0, np.cumsum(counts)]
+        group = (line_starts[:-1] // max(1, batch_lines))
+        bounds = np.r_[0, np.flatnonzero(np.diff(group)) + 1, len(group)]
+        line_ts = self.created_at[self.line_po]
+        for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            pos, (l0, l1) = slice(lo, hi), (int(line_starts[lo]), int(line_starts[hi]))
+            m, k = hi - lo, l1 - l0
+            headers = Batch("po_headers", m)
+            headers.add("id", "uuid", self.po_id[pos])
+            headers.add("po_number", "freetext", self.po_number[pos])
+            for name, values in (("division_leader_id", self.leader_id), ("division_id", self.division_id),
+                                 ("project_id", self.project_id), ("work_order_id", self.work_order_id),
+                                 ("vendor_id", self.vendor_id), ("requested_by_user_id", self.requested_by)):
+                headers.add(name, "uuid", values[pos], values[pos] == "")
+            headers.add("terms_code", "freetext", self.terms[pos])
+            headers.add("tax_rate", "rate", self.tax_rate[pos])
+            headers.add("subtotal_amount", "money", self.subtotal[pos])
+            headers.add("tax_amount", "money", self.tax[pos])
+            headers.add("total_amount", "money", self.total[pos])
+            headers.add("status", "text", self.status[pos])
+            headers.add("required_by_date", "date", self.required_by[pos], self.required_null[pos])
+            headers.add("notes_internal", "freetext", self.notes_internal[pos], self.notes_internal[pos] == "")
+            headers.add("notes_vendor", "freetext", self.notes_vendor[pos], self.notes_vendor[pos] == "")
+            headers.add("created_at", "ts", self.created_at[pos])
+            headers.add("updated_at", "ts", self.now)  # so incremental readers (kpi_aggregator) see the import
+
+            lines = Batch("po_line_items", k)
+            ls = slice(l0, l1)
+            lines.add("id", "uuid", _uuid4(k))
+            lines.add("po_id", "uuid", self.po_id[self.line_po[ls]])
+            lines.add("line_number", "int", self.line_number[ls])
+            lines.add("item_description", "freetext", self.description[ls])
+            lines.add("quantity", "qty", self.quantity[ls])
+            lines.add("unit_of_measure", "freetext", self.unit[ls])
+            lines.add("unit_price", "money", self.unit_price[ls])
+            lines.add("line_subtotal", "money", self.line_subtotal[ls])
+            lines.add("gl_account_code", "text", self.gl_short[ls], self.gl_short[ls] == "")
+            lines.add("gl_account_number", "text", self.gl_number[ls], self.gl_number[ls] == "")
+            lines.add("gl_account_name", "freetext", self.gl_name[ls], self.gl_name[ls] == "")
+            lines.add("is_taxable", "bool", self.taxable[ls])
+            lines.add("created_at", "ts", line_ts[ls])
+            lines.add("updated_at", "ts", self.now)
+
+            audit = Batch("po_approvals", m)
+            audit.add("id", "uuid", _uuid4(m))
+            audit.add("po_id", "uuid", self.po_id[pos])
+            audit.add("action", "text", "Created")
+            audit.add("actor_user_id", "uuid", self.requested_by[pos], self.requested_by[pos] == "")
+            audit.add("status_after", "text", self.status[pos])
+            audit.add("notes", "freetext", np.char.add(np.char.add("PO ", self.po_number[pos]),
+                                                        f" imported from {source}"))
+            audit.add("timestamp", "ts", self.created_at[pos])
+            yield [headers, lines, audit]
+
+
+# ---------------------------------------------------------------------- targets
+
+class ImportTarget:
+    """Where the POs go: PostgreSQL, or a SQLite stand-in"""
+
+    name = ""
+
+    def query(self, sql: str, params: Sequence = ()) -> List[Tuple]:
+        raise NotImplementedError
+
+    def existing(self, po_numbers: Sequence[str]) -> List[str]:
+        found = []
+        for i in range(0, len(po_numbers), 1000):
+            chunk = list(po_numbers[i:i + 1000])
+            marks = ", ".join(["%s"] * len(chunk))
+            found += [r[0] for r in self.query(f"SELECT po_number FROM po_headers WHERE po_number IN ({marks})",
+                                               chunk)]
+        return found
+
+    def load(self, batches: Iterator[List[Batch]], progress) -> None:
+        raise NotImplementedError
+
+    def trigger_totals(self, po_ids: Sequence[str]) -> Dict[str, Tuple[int, int, int]]:
+        """(subtotal, tax, total) in cents per PO id, as calculate_po_totals computes them"""
+        raise NotImplementedError
+
+    def stored_totals(self, po_ids: Sequence[str]) -> Dict[str, Tuple[int, int, int]]:
+        out = {}
+        for i in range(0, len(po_ids), 1000):
+            chunk = list(po_ids[i:i + 1000])
+            marks = ", ".join(["%s"] * len(chunk))
+            for po_id, sub, tax, total in self.query(
+                    f"SELECT id, subtotal_amount, tax_amount, total_amount FROM po_headers WHERE id IN ({marks})",
+                    chunk):
+                out[str(po_id)] = tuple(int(round(float(v or 0) * 100)) for v in (sub, tax, total))
+        return out
+
+    def close(self):
+        pass
+
+
+class SQLiteTarget(ImportTarget):
+    def __init__(self, path: str):
+        self.name = f"sqlite:{path}"
+        self.db = sqlite3.connect(path)
+
+    def query(self, sql: str, params: Sequence = ()) -> List[Tuple]:
+        return self.db.execute(sql.replace("%s", "?"), tuple(params)).fetchall()
+
+    def load(self, batches: Iterator[List[Batch]], progress) -> None:
+        for group in batches:
+            with self.db:
+                for batch in group:
+                    if batch.size:
+                        self.db.executemany(f"INSERT INTO {batch.table} ({', '.join(batch.names)}) "
+                                            f"VALUES ({', '.join('?' * len(batch.columns))})", batch.rows("sqlite"))
+            progress(group)
+
+    def trigger_totals(self, po_ids: Sequence[str]) -> Dict[str, Tuple[int, int, int]]:
+        # the stand-in has no triggers: restate calculate_po_totals' queries and numeric(12, 2) rounding
+        out = {}
+        for i in range(0, len(po_ids), 1000):
+            chunk = list(po_ids[i:i + 1000])
+            marks = ", ".join("?" * len(chunk))
+            rows = self.db.execute(
+                f"SELECT h.id, h.tax_rate, COALESCE(SUM(l.line_subtotal), 0), "
+                f"COALESCE(SUM(CASE WHEN l.is_taxable THEN l.line_subtotal END), 0) "
+                f"FROM po_headers h LEFT JOIN po_line_items l ON l.po_id = h.id "
+                f"WHERE h.id IN ({marks}) GROUP BY h.id, h.tax_rate", chunk).fetchall()
+            for po_id, rate, subtotal, taxable in rows:
+                sub = int(round(subtotal * 100))
+                tax = int(_half_away(np.int64(int(round(taxable * 100)) * int(round(rate * 10_000))), 10_000))
+                out[po_id] = (sub, tax, sub + tax)
+        return out
+
+    def close(self):
+        self.db.close()
+
+
+class PostgresTarget(ImportTarget):
+    def __init__(self, url: str, trigger_mode: str = "replica"):
+        self.name = mask_url(url)
+        self.conn = connect_postgres(url)
+        self.trigger_mode = trigger_mode
+
+    def query(self, sql: str, params: Sequence = ()) -> List[Tuple]:
+        with self.conn.cursor() as cur:
+            cur.execute(sql, tuple(params))
+            rows = cur.fetchall()
+        self.conn.rollback()
+        return rows
+
+    def _copy(self, cur, batch: Batch):
+        sql = f"COPY {batch.table} ({', '.join(batch.names)}) FROM STDIN"
+        text = batch.copy_text()
+        if hasattr(cur, "copy"):
+            with cur.copy(sql) as copy:
+                copy.write(text)
+        else:
+            cur.copy_expert(sql, io.StringIO(text))
+
+    def load(self, batches: Iterator[List[Batch]], progress) -> None:
+        with self.conn.cursor() as cur:
+            if self.trigger_mode == "replica":
+                try:
+                    cur.execute("SET session_replication_role = replica")
+                    self.conn.commit()
+                except Exception as e:
+                    self.conn.rollback()
+                    raise SystemExit(f"❌ Cannot set session_replication_role ({e}); "
+                                     f"rerun with --trigger-mode table")
+            try:
+                for group in batches:
+                    if self.trigger_mode == "table":
+                        cur.execute(f"ALTER TABLE po_line_items DISABLE TRIGGER {TOTALS_TRIGGER}")
+                    for batch in group:
+                        if batch.size:
+                            self._copy(cur, batch)
+                    if self.trigger_mode == "table":
+                        cur.execute(f"ALTER TABLE po_line_items ENABLE TRIGGER {TOTALS_TRIGGER}")
+                    self.conn.commit()
+                    progress(group)
+            except BaseException:
+                self.conn.rollback()
+                raise
+            finally:
+                if self.trigger_mode == "replica":
+                    cur.execute("SET session_replication_role = DEFAULT")
+                    self.conn.commit()
+            cur.execute("ANALYZE po_headers")
+            cur.execute("ANALYZE po_line_items")
+            self.conn.commit()
+
+    def trigger_totals(self, po_ids: Sequence[str]) -> Dict[str, Tuple[int, int, int]]:
+        # fire the real trigger: a no-op UPDATE runs calculate_po_totals once per line, then roll it all back
+        with self.conn.cursor() as cur:
+            cur.execute("UPDATE po_line_items SET line_subtotal = line_subtotal WHERE po_id = ANY(%s::uuid[])",
+                        (list(po_ids),))
+            cur.execute("SELECT id, subtotal_amount, tax_amount, total_amount FROM po_headers "
+                        "WHERE id = ANY(%s::uuid[])", (list(po_ids),))
+            rows = cur.fetchall()
+        self.conn.rollback()
+        return {str(i): (int(sub * 100), int(tax * 100), int(total * 100)) for i, sub, tax, total in rows}
+
+    def close(self):
+        self.conn.rollback()
+        self.conn.close()
+
+
+def open_target(spec: str, trigger_mode: str = "replica") -> ImportTarget:
+    if spec.startswith(("postgres://", "postgresql://")):
+        return PostgresTarget(spec, trigger_mode)
+    path = spec[len("sqlite:"):] if spec.startswith("sqlite:") else spec
+    if not os.path.isfile(path):
+        raise SystemExit(f"❌ No SQLite stand-in at {path} (create one with po_dataset.py or sql_schema.py)")
+    return SQLiteTarget(path)
+
+
+def reconcile(target: ImportTarget, po_ids: Sequence[str], sample: int) -> Tuple[int, List[Tuple]]:
+    """Compare imported totals with the trigger's for a sample of POs (0 = all); returns (checked, mismatches)"""
+    ids = list(po_ids)
+    if 0 < sample < len(ids):
+        ids = random.sample(ids, sample)
+    stored = target.stored_totals(ids)
+    expected = target.trigger_totals(ids)
+    mismatches = [(po_id, stored.get(po_id), expected.get(po_id)) for po_id in ids
+                  if stored.get(po_id) != expected.get(po_id)]
+    return len(ids), mismatches
+
+
+def _write_errors(path: str, errors: List[Tuple[int, str, str]]):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["csv_line", "po_number", "error"])
+        writer.writerows(sorted(errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import POs with COPY and the totals trigger deferred")
+    parser.add_argument("target", help="postgresql:// URL or SQLite stand-in path")
+    parser.add_argument("csv", help="Flat CSV, one row per line item (see the module docstring)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and compute totals, load nothing")
+    parser.add_argument("--skip-invalid", action="store_true",
+                        help="Load the valid POs even if some are rejected (default: load nothing)")
+    parser.add_argument("--errors", metavar="PATH", help="Write every validation error to this CSV")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH_LINES,
+                        help=f"Line items per COPY transaction, whole POs (default: {DEFAULT_BATCH_LINES:,})")
+    parser.add_argument("--trigger-mode", choices=["replica", "table"], default="replica",
+                        help="How the totals trigger is deferred on PostgreSQL (default: replica)")
+    parser.add_argument("--reconcile", type=int, default=DEFAULT_RECONCILE, metavar="N",
+                        help=f"POs to check against the trigger after loading, 0 = all (default: {DEFAULT_RECONCILE})")
+    parser.add_argument("--tax-rate", default=DEFAULT_TAX_RATE, help="tax_rate for POs that give none (default: 0.08)")
+    args = parser.parse_args()
+
+    try:
+        target = open_target(args.target, args.trigger_mode)
+    except ImportError as e:
+        raise SystemExit(f"❌ {e}")
+    try:
+        started = time.perf_counter()
+        staging = Staging(args.csv, Lookups(target), args.tax_rate)
+        staging.reject_existing(target.existing(staging.po_number.tolist()))
+        staged = time.perf_counter() - started
+        print(f"📄 {args.csv}: {staging.rows:,} rows, {len(staging.po_number):,} valid POs, "
+              f"{len(staging.line_po):,} line items, ${staging.total.sum() / 100:,.2f} total "
+              f"(staged in {staged:.2f}s)")
+        if staging.errors:
+            print(f"⚠️  {len(staging.errors):,} errors, {staging.rejected_pos:,} POs rejected")
+            for line, number, message in sorted(staging.errors)[:20]:
+                print(f"   line {line or '-':>6}  {number:<16} {message}")
+            if args.errors:
+                _write_errors(args.errors, staging.errors)
+                print(f"   all errors written to {args.errors}")
+            if not args.skip_invalid and not args.dry_run:
+                raise SystemExit("❌ Nothing loaded; fix the errors or pass --skip-invalid")
+        if args.dry_run or not len(staging.po_number):
+            return
+
+        loaded = {"po_headers": 0, "po_line_items": 0}
+        t0 = time.perf_counter()
+
+        def progress(group: List[Batch]):
+            for batch in group[:2]:
+                loaded[batch.table] += batch.size
+            elapsed = time.perf_counter() - t0
+            print(f"   ⏳ {loaded['po_headers']:,} POs, {loaded['po_line_items']:,} line items "
+                  f"({loaded['po_line_items'] / elapsed:,.0f} lines/s)")
+
+        target.load(staging.batches(args.batch, os.path.basename(args.csv)), progress)
+        elapsed = time.perf_counter() - t0
+        print(f"✅ Loaded {loaded['po_headers']:,} POs and {loaded['po_line_items']:,} line items into "
+              f"{target.name} in {elapsed:.1f}s")
+
+        checked, mismatches = reconcile(target, staging.po_id.tolist(), args.reconcile)
+        if mismatches:
+            print(f"❌ {len(mismatches):,} of {checked:,} POs disagree with calculate_po_totals:")
+            for po_id, stored, expected in mismatches[:20]:
+                print(f"   {po_id}  imported {stored}  trigger {expected}")
+            sys.exit(1)
+        print(f"🔁 Reconciled {checked:,} POs against calculate_po_totals: all match")
+    finally:
+        target.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stub of the Render API and the ASR PO System health endpoints
+For exercising monitor_render_deployment.py without touching Render
+
+Simulates one or more services, each with a history of finished deploys
+and one active deploy that moves through created -> build_in_progress ->
+update_in_progress -> live (or build_failed) over its build time.
+Responses carry ETags and honour If-None-Match, deploy lists support
+limit/cursor, and --throttle-every returns 429 with Retry-After.
+
+Usage:
+    python render_api_stub.py --port 8765
+    python render_api_stub.py --service srv-aaa:2b4b722:120 --service srv-bbb:9f1c0de:60:fail
+
+    RENDER_API_KEY=test python monitor_render_deployment.py \
+        --base-url http://127.0.0.1:8765/v1
+    curl http://127.0.0.1:8765/stats   # request counts per endpoint
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from health_prober import HEALTH_ENDPOINTS
+
+DEFAULT_SERVICE = "srv-d5girrp4tr6s73ed7d1g:2b4b722:90"
+HISTORY_DEPLOYS = 25
+
+
+def iso(ts: datetime) -> str:
+    return ts.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+class SimulatedService:
+    """A service with finished deploy history and one deploy in flight"""
+
+    def __init__(self, service_id: str, commit: str, build_seconds: float,
+                 fail: bool = False, history: int = HISTORY_DEPLOYS):
+        self.service_id = service_id
+        self.commit = commit
+        self.build_seconds = build_seconds
+        self.fail = fail
+        self.started = datetime.now(timezone.utc)
+
+        rng = random.Random(service_id)
+        self.history = []
+        finished = self.started - timedelta(minutes=30)
+        for i in range(history):
+            duration = build_seconds * rng.uniform(0.8, 1.25)
+            created = finished - timedelta(seconds=duration)
+            sha = hashlib.sha1(f"{service_id}-{i}".encode()).hexdigest()
+            self.history.append({
+                "id": f"dep-{service_id[-6:]}-{i:04d}",
+                "commit": {"id": sha, "sha": sha, "message": f"Historical change {i}"},
+                "status": "build_failed" if rng.random() < 0.1 else "deactivated",
+                "trigger": "new_commit",
+                "createdAt": iso(created),
+                "updatedAt": iso(finished),
+                "finishedAt": iso(finished),
+            })
+            finished = created - timedelta(hours=rng.uniform(2, 30))
+
+    def active_deploy(self) -> Dict:
+        elapsed = (datetime.now(timezone.utc) - self.started).total_seconds()
+        progress = elapsed / self.build_seconds if self.build_seconds else 1.0
+        finished_at = None
+        # (status, fraction of build time at which it began)
+        if progress < 0.1:
+            status, phase_start = "created", 0.0
+        elif progress < 0.8:
+            status, phase_start = "build_in_progress", 0.1
+        elif self.fail:
+            status, phase_start = "build_failed", 0.8
+        elif progress < 1.0:
+            status, phase_start = "update_in_progress", 0.8
+        else:
+            status, phase_start = "live", 1.0
+        # updatedAt only moves on status changes, so unchanged polls keep their ETag
+        updated_at = iso(self.started + timedelta(seconds=self.build_seconds * phase_start))
+        if status in ("live", "build_failed"):
+            finished_at = updated_at
+        return {
+            "id": f"dep-{self.service_id[-6:]}-active",
+            "commit": {"id": self.commit, "sha": self.commit.ljust(40, "0"),
+                       "message": "Deploy under test"},
+            "status": status,
+            "trigger": "new_commit",
+            "createdAt": iso(self.started),
+            "updatedAt": updated_at,
+            "finishedAt": finished_at,
+        }
+
+    def deploys(self) -> List[Dict]:
+        """All deploys, newest first"""
+        return [self.active_deploy()] + self.history
+
+    def info(self) -> Dict:
+        return {
+            "id": self.service_id,
+            "name": f"asr-po-system-{self.service_id}",
+            "type": "web_service",
+            "serviceDetails": {"url": "http://127.0.0.1"},
+        }
+
+
+class StubState:
+    def __init__(self, services: Dict[str, SimulatedService], throttle_every: int,
+                 latency_ms: float, jitter_ms: float, error_rate: float):
+        self.services = services
+        self.throttle_every = throttle_every
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.counts: Dict[str, int] = {}
+
+    def count(self, endpoint: str) -> int:
+        with self.lock:
+            self.requests += 1
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+            return self.requests
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_version = "RenderStub/1.0"
+    state: StubState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload, headers: Optional[Dict[str, str]] = None):
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _send_cacheable(self, payload):
+        body = json.dumps(payload, sort_keys=True).encode("utf-8")
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, None, {"ETag": etag})
+        else:
+            self._send(200, payload, {"ETag": etag})
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        path = parts.path.rstrip("/") or "/"
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+
+        if path == "/stats":
+            with self.state.lock:
+                return self._send(200, {"requests": self.state.requests, "by_endpoint": self.state.counts})
+
+        if path.startswith("/api/"):
+            return self._app_endpoint(path)
+
+        segments = path.strip("/").split("/")
+        if len(segments) < 3 or segments[:2] != ["v1", "services"]:
+            return self._send(404, {"message": "not found"})
+
+        endpoint = "/v1/services/" + "/".join(
+            "{id}" if i % 2 == 0 else seg for i, seg in enumerate(segments[2:]))
+        number = self.state.count(endpoint)
+        if self.state.throttle_every and number % self.state.throttle_every == 0:
+            return self._send(429, {"message": "rate limit exceeded"}, {"Retry-After": "1"})
+
+        service = self.state.services.get(segments[2])
+        if service is None:
+            return self._send(404, {"message": "service not found"})
+
+        if len(segments) == 3:
+            return self._send_cacheable(service.info())
+        if segments[3] != "deploys":
+            return self._send(404, {"message": "not found"})
+        if len(segments) == 5:
+            deploy = next((d for d in service.deploys() if d["id"] == segments[4]), None)
+            return self._send_cacheable(deploy) if deploy else self._send(404, {"message": "deploy not found"})
+
+        deploys = service.deploys()
+        start = 0
+        if query.get("cursor"):
+            start = next((i + 1 for i, d in enumerate(deploys) if d["id"] == query["cursor"]), len(deploys))
+        limit = min(100, int(query.get("limit", 20)))
+        page = deploys[start:start + limit]
+        self._send_cacheable([{"deploy": d, "cursor": d["id"]} for d in page])
+
+    def _app_endpoint(self, path: str):
+        self.state.count(path)
+        delay = max(0.0, random.gauss(self.state.latency_ms, self.state.jitter_ms)) / 1000
+        if delay:
+            time.sleep(delay)
+        if random.random() < self.state.error_rate:
+            return self._send(500, {"status": "error"})
+        if path in HEALTH_ENDPOINTS:
+            return self._send(200, {"status": "healthy", "timestamp": iso(datetime.now(timezone.utc))})
+        # Any other app route (dashboards, reports, ...) answers with a small payload
+        self._send(200, {"data": [], "path": path})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if self.path.startswith("/api/"):
+            return self._app_endpoint(urlsplit(self.path).path)
+        self._send(404, {"message": "not found"})
+
+
+def parse_service(spec: str, history: int = HISTORY_DEPLOYS) -> SimulatedService:
+    """SERVICE_ID:COMMIT[:BUILD_SECONDS[:fail]]"""
+    parts = spec.split(":")
+    if len(parts) < 2:
+        raise ValueError(f"invalid service '{spec}'")
+    build_seconds = float(parts[2]) if len(parts) > 2 else 90.0
+    return SimulatedService(parts[0], parts[1], build_seconds, fail=len(parts) > 3 and parts[3] == "fail",
+                            history=history)
+
+
+def create_server(host: str = "127.0.0.1", port: int = 0,
+                  services: Optional[List[SimulatedService]] = None,
+                  throttle_every: int = 0, latency_ms: float = 0.0,
+                  jitter_ms: float = 0.0, error_rate: float = 0.0) -> ThreadingHTTPServer:
+    """Build (but do not start) a stub server; port 0 picks a free port"""
+    services = services or [parse_service(DEFAULT_SERVICE)]
+    state = StubState({s.service_id: s for s in services}, throttle_every,
+                      latency_ms, jitter_ms, error_rate)
+    handler = type("BoundStubHandler", (StubHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.stub_state = state
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Render API / health endpoint stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--service", action="append", default=[],
+                        metavar="SERVICE_ID:COMMIT[:BUILD_SECONDS[:fail]]",
+                        help=f"Simulated service; repeatable (default: {DEFAULT_SERVICE})")
+    parser.add_argument("--throttle-every", type=int, default=0,
+                        help="Return 429 + Retry-After on every Nth Render API request")
+    parser.add_argument("--latency-ms", type=float, default=5.0,
+                        help="Mean latency of /api/* endpoints (default: 5)")
+    parser.add_argument("--jitter-ms", type=float, default=2.0,
+                        help="Latency standard deviation of /api/* endpoints (default: 2)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of /api/* requests answered with 500 (default: 0)")
+    parser.add_argument("--history", type=int, default=HISTORY_DEPLOYS,
+                        help=f"Finished deploys per service, for paging tests (default: {HISTORY_DEPLOYS})")
+    args = parser.parse_args()
+
+    try:
+        services = [parse_service(spec, args.history) for spec in args.service or [DEFAULT_SERVICE]]
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = create_server(args.host, args.port, services, args.throttle_every,
+                           args.latency_ms, args.jitter_ms, args.error_rate)
+    print(f"Render API stub listening on http://{args.host}:{server.server_port}/v1")
+    for service in server.stub_state.services.values():
+        print(f"   {service.service_id}: commit {service.commit}, "
+              f"{service.build_seconds:.0f}s build{' (fails)' if service.fail else ''}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1510 @@
+#!/usr/bin/env python3
+"""
+Offline columnar engine for the six business reports
+
+The /api/reports endpoints (po-summary, vendor-analysis, gl-analysis,
+budget-vs-actual, project-details, approval-bottleneck) fetch every PO in
+the date range through Prisma and aggregate row by row in JavaScript, so
+month-end packs over long ranges run close to the 10s p99 target. This
+module loads the tables once into NumPy column arrays and answers the same
+reports with vectorised group-bys (bincount / unique over integer keys),
+which takes milliseconds even for years of data.
+
+Loading:
+    - string columns are dictionary-encoded (int32 codes + sorted labels)
+    - foreign keys are resolved to row numbers in the referenced table, so
+      joins are plain array indexing
+    - money is int64 cents, timestamps int64 epoch seconds (UTC), dates
+      int64 epoch days; NULL timestamps/dates are NULL_TS
+
+Sources are a directory of COPY files (po_dataset.py output, or
+`\\copy <table> TO '<table>.copy'` exports in schema column order), a
+SQLite stand-in, PostgreSQL (server-side cursors, needs psycopg), or a
+.npz snapshot written with --save-snapshot, which reloads in a fraction of
+the time and is the way to run packs repeatedly.
+
+Each report returns the same JSON structure as its route, with the same
+filters and the same definitions, including the routes' quirks, so the
+two can be diffed. Two deliberate differences: po-summary averages
+processing time over all completed POs rather than the route's first-50
+sample, and nothing is truncated except where the route truncates.
+
+Usage:
+    python report_engine.py /data/po-copy --save-snapshot po.npz
+    python report_engine.py po.npz --report all --start 2025-01-01 --end 2025-12-31
+    python report_engine.py po.npz --report vendor-analysis --division O3 --json > vendors.json
+    python report_engine.py standin.db --report approval-bottleneck --as-of 2026-06-30
+    python report_engine.py "$DATABASE_URL" --report gl-analysis --save-snapshot po.npz
+
+Requirements:
+    pip install numpy            (and psycopg for PostgreSQL sources)
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sql_schema import SCHEMA_PATH, connect_postgres, load_schema
+
+DAY = 86_400
+HOUR = 3_600
+NULL_TS = np.iinfo(np.int64).min
+CHUNK_ROWS = 500_000
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June", "July", "August", "September",
+               "October", "November", "December"]
+
+# Columns the reports and approval_intervals.py need, in load order (referenced tables first). Kinds:
+# key (row id), str (dictionary-encoded), ref:<table> (row number there),
+# money (cents), ts (epoch seconds), date (epoch days), bool
+COLUMNS: Dict[str, Dict[str, str]] = {
+    "divisions": {"id": "key", "division_name": "str", "division_code": "str", "is_active": "bool"},
+    "users": {"id": "key", "first_name": "str", "last_name": "str", "email": "str", "role": "str",
+              "division_id": "ref:divisions"},
+    "division_leaders": {"id": "key", "name": "str", "division_code": "str", "division_id": "ref:divisions",
+                         "is_active": "bool"},
+    "vendors": {"id": "key", "vendor_name": "str", "vendor_code": "str", "vendor_type": "str",
+                "contact_name": "str", "contact_phone": "str", "contact_email": "str",
+                "payment_terms_default": "str", "is_active": "bool", "is_1099_required": "bool",
+                "w9_on_file": "bool", "tax_id": "str"},
+    "projects": {"id": "key", "project_code": "str", "project_name": "str", "status": "str",
+                 "primary_division_id": "ref:divisions", "start_date": "date", "end_date": "date",
+                 "budget_total": "money", "budget_actual": "money"},
+    "gl_account_mappings": {"gl_account_number": "str", "gl_account_name": "str", "gl_account_category": "str"},
+    "work_orders": {"id": "key", "project_id": "ref:projects", "status": "str", "budget_estimate": "money",
+                    "budget_actual": "money", "created_at": "ts"},
+    "po_headers": {"id": "key", "po_number": "str", "division_id": "ref:divisions", "project_id": "ref:projects",
+                   "vendor_id": "ref:vendors", "division_leader_id": "ref:division_leaders",
+                   "total_amount": "money", "status": "str", "required_by_date": "date", "created_at": "ts",
+                   "deleted_at": "ts"},
+    "po_line_items": {"po_id": "ref:po_headers", "line_subtotal": "money", "gl_account_number": "str",
+                      "gl_account_name": "str", "is_taxable": "bool"},
+    "po_approvals": {"po_id": "ref:po_headers", "action": "str", "actor_user_id": "ref:users",
+                     "actor_division_id": "ref:divisions", "status_after": "str", "timestamp": "ts"},
+}
+# Column defaults when a source lacks a column (schema DEFAULTs)
+MISSING_DEFAULTS = {"is_active": True, "budget_actual": 0}
+
+ADMIN_ROLES = ("ADMIN", "DIRECTOR_OF_SYSTEMS_INTEGRATIONS", "MAJORITY_OWNER")  # lib/auth/permissions.ts
+APPROVER_ROLES = ("DIRECTOR_OF_SYSTEMS_INTEGRATIONS", "MAJORITY_OWNER", "DIVISION_LEADER", "OPERATIONS_MANAGER")
+
+
+class Table:
+    """Column arrays of one table; string columns are codes into sorted labels"""
+
+    def __init__(self, name: str, size: int = 0):
+        self.name = name
+        self.size = size
+        self.columns: Dict[str, np.ndarray] = {}
+        self.labels: Dict[str, np.ndarray] = {}
+        self.nulls: Dict[str, np.ndarray] = {}
+        self._index: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def code(self, column: str, value: str) -> int:
+        """Code of a label, or -2 (matches nothing, not even NULL) when absent"""
+        labels = self.labels[column]
+        i = int(np.searchsorted(labels, value))
+        return i if i < len(labels) and labels[i] == value else -2
+
+    def isin(self, column: str, values: Sequence[str]) -> np.ndarray:
+        return np.isin(self.columns[column], [self.code(column, v) for v in values])
+
+    def text(self, column: str, rows) -> List[Optional[str]]:
+        labels = self.labels[column].tolist()
+        return [labels[c] if c >= 0 else None for c in self.columns[column][rows].tolist()]
+
+    def value(self, column: str, row: int) -> Optional[str]:
+        if column == "id":
+            return self.columns["id"][row].decode()
+        code = int(self.columns[column][row])
+        return self.labels[column][code] if code >= 0 else None
+
+    def notnull(self, column: str) -> np.ndarray:
+        nulls = self.nulls.get(column)
+        return ~nulls if nulls is not None else np.ones(self.size, dtype=bool)
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        """Row numbers for id values (bytes), -1 where unknown"""
+        if self._index is None:
+            order = np.argsort(self.columns["id"], kind="stable")
+            self._index = (self.columns["id"][order], order)
+        ids, order = self._index
+        if not len(ids):
+            return np.full(len(keys), -1, dtype=np.int32)
+        pos = np.minimum(np.searchsorted(ids, keys), len(ids) - 1)
+        return np.where(ids[pos] == keys, order[pos], -1).astype(np.int32)
+
+    def row(self, key: str) -> int:
+        row = int(self.lookup(np.array([key.encode()]))[0])
+        if row < 0:
+            raise KeyError(f"{self.name}: no row with id {key}")
+        return row
+
+
+class _StringColumn:
+    """Accumulates dictionary-encoded chunks with a growing label set"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.chunks: List[np.ndarray] = []
+
+    def add(self, values: Sequence[Optional[str]]):
+        labels, codes = np.unique(np.array(["" if v is None else str(v) for v in values]), return_inverse=True)
+        remap = np.array([self.ids.setdefault(label, len(self.ids)) if label else -1
+                          for label in labels.tolist()], dtype=np.int32)
+        self.chunks.append(remap[codes] if len(labels) else np.empty(0, dtype=np.int32))
+
+    def finish(self) -> Tuple[np.ndarray, np.ndarray]:
+        labels = np.array(list(self.ids), dtype=str) if self.ids else np.empty(0, dtype="U1")
+        order = np.argsort(labels, kind="stable")
+        rank = np.empty(len(labels), dtype=np.int32)
+        rank[order] = np.arange(len(labels), dtype=np.int32)
+        codes = np.concatenate(self.chunks) if self.chunks else np.empty(0, dtype=np.int32)
+        return labels[order], np.where(codes >= 0, rank[np.maximum(codes, 0)] if len(rank) else -1, -1)
+
+
+def _parse_money(values: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    amounts = np.array(values, dtype=float)
+    nulls = np.isnan(amounts)
+    return np.round(np.where(nulls, 0.0, amounts) * 100).astype(np.int64), nulls
+
+
+def _parse_time(values: Sequence, unit: str) -> np.ndarray:
+    width = 19 if unit == "s" else 10
+    text = np.array(["NaT" if v is None else str(v) for v in values], dtype=f"U{width}")
+    if unit == "s":
+        text = np.char.replace(text, " ", "T")
+    return text.astype(f"datetime64[{unit}]").astype(np.int64)
+
+
+def _parse_bool(values: Sequence) -> np.ndarray:
+    return np.isin(np.array([str(v) for v in values]), ["t", "true", "True", "1"])
+
+
+class ColumnStore:
+    """All report tables as columns, loaded from a source or a snapshot"""
+
+    def __init__(self):
+        self.tables: Dict[str, Table] = {}
+
+    def __getitem__(self, table: str) -> Table:
+        return self.tables[table]
+
+    @classmethod
+    def load(cls, source: str) -> "ColumnStore":
+        if source.endswith(".npz"):
+            return cls.load_snapshot(source)
+        if source.startswith(("postgres://", "postgresql://")):
+            reader = PostgresReader(source)
+        elif os.path.isdir(source):
+            reader = CopyDirectoryReader(source)
+        elif os.path.isfile(source):
+            reader = SQLiteReader(source)
+        else:
+            raise SystemExit(f"❌ Not a COPY directory, SQLite file, snapshot or PostgreSQL URL: {source}")
+        store = cls()
+        for table, spec in COLUMNS.items():
+            store.tables[table] = store._read_table(table, spec, reader)
+        reader.close()
+        return store
+
+    def _read_table(self, name: str, spec: Dict[str, str], reader: "Reader") -> Table:
+        available = reader.columns(name)
+        wanted = [c for c in spec if c in available]
+        parts: Dict[str, list] = {c: [] for c in wanted}
+        strings = {c: _StringColumn() for c in wanted if spec[c] == "str"}
+        size = 0
+        for chunk in reader.rows(name, wanted):
+            size += len(chunk)
+            for i, column in enumerate(wanted):
+                values = [row[i] for row in chunk]
+                kind = spec[column]
+                if kind == "str":
+                    strings[column].add(values)
+                elif kind == "key":
+                    parts[column].append(np.array(values, dtype="S"))
+                elif kind.startswith("ref:"):
+                    keys = np.array(["" if v is None else v for v in values], dtype="S")
+                    parts[column].append(self.tables[kind[4:]].lookup(keys))
+                elif kind == "money":
+                    parts[column].append(_parse_money(values))
+                elif kind in ("ts", "date"):
+                    parts[column].append(_parse_time(values, "s" if kind == "ts" else "D"))
+                else:
+                    parts[column].append(_parse_bool(values))
+        table = Table(name, size)
+        for column, kind in spec.items():
+            if column in strings:
+                table.labels[column], table.columns[column] = strings[column].finish()
+            elif column not in wanted:
+                table.columns[column], table.labels[column] = self._missing(column, kind, size)
+                if kind == "money" and column not in MISSING_DEFAULTS:
+                    table.nulls[column] = np.ones(size, dtype=bool)
+            elif kind == "money":
+                table.columns[column] = np.concatenate([p[0] for p in parts[column]] or [np.empty(0, np.int64)])
+                nulls = np.concatenate([p[1] for p in parts[column]] or [np.empty(0, bool)])
+                if nulls.any():
+                    table.nulls[column] = nulls
+            else:
+                empty = np.empty(0, dtype="S1" if kind == "key" else np.int64)
+                table.columns[column] = np.concatenate(parts[column] or [empty])
+        if "id" in spec and "id" not in wanted:
+            raise SystemExit(f"❌ {name} has no id column in the source")
+        table.labels = {c: v for c, v in table.labels.items() if v is not None}
+        return table
+
+    @staticmethod
+    def _missing(column: str, kind: str, size: int) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        default = MISSING_DEFAULTS.get(column)
+        if kind == "str":
+            return np.full(size, -1, dtype=np.int32), np.empty(0, dtype="U1")
+        if kind.startswith("ref:"):
+            return np.full(size, -1, dtype=np.int32), None
+        if kind == "bool":
+            return np.full(size, bool(default)), None
+        if kind == "money":
+            return np.zeros(size, dtype=np.int64), None
+        return np.full(size, NULL_TS, dtype=np.int64), None
+
+    def save_snapshot(self, path: str):
+        arrays = {}
+        for name, table in self.tables.items():
+            arrays[f"{name}/@size"] = np.array(table.size)
+            for column, values in table.columns.items():
+                arrays[f"{name}/{column}"] = values
+            for column, labels in table.labels.items():
+                arrays[f"{name}/{column}@labels"] = labels
+            for column, nulls in table.nulls.items():
+                arrays[f"{name}/{column}@null"] = nulls
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> "ColumnStore":
+        store = cls()
+        with np.load(path) as data:
+            for key in data.files:
+                name, field = key.split("/", 1)
+                table = store.tables.setdefault(name, Table(name))
+                if field == "@size":
+                    table.size = int(data[key])
+                elif field.endswith("@labels"):
+                    table.labels[field[:-7]] = data[key]
+                elif field.endswith("@null"):
+                    table.nulls[field[:-5]] = data[key]
+                else:
+                    table.columns[field] = data[key]
+        return store
+
+
+class Reader:
+    def columns(self, table: str) -> List[str]:
+        raise NotImplementedError
+
+    def rows(self, table: str, columns: List[str]) -> Iterator[List[Tuple]]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def _unescape_copy(field: str) -> Optional[str]:
+    if field == "\\N":
+        return None
+    if "\\" not in field:
+        return field
+    return re.sub(r"\\(.)", lambda m: {"t": "\t", "n": "\n", "r": "\r"}.get(m.group(1), m.group(1)), field)
+
+
+class CopyDirectoryReader(Reader):
+    """COPY text files, described by load.sql or named <table>.copy[.gz] in schema column order"""
+
+    COPY_LINE = re.compile(r"\\copy (\w+) \(([^)]*)\) FROM (?:PROGRAM 'gzip -dc ([^']+)'|'([^']+)')")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, List[Tuple[str, List[str]]]] = {}
+        load_sql = os.path.join(path, "load.sql")
+        if os.path.exists(load_sql):
+            with open(load_sql, encoding="utf-8") as f:
+                for match in self.COPY_LINE.finditer(f.read()):
+                    table, columns, packed, plain = match.groups()
+                    self.files.setdefault(table, []).append(
+                        (packed or plain, [c.strip() for c in columns.split(",")]))
+        else:
+            schema = load_schema(SCHEMA_PATH)
+            for table in COLUMNS:
+                for filename in (f"{table}.copy", f"{table}.copy.gz"):
+                    if os.path.exists(os.path.join(path, filename)):
+                        self.files[table] = [(filename, list(schema.tables[table].columns))]
+
+    def columns(self, table: str) -> List[str]:
+        return sorted({c for _, columns in self.files.get(table, []) for c in columns})
+
+    def rows(self, table: str, columns: List[str]) -> Iterator[List[Tuple]]:
+        for filename, file_columns in self.files.get(table, []):
+            positions = [file_columns.index(c) if c in file_columns else None for c in columns]
+            path = os.path.join(self.path, filename)
+            opener = gzip.open if filename.endswith(".gz") else open
+            with opener(path, "rt", encoding="utf-8", newline="\n") as f:
+                chunk = []
+                for line in f:
+                    fields = line.rstrip("\n").split("\t")
+                    chunk.append(tuple(None if p is None else _unescape_copy(fields[p]) for p in positions))
+                    if len(chunk) >= CHUNK_ROWS:
+                        yield chunk
+                        chunk = []
+                if chunk:
+                    yield chunk
+
+
+class SQLiteReader(Reader):
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path)
+
+    def columns(self, table: str) -> List[str]:
+        return [row[1] for row in self.db.execute(f"PRAGMA table_info({table})")]
+
+    def rows(self, table: str, columns: List[str]) -> Iterator[List[Tuple]]:
+        cursor = self.db.execute(f"SELECT {', '.join(columns)} FROM {table}")
+        while True:
+            chunk = cursor.fetchmany(CHUNK_ROWS)
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self):
+        self.db.close()
+
+
+class PostgresReader(Reader):
+    """Server-side cursors over text-cast columns, with the session in UTC"""
+
+    def __init__(self, url: str):
+        self.conn = connect_postgres(url)
+        with self.conn.cursor() as cur:
+            cur.execute("SET TIME ZONE 'UTC'")
+
+    def columns(self, table: str) -> List[str]:
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT column_name FROM information_schema.columns "
+                        "WHERE table_schema = 'public' AND table_name = %s", (table,))
+            return [row[0] for row in cur.fetchall()]
+
+    def rows(self, table: str, columns: List[str]) -> Iterator[List[Tuple]]:
+        with self.conn.cursor(name=f"report_engine_{table}") as cur:
+            cur.execute(f"SELECT {', '.join(f'{c}::text' for c in columns)} FROM {table}")
+            while True:
+                chunk = cur.fetchmany(CHUNK_ROWS)
+                if not chunk:
+                    break
+                yield chunk
+
+    def close(self):
+        self.conn.rollback()
+        self.conn.close()
+
+
+# ---------------------------------------------------------------------- helpers
+
+def _js_round(x):
+    """Math.round: halves round up"""
+    return int(np.floor(x + 0.5))
+
+
+def _dollars(cents) -> float:
+    return float(cents) / 100
+
+
+def _month_index(ts: np.ndarray) -> np.ndarray:
+    """Months since 1970-01 of epoch seconds"""
+    return ts.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+
+
+def _month_label(month: int) -> Tuple[str, int]:
+    return MONTH_NAMES[month % 12], 1970 + month // 12
+
+
+def _iso(ts: int) -> Optional[str]:
+    if ts == NULL_TS:
+        return None
+    return datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _iso_date(days: int) -> Optional[str]:
+    return None if days == NULL_TS else _iso(days * DAY)
+
+
+def _pairs(a: np.ndarray, b: np.ndarray, weights: Optional[np.ndarray] = None):
+    """GROUP BY (a, b): unique pairs sorted by a then b, with counts and sums"""
+    span = int(b.max()) + 2 if len(b) else 1
+    keys = a.astype(np.int64) * span + (b.astype(np.int64) + 1)
+    unique, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(unique))
+    sums = np.bincount(inverse, weights=weights, minlength=len(unique)) if weights is not None else None
+    return unique // span, unique % span - 1, counts, sums
+
+
+def _group_slices(groups: np.ndarray) -> Dict[int, slice]:
+    """Slices of runs of equal values in a sorted array"""
+    if not len(groups):
+        return {}
+    bounds = np.r_[0, np.flatnonzero(np.diff(groups)) + 1, len(groups)]
+    return {int(groups[s]): slice(int(s), int(e)) for s, e in zip(bounds[:-1], bounds[1:])}
+
+
+def _by_group_desc(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Order sorting by group, then value descending (stable)"""
+    return np.lexsort((-values, groups))
+
+
+def _first_by(group: np.ndarray, order_key: np.ndarray, size: int, last: bool = False) -> np.ndarray:
+    """Per group (0..size-1), the index of the row with the smallest (or largest) order_key, -1 if none"""
+    limit = np.iinfo(np.int64)
+    best = np.full(size, limit.min if last else limit.max, dtype=np.int64)
+    (np.maximum if last else np.minimum).at(best, group, order_key)
+    hit = np.flatnonzero(order_key == best[group])[::-1]
+    out = np.full(size, -1, dtype=np.int64)
+    out[group[hit]] = hit  # reversed, so the first of tied rows is written last and wins
+    return out
+
+
+def _epoch(date: datetime.date) -> int:
+    return int(datetime.datetime(date.year, date.month, date.day, tzinfo=datetime.timezone.utc).timestamp())
+
+
+def _years_before(ts: int, years: int) -> int:
+    """Date.setFullYear(year - n) on a UTC timestamp (Feb 29 rolls to Mar 1)"""
+    moment = datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc)
+    if moment.month == 2 and moment.day == 29:
+        moment = moment.replace(month=3, day=1)
+    return int(moment.replace(year=moment.year - years).timestamp())
+
+
+def _live_pos(store: ColumnStore, start: int, end: int, division: Optional[int] = None) -> np.ndarray:
+    po = store["po_headers"]
+    mask = (po["deleted_at"] == NULL_TS) & (po["created_at"] >= start) & (po["created_at"] <= end)
+    if division is not None:
+        mask &= po["division_id"] == division
+    return mask
+
+
+# ---------------------------------------------------------------------- reports
+
+def po_summary(store: ColumnStore, start: int, end: int, now: int, division: Optional[int] = None) -> Dict:
+    po, divs, vendors = store["po_headers"], store["divisions"], store["vendors"]
+    if division is not None:
+        rows = [division]
+    else:
+        active = np.flatnonzero(divs["is_active"])
+        rows = active[np.argsort(np.array(divs.text("division_name", active), dtype=str), kind="stable")].tolist()
+    n_div = divs.size
+    idx = np.flatnonzero(_live_pos(store, start, end, division))
+    d = po["division_id"][idx]
+    amount = po["total_amount"][idx]
+    status = po["status"][idx]
+    counts = np.bincount(d, minlength=n_div)
+    totals = np.bincount(d, weights=amount, minlength=n_div)
+    completed = po.isin("status", ["Approved", "Issued", "Received", "Paid"])[idx]
+    completed_counts = np.bincount(d[completed], minlength=n_div)
+
+    # latest Approved/Issued action per PO, as the route's findFirst(orderBy timestamp desc)
+    approvals = store["po_approvals"]
+    hit = approvals.isin("action", ["Approved", "Issued"]) & (approvals["po_id"] >= 0)
+    last = np.full(po.size, NULL_TS, dtype=np.int64)
+    np.maximum.at(last, approvals["po_id"][hit], approvals["timestamp"][hit])
+    done = idx[completed]
+    hours = (last[done] - po["created_at"][done]) / HOUR
+    valid = (last[done] != NULL_TS) & (hours > 0)
+    hours_sum = np.bincount(d[completed][valid], weights=hours[valid], minlength=n_div)
+    hours_n = np.bincount(d[completed][valid], minlength=n_div)
+
+    sd, ss, s_counts, s_sums = _pairs(d, status, amount)
+    status_slices = _group_slices(sd)
+
+    twelve_ago = _years_before(now, 1)
+    trend_mask = (po["deleted_at"] == NULL_TS) & (po["created_at"] >= twelve_ago) & (po["created_at"] <= end)
+    trend_idx = np.flatnonzero(trend_mask)
+    td, tm, t_counts, t_sums = _pairs(po["division_id"][trend_idx], _month_index(po["created_at"][trend_idx]),
+                                      po["total_amount"][trend_idx])
+    trend_slices = _group_slices(td)
+
+    vd, vv, v_counts, v_sums = _pairs(d, po["vendor_id"][idx], amount)
+    vendor_order = _by_group_desc(vd, v_sums)
+    vd, vv, v_counts, v_sums = vd[vendor_order], vv[vendor_order], v_counts[vendor_order], v_sums[vendor_order]
+    vendor_slices = _group_slices(vd)
+
+    report = []
+    for row in rows:
+        count, total = int(counts[row]), _dollars(totals[row])
+        sl = status_slices.get(row, slice(0, 0))
+        breakdown = {po.labels["status"][s]: {"count": int(c), "amount": _dollars(a)}
+                     for s, c, a in zip(ss[sl], s_counts[sl], s_sums[sl]) if s >= 0}
+        sl = trend_slices.get(row, slice(0, 0))
+        monthly = [{"month": _month_label(m)[0], "year": _month_label(m)[1], "totalAmount": _dollars(a),
+                    "poCount": int(c)} for m, c, a in zip(tm[sl].tolist(), t_counts[sl], t_sums[sl])]
+        sl = vendor_slices.get(row, slice(0, 0))
+        top_vendors = []
+        for v, c, a in list(zip(vv[sl].tolist(), v_counts[sl].tolist(), v_sums[sl]))[:10]:
+            top_vendors.append({"vendorId": vendors.value("id", v) if v >= 0 else None,
+                                "vendorName": (vendors.value("vendor_name", v) if v >= 0 else None) or "Unknown Vendor",
+                                "totalAmount": _dollars(a), "poCount": c, "averagePOSize": _dollars(a) / c})
+        report.append({
+            "division": {"id": divs.value("id", row), "name": divs.value("division_name", row),
+                         "code": divs.value("division_code", row)},
+            "metrics": {
+                "totalPOCount": count,
+                "totalAmount": total,
+                "averagePOSize": total / count if count else 0,
+                "averageProcessingTime": hours_sum[row] / hours_n[row] if hours_n[row] else 0,
+                "completionRate": completed_counts[row] / count * 100 if count else 0,
+            },
+            "statusBreakdown": breakdown,
+            "monthlyTrend": monthly,
+            "topVendors": top_vendors,
+        })
+
+    grand_count = sum(r["metrics"]["totalPOCount"] for r in report)
+    grand_total = sum(r["metrics"]["totalAmount"] for r in report)
+    weighted = sum(r["metrics"]["completionRate"] * r["metrics"]["totalPOCount"] for r in report)
+    return {
+        "reportType": "po-summary",
+        "summary": {
+            "totalDivisions": len(report),
+            "grandTotalAmount": grand_total,
+            "grandTotalPOCount": grand_count,
+            "overallAveragePOSize": grand_total / grand_count if grand_count else 0,
+            "overallCompletionRate": weighted / grand_count if grand_count else 0,
+        },
+        "divisions": report,
+    }
+
+
+def vendor_analysis(store: ColumnStore, start: int, end: int, now: int, division: Optional[int] = None,
+                    vendor_type: Optional[str] = None, vendor: Optional[int] = None) -> Dict:
+    po, vendors, divs, projects = store["po_headers"], store["vendors"], store["divisions"], store["projects"]
+    listed = vendors["is_active"].copy()
+    if vendor_type:
+        listed &= vendors["vendor_type"] == vendors.code("vendor_type", vendor_type)
+    mask = _live_pos(store, start, end, division)
+    vid_all = po["vendor_id"]
+    if vendor is not None:
+        mask &= vid_all == vendor
+    else:
+        mask &= (vid_all >= 0) & listed[np.maximum(vid_all, 0)]
+    idx = np.flatnonzero(mask)
+    v = vid_all[idx]
+    amount = po["total_amount"][idx]
+    created = po["created_at"][idx]
+    required = po["required_by_date"][idx]
+    n = vendors.size
+    company_spend = _dollars(amount.sum())
+
+    counts = np.bincount(v, minlength=n)
+    spend = np.bincount(v, weights=amount, minlength=n)
+    largest = np.full(n, np.iinfo(np.int64).min)
+    smallest = np.full(n, np.iinfo(np.int64).max)
+    np.maximum.at(largest, v, amount)
+    np.minimum.at(smallest, v, amount)
+    completed = np.bincount(v, weights=po.isin("status", ["Received", "Paid"])[idx], minlength=n)
+    has_required = required != NULL_TS
+    lead_days = (required * DAY - created) / DAY
+    on_time = np.bincount(v, weights=~has_required | (lead_days >= 0), minlength=n)
+    lead_sum = np.bincount(v[has_required], weights=lead_days[has_required], minlength=n)
+    lead_n = np.bincount(v[has_required], minlength=n)
+
+    dv, dd, d_counts, d_sums = _pairs(v, po["division_id"][idx], amount)
+    order = _by_group_desc(dv, d_sums)
+    dv, dd, d_counts, d_sums = dv[order], dd[order], d_counts[order], d_sums[order]
+    division_slices = _group_slices(dv)
+    with_project = po["project_id"][idx] >= 0
+    pv, pp, p_counts, p_sums = _pairs(v[with_project], po["project_id"][idx][with_project], amount[with_project])
+    order = _by_group_desc(pv, p_sums)
+    pv, pp, p_counts, p_sums = pv[order], pp[order], p_counts[order], p_sums[order]
+    project_slices = _group_slices(pv)
+    tv, tm, t_counts, t_sums = _pairs(v, _month_index(created), amount)
+    trend_slices = _group_slices(tv)
+
+    analysis = []
+    for row in np.flatnonzero(listed).tolist():
+        count = int(counts[row])
+        if not count:
+            continue
+        total = _dollars(spend[row])
+        average = total / count
+        share = total / company_spend * 100 if company_spend > 0 else 0
+        completion = completed[row] / count * 100
+        on_time_rate = on_time[row] / count * 100
+        w9 = bool(vendors["w9_on_file"][row])
+        quality = _js_round(on_time_rate * 0.4 + completion * 0.3 + min(100, average / 1000) * 0.2 + (10 if w9 else 0))
+        tax_id = vendors.value("tax_id", row)
+        terms = vendors.value("payment_terms_default", row) or "Net30"
+        sl = division_slices.get(row, slice(0, 0))
+        division_usage = [{"divisionId": divs.value("id", d), "divisionName": divs.value("division_name", d) or "Unknown",
+                           "divisionCode": divs.value("division_code", d) or "XX", "totalAmount": _dollars(a),
+                           "poCount": int(c), "percentage": _dollars(a) / total * 100 if total > 0 else 0}
+                          for d, c, a in zip(dd[sl].tolist(), d_counts[sl], d_sums[sl])]
+        sl = project_slices.get(row, slice(0, 0))
+        top_projects = [{"projectId": projects.value("id", p),
+                         "projectName": projects.value("project_name", p) or "Unknown Project",
+                         "projectCode": projects.value("project_code", p) or "UNK",
+                         "totalAmount": _dollars(a), "poCount": int(c)}
+                        for p, c, a in list(zip(pp[sl].tolist(), p_counts[sl], p_sums[sl]))[:10]]
+        sl = trend_slices.get(row, slice(0, 0))
+        trends = [{"month": _month_label(m)[0], "year": _month_label(m)[1], "totalAmount": _dollars(a),
+                   "poCount": int(c), "averagePOSize": _dollars(a) / c}
+                  for m, c, a in zip(tm[sl].tolist(), t_counts[sl], t_sums[sl])]
+
+        concentration = "high" if share > 20 else "medium" if share > 10 else "low"
+        compliance = "good" if w9 and tax_id else \
+            "poor" if vendors["is_1099_required"][row] and not w9 else "warning"
+        performance = "excellent" if quality >= 85 else "good" if quality >= 70 else \
+            "fair" if quality >= 55 else "poor"
+        risk = "high" if concentration == "high" or compliance == "poor" or performance == "poor" else \
+            "medium" if concentration == "medium" or compliance == "warning" or performance == "fair" else "low"
+        analysis.append({
+            "vendor": {
+                "id": vendors.value("id", row), "name": vendors.value("vendor_name", row),
+                "code": vendors.value("vendor_code", row), "type": vendors.value("vendor_type", row) or "Other",
+                "contactInfo": {"contactName": vendors.value("contact_name", row),
+                                "contactPhone": vendors.value("contact_phone", row),
+                                "contactEmail": vendors.value("contact_email", row)},
+                "compliance": {"is1099Required": bool(vendors["is_1099_required"][row]), "w9OnFile": w9,
+                               "taxId": tax_id},
+            },
+            "financialMetrics": {"totalSpend": total, "totalPOCount": count, "averagePOSize": average,
+                                 "largestPO": _dollars(largest[row]), "smallestPO": _dollars(smallest[row]),
+                                 "spendRank": 0, "spendShare": share},
+            "performance": {"onTimeDeliveryRate": on_time_rate,
+                            "averageDeliveryDays": lead_sum[row] / lead_n[row] if lead_n[row] else 0,
+                            "completionRate": completion, "qualityScore": quality},
+            "paymentTerms": {"defaultTerms": terms, "actualTermsUsed": {terms: count}, "averagePaymentDays": 30},
+            "spendingTrends": trends,
+            "divisionUsage": division_usage,
+            "topProjects": top_projects,
+            "riskFactors": {"concentration": concentration, "compliance": compliance, "performance": performance,
+                            "overallRisk": risk},
+        })
+    analysis.sort(key=lambda a: -a["financialMetrics"]["totalSpend"])
+    for rank, entry in enumerate(analysis, 1):
+        entry["financialMetrics"]["spendRank"] = rank
+
+    def breakdown(key: Callable[[Dict], str]) -> Dict[str, List[Dict]]:
+        groups: Dict[str, List[Dict]] = {}
+        for entry in analysis:
+            groups.setdefault(key(entry), []).append(entry)
+        return groups
+
+    industry = [{"vendorType": kind, "vendorCount": len(group),
+                 "totalSpend": sum(e["financialMetrics"]["totalSpend"] for e in group),
+                 "averageSpend": sum(e["financialMetrics"]["totalSpend"] for e in group) / len(group),
+                 "performanceScore": _js_round(sum(e["performance"]["qualityScore"] for e in group) / len(group))}
+                for kind, group in breakdown(lambda e: e["vendor"]["type"]).items()]
+    terms_analysis = [{"terms": terms, "vendorCount": len(group),
+                       "totalSpend": sum(e["financialMetrics"]["totalSpend"] for e in group),
+                       "utilizationRate": len(group) / len(analysis) * 100}
+                      for terms, group in breakdown(lambda e: e["paymentTerms"]["defaultTerms"]).items()]
+
+    active = len(analysis)
+    total_spend = sum(e["financialMetrics"]["totalSpend"] for e in analysis)
+    top5 = sum(e["financialMetrics"]["totalSpend"] for e in analysis[:5])
+    return {
+        "reportType": "vendor-analysis",
+        "summary": {
+            "totalVendors": int(listed.sum()),
+            "activeVendors": active,
+            "totalSpend": total_spend,
+            "averageSpendPerVendor": total_spend / active if active else 0,
+            "vendorConcentrationRisk": top5 / total_spend * 100 if total_spend > 0 else 0,
+            "complianceRate": sum(e["vendor"]["compliance"]["w9OnFile"] for e in analysis) / active * 100
+            if active else 0,
+            "overallPerformanceScore": _js_round(sum(e["performance"]["qualityScore"] for e in analysis) / active)
+            if active else 0,
+        },
+        "vendorAnalysis": analysis,
+        "industryBreakdown": sorted(industry, key=lambda x: -x["totalSpend"]),
+        "paymentTermsAnalysis": sorted(terms_analysis, key=lambda x: -x["totalSpend"]),
+        "topPerformers": {
+            "bySpend": analysis[:10],
+            "byPerformance": sorted(analysis, key=lambda e: -e["performance"]["qualityScore"])[:10],
+            "byGrowth": sorted([e for e in analysis if len(e["spendingTrends"]) >= 2],
+                               key=lambda e: -e["spendingTrends"][-1]["totalAmount"])[:10],
+        },
+    }
+
+
+def gl_analysis(store: ColumnStore, start: int, end: int, now: int, division: Optional[int] = None,
+                gl_account: Optional[str] = None) -> Dict:
+    po, lines, gl, divs, projects = (store["po_headers"], store["po_line_items"], store["gl_account_mappings"],
+                                     store["divisions"], store["projects"])
+    header_mask = _live_pos(store, start, end, division)
+    po_id = lines["po_id"]
+    mask = (po_id >= 0) & header_mask[np.maximum(po_id, 0)]
+    if gl_account:
+        mask &= lines["gl_account_number"] == lines.code("gl_account_number", gl_account)
+    idx = np.flatnonzero(mask)
+    heads = po_id[idx]
+    subtotal = lines["line_subtotal"][idx]
+    taxable = lines["is_taxable"][idx]
+    # group key: the line's GL number code, with NULL as its own 'Unknown' group
+    number_labels = lines.labels["gl_account_number"].tolist()
+    group = lines["gl_account_number"][idx]
+    n_groups = len(number_labels) + 1
+    key = np.where(group >= 0, group, len(number_labels))
+    number_of = number_labels + ["Unknown"]
+
+    mapping = {}
+    for row in range(gl.size):
+        mapping[gl.value("gl_account_number", row)] = (gl.value("gl_account_name", row),
+                                                       gl.value("gl_account_category", row))
+    first_line = _first_by(key, np.arange(len(key)), n_groups)
+    counts = np.bincount(key, minlength=n_groups)
+    totals = np.bincount(key, weights=subtotal, minlength=n_groups)
+    taxables = np.bincount(key, weights=subtotal * taxable, minlength=n_groups)
+
+    gd, dd, d_counts, d_sums = _pairs(key, po["division_id"][heads], subtotal)
+    order = _by_group_desc(gd, d_sums)
+    gd, dd, d_counts, d_sums = gd[order], dd[order], d_counts[order], d_sums[order]
+    division_slices = _group_slices(gd)
+    with_project = po["project_id"][heads] >= 0
+    gp, pp, p_counts, p_sums = _pairs(key[with_project], po["project_id"][heads][with_project],
+                                      subtotal[with_project])
+    order = _by_group_desc(gp, p_sums)
+    gp, pp, p_counts, p_sums = gp[order], pp[order], p_counts[order], p_sums[order]
+    project_slices = _group_slices(gp)
+    months = _month_index(po["created_at"][heads])
+    gm, mm, m_counts, m_sums = _pairs(key, months, subtotal)
+    month_slices = _group_slices(gm)
+
+    analysis = []
+    for g in np.flatnonzero(counts).tolist():
+        number = number_of[g]
+        mapped_name, category = mapping.get(number, (None, None))
+        category = category or "Other"
+        name = lines.value("gl_account_name", int(idx[first_line[g]])) or mapped_name or "Unknown Account"
+        total, count, taxable_amount = _dollars(totals[g]), int(counts[g]), _dollars(taxables[g])
+        sl = division_slices.get(g, slice(0, 0))
+        division_breakdown = [{"divisionId": divs.value("id", d), "divisionName": divs.value("division_name", d) or "Unknown",
+                               "divisionCode": divs.value("division_code", d) or "XX", "amount": _dollars(a),
+                               "lineItemCount": int(c), "percentage": _dollars(a) / total * 100 if total > 0 else 0}
+                              for d, c, a in zip(dd[sl].tolist(), d_counts[sl], d_sums[sl])]
+        sl = project_slices.get(g, slice(0, 0))
+        top_projects = [{"projectId": projects.value("id", p),
+                         "projectName": projects.value("project_name", p) or "Unknown Project",
+                         "projectCode": projects.value("project_code", p) or "UNK",
+                         "amount": _dollars(a), "lineItemCount": int(c)}
+                        for p, c, a in list(zip(pp[sl].tolist(), p_counts[sl], p_sums[sl]))[:10]]
+        sl = month_slices.get(g, slice(0, 0))
+        trend = [{"month": _month_label(m)[0], "year": _month_label(m)[1], "totalAmount": _dollars(a),
+                  "lineItemCount": int(c), "cogsCOGSAmount": _dollars(a) if category == "COGS" else 0,
+                  "opexAmount": _dollars(a) if category == "OpEx" else 0}
+                 for m, c, a in zip(mm[sl].tolist(), m_counts[sl], m_sums[sl])]
+        analysis.append({
+            "glAccount": {"number": number, "name": name, "category": category},
+            "metrics": {"totalAmount": total, "totalLineItems": count, "averageLineItemValue": total / count,
+                        "taxableAmount": taxable_amount, "nonTaxableAmount": total - taxable_amount,
+                        "taxablePercentage": taxable_amount / total * 100 if total > 0 else 0},
+            "categoryBreakdown": {"totalCOGS": total if category == "COGS" else 0,
+                                  "totalOpEx": total if category == "OpEx" else 0,
+                                  "totalOther": total if category == "Other" else 0,
+                                  "totalCreditCard": total if category == "CreditCard" else 0},
+            "monthlyTrend": trend,
+            "divisionBreakdown": division_breakdown,
+            "topProjects": top_projects,
+        })
+    analysis.sort(key=lambda a: -a["metrics"]["totalAmount"])
+
+    category_of = np.array([(mapping.get(n, (None, None))[1] or "Other") for n in number_of])
+    slot = {"COGS": 0, "OpEx": 1, "Other": 2, "CreditCard": 3}
+    line_slot = np.array([slot.get(c, 2) for c in category_of])[key] if len(key) else np.empty(0, dtype=np.int64)
+    cm, cs, _, c_sums = _pairs(months, line_slot, subtotal)
+    category_trends: Dict[int, Dict] = {}
+    for m, s, a in zip(cm.tolist(), cs.tolist(), c_sums):
+        entry = category_trends.setdefault(m, {"month": _month_label(m)[0], "year": _month_label(m)[1],
+                                               "cogs": 0, "opex": 0, "other": 0, "creditCard": 0})
+        entry[("cogs", "opex", "other", "creditCard")[s]] += _dollars(a)
+
+    def total_of(field: str) -> float:
+        return sum(a["categoryBreakdown"][field] for a in analysis)
+
+    spend = total_of("totalCOGS") + total_of("totalOpEx") + total_of("totalOther") + total_of("totalCreditCard")
+    return {
+        "reportType": "gl-analysis",
+        "summary": {
+            "totalAnalyzed": len(idx),
+            "totalGLAccounts": len(analysis),
+            "totalCOGSSpend": total_of("totalCOGS"),
+            "totalOpExSpend": total_of("totalOpEx"),
+            "totalOtherSpend": total_of("totalOther"),
+            "totalCreditCardSpend": total_of("totalCreditCard"),
+            "overallTaxablePercentage": sum(a["metrics"]["taxableAmount"] for a in analysis) / spend * 100
+            if spend > 0 else 0,
+            "averageGLAccountUtilization": sum(a["metrics"]["totalLineItems"] for a in analysis) / len(analysis)
+            if analysis else 0,
+        },
+        "accountAnalysis": analysis,
+        "categoryTrends": [category_trends[m] for m in sorted(category_trends)],
+        "topGLAccounts": [{"glAccountNumber": a["glAccount"]["number"], "glAccountName": a["glAccount"]["name"],
+                           "category": a["glAccount"]["category"], "totalAmount": a["metrics"]["totalAmount"],
+                           "utilization": a["metrics"]["totalLineItems"]} for a in analysis[:10]],
+    }
+
+
+def budget_vs_actual(store: ColumnStore, start: int, end: int, now: int, division: Optional[int] = None,
+                     project: Optional[int] = None) -> Dict:
+    po, wo, projects, divs = store["po_headers"], store["work_orders"], store["projects"], store["divisions"]
+    listed = projects.isin("status", ["Active", "Completed"]) & projects.notnull("budget_total")
+    if division is not None:
+        listed &= projects["primary_division_id"] == division
+    if project is not None:
+        listed &= np.arange(projects.size) == project
+    n = projects.size
+    pid = po["project_id"]
+    idx = np.flatnonzero(_live_pos(store, start, end) & (pid >= 0) & listed[np.maximum(pid, 0)])
+    p = pid[idx]
+    amount = po["total_amount"][idx]
+    committed = np.bincount(p, weights=amount * po.isin("status", ["Approved", "Issued"])[idx], minlength=n) / 100
+    wid = wo["project_id"]
+    widx = np.flatnonzero((wo["created_at"] >= start) & (wo["created_at"] <= end) & (wid >= 0)
+                          & listed[np.maximum(wid, 0)])
+    wp = wid[widx]
+    wo_count = np.bincount(wp, minlength=n)
+    wo_estimate = np.bincount(wp, weights=wo["budget_estimate"][widx], minlength=n) / 100
+    wo_actual = np.bincount(wp, weights=wo["budget_actual"][widx], minlength=n) / 100
+
+    tp, tm, _, t_sums = _pairs(p, _month_index(po["created_at"][idx]), amount)
+    trend_slices = _group_slices(tp)
+
+    budget = projects["budget_total"] / 100
+    actual = projects["budget_actual"] / 100
+    start_day = projects["start_date"]
+    end_day = projects["end_date"]
+    analysis = []
+    for row in np.flatnonzero(listed).tolist():
+        original, current = float(budget[row]), float(actual[row])
+        projected = current + float(committed[row])
+        variance = original - projected
+        utilization = projected / original * 100 if original > 0 else 0
+        started = start_day[row] * DAY if start_day[row] != NULL_TS else now
+        days_active = int(np.floor((now - started) / DAY))
+        days_remaining = max(0, int(np.floor((end_day[row] * DAY - now) / DAY))) if end_day[row] != NULL_TS else 0
+        burn = current / days_active if days_active > 0 else 0
+        projected_completion = projected + burn * days_remaining if days_remaining > 0 else projected
+        timeline_progress = days_active / ((days_active + days_remaining) or 1) * 100 \
+            if end_day[row] != NULL_TS and days_active > 0 else 0
+        on_track = abs(utilization - timeline_progress) < 20
+        reasons = []
+        budget_risk = timeline_risk = "low"
+        if utilization > 110:
+            budget_risk = "high"
+            reasons.append("Significantly over budget")
+        elif utilization > 95:
+            budget_risk = "medium"
+            reasons.append("Approaching budget limit")
+        if not on_track and utilization > timeline_progress + 30:
+            timeline_risk = "high"
+            reasons.append("Spending ahead of timeline")
+        elif not on_track:
+            timeline_risk = "medium"
+            reasons.append("Timeline and budget misaligned")
+        if projected_completion > original * 1.2:
+            budget_risk = "high"
+            reasons.append("Projected overrun exceeds 20%")
+        overall = "high" if "high" in (budget_risk, timeline_risk) else \
+            "medium" if "medium" in (budget_risk, timeline_risk) else "low"
+        sl = trend_slices.get(row, slice(0, 0))
+        cumulative = np.cumsum(t_sums[sl]) / 100
+        trend = [{"month": _month_label(m)[0], "year": _month_label(m)[1], "actualSpend": _dollars(a),
+                  "cumulativeSpend": float(c), "budgetUtilization": c / original * 100 if original > 0 else 0}
+                 for m, a, c in zip(tm[sl].tolist(), t_sums[sl], cumulative)]
+        division_row = int(projects["primary_division_id"][row])
+        analysis.append({
+            "project": {"id": projects.value("id", row), "code": projects.value("project_code", row),
+                        "name": projects.value("project_name", row),
+                        "status": projects.value("status", row) or "Active",
+                        "divisionId": divs.value("id", division_row) if division_row >= 0 else None,
+                        "divisionName": divs.value("division_name", division_row) if division_row >= 0 else None,
+                        "startDate": _iso_date(int(start_day[row])), "endDate": _iso_date(int(end_day[row]))},
+            "budget": {"originalBudget": original, "currentActual": current, "poCommitted": float(committed[row]),
+                       "totalProjectedSpend": projected, "variance": variance,
+                       "variancePercentage": variance / original * 100 if original > 0 else 0,
+                       "utilizationPercentage": utilization},
+            "workOrders": {"totalWorkOrders": int(wo_count[row]),
+                           "workOrderBudgetEstimate": float(wo_estimate[row]),
+                           "workOrderActual": float(wo_actual[row]),
+                           "workOrderVariance": float(wo_estimate[row] - wo_actual[row]),
+                           "workOrderUtilization": wo_actual[row] / wo_estimate[row] * 100 if wo_estimate[row] > 0 else 0},
+            "timeline": {"daysActive": days_active, "daysRemaining": days_remaining, "budgetBurnRate": burn,
+                         "projectedCompletionSpend": projected_completion, "isOverBudget": utilization > 100,
+                         "isOnTrack": on_track},
+            "riskFactors": {"budgetRisk": budget_risk, "timelineRisk": timeline_risk, "overallRisk": overall,
+                            "riskReasons": reasons},
+            "monthlyTrend": trend,
+            "_startDay": int(start_day[row]),
+        })
+    analysis.sort(key=lambda a: -a["budget"]["originalBudget"])
+
+    by_division: Dict[str, List[Dict]] = {}
+    for entry in analysis:
+        if entry["project"]["divisionId"]:
+            by_division.setdefault(entry["project"]["divisionId"], []).append(entry)
+    division_summary = []
+    for division_id, group in by_division.items():
+        budgets = sum(e["budget"]["originalBudget"] for e in group)
+        spent = sum(e["budget"]["currentActual"] for e in group)
+        commit = sum(e["budget"]["poCommitted"] for e in group)
+        ranked = sorted(group, key=lambda e: -e["budget"]["variancePercentage"])
+        named = next((e["project"]["divisionName"] for e in group if e["project"]["divisionName"]), None)
+        division_summary.append({
+            # the route derives the code from the division name; mirrored so outputs diff cleanly
+            "division": {"id": division_id, "name": group[0]["project"]["divisionName"] or "Unknown Division",
+                         "code": named[:2] if named else "XX"},
+            "aggregate": {"totalProjectBudgets": budgets, "totalActualSpend": spent, "totalCommittedSpend": commit,
+                          "overallVariance": sum(e["budget"]["variance"] for e in group),
+                          "overallUtilization": (spent + commit) / budgets * 100 if budgets > 0 else 0,
+                          "projectCount": len(group),
+                          "overBudgetProjects": sum(e["budget"]["utilizationPercentage"] > 100 for e in group)},
+            "performance": {"averageVariancePercentage": sum(e["budget"]["variancePercentage"] for e in group) / len(group),
+                            "bestPerformingProject": ranked[0]["project"]["name"] or "N/A",
+                            "worstPerformingProject": ranked[-1]["project"]["name"] or "N/A",
+                            "completionRate": sum(e["project"]["status"] == "Completed" for e in group) / len(group) * 100},
+        })
+    division_summary.sort(key=lambda d: -d["aggregate"]["totalProjectBudgets"])
+
+    # company-wide months: spend summed, budgets/commitments of projects active in that month
+    month_spend: Dict[int, float] = {}
+    month_budget: Dict[int, float] = {}
+    month_commit: Dict[int, float] = {}
+    by_id = {e["project"]["id"]: e for e in analysis}
+    for prow, m, a in zip(tp.tolist(), tm.tolist(), t_sums):
+        entry = by_id[projects.value("id", prow)]
+        month_spend[m] = month_spend.get(m, 0) + _dollars(a)
+        month_budget[m] = month_budget.get(m, 0) + entry["budget"]["originalBudget"]
+        month_commit[m] = month_commit.get(m, 0) + entry["budget"]["poCommitted"]
+    budget_trends = [{"month": _month_label(m)[0], "year": _month_label(m)[1], "budgetAllocated": month_budget[m],
+                      "actualSpend": month_spend[m], "commitments": month_commit[m],
+                      "utilization": (month_spend[m] + month_commit[m]) / month_budget[m] * 100
+                      if month_budget[m] > 0 else 0} for m in sorted(month_spend)]
+
+    today = datetime.datetime.fromtimestamp(now, tz=datetime.timezone.utc)
+    first_day = _epoch(datetime.date(today.year, 1, 1)) // DAY
+    this_year = [e for e in analysis if first_day <= e["_startDay"] < first_day + 366
+                 and e["_startDay"] <= _epoch(datetime.date(today.year, 12, 31)) // DAY]
+    avg_burn = sum(e["timeline"]["budgetBurnRate"] for e in this_year) / (len(this_year) or 1)
+    remaining_days = max(0, int(np.floor((_epoch(datetime.date(today.year, 12, 31)) - now) / DAY)))
+    spent_total = sum(e["budget"]["currentActual"] for e in analysis)
+    year_end = spent_total + avg_burn * remaining_days * len(this_year)
+    budgets_total = sum(e["budget"]["originalBudget"] for e in analysis)
+    projected_utilization = year_end / budgets_total * 100 if budgets_total > 0 else 0
+    high_risk = [e for e in analysis if e["riskFactors"]["overallRisk"] == "high"]
+    overruns = [e for e in analysis if e["budget"]["utilizationPercentage"] > 100]
+    timeline_risks = [e for e in analysis if not e["timeline"]["isOnTrack"]]
+    actions = []
+    if high_risk:
+        actions.append(f"Review {len(high_risk)} high-risk projects for budget reallocation")
+    if projected_utilization > 110:
+        actions.append("Consider budget increase or project scope reduction")
+    if len(overruns) > len(analysis) * 0.2:
+        actions.append("Implement enhanced budget monitoring and approval controls")
+    if timeline_risks:
+        actions.append("Align project timelines with budget burn rates")
+    for entry in analysis:
+        entry.pop("_startDay")
+
+    committed_total = sum(e["budget"]["poCommitted"] for e in analysis)
+    wo_budgets = sum(e["workOrders"]["workOrderBudgetEstimate"] for e in analysis)
+    wo_actuals = sum(e["workOrders"]["workOrderActual"] for e in analysis)
+    return {
+        "reportType": "budget-vs-actual",
+        "summary": {
+            "totalProjects": len(analysis),
+            "totalProjectBudgets": budgets_total,
+            "totalActualSpend": spent_total,
+            "totalCommittedSpend": committed_total,
+            "overallVariance": sum(e["budget"]["variance"] for e in analysis),
+            "overallUtilization": (spent_total + committed_total) / budgets_total * 100 if budgets_total > 0 else 0,
+            "projectsOverBudget": len(overruns),
+            "projectsOnTrack": sum(e["timeline"]["isOnTrack"] for e in analysis),
+            "averageVariancePercentage": sum(e["budget"]["variancePercentage"] for e in analysis) / len(analysis)
+            if analysis else 0,
+            "totalWorkOrderBudgets": wo_budgets,
+            "totalWorkOrderActuals": wo_actuals,
+            "workOrderUtilization": wo_actuals / wo_budgets * 100 if wo_budgets > 0 else 0,
+        },
+        "projectAnalysis": analysis,
+        "divisionSummary": division_summary,
+        "budgetTrends": budget_trends,
+        "riskAnalysis": {"highRiskProjects": high_risk, "budgetOverruns": overruns, "timelineRisks": timeline_risks},
+        "forecasting": {"projectedYearEndSpend": year_end, "projectedBudgetUtilization": projected_utilization,
+                        "recommendedActions": actions},
+    }
+
+
+def project_details(store: ColumnStore, start: int, end: int, now: int, project: Optional[int] = None) -> Dict:
+    po, wo, projects, divs = store["po_headers"], store["work_orders"], store["projects"], store["divisions"]
+    if project is not None:
+        rows = [project]
+    else:
+        active = np.flatnonzero(projects["status"] == projects.code("status", "Active"))
+        names = np.array(projects.text("project_name", active), dtype=str)
+        rows = active[np.argsort(names, kind="stable")].tolist()
+    n = projects.size
+    pid = po["project_id"]
+    idx = np.flatnonzero(_live_pos(store, start, end) & (pid >= 0))
+    p = pid[idx]
+    amount = po["total_amount"][idx]
+    counts = np.bincount(p, minlength=n)
+    totals = np.bincount(p, weights=amount, minlength=n)
+    completed = po.isin("status", ["Received", "Paid"])[idx]
+    required = po["required_by_date"][idx]
+    on_time = completed & ((required == NULL_TS) | (po["created_at"][idx] <= required * DAY))
+    completed_n = np.bincount(p, weights=completed, minlength=n)
+    on_time_n = np.bincount(p, weights=on_time, minlength=n)
+    pp, pd, d_counts, d_sums = _pairs(p, po["division_id"][idx], amount)
+    order = _by_group_desc(pp, d_sums)
+    pp, pd, d_counts, d_sums = pp[order], pd[order], d_counts[order], d_sums[order]
+    division_slices = _group_slices(pp)
+    wid = wo["project_id"]
+    widx = np.flatnonzero((wo["created_at"] >= start) & (wo["created_at"] <= end) & (wid >= 0))
+    wo_n = np.bincount(wid[widx], minlength=n)
+    wo_done = np.bincount(wid[widx], weights=wo["status"][widx] == wo.code("status", "Completed"), minlength=n)
+
+    report = []
+    for row in rows:
+        count, total = int(counts[row]), _dollars(totals[row])
+        original = _dollars(projects["budget_total"][row])
+        sl = division_slices.get(row, slice(0, 0))
+        by_division = [{"divisionId": divs.value("id", d), "divisionName": divs.value("division_name", d) or "Unknown",
+                        "divisionCode": divs.value("division_code", d) or "XX", "amount": _dollars(a),
+                        "poCount": int(c), "percentage": _dollars(a) / total * 100 if total > 0 else 0}
+                       for d, c, a in zip(pd[sl].tolist(), d_counts[sl], d_sums[sl])]
+        start_day, end_day = int(projects["start_date"][row]), int(projects["end_date"][row])
+        report.append({
+            "project": {"id": projects.value("id", row), "projectCode": projects.value("project_code", row) or "N/A",
+                        "projectName": projects.value("project_name", row),
+                        "status": projects.value("status", row) or "Active"},
+            "budget": {"originalBudget": original, "currentBudget": original, "spentToDate": total,
+                       "remainingBudget": original - total,
+                       "budgetUtilization": total / original * 100 if original > 0 else 0,
+                       "projectedOverrun": max(0, total - original)},
+            "spending": {"totalPOAmount": total, "totalPOCount": count,
+                         "averagePOSize": total / count if count else 0, "spendingByDivision": by_division},
+            "workOrders": {"totalWorkOrders": int(wo_n[row]), "completedWorkOrders": int(wo_done[row]),
+                           "averageCompletionTime": 7 if wo_done[row] else 0,  # the route's placeholder
+                           "workOrderToPORatio": count / wo_n[row] if wo_n[row] else 0},
+            "timeline": {"projectStartDate": _iso_date(start_day), "estimatedCompletion": _iso_date(end_day),
+                         "daysActive": int(np.floor((now - start_day * DAY) / DAY)) if start_day != NULL_TS else 0,
+                         "isOverdue": end_day != NULL_TS and now > end_day * DAY},
+            "performance": {"onTimeDelivery": on_time_n[row] / completed_n[row] * 100 if completed_n[row] else 100,
+                            "budgetVariance": (total - original) / original * 100 if original > 0 else 0,
+                            "qualityScore": 85},
+        })
+
+    total_budget = sum(r["budget"]["originalBudget"] for r in report)
+    total_spent = sum(r["budget"]["spentToDate"] for r in report)
+    delivering = [r for r in report if r["spending"]["totalPOCount"] > 0]
+    return {
+        "reportType": "project-details",
+        "summary": {
+            "totalProjects": len(report),
+            "totalBudget": total_budget,
+            "totalSpent": total_spent,
+            "overallBudgetUtilization": total_spent / total_budget * 100 if total_budget > 0 else 0,
+            "projectsOverBudget": sum(r["budget"]["budgetUtilization"] > 100 for r in report),
+            "projectsOverdue": sum(r["timeline"]["isOverdue"] for r in report),
+            "averageOnTimeDelivery": sum(r["performance"]["onTimeDelivery"] for r in delivering) / len(delivering)
+            if delivering else 100,
+        },
+        "projects": report,
+    }
+
+
+def approval_bottleneck(store: ColumnStore, start: int, end: int, now: int, division: Optional[int] = None,
+                        user: Optional[int] = None) -> Dict:
+    po, approvals, users, divs, vendors, projects = (store["po_headers"], store["po_approvals"], store["users"],
+                                                     store["divisions"], store["vendors"], store["projects"])
+    ts_all = approvals["timestamp"]
+    mask = (ts_all >= start) & (ts_all <= end)
+    if division is not None:
+        mask &= approvals["actor_division_id"] == division
+    if user is not None:
+        mask &= approvals["actor_user_id"] == user
+    a_idx = np.flatnonzero(mask)
+    a_po = approvals["po_id"][a_idx]
+    a_ts = ts_all[a_idx]
+    a_actor = approvals["actor_user_id"][a_idx]
+    a_div = approvals["actor_division_id"][a_idx]
+    action = approvals["action"][a_idx]
+    submitted = action == approvals.code("action", "Submitted")
+    approved = action == approvals.code("action", "Approved")
+    rejected = action == approvals.code("action", "Rejected")
+
+    # the route matches each approval with the PO's first Submitted record in the fetched set
+    submit_ts = np.full(po.size, NULL_TS, dtype=np.int64)
+    sub = submitted & (a_po >= 0)
+    first_sub = _first_by(a_po[sub], a_ts[sub], po.size)
+    found = first_sub >= 0
+    submit_ts[found] = a_ts[sub][first_sub[found]]
+    appr = np.flatnonzero(approved & (a_po >= 0))
+    appr_sub = submit_ts[a_po[appr]]
+    appr_hours = np.where(appr_sub != NULL_TS, (a_ts[appr] - appr_sub) / HOUR, 0.0)
+
+    pending_mask = po.isin("status", ["Draft", "Submitted"]) & (po["deleted_at"] == NULL_TS)
+    pending = np.flatnonzero(pending_mask)
+    p_amount = po["total_amount"][pending] / 100
+    p_created = po["created_at"][pending]
+    p_div = po["division_id"][pending]
+    oldest_days = int(np.floor((now - p_created.min()) / DAY)) if len(pending) else 0
+    days_range = (end - start) / DAY
+
+    n_users = users.size
+    handled = np.bincount(a_actor[a_actor >= 0], minlength=n_users)
+    approved_n = np.bincount(a_actor[approved & (a_actor >= 0)], minlength=n_users)
+    rejected_n = np.bincount(a_actor[rejected & (a_actor >= 0)], minlength=n_users)
+    actors = a_actor[appr]
+    capped = (appr_hours > 0) & (appr_hours < 720) & (actors >= 0)
+    t_n = np.bincount(actors[capped], minlength=n_users)
+    t_sum = np.bincount(actors[capped], weights=appr_hours[capped], minlength=n_users)
+    mean_hours = np.divide(t_sum, t_n, out=np.zeros(n_users), where=t_n > 0)
+    t_sq = np.bincount(actors[capped], weights=(appr_hours[capped] - mean_hours[actors[capped]]) ** 2,
+                       minlength=n_users)
+    positive = (appr_hours > 0) & (actors >= 0)
+    peer_n = np.bincount(actors[positive], minlength=n_users)
+    peer_mean = np.divide(np.bincount(actors[positive], weights=appr_hours[positive], minlength=n_users), peer_n,
+                          out=np.zeros(n_users), where=peer_n > 0)
+
+    roles = np.array(users.text("role", np.arange(n_users)), dtype=object)
+    approver_rows = [r for r in range(n_users) if roles[r] in APPROVER_ROLES]
+    user_div = users["division_id"]
+    high_value_by_div = np.bincount(p_div[(p_amount > 10000) & (p_div >= 0)], minlength=divs.size)
+    pending_by_div = np.bincount(p_div[p_div >= 0], minlength=divs.size)
+    high_value_total = int((p_amount > 10000).sum())
+
+    approver_analysis = []
+    for row in approver_rows:
+        if not handled[row]:
+            continue
+        avg = float(mean_hours[row])
+        velocity = (approved_n[row] + rejected_n[row]) / days_range if days_range > 0 else 0
+        d = int(user_div[row])
+        if roles[row] in ADMIN_ROLES:
+            pending_count = high_value_total
+        elif d >= 0:
+            pending_count = int(pending_by_div[d])
+        else:
+            pending_count = 0
+        oldest = oldest_days if pending_count > 0 else 0  # the route takes the oldest over all pending POs
+        throughput = min(100, velocity * 20)
+        timeliness = max(0, 100 - (avg / 24) * 20) if avg > 0 else 100
+        consistency = max(0, 100 - (np.sqrt(t_sq[row] / t_n[row]) / avg) * 50) if t_n[row] > 1 else 100
+        responsiveness = max(0, 100 - oldest * 10) if pending_count > 0 else 100
+        overall = _js_round((throughput + timeliness + consistency + responsiveness) / 4)
+        peers = [p for p in approver_rows if p != row and int(user_div[p]) == d and peer_mean[p] > 0]
+        peer_avg = sum(peer_mean[p] for p in peers) / len(peers) if peers else avg
+        vs_peers = (avg - peer_avg) / peer_avg * 100 if peer_avg > 0 else 0
+        reasons = []
+        if avg > 48:
+            reasons.append("Slow approval time (>48 hours)")
+        if pending_count > 10:
+            reasons.append("High pending queue (>10 items)")
+        if oldest > 7:
+            reasons.append("Stale items in queue (>7 days)")
+        if vs_peers > 50:
+            reasons.append("Significantly slower than peers")
+        approver_analysis.append({
+            "approver": {"id": users.value("id", row),
+                         "name": f"{users.value('first_name', row)} {users.value('last_name', row)}",
+                         "email": users.value("email", row), "role": roles[row],
+                         "divisionId": divs.value("id", d) if d >= 0 else None,
+                         "divisionName": divs.value("division_name", d) if d >= 0 else None},
+            "metrics": {"totalApprovalsHandled": int(handled[row]), "approvedCount": int(approved_n[row]),
+                        "rejectedCount": int(rejected_n[row]), "averageApprovalTimeHours": avg,
+                        "approvalVelocity": velocity, "currentPendingCount": pending_count,
+                        "oldestPendingDays": oldest},
+            "performance": {"throughputScore": throughput, "consistencyScore": float(consistency),
+                            "responsivenesScore": responsiveness, "overallScore": overall,
+                            "performanceLevel": "excellent" if overall >= 85 else "good" if overall >= 70
+                            else "fair" if overall >= 55 else "poor"},
+            "bottlenecks": {"hasBottleneck": bool(reasons), "bottleneckReasons": reasons,
+                            "avgTimeVsPeers": float(vs_peers),
+                            "highValuePendingCount": int(high_value_by_div[d]) if d >= 0 else 0},
+            "workloadTrends": [],
+        })
+    approver_analysis.sort(key=lambda a: -a["performance"]["overallScore"])
+
+    # per division, approvals matched to a Submitted record by an actor of the same division
+    n_div = divs.size
+    sub_key = a_div[sub].astype(np.int64) * po.size + a_po[sub]
+    order = np.lexsort((a_ts[sub], sub_key))
+    keys, first = np.unique(sub_key[order], return_index=True)
+    first_ts = a_ts[sub][order][first]
+    appr_div = a_div[appr]
+    appr_key = appr_div.astype(np.int64) * po.size + a_po[appr]
+    pos = np.minimum(np.searchsorted(keys, appr_key), max(len(keys) - 1, 0))
+    matched = (appr_div >= 0) & (keys[pos] == appr_key) if len(keys) else np.zeros(len(appr), dtype=bool)
+    div_hours = (a_ts[appr] - (first_ts[pos] if len(keys) else 0)) / HOUR
+    matched &= (div_hours > 0) & (div_hours < 720)
+    div_hours_sum = np.bincount(appr_div[matched], weights=div_hours[matched], minlength=n_div)
+    div_hours_n = np.bincount(appr_div[matched], minlength=n_div)
+    valid_div = a_div >= 0
+    sub_n = np.bincount(a_div[submitted & valid_div], minlength=n_div)
+    appr_n = np.bincount(a_div[approved & valid_div], minlength=n_div)
+    rej_n = np.bincount(a_div[rejected & valid_div], minlength=n_div)
+    p_hours = (now - p_created) / HOUR
+    division_analysis = []
+    for d in np.flatnonzero(divs["is_active"]).tolist():
+        if not sub_n[d]:
+            continue
+        rate = appr_n[d] / sub_n[d] * 100
+        avg = div_hours_sum[d] / div_hours_n[d] if div_hours_n[d] else 0
+        speed = max(0, 100 - (avg / 24) * 25) if avg > 0 else 100
+        in_div = p_div == d
+        over24 = int((in_div & (p_hours > 24)).sum())
+        over72 = int((in_div & (p_hours > 72)).sum())
+        current = int(in_div.sum())
+        division_analysis.append({
+            "division": {"id": divs.value("id", d), "name": divs.value("division_name", d),
+                         "code": divs.value("division_code", d)},
+            "workflow": {"totalPOsSubmitted": int(sub_n[d]), "totalPOsApproved": int(appr_n[d]),
+                         "totalPOsRejected": int(rej_n[d]), "approvalRate": float(rate),
+                         "avgSubmissionToApprovalTime": float(avg), "workflowEfficiency": _js_round((rate + speed) / 2)},
+            "bottlenecks": {"currentlyPending": current, "pendingOver24Hours": over24, "pendingOver72Hours": over72,
+                            "highValuePending": int((in_div & (p_amount > 10000)).sum()),
+                            "avgPendingDays": float((p_hours[in_div] / 24).mean()) if current else 0,
+                            "bottleneckLevel": "severe" if over72 > 5 else "moderate" if over24 > 10
+                            else "minor" if current > 5 else "none"},
+            "approvers": [a for a in approver_analysis if a["approver"]["divisionId"] == divs.value("id", d)],
+            "monthlyTrend": [],
+        })
+    division_analysis.sort(key=lambda x: -x["bottlenecks"]["currentlyPending"])
+
+    # pending POs, with their latest action in the fetched approvals
+    has_po = a_po >= 0
+    last_action = _first_by(a_po[has_po], a_ts[has_po], po.size, last=True)
+    last_rows = last_action[pending]
+    last_ts = np.where(last_rows >= 0, a_ts[has_po][np.maximum(last_rows, 0)], NULL_TS)
+    last_actor = np.where(last_rows >= 0, a_actor[has_po][np.maximum(last_rows, 0)], -1)
+    days_pending = np.floor((now - p_created) / DAY).astype(np.int64)
+    required = po["required_by_date"][pending]
+    overdue = (required != NULL_TS) & (now > required * DAY)
+    urgency = np.minimum(50, days_pending * 5) + np.select(
+        [p_amount > 50000, p_amount > 10000, p_amount > 5000], [30, 20, 10], 0) + overdue * 20
+    stuck = np.where(last_ts != NULL_TS, (now - last_ts) / HOUR > 72, p_hours > 72)
+    order = np.argsort(-np.minimum(100, urgency), kind="stable")
+    pending_analysis = []
+    for i in order[:50].tolist():
+        row = int(pending[i])
+        amount = float(p_amount[i])
+        actor = int(last_actor[i])
+        actor_name = f"{users.value('first_name', actor)} {users.value('last_name', actor)}" if actor >= 0 else None
+        reason = "No action for >72 hours" if stuck[i] else \
+            "High-value PO pending approval" if amount > 50000 and days_pending[i] > 2 else \
+            "Past required-by date" if overdue[i] else None
+        v, p = int(po["vendor_id"][row]), int(po["project_id"][row])
+        pending_analysis.append({
+            "po": {"id": po.value("id", row), "poNumber": po.value("po_number", row), "totalAmount": amount,
+                   "vendorName": (vendors.value("vendor_name", v) if v >= 0 else None) or "Unknown Vendor",
+                   "divisionName": (divs.value("division_name", int(p_div[i])) if p_div[i] >= 0 else None)
+                   or "Unknown Division",
+                   "projectName": projects.value("project_name", p) if p >= 0 else None},
+            "timeline": {"submittedAt": _iso(int(p_created[i])), "daysPending": int(days_pending[i]),
+                         "hoursPending": float(p_hours[i]), "requiredByDate": _iso_date(int(required[i])),
+                         "isOverdue": bool(overdue[i]), "urgencyScore": int(min(100, urgency[i]))},
+            "approval": {"currentApprover": actor_name,
+                         "approvalLevel": "Owner Required" if amount > 50000 else "Division Leader",
+                         "lastActionBy": actor_name, "lastActionAt": _iso(int(last_ts[i])),
+                         "isStuck": bool(stuck[i]), "bottleneckReason": reason},
+        })
+
+    times = appr_hours[appr_hours > 0]
+    submission_to_approval = float(times.mean()) if len(times) else 0.0
+    over24 = int((days_pending > 1).sum())
+    over72 = int((days_pending > 3).sum())
+    efficiency = _js_round(sum(d["workflow"]["workflowEfficiency"] for d in division_analysis)
+                           / len(division_analysis)) if division_analysis else 0
+    critical = sum(a["bottlenecks"]["hasBottleneck"] for a in approver_analysis)
+    high_value = int((p_amount > 10000).sum())
+    actions, improvements, resources = [], [], []
+    if over72 > 0:
+        actions.append(f"Review {over72} POs pending >72 hours immediately")
+    if high_value > 0:
+        actions.append(f"Prioritize {high_value} high-value POs for approval")
+    if critical > 2:
+        resources.append("Consider additional approval authority delegation")
+    if submission_to_approval > 48:
+        improvements.append("Implement automated approval reminders")
+    if efficiency < 70:
+        improvements.append("Review and optimize approval workflow")
+    return {
+        "reportType": "approval-bottleneck",
+        "summary": {
+            "totalPendingPOs": len(pending),
+            "pendingOver24Hours": over24,
+            "pendingOver72Hours": over72,
+            "averagePendingDays": float(days_pending.mean()) if len(pending) else 0,
+            "highValuePending": high_value,
+            "totalPendingValue": float(p_amount.sum()),
+            "overallWorkflowEfficiency": efficiency,
+            "criticalBottlenecks": critical,
+        },
+        "divisionAnalysis": division_analysis,
+        "approverAnalysis": approver_analysis,
+        "pendingPOs": pending_analysis,
+        "workflowMetrics": {
+            "avgSubmissionToApproval": submission_to_approval,
+            "avgApprovalToIssue": 0,
+            "avgIssueToReceived": 0,
+            "totalCycleTime": submission_to_approval,
+            "bottleneckStage": "Approval" if submission_to_approval > 0 else "Receiving",
+        },
+        "trends": {"approvalVolumeTrend": [], "performanceTrend": []},
+        "recommendations": {"criticalActions": actions, "processImprovements": improvements,
+                            "resourceNeeds": resources},
+    }
+
+
+REPORTS: Dict[str, Callable[..., Dict]] = {
+    "po-summary": po_summary,
+    "vendor-analysis": vendor_analysis,
+    "gl-analysis": gl_analysis,
+    "budget-vs-actual": budget_vs_actual,
+    "project-details": project_details,
+    "approval-bottleneck": approval_bottleneck,
+}
+# Which CLI filters each report accepts (the route's query parameters)
+REPORT_FILTERS = {
+    "po-summary": ("division",),
+    "vendor-analysis": ("division", "vendor_type", "vendor"),
+    "gl-analysis": ("division", "gl_account"),
+    "budget-vs-actual": ("division", "project"),
+    "project-details": ("project",),
+    "approval-bottleneck": ("division", "user"),
+}
+
+
+def default_range(report: str, now: int) -> Tuple[int, int]:
+    """The routes' defaults: last 30 days for approval-bottleneck, else year to date"""
+    if report == "approval-bottleneck":
+        return now - 30 * DAY, now
+    year = datetime.datetime.fromtimestamp(now, tz=datetime.timezone.utc).year
+    return _epoch(datetime.date(year, 1, 1)), now
+
+
+def run_report(store: ColumnStore, report: str, start: Optional[int] = None, end: Optional[int] = None,
+               now: Optional[int] = None, **filters) -> Dict:
+    now = int(time.time()) if now is None else now
+    default_start, default_end = default_range(report, now)
+    start = default_start if start is None else start
+    end = default_end if end is None else end
+    accepted = {k: v for k, v in filters.items() if k in REPORT_FILTERS[report] and v is not None}
+    result = REPORTS[report](store, start, end, now, **accepted)
+    result["parameters"] = {"startDate": _iso(start), "endDate": _iso(end), **accepted}
+    return result
+
+
+def _headline(result: Dict) -> str:
+    summary = result["summary"]
+    picks = {
+        "po-summary": ("grandTotalPOCount", "grandTotalAmount", "overallCompletionRate"),
+        "vendor-analysis": ("activeVendors", "totalSpend", "vendorConcentrationRisk"),
+        "gl-analysis": ("totalAnalyzed", "totalCOGSSpend", "totalOpExSpend"),
+        "budget-vs-actual": ("totalProjects", "totalCommittedSpend", "projectsOverBudget"),
+        "project-details": ("totalProjects", "totalSpent", "projectsOverdue"),
+        "approval-bottleneck": ("totalPendingPOs", "pendingOver72Hours", "criticalBottlenecks"),
+    }[result["reportType"]]
+    parts = []
+    for key in picks:
+        value = summary[key]
+        parts.append(f"{key}={value:,.2f}" if isinstance(value, float) else f"{key}={value:,}")
+    return ", ".join(parts)
+
+
+def _resolve(store: ColumnStore, table: str, value: Optional[str], code_column: Optional[str] = None) -> Optional[int]:
+    if value is None:
+        return None
+    t = store[table]
+    if code_column:
+        code = t.code(code_column, value)
+        rows = np.flatnonzero(t[code_column] == code) if code >= 0 else []
+        if len(rows):
+            return int(rows[0])
+    try:
+        return t.row(value)
+    except KeyError as e:
+        raise SystemExit(f"❌ {e.args[0]}")
+
+
+def _date_arg(text: str) -> int:
+    return int(datetime.datetime.fromisoformat(text).replace(tzinfo=datetime.timezone.utc).timestamp()) \
+        if "T" in text else _epoch(datetime.date.fromisoformat(text))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar offline engine for the six business reports")
+    parser.add_argument("source", help="COPY directory, SQLite file, .npz snapshot or postgresql:// URL")
+    parser.add_argument("--report", choices=list(REPORTS) + ["all"], default="all",
+                        help="Report to compute (default: all)")
+    parser.add_argument("--start", type=_date_arg, help="startDate (default: the route's default)")
+    parser.add_argument("--end", type=_date_arg, help="endDate (default: --as-of)")
+    parser.add_argument("--as-of", type=_date_arg, help="The report's 'now' (default: current time)")
+    parser.add_argument("--division", help="Division id or code (e.g. O3)")
+    parser.add_argument("--project", help="Project id or code")
+    parser.add_argument("--vendor", help="Vendor id or code")
+    parser.add_argument("--vendor-type", help="Vendor type (Material, Labor, ...)")
+    parser.add_argument("--gl-account", help="GL account number (e.g. 5010)")
+    parser.add_argument("--user", help="Approver user id or email")
+    parser.add_argument("--save-snapshot", metavar="PATH", help="Write the loaded columns to a .npz snapshot")
+    parser.add_argument("--repeat", type=int, default=1, help="Run each report N times and keep the best timing")
+    parser.add_argument("--json", action="store_true", help="Print the full reports as JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        store = ColumnStore.load(args.source)
+    except ImportError as e:
+        raise SystemExit(f"❌ {e}")
+    loaded = time.perf_counter() - started
+    rows = sum(t.size for t in store.tables.values())
+    log = sys.stderr if args.json else sys.stdout
+    print(f"📥 Loaded {rows:,} rows from {args.source} in {loaded:.2f}s", file=log)
+    if args.save_snapshot:
+        store.save_snapshot(args.save_snapshot)
+        print(f"💾 Snapshot written to {args.save_snapshot}", file=log)
+
+    filters = {
+        "division": _resolve(store, "divisions", args.division, "division_code"),
+        "project": _resolve(store, "projects", args.project, "project_code"),
+        "vendor": _resolve(store, "vendors", args.vendor, "vendor_code"),
+        "user": _resolve(store, "users", args.user, "email"),
+        "vendor_type": args.vendor_type,
+        "gl_account": args.gl_account,
+    }
+    names = list(REPORTS) if args.report == "all" else [args.report]
+    results = {}
+    for name in names:
+        best = None
+        for _ in range(max(1, args.repeat)):
+            t0 = time.perf_counter()
+            result = run_report(store, name, args.start, args.end, args.as_of, **filters)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = result
+        print(f"📊 {name:<20} {best * 1000:8.1f} ms  {_headline(result)}", file=log)
+
+    if args.json:
+        json.dump(results if len(results) > 1 else results[names[0]], sys.stdout, indent=2, default=float)
+        print()
+
+
+if __name__ == "__main__":
+    main()
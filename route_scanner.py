@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Static compliance scanner for the ASR PO System Next.js API routes
+
+Builds an index of every route.ts under web/src/app/api - exported HTTP
+methods, route segment config (dynamic, revalidate, runtime, ...),
+other exports and imports - using the tokenizer from ts_tokenizer.py,
+then checks the index against configurable rules. Files are read through
+mmap and scanned in a process pool for large trees; the whole API tree
+scans in well under a second, so it can gate every commit.
+
+Rules (severity error, warning or off; each accepts "exclude" globs
+matched against the route path relative to the API root):
+
+    valid-exports       only handlers and segment config may be exported
+                        (anything else fails `next build`)
+    require-handler     at least one HTTP method is exported
+    require-dynamic     `export const dynamic` is present ("values" limits it)
+    static-config       segment config values are literals
+    allowed-runtime     runtime is one of "values"
+    edge-imports        edge routes do not import "forbidden" modules
+    no-default-export   route handlers are named exports only
+    require-rate-limit  mutating methods import withRateLimit (warning)
+
+Usage:
+    python route_scanner.py                           # scan and report
+    python route_scanner.py --rules route-rules.json --json
+    python route_scanner.py --index route-index.json  # also write the index
+    python route_scanner.py --staged                  # pre-commit: staged routes only
+
+    route-rules.json:
+        {"rules": {"require-rate-limit": {"severity": "error"},
+                   "require-dynamic": {"exclude": ["auth/**"]}}}
+"""
+
+import argparse
+import ast
+import fnmatch
+import json
+import mmap
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from codemod import CHUNK_SIZE, DEFAULT_EXCLUDES, MIN_FILES_FOR_POOL, discover
+from ts_tokenizer import scan_module
+
+API_ROOT = "web/src/app/api"
+ROUTE_GLOB = "**/route.ts"
+HTTP_METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+MUTATING_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+# Route segment config exports recognised by Next.js route handlers
+SEGMENT_CONFIG = ("dynamic", "dynamicParams", "revalidate", "fetchCache", "runtime",
+                  "preferredRegion", "maxDuration", "generateStaticParams")
+TYPE_KINDS = ("type", "interface")
+
+DEFAULT_RULES = {
+    "valid-exports": {"severity": "error"},
+    "require-handler": {"severity": "error"},
+    "require-dynamic": {"severity": "error", "values": ["force-dynamic"]},
+    "static-config": {"severity": "error"},
+    "allowed-runtime": {"severity": "error", "values": ["nodejs"]},
+    "edge-imports": {"severity": "error",
+                     "forbidden": ["@/lib/db", "@prisma/client", "fs", "path", "child_process", "crypto"]},
+    "no-default-export": {"severity": "error"},
+    "require-rate-limit": {"severity": "warning", "name": "withRateLimit"},
+}
+
+
+def read_source(path: str) -> str:
+    """Decode a file through a read-only memory map"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:].decode("utf-8")
+
+
+def literal_value(text: Optional[str]):
+    """(is_literal, value) for a config initializer such as 'force-dynamic', 60 or false"""
+    if text is None:
+        return False, None
+    text = text.strip()
+    mapped = {"true": "True", "false": "False", "null": "None", "undefined": "None"}.get(text, text)
+    if mapped.startswith("`") and mapped.endswith("`") and "${" not in mapped:
+        mapped = repr(mapped[1:-1])
+    try:
+        value = ast.literal_eval(mapped)
+    except (ValueError, SyntaxError):
+        return False, text
+    if isinstance(value, (str, int, float, bool, list)) or value is None:
+        return True, value
+    return False, text
+
+
+def route_for(path: str, api_root: str) -> str:
+    relative = os.path.relpath(os.path.dirname(path), api_root).replace(os.sep, "/")
+    segments = [s for s in relative.split("/") if s != "." and not (s.startswith("(") and s.endswith(")"))]
+    return "/api/" + "/".join(segments) if segments else "/api"
+
+
+def scan_route(path: str, api_root: str = API_ROOT) -> Dict:
+    """Index entry for one route file (errors are reported, not raised)"""
+    entry = {"path": path, "route": route_for(path, api_root),
+             "relative": os.path.relpath(path, api_root).replace(os.sep, "/"),
+             "methods": [], "config": {}, "exports": [], "imports": [], "error": None}
+    try:
+        info = scan_module(read_source(path))
+    except Exception as e:  # unreadable or undecodable file
+        entry["error"] = f"{type(e).__name__}: {e}"
+        return entry
+
+    for decl in info.exports:
+        for name in decl.names:
+            export = {"name": name, "kind": decl.kind, "line": decl.line, "type_only": decl.type_only}
+            entry["exports"].append(export)
+            if name in HTTP_METHODS and name not in entry["methods"]:
+                entry["methods"].append(name)
+            elif name in SEGMENT_CONFIG and decl.kind in ("const", "let", "var"):
+                is_literal, value = literal_value(decl.value)
+                entry["config"][name] = {"value": value, "literal": is_literal, "line": decl.line}
+    entry["imports"] = [{"specifier": d.specifier, "names": d.bindings(), "line": d.line,
+                         "type_only": d.type_only} for d in info.imports]
+    return entry
+
+
+def _scan_chunk(args):
+    path, api_root = args
+    return scan_route(path, api_root)
+
+
+def build_index(paths: List[str], api_root: str = API_ROOT, workers: Optional[int] = None) -> List[Dict]:
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) < MIN_FILES_FOR_POOL:
+        return [scan_route(path, api_root) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_scan_chunk, [(path, api_root) for path in paths], chunksize=CHUNK_SIZE))
+
+
+# Rule checks: (entry, options) -> [(line, message), ...]
+
+def check_valid_exports(entry: Dict, options: Dict) -> List:
+    allowed = set(HTTP_METHODS) | set(SEGMENT_CONFIG) | {"default"}
+    return [(e["line"], f"'{e['name']}' is not a valid route export (move it to a lib module)")
+            for e in entry["exports"]
+            if e["name"] not in allowed and e["kind"] not in TYPE_KINDS and not e["type_only"]]
+
+
+def check_require_handler(entry: Dict, options: Dict) -> List:
+    return [] if entry["methods"] else [(1, "no HTTP method handler is exported")]
+
+
+def check_require_dynamic(entry: Dict, options: Dict) -> List:
+    dynamic = entry["config"].get("dynamic")
+    if dynamic is None:
+        return [(1, "missing `export const dynamic` (fix with: python codemod.py add-dynamic-export)")]
+    values = options.get("values")
+    if values and dynamic["literal"] and dynamic["value"] not in values:
+        return [(dynamic["line"], f"dynamic = {dynamic['value']!r}, expected one of {values}")]
+    return []
+
+
+def check_static_config(entry: Dict, options: Dict) -> List:
+    return [(c["line"], f"{name} must be a literal, got `{c['value']}`")
+            for name, c in entry["config"].items() if not c["literal"] and name != "generateStaticParams"]
+
+
+def check_allowed_runtime(entry: Dict, options: Dict) -> List:
+    runtime = entry["config"].get("runtime")
+    values = options.get("values") or []
+    if runtime is not None and runtime["literal"] and values and runtime["value"] not in values:
+        return [(runtime["line"], f"runtime = {runtime['value']!r}, expected one of {values}")]
+    return []
+
+
+def check_edge_imports(entry: Dict, options: Dict) -> List:
+    runtime = entry["config"].get("runtime")
+    if runtime is None or runtime["value"] != "edge":
+        return []
+    forbidden = options.get("forbidden") or []
+    return [(i["line"], f"edge runtime cannot import '{i['specifier']}'")
+            for i in entry["imports"]
+            if not i["type_only"] and any(i["specifier"] == f or (i["specifier"] or "").startswith(f + "/")
+                                          for f in forbidden)]
+
+
+def check_no_default_export(entry: Dict, options: Dict) -> List:
+    return [(e["line"], "default export is ignored by Next.js route handlers")
+            for e in entry["exports"] if e["name"] == "default"]
+
+
+def check_require_rate_limit(entry: Dict, options: Dict) -> List:
+    mutating = [m for m in entry["methods"] if m in options.get("methods", MUTATING_METHODS)]
+    name = options.get("name", "withRateLimit")
+    if mutating and not any(name in i["names"] for i in entry["imports"]):
+        return [(1, f"{'/'.join(mutating)} handler(s) without {name}")]
+    return []
+
+
+RULE_CHECKS = {
+    "valid-exports": check_valid_exports,
+    "require-handler": check_require_handler,
+    "require-dynamic": check_require_dynamic,
+    "static-config": check_static_config,
+    "allowed-runtime": check_allowed_runtime,
+    "edge-imports": check_edge_imports,
+    "no-default-export": check_no_default_export,
+    "require-rate-limit": check_require_rate_limit,
+}
+
+
+def load_rules(path: Optional[str] = None) -> Dict[str, Dict]:
+    """Default rules merged with overrides from a JSON file"""
+    rules = {name: dict(options) for name, options in DEFAULT_RULES.items()}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f).get("rules", {})
+        for name, options in overrides.items():
+            if name not in RULE_CHECKS:
+                raise ValueError(f"unknown rule '{name}' (known: {', '.join(RULE_CHECKS)})")
+            rules[name].update(options)
+    for name, options in rules.items():
+        if options.get("severity") not in ("error", "warning", "off"):
+            raise ValueError(f"rule '{name}': severity must be error, warning or off")
+    return rules
+
+
+def evaluate(index: List[Dict], rules: Dict[str, Dict]) -> List[Dict]:
+    violations = []
+    for entry in index:
+        if entry["error"]:
+            violations.append({"path": entry["path"], "line": 1, "rule": "parse",
+                               "severity": "error", "message": entry["error"]})
+            continue
+        for name, options in rules.items():
+            if options["severity"] == "off":
+                continue
+            if any(fnmatch.fnmatch(entry["relative"], pattern) for pattern in options.get("exclude", [])):
+                continue
+            for line, message in RULE_CHECKS[name](entry, options):
+                violations.append({"path": entry["path"], "line": line, "rule": name,
+                                   "severity": options["severity"], "message": message})
+    return violations
+
+
+def staged_routes(api_root: str) -> List[str]:
+    """route.ts files under api_root that are staged for commit"""
+    output = subprocess.run(["git", "diff", "--cached", "--name-only", "--diff-filter=ACMR", "--", api_root],
+                            capture_output=True, text=True, check=True).stdout
+    return sorted(path for path in output.splitlines() if path.endswith("/route.ts") and os.path.exists(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan Next.js API routes for compliance problems")
+    parser.add_argument("--root", default=API_ROOT, help=f"API routes directory (default: {API_ROOT})")
+    parser.add_argument("--rules", help="JSON file with rule overrides")
+    parser.add_argument("--staged", action="store_true", help="Only scan route files staged in git")
+    parser.add_argument("--index", metavar="PATH", help="Write the route index as JSON")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", action="store_true", help="Print index summary and violations as JSON")
+    parser.add_argument("--strict", action="store_true", help="Fail on warnings as well as errors")
+    args = parser.parse_args()
+
+    try:
+        rules = load_rules(args.rules)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if not os.path.isdir(args.root):
+        print(f"❌ {args.root} does not exist")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    paths = staged_routes(args.root) if args.staged else discover(args.root, [ROUTE_GLOB], DEFAULT_EXCLUDES)
+    index = build_index(paths, args.root, args.workers)
+    violations = evaluate(index, rules)
+    elapsed = time.perf_counter() - started
+
+    if args.index:
+        with open(args.index, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+
+    errors = sum(1 for v in violations if v["severity"] == "error")
+    warnings = len(violations) - errors
+    if args.json:
+        print(json.dumps({"routes": len(index), "elapsed_s": round(elapsed, 3),
+                          "errors": errors, "warnings": warnings, "violations": violations}, indent=2))
+    else:
+        for v in violations:
+            icon = "❌" if v["severity"] == "error" else "⚠️ "
+            print(f"{icon} {v['path']}:{v['line']} [{v['rule']}] {v['message']}")
+        methods = {}
+        for entry in index:
+            for method in entry["methods"]:
+                methods[method] = methods.get(method, 0) + 1
+        method_summary = ", ".join(f"{m} {methods[m]}" for m in HTTP_METHODS if m in methods)
+        print(f"\n🔍 {len(index)} routes ({method_summary or 'no handlers'}) scanned in {elapsed:.2f}s: "
+              f"{errors} errors, {warnings} warnings")
+
+    if errors or (args.strict and warnings):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1465 @@
+#!/usr/bin/env python3
+"""
+Index advisor for the ASR PO System database
+
+Reads database/schema.sql and a query corpus, works out which columns
+each query filters, joins, sorts and groups on, and recommends composite,
+covering (INCLUDE) and partial (WHERE) B-tree indexes ranked by estimated
+benefit: queries are weighted by call count (or total time when the corpus
+has durations), and each candidate is scored by how much it narrows the
+rows read compared with the best index the schema already has.
+
+Column order follows the usual rule: equality columns first (most
+selective first), then the ORDER BY / GROUP BY columns when the index can
+return rows pre-sorted, then at most one range column. Constant predicates
+on low-cardinality columns (deleted_at IS NULL, status = 'Submitted')
+become the index's WHERE clause instead of key columns. Candidates that
+are prefixes of one another are merged, and existing indexes made
+redundant by a recommendation are listed.
+
+Selectivity comes from schema-level heuristics (enum sizes, uniqueness,
+order-of-magnitude table sizes) unless a database is given, in which case
+row counts, distinct counts and null fractions are read from it. With
+--validate each recommendation is created temporarily and the queries it
+serves are EXPLAINed and timed before and after, and queries it measurably
+slows down stop counting toward its score and rank; on PostgreSQL the index
+is built inside a transaction that is rolled back, which locks the table
+for writes while it runs, so validate against a staging copy.
+
+The corpus can be:
+    - a .sql file of statements, optionally preceded by "-- calls: N"
+    - a PostgreSQL log (log_min_duration_statement = 0): "duration: X ms
+      statement: ..." / "execute <name>: ..." lines with DETAIL parameters
+    - a Prisma query log ("prisma:query ..." or Query:/Params:/Duration:)
+
+Usage:
+    python schema_advisor.py database/query-patterns.sql
+    python schema_advisor.py /var/log/postgresql/postgresql.log --top 5 --json
+    python schema_advisor.py database/query-patterns.sql --rows po_headers=2000000
+
+    # Validate on a SQLite stand-in (python sql_schema.py --sqlite standin.db)
+    python schema_advisor.py database/query-patterns.sql --validate sqlite:standin.db
+
+    # Validate on a PostgreSQL staging copy (needs psycopg)
+    python schema_advisor.py database/query-patterns.sql --validate "$STAGING_DATABASE_URL"
+"""
+
+import argparse
+import json
+import math
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sql_schema import (SCHEMA_PATH, Index, Schema, connect_postgres, load_schema, mask_url, split_statements,
+                        sqlite_index)
+
+# Order-of-magnitude row counts used when no database is available
+HEURISTIC_ROWS = {
+    "divisions": 10,
+    "users": 100,
+    "division_leaders": 10,
+    "vendors": 1_000,
+    "projects": 500,
+    "gl_account_mappings": 50,
+    "work_orders": 5_000,
+    "po_headers": 100_000,
+    "po_line_items": 400_000,
+    "po_approvals": 300_000,
+    "work_order_sequences": 50,
+}
+DEFAULT_ROWS = 10_000
+
+# PostgreSQL's own fallbacks when it has no statistics (selfuncs.h)
+DEFAULT_EQ_SEL = 0.005
+DEFAULT_INEQ_SEL = 1 / 3
+DEFAULT_RANGE_INEQ_SEL = 0.005
+DEFAULT_NULL_FRAC = 0.5
+
+MAX_INCLUDE = 6            # wider covering indexes cost more than they save
+PARTIAL_MAX_DISTINCT = 16  # constant predicates on columns this small go in WHERE
+MIN_TABLE_ROWS = 1_000     # below this a sequential scan is as good as any index
+MIN_SCORE_SHARE = 0.02     # stop once the next index adds less than this share of the first
+MIN_VALIDATED_SPEEDUP = 0.9  # a served query validated slower than this no longer counts
+MAX_INDEX_NAME = 63
+
+KEYWORDS = {
+    "SELECT", "FROM", "WHERE", "GROUP", "ORDER", "BY", "HAVING", "LIMIT", "OFFSET", "FETCH",
+    "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "OUTER", "CROSS", "NATURAL", "ON", "USING", "AS",
+    "AND", "OR", "NOT", "IN", "IS", "NULL", "BETWEEN", "LIKE", "ILIKE", "ASC", "DESC", "NULLS",
+    "FIRST", "LAST", "UNION", "INTERSECT", "EXCEPT", "ALL", "DISTINCT", "UPDATE", "SET", "DELETE",
+    "INSERT", "INTO", "VALUES", "RETURNING", "FOR", "WITH", "CASE", "WHEN", "THEN", "ELSE", "END",
+    "EXISTS", "TRUE", "FALSE", "INTERVAL",
+}
+CLAUSES = {"SELECT": "select", "FROM": "from", "WHERE": "where", "GROUP": "group", "HAVING": "having",
+           "ORDER": "order", "LIMIT": "limit", "OFFSET": "offset", "FETCH": "limit", "FOR": "lock",
+           "RETURNING": "returning", "SET": "set"}
+JOIN_WORDS = {"JOIN", "INNER", "LEFT", "RIGHT", "FULL", "OUTER", "CROSS", "NATURAL"}
+COMPARISONS = {"=": "=", "<>": "<>", "!=": "<>", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+MIRRORED = {"=": "=", "<>": "<>", "<": ">", "<=": ">=", ">": "<", ">=": "<="}
+QUOTE_IDENTIFIERS = {"timestamp", "user", "order", "group", "year", "key", "value", "type"}
+
+TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<string>[Ee]?'(?:[^']|'')*')
+  | (?P<qident>"(?:[^"]|"")*")
+  | (?P<param>\$\d+|\?)
+  | (?P<number>\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+  | (?P<word>[A-Za-z_][\w$]*)
+  | (?P<op><>|!=|<=|>=|::|\|\||[-+*/%=<>(),.;\[\]])
+  | (?P<other>.)
+""", re.X | re.S)
+
+
+def tokenize(sql: str) -> List[Tuple[str, str]]:
+    """(kind, text) pairs; keywords upper-cased, identifiers folded, ? numbered as $n"""
+    tokens, positional = [], 0
+    for match in TOKEN_RE.finditer(sql):
+        kind, text = match.lastgroup, match.group()
+        if kind in ("ws", "comment"):
+            continue
+        if kind == "word":
+            upper = text.upper()
+            tokens.append(("kw", upper) if upper in KEYWORDS else ("ident", text.lower()))
+        elif kind == "qident":
+            tokens.append(("ident", text[1:-1].replace('""', '"')))
+        elif kind == "param":
+            if text == "?":
+                positional += 1
+                text = f"${positional}"
+            tokens.append(("param", text))
+        else:
+            tokens.append((kind, text))
+    return tokens
+
+
+def match_paren(tokens: List[Tuple[str, str]], i: int) -> int:
+    depth = 0
+    for j in range(i, len(tokens)):
+        if tokens[j][1] == "(" and tokens[j][0] == "op":
+            depth += 1
+        elif tokens[j][1] == ")" and tokens[j][0] == "op":
+            depth -= 1
+            if depth == 0:
+                return j
+    return len(tokens) - 1
+
+
+def strip_casts(tokens: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Drop ::type casts and unwrap CAST(x AS type), which only obscure the column/value"""
+    out, i = [], 0
+    while i < len(tokens):
+        kind, text = tokens[i]
+        if kind == "op" and text == "::":
+            i += 2
+            while i + 1 < len(tokens) and tokens[i] == ("op", "."):
+                i += 2
+            if i < len(tokens) and tokens[i] == ("op", "("):
+                i = match_paren(tokens, i) + 1
+            while i + 1 < len(tokens) and tokens[i] == ("op", "[") and tokens[i + 1] == ("op", "]"):
+                i += 2
+            continue
+        if kind == "ident" and text == "cast" and i + 1 < len(tokens) and tokens[i + 1] == ("op", "("):
+            end = match_paren(tokens, i + 1)
+            inner, depth = tokens[i + 2:end], 0
+            for j, token in enumerate(inner):
+                depth += token == ("op", "(")
+                depth -= token == ("op", ")")
+                if depth == 0 and token == ("kw", "AS"):
+                    inner = inner[:j]
+                    break
+            out.extend(strip_casts(inner))
+            i = end + 1
+            continue
+        out.append(tokens[i])
+        i += 1
+    return out
+
+
+def fingerprint(tokens: List[Tuple[str, str]]) -> str:
+    """Statement shape with literals and parameters replaced by ? and IN lists collapsed"""
+    parts = []
+    for kind, text in tokens:
+        if kind in ("string", "number", "param") or (kind == "kw" and text in ("TRUE", "FALSE")):
+            parts.append("?")
+        elif kind == "ident":
+            parts.append(text)
+        else:
+            parts.append(text)
+    text = " ".join(parts)
+    text = re.sub(r"\bpublic \. ", "", text)
+    text = re.sub(r"\( \?(?: , \?)+ \)", "( ?... )", text)
+    return _tidy(text).rstrip(" ;")
+
+
+def _tidy(text: str) -> str:
+    return re.sub(r" ?\. ?", ".", text).replace("( ", "(").replace(" )", ")").replace(" ,", ",")
+
+
+def render(tokens: List[Tuple[str, str]], dialect: str = "postgresql") -> str:
+    """Rebuild SQL from tokens; sqlite drops schema prefixes and PostgreSQL-only syntax"""
+    parts, i = [], 0
+    while i < len(tokens):
+        kind, text = tokens[i]
+        if dialect == "sqlite" and kind == "ident" and text == "public" and i + 1 < len(tokens) \
+                and tokens[i + 1] == ("op", "."):
+            i += 2
+            continue
+        if kind == "ident":
+            text = quote_ident(text)
+        elif kind == "param":
+            text = f"?{text[1:]}" if dialect == "sqlite" else f"%(p{text[1:]})s"
+        elif kind == "string" and dialect != "sqlite":
+            text = text.replace("%", "%%")
+        elif kind == "op" and text == "%" and dialect != "sqlite":
+            text = "%%"
+        elif dialect == "sqlite" and kind == "kw" and text in ("TRUE", "FALSE"):
+            text = "1" if text == "TRUE" else "0"
+        elif dialect == "sqlite" and kind == "kw" and text == "ILIKE":
+            text = "LIKE"
+        if dialect == "sqlite" and tokens[i] == ("ident", "now") and tokens[i + 1:i + 3] == [("op", "("), ("op", ")")]:
+            text = "CURRENT_TIMESTAMP"
+            i += 2
+            # now() +/- interval '30 days'  ->  datetime('now', '-30 days')
+            if i + 3 < len(tokens) and tokens[i + 1][1] in ("+", "-") and tokens[i + 2] == ("kw", "INTERVAL") \
+                    and tokens[i + 3][0] == "string":
+                sign = "-" if tokens[i + 1][1] == "-" else "+"
+                text = f"datetime('now', '{sign}{tokens[i + 3][1].strip(chr(39))}')"
+                i += 3
+        parts.append(text)
+        i += 1
+    return _tidy(" ".join(parts))
+
+
+def quote_ident(name: str) -> str:
+    if name in QUOTE_IDENTIFIERS or not re.match(r"^[a-z_][a-z0-9_]*$", name):
+        return '"' + name.replace('"', '""') + '"'
+    return name
+
+
+class Predicate:
+    """A sargable condition on one column: eq, in, range, null, not_null, neq, not_in, prefix"""
+
+    def __init__(self, table: str, column: str, op: str, values: List[Tuple[str, str]]):
+        self.table = table
+        self.column = column
+        self.op = op
+        self.values = values  # ("lit", sql) | ("param", "$n") | ("expr", "")
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return (self.table, self.column, self.op)
+
+    @property
+    def literal(self) -> bool:
+        return all(kind == "lit" for kind, _ in self.values)
+
+    def sql(self) -> str:
+        column = quote_ident(self.column)
+        literals = [text for _, text in self.values]
+        if self.op == "null":
+            return f"{column} IS NULL"
+        if self.op == "not_null":
+            return f"{column} IS NOT NULL"
+        if self.op == "eq":
+            return f"{column} = {literals[0]}"
+        if self.op == "neq":
+            return f"{column} <> {literals[0]}"
+        keyword = "NOT IN" if self.op == "not_in" else "IN"
+        return f"{column} {keyword} ({', '.join(sorted(literals))})"
+
+
+VARIABLE = "<variable>"
+
+
+class QueryShape:
+    """Everything the advisor needs to know about one statement fingerprint"""
+
+    def __init__(self, fingerprint: str, tokens: List[Tuple[str, str]], raw: List[Tuple[str, str]]):
+        self.fingerprint = fingerprint
+        self.tokens = tokens    # casts stripped
+        self.raw = raw          # as written
+        self.calls = 0
+        self.total_ms = 0.0
+        self.params: Dict[str, str] = {}
+        self.tables: Set[str] = set()
+        self.predicates: List[Predicate] = []
+        self.joins: List[Tuple[Tuple[str, str], Tuple[str, str]]] = []
+        self.order_by: List[Tuple[str, str, bool]] = []  # (table, column, descending)
+        self.order_ok = True    # False when ORDER BY has expressions or spans tables
+        self.group_by: List[Tuple[str, str]] = []
+        self.needed: Dict[str, Optional[Set[str]]] = {}  # table -> columns read (None: all)
+        self.param_columns: Dict[str, Tuple[str, str]] = {}
+        self.limit_params: Dict[str, int] = {}
+        self.constants: Dict[Tuple[str, str, str], Set[str]] = {}  # values seen per predicate
+        self.bound: Dict[Tuple[str, str, str], Predicate] = {}  # parameterised predicates with logged values
+
+    @property
+    def weight(self) -> float:
+        return self.total_ms if self.total_ms > 0 else float(self.calls)
+
+    def predicates_on(self, table: str) -> List[Predicate]:
+        return [p for p in self.predicates if p.table == table]
+
+    def constant_form(self, predicate: Predicate) -> Optional[Predicate]:
+        """The predicate with literal values if every call used the same ones, else None
+
+        Parameters count as constant when the log bound the same value in
+        every call, as Prisma does for values hard-coded in a route.
+        """
+        if predicate.op in ("null", "not_null"):
+            return predicate
+        seen = self.constants.get(predicate.key, ())
+        if len(seen) != 1 or VARIABLE in seen:
+            return None
+        return predicate if predicate.literal else self.bound.get(predicate.key)
+
+
+class _Block:
+    """Name resolution scope of one SELECT/UPDATE/DELETE block"""
+
+    def __init__(self, schema: Schema, shape: QueryShape, outer: Optional[Dict[str, str]] = None):
+        self.schema = schema
+        self.shape = shape
+        self.aliases: Dict[str, str] = dict(outer or {})
+
+    def resolve(self, parts: List[str]) -> Optional[Tuple[str, str]]:
+        column = parts[-1]
+        if len(parts) >= 2:
+            qualifier = parts[-2]
+            table = self.aliases.get(qualifier, qualifier)
+        else:
+            owners = {t for t in self.aliases.values()
+                      if t in self.schema.tables and column in self.schema.tables[t].columns}
+            if len(owners) != 1:
+                return None
+            table = owners.pop()
+        if table in self.schema.tables and column in self.schema.tables[table].columns:
+            return table, column
+        return None
+
+    def colref(self, tokens: List[Tuple[str, str]], i: int) -> Tuple[Optional[List[str]], int]:
+        """Dotted identifier starting at i that is not a function call"""
+        if i >= len(tokens) or tokens[i][0] != "ident":
+            return None, i
+        parts, j = [tokens[i][1]], i + 1
+        while j + 1 < len(tokens) and tokens[j] == ("op", ".") and tokens[j + 1][0] == "ident":
+            parts.append(tokens[j + 1][1])
+            j += 2
+        if j < len(tokens) and tokens[j] == ("op", "("):
+            return None, i
+        return parts, j
+
+    def note_columns(self, tokens: List[Tuple[str, str]]):
+        """Record every resolvable column referenced in tokens as needed"""
+        i = 0
+        while i < len(tokens):
+            if tokens[i][0] == "ident" and not (i > 0 and tokens[i - 1] == ("kw", "AS")):
+                parts, j = self.colref(tokens, i)
+                if parts:
+                    if j + 1 < len(tokens) and tokens[j] == ("op", ".") and tokens[j + 1] == ("op", "*"):
+                        table = self.aliases.get(parts[-1], parts[-1])
+                        if table in self.schema.tables:
+                            self.shape.needed[table] = None
+                        i = j + 2
+                        continue
+                    resolved = self.resolve(parts)
+                    if resolved:
+                        self.need(*resolved)
+                    i = j
+                    continue
+            i += 1
+
+    def need(self, table: str, column: str):
+        needed = self.shape.needed.setdefault(table, set())
+        if needed is not None:
+            needed.add(column)
+
+
+def split_top(tokens: List[Tuple[str, str]], separator: Tuple[str, str]) -> List[List[Tuple[str, str]]]:
+    parts, current, depth = [], [], 0
+    for token in tokens:
+        if token == ("op", "("):
+            depth += 1
+        elif token == ("op", ")"):
+            depth -= 1
+        if depth == 0 and token == separator:
+            parts.append(current)
+            current = []
+            continue
+        current.append(token)
+    if current:
+        parts.append(current)
+    return parts
+
+
+def conjuncts(tokens: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+    """Split on top-level AND, leaving the AND of BETWEEN x AND y alone"""
+    parts, current, depth, between = [], [], 0, False
+    for token in tokens:
+        if token == ("op", "("):
+            depth += 1
+        elif token == ("op", ")"):
+            depth -= 1
+        elif depth == 0 and token == ("kw", "BETWEEN"):
+            between = True
+        elif depth == 0 and token == ("kw", "AND"):
+            if between:
+                between = False
+            else:
+                parts.append(current)
+                current = []
+                continue
+        current.append(token)
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _unwrap(tokens: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    while tokens and tokens[0] == ("op", "(") and match_paren(tokens, 0) == len(tokens) - 1:
+        tokens = tokens[1:-1]
+    return tokens
+
+
+def _value(tokens: List[Tuple[str, str]]) -> Tuple[str, str]:
+    tokens = _unwrap(tokens)
+    if len(tokens) == 2 and tokens[0] == ("op", "-") and tokens[1][0] == "number":
+        return "lit", "-" + tokens[1][1]
+    if len(tokens) == 1:
+        kind, text = tokens[0]
+        if kind in ("string", "number"):
+            return "lit", text
+        if kind == "kw" and text in ("TRUE", "FALSE"):
+            return "lit", text.lower()
+        if kind == "param":
+            return "param", text
+    return "expr", ""
+
+
+class Analyzer:
+    """Turns statements into QueryShapes, folding repeats of the same fingerprint"""
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self.shapes: Dict[str, QueryShape] = {}
+        self._seen: Dict[str, Tuple[str, List[Predicate]]] = {}
+
+    def add(self, sql: str, calls: int = 1, duration_ms: float = 0.0, params: Optional[Dict[str, str]] = None):
+        cached = self._seen.get(sql)
+        if cached is None:
+            raw = tokenize(sql)
+            if not raw or raw[0] not in (("kw", "SELECT"), ("kw", "WITH"), ("kw", "UPDATE"), ("kw", "DELETE")):
+                self._seen[sql] = ("", [])
+                return
+            tokens = strip_casts(raw)
+            key = fingerprint(tokens)
+            shape = self.shapes.get(key)
+            predicates = []
+            if shape is None:
+                shape = self.shapes[key] = QueryShape(key, tokens, raw)
+                self._analyze(tokens, _Block(self.schema, shape))
+                predicates = shape.predicates
+            else:
+                scratch = QueryShape(key, tokens, raw)
+                self._analyze(tokens, _Block(self.schema, scratch))
+                predicates = scratch.predicates
+            cached = self._seen[sql] = (key, predicates)
+        key, predicates = cached
+        if not key:
+            return
+        shape = self.shapes[key]
+        shape.calls += calls
+        shape.total_ms += duration_ms
+        if params and not shape.params:
+            shape.params = dict(params)
+        for predicate in predicates:
+            values = [("lit", params[text]) if kind == "param" and params and text in params else (kind, text)
+                      for kind, text in predicate.values]
+            seen = shape.constants.setdefault(predicate.key, set())
+            if all(kind == "lit" for kind, _ in values):
+                seen.add(repr(values))
+                if not predicate.literal:
+                    shape.bound[predicate.key] = Predicate(predicate.table, predicate.column, predicate.op, values)
+            else:
+                seen.add(VARIABLE)
+
+    def _analyze(self, tokens: List[Tuple[str, str]], block: _Block):
+        shape = block.shape
+        clauses: Dict[str, List[Tuple[str, str]]] = {}
+        subqueries: List[List[Tuple[str, str]]] = []
+        current, i = "head", 0
+        if tokens and tokens[0] == ("kw", "UPDATE"):
+            current, i = "from", 1
+        elif tokens[:2] == [("kw", "DELETE"), ("kw", "FROM")]:
+            current, i = "from", 2
+        while i < len(tokens):
+            token = tokens[i]
+            if token == ("op", "("):
+                end = match_paren(tokens, i)
+                inner = tokens[i + 1:end]
+                if inner and inner[0] in (("kw", "SELECT"), ("kw", "WITH")):
+                    subqueries.append(inner)
+                    clauses.setdefault(current, []).extend([("op", "("), ("subquery", "?"), ("op", ")")])
+                else:
+                    clauses.setdefault(current, []).extend(tokens[i:end + 1])
+                i = end + 1
+                continue
+            if token[0] == "kw" and token[1] in ("UNION", "INTERSECT", "EXCEPT"):
+                rest = tokens[i + 1:]
+                if rest and rest[0] in (("kw", "ALL"), ("kw", "DISTINCT")):
+                    rest = rest[1:]
+                subqueries.append(rest)
+                break
+            if token[0] == "kw" and token[1] in CLAUSES:
+                current = CLAUSES[token[1]]
+                i += 2 if token[1] in ("GROUP", "ORDER") else 1
+                continue
+            clauses.setdefault(current, []).append(token)
+            i += 1
+
+        self._from(clauses.get("from", []), block)
+        for table in set(block.aliases.values()):
+            if table in self.schema.tables:
+                shape.tables.add(table)
+
+        select = clauses.get("select", [])
+        if select[:1] == [("kw", "DISTINCT")]:
+            select = select[1:]
+        for item in split_top(select, ("op", ",")):
+            if item == [("op", "*")]:
+                for table in set(block.aliases.values()):
+                    if table in self.schema.tables:
+                        shape.needed[table] = None
+            else:
+                block.note_columns(item)
+        for name in ("set", "having", "returning"):
+            block.note_columns(clauses.get(name, []))
+
+        for conjunct in conjuncts(clauses.get("where", [])):
+            self._condition(conjunct, block)
+
+        group = clauses.get("group", [])
+        block.note_columns(group)
+        for item in split_top(group, ("op", ",")):
+            parts, end = block.colref(item, 0)
+            resolved = block.resolve(parts) if parts and end == len(item) else None
+            if resolved:
+                shape.group_by.append(resolved)
+
+        for item in split_top(clauses.get("order", []), ("op", ",")):
+            block.note_columns(item)
+            parts, end = block.colref(item, 0)
+            resolved = block.resolve(parts) if parts else None
+            rest = [text for _, text in item[end:]] if parts else []
+            if not resolved or any(word not in ("ASC", "DESC", "NULLS", "FIRST", "LAST") for word in rest):
+                shape.order_ok = False
+                continue
+            shape.order_by.append((resolved[0], resolved[1], "DESC" in rest))
+
+        for name, default in (("limit", 50), ("offset", 0)):
+            for kind, text in clauses.get(name, []):
+                if kind == "param":
+                    shape.limit_params[text] = default
+
+        for inner in subqueries:
+            self._analyze(inner, _Block(self.schema, shape, block.aliases))
+
+    def _from(self, tokens: List[Tuple[str, str]], block: _Block):
+        refs, ons, current, mode, depth = [], [], [], "ref", 0
+
+        def finish():
+            if current:
+                (refs if mode == "ref" else ons).append(list(current))
+
+        for token in tokens:
+            if token == ("op", "("):
+                depth += 1
+            elif token == ("op", ")"):
+                depth -= 1
+            if depth == 0 and (token == ("op", ",") or (token[0] == "kw" and token[1] in JOIN_WORDS)):
+                finish()
+                current, mode = [], "ref"
+                continue
+            if depth == 0 and token in (("kw", "ON"), ("kw", "USING")):
+                finish()
+                current, mode = [], "on" if token == ("kw", "ON") else "using"
+                continue
+            current.append(token)
+        finish()
+
+        for ref in refs:
+            if ref and ref[0] == ("op", "("):
+                continue
+            parts, j = block.colref(ref, 0)
+            if not parts:
+                continue
+            rest = [t for t in ref[j:] if t != ("kw", "AS")]
+            alias = rest[0][1] if rest and rest[0][0] == "ident" else parts[-1]
+            block.aliases[alias] = parts[-1]
+        for on in ons:
+            for conjunct in conjuncts(on):
+                self._condition(conjunct, block)
+
+    def _condition(self, tokens: List[Tuple[str, str]], block: _Block):
+        shape = block.shape
+        block.note_columns(tokens)
+        tokens = _unwrap(tokens)
+        if not tokens:
+            return
+        inner = conjuncts(tokens)
+        if len(inner) > 1:
+            for conjunct in inner:
+                self._condition(conjunct, block)
+            return
+
+        disjuncts = split_top(tokens, ("kw", "OR"))
+        if len(disjuncts) > 1:
+            found = []
+            for disjunct in disjuncts:
+                scratch = QueryShape("", [], [])
+                self._condition(disjunct, _Block(self.schema, scratch, block.aliases))
+                found.extend(scratch.predicates)
+            columns = {(p.table, p.column) for p in found}
+            if len(found) == len(disjuncts) and len(columns) == 1 and all(p.op in ("eq", "in") for p in found):
+                table, column = columns.pop()
+                self._add(block, Predicate(table, column, "in", [v for p in found for v in p.values]))
+            return
+
+        parts, j = block.colref(tokens, 0)
+        left = block.resolve(parts) if parts else None
+        rest = tokens[j:] if left else []
+        if not left:
+            # value <op> column
+            for k, (kind, text) in enumerate(tokens):
+                if kind == "op" and text in COMPARISONS:
+                    parts, end = block.colref(tokens, k + 1)
+                    right = block.resolve(parts) if parts and end == len(tokens) else None
+                    if right:
+                        left = right
+                        rest = [("op", MIRRORED[COMPARISONS[text]])] + tokens[:k]
+                    break
+            if not left:
+                return
+        if not rest:
+            return
+
+        table, column = left
+        head = rest[0]
+        negated = head == ("kw", "NOT")
+        if negated:
+            rest = rest[1:]
+            head = rest[0] if rest else ("", "")
+
+        if head[0] == "op" and head[1] in COMPARISONS and not negated:
+            op = COMPARISONS[head[1]]
+            parts, end = block.colref(rest, 1)
+            other = block.resolve(parts) if parts and end == len(rest) else None
+            if other and op == "=":
+                if other[0] != table:
+                    shape.joins.append((left, other))
+                return
+            value = _value(rest[1:])
+            kind = {"=": "eq", "<>": "neq"}.get(op, "range")
+            self._add(block, Predicate(table, column, kind, [value]))
+        elif head == ("kw", "IS"):
+            words = [text for _, text in rest[1:]]
+            if words == ["NULL"]:
+                self._add(block, Predicate(table, column, "null", []))
+            elif words == ["NOT", "NULL"]:
+                self._add(block, Predicate(table, column, "not_null", []))
+            elif words in (["TRUE"], ["FALSE"]):
+                self._add(block, Predicate(table, column, "eq", [("lit", words[0].lower())]))
+        elif head == ("kw", "IN") and len(rest) > 1 and rest[1] == ("op", "("):
+            items = split_top(rest[2:match_paren(rest, 1)], ("op", ","))
+            values = [("expr", "")] if items == [[("subquery", "?")]] else [_value(item) for item in items]
+            self._add(block, Predicate(table, column, "not_in" if negated else "in", values))
+        elif head == ("kw", "BETWEEN") and not negated:
+            bounds = conjuncts([("kw", "BETWEEN")] + rest[1:])
+            values = [_value(bounds[0][1:])] + [_value(b) for b in bounds[1:]]
+            self._add(block, Predicate(table, column, "range", values[:2]))
+        elif head == ("kw", "LIKE") and not negated and len(rest) == 2:
+            kind, value = _value(rest[1:])
+            if kind == "lit" and value[1:2] not in ("%", "_", ""):
+                self._add(block, Predicate(table, column, "prefix", [(kind, value)]))
+            elif kind == "param":
+                self._add(block, Predicate(table, column, "prefix", [(kind, value)]))
+
+    def _add(self, block: _Block, predicate: Predicate):
+        block.shape.predicates.append(predicate)
+        for kind, text in predicate.values:
+            if kind == "param":
+                block.shape.param_columns[text] = (predicate.table, predicate.column)
+
+
+PG_LOG_RE = re.compile(r"(?:LOG|STATEMENT):\s+(?:duration: ([\d.]+) ms\s+)?(?:statement|execute [^:]*|bind [^:]*):\s?(.*)")
+PG_DURATION_RE = re.compile(r"LOG:\s+duration: ([\d.]+) ms\s*$")
+PG_PARAMS_RE = re.compile(r"DETAIL:\s+parameters: (.*)")
+PG_PARAM_RE = re.compile(r"(\$\d+) = ('(?:[^']|'')*'|NULL)")
+PRISMA_RE = re.compile(r"^(?:prisma:query|Query:)\s+(.*)")
+CALLS_RE = re.compile(r"^\s*--\s*calls:\s*(\d+)\s*$", re.M)
+
+
+def read_corpus(path: str) -> List[Tuple[str, int, float, Optional[Dict[str, str]]]]:
+    """(sql, calls, duration_ms, params) entries from a .sql file or a query log"""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    if re.search(r"^(?:prisma:query|Query:) ", text, re.M):
+        return _read_prisma_log(text)
+    if re.search(r"(?:LOG|STATEMENT):\s+(?:duration: [\d.]+ ms\s+)?(?:statement|execute)", text):
+        return _read_postgres_log(text)
+    entries = []
+    pieces = CALLS_RE.split(text)
+    entries.extend((sql, 1, 0.0, None) for sql in split_statements(pieces[0]))
+    for calls, chunk in zip(pieces[1::2], pieces[2::2]):
+        for n, sql in enumerate(split_statements(chunk)):
+            entries.append((sql, int(calls) if n == 0 else 1, 0.0, None))
+    return entries
+
+
+def _read_postgres_log(text: str) -> List[Tuple[str, int, float, Optional[Dict[str, str]]]]:
+    entries, current = [], None
+    for line in text.splitlines():
+        match = PG_LOG_RE.search(line)
+        if match:
+            if current:
+                entries.append(current)
+            current = [match.group(2), 1, float(match.group(1) or 0), None]
+            continue
+        match = PG_PARAMS_RE.search(line)
+        if match and current:
+            current[3] = {name: value for name, value in PG_PARAM_RE.findall(match.group(1))}
+            continue
+        match = PG_DURATION_RE.search(line)
+        if match and current and not current[2]:
+            current[2] = float(match.group(1))
+            continue
+        if current and line[:1] in ("\t", " ") and not re.search(r"\b(?:LOG|DETAIL|HINT|ERROR):", line):
+            current[0] += "\n" + line.strip()
+        elif current:
+            entries.append(current)
+            current = None
+    if current:
+        entries.append(current)
+    return [tuple(entry) for entry in entries]
+
+
+def _read_prisma_log(text: str) -> List[Tuple[str, int, float, Optional[Dict[str, str]]]]:
+    entries = []
+    for line in text.splitlines():
+        match = PRISMA_RE.match(line)
+        if match:
+            entries.append([match.group(1), 1, 0.0, None])
+        elif entries and line.startswith("Params: "):
+            try:
+                values = json.loads(line[len("Params: "):])
+            except ValueError:
+                continue
+            entries[-1][3] = {f"${n}": _sql_literal(v) for n, v in enumerate(values, 1)}
+        elif entries and line.startswith("Duration: "):
+            entries[-1][2] = float(re.sub(r"[^\d.]", "", line[len("Duration: "):]) or 0)
+    return [tuple(entry) for entry in entries]
+
+
+def _sql_literal(value) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class Stats:
+    """Row counts, distinct counts and null fractions, measured or guessed"""
+
+    def __init__(self, schema: Schema, rows: Optional[Dict[str, int]] = None):
+        self.schema = schema
+        self.rows = dict(HEURISTIC_ROWS)
+        self.rows.update(rows or {})
+        self.distinct: Dict[Tuple[str, str], float] = {}
+        self.null_frac: Dict[Tuple[str, str], float] = {}
+        self.source = "heuristic"
+
+    def row_count(self, table: str) -> int:
+        return max(1, self.rows.get(table, DEFAULT_ROWS))
+
+    def n_distinct(self, table: str, column: str) -> float:
+        if (table, column) in self.distinct:
+            return max(1.0, self.distinct[(table, column)])
+        t = self.schema.tables[table]
+        col = t.columns[column]
+        rows = self.row_count(table)
+        if col.enum_values:
+            return float(len(col.enum_values))
+        if col.base_type == "boolean":
+            return 2.0
+        if col.primary_key or (column,) in t.unique:
+            return float(rows)
+        if col.references:
+            return float(min(rows, self.row_count(col.references[0])))
+        return float(min(rows, round(1 / DEFAULT_EQ_SEL)))
+
+    def selectivity(self, predicate: Predicate) -> float:
+        key = (predicate.table, predicate.column)
+        column = self.schema.tables[predicate.table].columns[predicate.column]
+        known = column.not_null or column.primary_key or key in self.null_frac
+        null_frac = 0.0 if column.not_null or column.primary_key else self.null_frac.get(key, 0.0)
+        eq = (1 - null_frac) / self.n_distinct(*key)
+        op = predicate.op
+        if op == "null":
+            return null_frac if known else DEFAULT_NULL_FRAC
+        if op == "not_null":
+            return 1 - null_frac if known else 1 - DEFAULT_NULL_FRAC
+        if op == "eq":
+            return eq
+        if op == "in":
+            if predicate.values and predicate.values[0][0] == "expr":
+                return min(1.0, eq * 10)
+            return min(1.0, eq * len(set(predicate.values)))
+        if op == "neq":
+            return max(0.0, 1 - null_frac - eq)
+        if op == "not_in":
+            return max(0.0, 1 - null_frac - eq * len(set(predicate.values)))
+        if op == "range":
+            return DEFAULT_RANGE_INEQ_SEL if len(predicate.values) == 2 else DEFAULT_INEQ_SEL
+        if op == "prefix":
+            return DEFAULT_RANGE_INEQ_SEL
+        return 1.0
+
+    def load(self, target: "Target", shapes: List[QueryShape]):
+        """Measure the tables and predicate columns the corpus touches"""
+        columns: Dict[str, Set[str]] = {}
+        for shape in shapes:
+            for table in shape.tables:
+                columns.setdefault(table, set())
+            for predicate in shape.predicates:
+                columns.setdefault(predicate.table, set()).add(predicate.column)
+            for (t1, c1), (t2, c2) in shape.joins:
+                columns.setdefault(t1, set()).add(c1)
+                columns.setdefault(t2, set()).add(c2)
+        for table, names in sorted(columns.items()):
+            rows, per_column = target.column_stats(table, sorted(names))
+            if not rows:
+                continue  # missing or empty: keep the heuristics
+            self.rows[table] = rows
+            for name, (distinct, null_frac) in per_column.items():
+                if distinct:
+                    self.distinct[(table, name)] = distinct
+                self.null_frac[(table, name)] = null_frac
+        self.source = target.name
+
+
+class Candidate:
+    def __init__(self, table: str, columns: Tuple[str, ...], where: Tuple[Predicate, ...],
+                 descending: Tuple[bool, ...] = ()):
+        self.table = table
+        self.columns = columns
+        self.descending = descending or (False,) * len(columns)
+        self.where = where
+        self.name = ""
+        self.include: Set[str] = set()
+        self.shapes: List[QueryShape] = []
+        self.gains: Dict[str, Tuple[float, float]] = {}  # fingerprint -> (weighted gain, selectivity)
+        self.score = 0.0
+        self.selectivity = 1.0
+        self.covering = False
+        self.sorted = False
+        self.replaces: List[str] = []
+        self.validation: List[Dict] = []
+
+    @property
+    def where_sql(self) -> Optional[str]:
+        return " AND ".join(p.sql() for p in self.where) or None
+
+    def default_name(self) -> str:
+        name = f"idx_{self.table}_{'_'.join(self.columns)}"
+        return (name[:MAX_INDEX_NAME - 8] + "_partial") if self.where else name[:MAX_INDEX_NAME]
+
+    def key_sql(self) -> List[str]:
+        return [quote_ident(c) + (" DESC" if d else "") for c, d in zip(self.columns, self.descending)]
+
+    def as_index(self, name: Optional[str] = None) -> Index:
+        return Index(name or self.name, self.table, self.key_sql(),
+                     where=self.where_sql, include=sorted(self.include))
+
+    def ddl(self) -> str:
+        statement = f"CREATE INDEX CONCURRENTLY {self.name} ON {self.table} ({', '.join(self.key_sql())})"
+        if self.include:
+            statement += f" INCLUDE ({', '.join(quote_ident(c) for c in sorted(self.include))})"
+        if self.where:
+            statement += f" WHERE {self.where_sql}"
+        return statement + ";"
+
+
+def evaluate_index(columns: List[str], where: Optional[Tuple[Predicate, ...]], include: Set[str],
+                   shape: QueryShape, table: str, stats: Stats, where_sql: Optional[str] = None,
+                   descending: Optional[Tuple[bool, ...]] = None):
+    """(selectivity, covering, sorted) for one index and query, or None if unusable
+
+    where is the candidate's partial predicate; existing indexes pass where_sql
+    and must match one of the query's constant predicates textually.
+    """
+    predicates = shape.predicates_on(table)
+    constants = {p.key: shape.constant_form(p) for p in predicates}
+    constant_sql = {c.sql() for c in constants.values() if c}
+    selectivity = 1.0
+    used: Set[str] = set()
+    if where:
+        if not all(p.sql() in constant_sql for p in where):
+            return None
+        for p in where:
+            selectivity *= stats.selectivity(p)
+            used.add(p.sql())
+    elif where_sql:
+        if where_sql not in constant_sql:
+            return None
+        used.add(where_sql)
+
+    by_column: Dict[str, List[Predicate]] = {}
+    for p in predicates:
+        constant = constants[p.key]
+        if not (constant and constant.sql() in used):
+            by_column.setdefault(p.column, []).append(p)
+    join_columns = lookup_columns(shape, table)
+
+    prefix = 0
+    for column in columns:
+        eq = [p for p in by_column.get(column, []) if p.op in ("eq", "in", "null")]
+        if eq:
+            selectivity *= min(stats.selectivity(p) for p in eq)
+            prefix += 1
+            continue
+        if column in join_columns and not by_column.get(column):
+            selectivity *= 1 / stats.n_distinct(table, column)
+            prefix += 1
+            continue
+        ranges = [p for p in by_column.get(column, []) if p.op in ("range", "prefix")]
+        if ranges:
+            for p in ranges:
+                selectivity *= stats.selectivity(p)
+            prefix = -prefix - 1  # a range ends the usable prefix
+        break
+
+    usable_prefix = prefix if prefix >= 0 else -prefix - 1
+    order = [(c, d) for t, c, d in shape.order_by if t == table]
+    is_sorted = False
+    if prefix >= 0 and order and shape.order_ok and len(order) == len(shape.order_by):
+        tail = slice(usable_prefix, usable_prefix + len(order))
+        index_directions = (descending or (False,) * len(columns))[tail]
+        # a B-tree can be read backwards, so only the relative directions matter
+        flips = {d != i for (_, d), i in zip(order, index_directions)}
+        is_sorted = len(flips) == 1 and list(columns[tail]) == [c for c, _ in order]
+    group = [c for t, c in shape.group_by if t == table]
+    if not is_sorted and prefix >= 0 and group and len(group) == len(shape.group_by) and len(shape.tables) == 1:
+        is_sorted = set(columns[usable_prefix:usable_prefix + len(group)]) == set(group)
+
+    if selectivity == 1.0 and not is_sorted:
+        return None
+    needed = shape.needed.get(table, set())
+    partial_columns = {p.column for p in where or ()}
+    covering = needed is not None and needed <= set(columns) | include | partial_columns
+    return selectivity, covering, is_sorted
+
+
+def lookup_columns(shape: QueryShape, table: str) -> Set[str]:
+    """Join columns of a table the query only reaches through joins (the probed side)"""
+    if any(p.table == table for p in shape.predicates):
+        return set()
+    return {c for side in shape.joins for t, c in side if t == table}
+
+
+def generate_candidates(shapes: List[QueryShape], schema: Schema, stats: Stats) -> Dict[Tuple, Candidate]:
+    candidates: Dict[Tuple, Candidate] = {}
+    for shape in shapes:
+        for table in shape.tables:
+            predicates = shape.predicates_on(table)
+            where, eq, ranges = [], [], []
+            for p in predicates:
+                constant = shape.constant_form(p)
+                if constant and (p.op in ("null", "not_null")
+                                 or stats.n_distinct(table, p.column) <= PARTIAL_MAX_DISTINCT):
+                    where.append(constant)
+                elif p.op in ("eq", "in"):
+                    eq.append(p)
+                elif p.op in ("range", "prefix"):
+                    ranges.append(p)
+            if stats.row_count(table) < MIN_TABLE_ROWS:
+                continue
+            for column in sorted(lookup_columns(shape, table)):
+                eq.append(Predicate(table, column, "eq", [("expr", "")]))
+
+            key: List[str] = []
+            for p in sorted(eq, key=stats.selectivity):
+                if p.column not in key:
+                    key.append(p.column)
+            descending = [False] * len(key)
+            order = [(c, d) for t, c, d in shape.order_by if t == table]
+            group = [c for t, c in shape.group_by if t == table]
+            if order and shape.order_ok and len(order) == len(shape.order_by) \
+                    and (not ranges or ranges[0].column == order[0][0]) \
+                    and not any(c in key for c, _ in order):
+                key.extend(c for c, _ in order)
+                descending.extend(d != order[0][1] for _, d in order)
+            elif ranges:
+                best = min(ranges, key=stats.selectivity)
+                if best.column not in key:
+                    key.append(best.column)
+                    descending.append(False)
+            elif group and len(group) == len(shape.group_by) and len(shape.tables) == 1:
+                key.extend(c for c in group if c not in key)
+                descending = [False] * len(key)
+            if not key:
+                # e.g. COUNT(*) WHERE deleted_at IS NULL AND status NOT IN (...)
+                key = [p.column for p in where if p.op not in ("null",)][:1]
+                where = [p for p in where if p.op == "null"] or where
+                descending = [False] * len(key)
+            if not key:
+                continue
+
+            signature = (table, tuple(key), tuple(descending), tuple(sorted(p.sql() for p in where)))
+            candidate = candidates.get(signature)
+            if candidate is None:
+                candidate = candidates[signature] = Candidate(
+                    table, tuple(key), tuple(sorted(where, key=Predicate.sql)), tuple(descending))
+            needed = shape.needed.get(table, set())
+            if needed is not None:
+                candidate.include |= needed - set(key) - {p.column for p in where}
+            else:
+                candidate.include = {"*"}
+            candidate.shapes.append(shape)
+    return candidates
+
+
+def merge_prefixes(candidates: List[Candidate]) -> List[Candidate]:
+    """Fold each candidate into a longer one on the same table/WHERE that it prefixes"""
+    ordered = sorted(candidates, key=lambda c: -len(c.columns))
+    kept: List[Candidate] = []
+    for candidate in ordered:
+        for longer in kept:
+            n = len(candidate.columns)
+            if longer.table == candidate.table and longer.where_sql == candidate.where_sql \
+                    and longer.columns[:n] == candidate.columns and longer.descending[:n] == candidate.descending:
+                longer.shapes.extend(s for s in candidate.shapes if s not in longer.shapes)
+                longer.include |= candidate.include
+                break
+        else:
+            kept.append(candidate)
+    return kept
+
+
+def _baseline(shape: QueryShape, table: str, options: List[Tuple], stats: Stats) -> Tuple[float, bool, bool]:
+    """(selectivity, covering, sorted) of the best of the given indexes for a query"""
+    best = (1.0, False, False)
+    for columns, where, where_sql, include, descending in options:
+        found = evaluate_index(columns, where, include, shape, table, stats,
+                               where_sql=where_sql, descending=descending)
+        if found and (found[0], not found[1], not found[2]) < (best[0], not best[1], not best[2]):
+            best = found
+    return best
+
+
+def _options(indexes: List[Index], chosen: List[Candidate], table: str) -> List[Tuple]:
+    options = [(index.columns, None, index.where, set(index.include), None) for index in indexes]
+    options += [(list(c.columns), c.where, None, c.include, c.descending) for c in chosen if c.table == table]
+    return options
+
+
+def score(candidate: Candidate, shapes: List[QueryShape], options: List[Tuple], stats: Stats):
+    """Benefit over the best available index for every query on the candidate's table"""
+    total, served = 0.0, []
+    candidate.covering = candidate.sorted = False
+    for shape in shapes:
+        if candidate.table not in shape.tables:
+            continue
+        mine = evaluate_index(list(candidate.columns), candidate.where, candidate.include,
+                              shape, candidate.table, stats, descending=candidate.descending)
+        if mine is None:
+            continue
+        base_sel, base_cover, base_sorted = _baseline(shape, candidate.table, options, stats)
+        if base_sel * stats.row_count(candidate.table) <= 1:
+            continue  # already a single-row lookup
+        sel, cover, is_sorted = mine
+        gain = math.log2(base_sel / sel) if sel > 0 else 0.0
+        gain += (cover and not base_cover) + (is_sorted and not base_sorted)
+        if gain > 0.05:
+            total += shape.weight * gain
+            served.append((shape, sel, shape.weight * gain))
+            candidate.covering = cover or candidate.covering
+            candidate.sorted = is_sorted or candidate.sorted
+    served.sort(key=lambda item: -item[0].weight)
+    candidate.shapes = [shape for shape, _, _ in served]
+    candidate.gains = {shape.fingerprint: (benefit, sel) for shape, sel, benefit in served}
+    candidate.score = total
+    candidate.selectivity = served[0][1] if served else 1.0  # for the heaviest query served
+
+
+def recommend(shapes: List[QueryShape], schema: Schema, stats: Stats, top: Optional[int] = None) -> List[Candidate]:
+    """Greedy selection: take the best candidate, count it as existing, re-score the rest
+
+    Each recommendation's score and served queries are therefore marginal:
+    what it adds on top of the schema and the recommendations before it.
+    """
+    remaining = merge_prefixes(list(generate_candidates(shapes, schema, stats).values()))
+    for candidate in remaining:
+        if "*" in candidate.include or len(candidate.include) > MAX_INCLUDE:
+            candidate.include = set()
+        candidate.include -= set(candidate.columns)
+    chosen: List[Candidate] = []
+    while remaining and (not top or len(chosen) < top):
+        for candidate in remaining:
+            score(candidate, shapes, _options(schema.indexes_on(candidate.table), chosen, candidate.table), stats)
+        best = max(remaining, key=lambda c: c.score)
+        if best.score <= 0 or (chosen and best.score < chosen[0].score * MIN_SCORE_SHARE):
+            break
+        remaining.remove(best)
+        chosen.append(best)
+
+    names = {index.name for index in schema.indexes}
+    for candidate in chosen:
+        name, n = candidate.default_name(), 2
+        while name in names:
+            name = f"{candidate.default_name()[:MAX_INDEX_NAME - 3]}_{n}"
+            n += 1
+        candidate.name = name
+        names.add(name)
+        if not candidate.where:
+            candidate.replaces = [index.name for index in schema.indexes
+                                  if index.table == candidate.table and not index.unique and not index.where
+                                  and len(index.columns) < len(candidate.columns)
+                                  and tuple(index.columns) == candidate.columns[:len(index.columns)]]
+    return chosen
+
+
+class Target:
+    """A database to read statistics from and validate recommendations against"""
+
+    name = "database"
+
+    def sample(self, table: str, column: str, n: int) -> List:
+        """Up to n distinct non-null values of a column, in ascending order"""
+        raise NotImplementedError
+
+    def bind(self, shape: QueryShape) -> Dict[str, object]:
+        """Parameter values: logged ones, else LIMIT defaults, else sampled column values
+
+        Parameters on the same column get distinct samples in ascending order,
+        so "created_at >= $2 AND created_at < $3" selects a non-empty range.
+        """
+        values, sampled = {}, {}
+        for kind, text in shape.tokens:
+            if kind != "param" or text in values:
+                continue
+            if text in shape.params:
+                literal = shape.params[text]
+                values[text] = None if literal == "NULL" else literal.strip("'").replace("''", "'")
+            elif text in shape.limit_params:
+                values[text] = shape.limit_params[text]
+            elif text in shape.param_columns:
+                values[text] = None
+                sampled.setdefault(shape.param_columns[text], []).append(text)
+            else:
+                values[text] = None
+        for (table, column), names in sampled.items():
+            samples = self.sample(table, column, len(names))
+            for name, value in zip(names, samples):
+                values[name] = value
+        return values
+
+
+class SQLiteTarget(Target):
+    def __init__(self, path: str):
+        self.name = f"sqlite:{path}"
+        self.db = sqlite3.connect(path)
+        self._samples: Dict[Tuple[str, str, int], List] = {}
+
+    def column_stats(self, table: str, columns: List[str]):
+        try:
+            rows = self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        except sqlite3.Error:
+            return None, {}
+        result = {}
+        for column in columns:
+            distinct, nulls = self.db.execute(
+                f'SELECT COUNT(DISTINCT "{column}"), SUM("{column}" IS NULL) FROM {table}').fetchone()
+            result[column] = (distinct, (nulls or 0) / rows if rows else 0.0)
+        return rows, result
+
+    def sample(self, table: str, column: str, n: int) -> List:
+        key = (table, column, n)
+        if key not in self._samples:
+            rows = self.db.execute(f'SELECT DISTINCT "{column}" FROM {table} WHERE "{column}" IS NOT NULL '
+                                   f"ORDER BY random() LIMIT {n}").fetchall()
+            self._samples[key] = sorted(row[0] for row in rows)
+        return self._samples[key]
+
+    def measure(self, shape: QueryShape, repeat: int) -> Dict:
+        sql = render(shape.tokens, "sqlite")
+        values = self.bind(shape)
+        params = {name[1:]: value for name, value in values.items()}
+        plan = "; ".join(row[3] for row in self.db.execute("EXPLAIN QUERY PLAN " + sql, params))
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            self.db.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        return {"plan": plan, "ms": statistics.median(timings)}
+
+    def trial(self, candidate: Candidate, shapes: List[QueryShape], repeat: int) -> List[Dict]:
+        name = f"advisor_{candidate.name}"[:MAX_INDEX_NAME]
+        before = [self.measure(shape, repeat) for shape in shapes]
+        self.db.execute(sqlite_index(candidate.as_index(), name=name))
+        self.db.execute("ANALYZE")
+        try:
+            after = [self.measure(shape, repeat) for shape in shapes]
+        finally:
+            self.db.execute(f"DROP INDEX IF EXISTS {name}")
+            self.db.commit()
+        return [{"query": shape.fingerprint, "before": b, "after": a} for shape, b, a in zip(shapes, before, after)]
+
+    def close(self):
+        self.db.close()
+
+
+class PostgresTarget(Target):
+    def __init__(self, url: str):
+        self.name = mask_url(url)
+        self.conn = connect_postgres(url)
+        self._samples: Dict[Tuple[str, str, int], List] = {}
+
+    def _query(self, sql: str, params=None):
+        with self.conn.cursor() as cur:
+            cur.execute(sql, params)
+            return cur.fetchall()
+
+    def column_stats(self, table: str, columns: List[str]):
+        rows = self._query("SELECT reltuples::bigint FROM pg_class WHERE relname = %s AND relkind = 'r'", (table,))
+        if not rows:
+            return None, {}
+        count = max(0, rows[0][0])
+        result = {}
+        for column, n_distinct, null_frac in self._query(
+                "SELECT attname, n_distinct, null_frac FROM pg_stats "
+                "WHERE schemaname = 'public' AND tablename = %s AND attname = ANY(%s)", (table, columns)):
+            distinct = n_distinct if n_distinct >= 0 else -n_distinct * count
+            result[column] = (distinct, null_frac)
+        self.conn.rollback()
+        return count, result
+
+    def sample(self, table: str, column: str, n: int) -> List:
+        key = (table, column, n)
+        if key not in self._samples:
+            rows = self._query(f'SELECT DISTINCT "{column}" FROM {table} TABLESAMPLE SYSTEM (1) '
+                               f'WHERE "{column}" IS NOT NULL LIMIT {n}')
+            if len(rows) < n:
+                rows = self._query(f'SELECT DISTINCT "{column}" FROM {table} WHERE "{column}" IS NOT NULL LIMIT {n}')
+            self._samples[key] = sorted(row[0] for row in rows)
+        return self._samples[key]
+
+    def measure(self, shape: QueryShape, repeat: int) -> Dict:
+        sql = render(shape.raw)
+        params = {f"p{name[1:]}": value for name, value in self.bind(shape).items()}
+        timings, plan = [], ""
+        for _ in range(repeat):
+            (result,), = self._query("EXPLAIN (ANALYZE, FORMAT JSON) " + sql, params)
+            result = result[0] if isinstance(result, list) else json.loads(result)[0]
+            timings.append(result["Execution Time"])
+            plan = _pg_plan_summary(result["Plan"])
+        return {"plan": plan, "ms": statistics.median(timings)}
+
+    def trial(self, candidate: Candidate, shapes: List[QueryShape], repeat: int) -> List[Dict]:
+        name = f"advisor_{candidate.name}"[:MAX_INDEX_NAME]
+        try:
+            before = [self.measure(shape, repeat) for shape in shapes]
+            self._query_none(candidate.ddl().replace(" CONCURRENTLY", "").replace(candidate.name, name, 1))
+            self._query_none(f"ANALYZE {candidate.table}")
+            after = [self.measure(shape, repeat) for shape in shapes]
+        finally:
+            self.conn.rollback()
+        return [{"query": shape.fingerprint, "before": b, "after": a} for shape, b, a in zip(shapes, before, after)]
+
+    def _query_none(self, sql: str):
+        with self.conn.cursor() as cur:
+            cur.execute(sql)
+
+    def close(self):
+        self.conn.close()
+
+
+def _pg_plan_summary(node: Dict) -> str:
+    parts = []
+
+    def walk(n):
+        label = n["Node Type"]
+        if n.get("Index Name"):
+            label += f" using {n['Index Name']}"
+        parts.append(label)
+        for child in n.get("Plans", []):
+            walk(child)
+
+    walk(node)
+    return f"{' -> '.join(parts)} (cost {node['Total Cost']:.0f})"
+
+
+def open_target(spec: str) -> Target:
+    if spec.startswith(("postgres://", "postgresql://")):
+        return PostgresTarget(spec)
+    return SQLiteTarget(spec[len("sqlite:"):] if spec.startswith("sqlite:") else spec)
+
+
+def load_shapes(paths: List[str], schema: Schema) -> List[QueryShape]:
+    analyzer = Analyzer(schema)
+    for path in paths:
+        for sql, calls, duration_ms, params in read_corpus(path):
+            analyzer.add(sql, calls, duration_ms, params)
+    return [shape for shape in analyzer.shapes.values() if shape.tables]
+
+
+def apply_validation(ranked: List[Candidate]) -> List[Candidate]:
+    """Stop counting served queries that validation measured as slower, and re-rank
+
+    Their gain comes off the candidate's score and they leave its served
+    queries; a candidate left serving nothing is dropped.
+    """
+    for candidate in ranked:
+        slower = set()
+        for result in candidate.validation:
+            before, after = result["before"]["ms"], result["after"]["ms"]
+            result["slower"] = bool(after) and before / after < MIN_VALIDATED_SPEEDUP
+            if result["slower"]:
+                slower.add(result["query"])
+        if not slower:
+            continue
+        candidate.shapes = [shape for shape in candidate.shapes if shape.fingerprint not in slower]
+        candidate.score -= sum(candidate.gains[fingerprint][0] for fingerprint in slower)
+        if candidate.shapes:
+            candidate.selectivity = candidate.gains[candidate.shapes[0].fingerprint][1]
+    return sorted((c for c in ranked if c.shapes), key=lambda c: -c.score)
+
+
+def print_report(ranked: List[Candidate], shapes: List[QueryShape], stats: Stats):
+    weighted_by = "total time" if any(s.total_ms for s in shapes) else "call count"
+    print(f"📊 {len(shapes)} query shapes ({sum(s.calls for s in shapes):,} calls, weighted by {weighted_by}); "
+          f"selectivity from {stats.source}")
+    if not ranked:
+        print("✅ No index recommendations: existing indexes already serve the corpus")
+        return
+    for n, candidate in enumerate(ranked, 1):
+        rows = stats.row_count(candidate.table)
+        traits = [label for label, on in (("covering", candidate.covering), ("avoids sort", candidate.sorted),
+                                          ("partial", bool(candidate.where))) if on]
+        print(f"\n{n:>2}. {candidate.ddl()}")
+        print(f"    score {candidate.score:,.0f} | selectivity {candidate.selectivity:.4g} "
+              f"(~{candidate.selectivity * rows:,.0f} of {rows:,} rows)"
+              + (f" | {', '.join(traits)}" if traits else ""))
+        for shape in candidate.shapes[:3]:
+            weight = f"{shape.total_ms:,.0f} ms" if shape.total_ms else f"{shape.calls:,}×"
+            print(f"    serves {weight:>9}  {shape.fingerprint[:110]}")
+        if len(candidate.shapes) > 3:
+            print(f"    ... and {len(candidate.shapes) - 3} more")
+        if candidate.replaces:
+            print(f"    makes redundant: {', '.join(candidate.replaces)}")
+        for result in candidate.validation:
+            before, after = result["before"], result["after"]
+            speedup = before["ms"] / after["ms"] if after["ms"] else float("inf")
+            if result.get("slower"):
+                icon = "❌"
+            else:
+                icon = "✅" if after["plan"] != before["plan"] else "⚠️"
+            print(f"    {icon} {before['ms']:.2f} ms -> {after['ms']:.2f} ms ({speedup:.1f}x)  {after['plan'][:100]}")
+            if result.get("slower"):
+                print(f"       slower, not counted: {result['query'][:100]}")
+
+
+def to_dict(candidate: Candidate, stats: Stats) -> Dict:
+    return {
+        "ddl": candidate.ddl(),
+        "table": candidate.table,
+        "columns": list(candidate.columns),
+        "include": sorted(candidate.include),
+        "where": candidate.where_sql,
+        "score": round(candidate.score, 1),
+        "selectivity": candidate.selectivity,
+        "estimated_rows": round(candidate.selectivity * stats.row_count(candidate.table)),
+        "covering": candidate.covering,
+        "avoids_sort": candidate.sorted,
+        "replaces": candidate.replaces,
+        "queries": [{"fingerprint": s.fingerprint, "calls": s.calls, "total_ms": s.total_ms}
+                    for s in candidate.shapes],
+        "validation": candidate.validation,
+    }
+
+
+def parse_rows(values: List[str]) -> Dict[str, int]:
+    rows = {}
+    for value in values:
+        table, _, count = value.partition("=")
+        if not count.isdigit():
+            raise argparse.ArgumentTypeError(f"--rows expects TABLE=N, got {value!r}")
+        rows[table] = int(count)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend indexes for a query corpus")
+    parser.add_argument("corpus", nargs="+", help=".sql file, PostgreSQL log or Prisma query log")
+    parser.add_argument("--schema", default=SCHEMA_PATH, help="Schema file (default: database/schema.sql)")
+    parser.add_argument("--stats", metavar="DB", help="Read row counts and column statistics from DB "
+                                                       "(sqlite:PATH or postgresql://...)")
+    parser.add_argument("--validate", metavar="DB", help="EXPLAIN and time served queries with each "
+                                                          "recommendation created temporarily on DB")
+    parser.add_argument("--rows", action="append", default=[], metavar="TABLE=N",
+                        help="Override the heuristic row count of a table")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query when validating")
+    parser.add_argument("--top", type=int, help="Only show the N best recommendations")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a report")
+    args = parser.parse_args()
+
+    schema = load_schema(args.schema)
+    shapes = load_shapes(args.corpus, schema)
+    if not shapes:
+        print("❌ No queries against schema tables found in the corpus")
+        sys.exit(1)
+
+    stats = Stats(schema, parse_rows(args.rows))
+    try:
+        target = open_target(args.validate) if args.validate else None
+        source = open_target(args.stats) if args.stats else target
+    except ImportError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    try:
+        if source:
+            stats.load(source, shapes)
+            if source is not target:
+                source.close()
+        ranked = recommend(shapes, schema, stats, args.top)
+        if target:
+            for candidate in ranked:
+                try:
+                    candidate.validation = target.trial(candidate, candidate.shapes[:3], args.repeat)
+                except Exception as e:
+                    candidate.validation = []
+                    print(f"⚠️  Could not validate {candidate.name}: {e}", file=sys.stderr)
+            validated = apply_validation(ranked)
+            for candidate in ranked:
+                if candidate not in validated:
+                    print(f"⚠️  Dropped {candidate.name}: slower for every query it serves", file=sys.stderr)
+            ranked = validated
+    finally:
+        if target:
+            target.close()
+
+    if args.json:
+        print(json.dumps([to_dict(c, stats) for c in ranked], indent=2, default=str))
+    else:
+        print_report(ranked, shapes, stats)
+
+
+if __name__ == "__main__":
+    main()
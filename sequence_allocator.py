@@ -0,0 +1,906 @@
+#!/usr/bin/env python3
+"""
+Block-leasing allocator for work order sequence numbers
+
+get_next_work_order_number (and the upsert in /api/po and /api/po/quick)
+takes the next number by incrementing work_order_sequences.last_sequence
+for the division and year. Every PO that creates a work order therefore
+updates the same row, and when that happens inside the creating
+transaction the row lock is held until commit: concurrent creations in a
+division run one at a time.
+
+This service leases blocks instead. One short transaction advances
+last_sequence by a whole block (default 50) and records the range in
+sequence_leases; the numbers are then handed out from memory, so the hot
+row is touched once per block rather than once per work order. A
+replacement block is leased in the background when the current one runs
+low, so callers rarely wait on the database at all.
+
+Numbers are never issued twice:
+
+    - a lease belongs to one allocator (holder) and carries expires_at,
+      which a heartbeat extends; an allocator that cannot renew stops
+      issuing from its leases once they lapse
+    - on shutdown the unused tail of each lease is marked 'returned' and
+      the next lease for that division and year takes it before advancing
+      last_sequence
+    - after a crash nothing is returned, so 'recover' (run by every live
+      allocator on start-up and with each heartbeat) reclaims leases that
+      expired more than --grace seconds ago: numbers that a work order
+      (WO-NNNN) or a PO (po_work_order_num) in the division already uses
+      stay consumed, every other run in the range is returned
+    - a leased range is consumed by exactly one holder: claiming a
+      returned range and recovering an expired one lock the lease row
+      (FOR UPDATE SKIP LOCKED), advancing last_sequence locks the
+      sequence row
+
+Numbers keep their formats: WO-0001 for work orders and
+"<leader> <gl> <wo> <vendor>" (O1 10 0001 AB) for smart PO numbers, zero
+padded to four digits like the routes' padStart (SQL's LPAD would
+truncate a fifth digit). Within a year numbers stay unique but are no
+longer strictly in creation order across allocators, and a returned
+range is reissued after later ones.
+
+Endpoints (JSON):
+    POST /v1/sequences/next         {"division_id": ..., "year": 2026}
+                                    -> sequence, work_order_number
+    POST /v1/po-numbers             {"division_id", "leader_code", "gl_code",
+                                     "vendor_code", "work_order_num"?}
+                                    -> po_number (allocates a new work order
+                                       sequence unless work_order_num is given)
+    GET  /v1/stats, GET /health
+
+Usage:
+    python sequence_allocator.py serve "$DATABASE_URL" --port 8095 --block 50
+    python sequence_allocator.py next "$DATABASE_URL" --division O1 --count 3
+    python sequence_allocator.py recover "$DATABASE_URL" --grace 120
+    python sequence_allocator.py status "$DATABASE_URL"
+    python sequence_allocator.py benchmark --workers 32 --creations 4000 --work-ms 5
+
+    allocator = SequenceAllocator(open_store(url), block=50)
+    seq = allocator.next(division_id)              # current year
+    allocator.close()                              # returns unused ranges
+
+benchmark runs on a scratch SQLite database unless given a PostgreSQL
+URL (use a scratch database: it needs divisions rows and writes to
+work_order_sequences and sequence_leases under year 9999, which it
+removes afterwards).
+
+Requirements:
+    PostgreSQL: pip install 'psycopg[binary]' (or psycopg2)
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from sql_schema import connect_postgres, mask_url
+
+DEFAULT_BLOCK = 50
+DEFAULT_TTL = 60          # seconds a lease stays valid without a heartbeat
+DEFAULT_GRACE = 120       # seconds past expiry before a lease is reclaimed
+LOW_WATER = 0.25          # prefetch the next block when this fraction is left
+USAGE_MARGIN = 86_400     # look for uses created up to a day before the lease
+BENCH_YEAR = 9999
+
+POSTGRES_DDL = [
+    """CREATE TABLE IF NOT EXISTS sequence_leases (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    division_id UUID NOT NULL REFERENCES divisions(id),
+    year INTEGER NOT NULL,
+    range_start INTEGER NOT NULL,
+    range_end INTEGER NOT NULL,
+    state VARCHAR(10) NOT NULL DEFAULT 'active',
+    holder VARCHAR(100),
+    leased_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE,
+    closed_at TIMESTAMP WITH TIME ZONE
+)""",
+    "CREATE INDEX IF NOT EXISTS idx_sequence_leases_state ON sequence_leases(division_id, year, state)",
+]
+
+SQLITE_DDL = [
+    """CREATE TABLE IF NOT EXISTS work_order_sequences (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(16)))),
+    division_id TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    last_sequence INTEGER DEFAULT 0,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (division_id, year)
+)""",
+    """CREATE TABLE IF NOT EXISTS sequence_leases (
+    id TEXT PRIMARY KEY,
+    division_id TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    range_start INTEGER NOT NULL,
+    range_end INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'active',
+    holder TEXT,
+    leased_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    expires_at TEXT,
+    closed_at TEXT
+)""",
+    "CREATE INDEX IF NOT EXISTS idx_sequence_leases_state ON sequence_leases(division_id, year, state)",
+]
+
+# Where a leased number can have been used; %(since)s is the lease time less USAGE_MARGIN
+USAGE_QUERIES = [
+    "SELECT work_order_number FROM work_orders "
+    "WHERE division_id = %(division_id)s AND created_at >= %(since)s",
+    "SELECT po_work_order_num FROM po_headers WHERE division_id = %(division_id)s "
+    "AND po_work_order_num BETWEEN %(lo)s AND %(hi)s AND created_at >= %(since)s",
+]
+
+
+def work_order_number(sequence: int) -> str:
+    return f"WO-{sequence:04d}"
+
+
+def smart_po_number(leader_code: str, gl_code: str, sequence: int, vendor_code: str) -> str:
+    """The O1 10 0001 AB format of generate_smart_po_number"""
+    return f"{leader_code} {gl_code} {sequence:04d} {vendor_code}"
+
+
+def _sequence_of(value) -> Optional[int]:
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"WO-(\d+)", str(value or ""))
+    return int(match.group(1)) if match else None
+
+
+def _runs(numbers: Sequence[int]) -> List[Tuple[int, int]]:
+    """Sorted numbers -> maximal consecutive (start, end) runs"""
+    runs = []
+    for n in numbers:
+        if runs and runs[-1][1] == n - 1:
+            runs[-1][1] = n
+        else:
+            runs.append([n, n])
+    return [tuple(r) for r in runs]
+
+
+class AllocatorError(Exception):
+    pass
+
+
+class Lease:
+    __slots__ = ("id", "division_id", "year", "start", "end", "next", "valid_until")
+
+    def __init__(self, lease_id: str, division_id: str, year: int, start: int, end: int, valid_until: float):
+        self.id = lease_id
+        self.division_id = division_id
+        self.year = year
+        self.start = start
+        self.end = end
+        self.next = start
+        self.valid_until = valid_until  # time.monotonic() deadline, pushed out by each renewal
+
+    @property
+    def remaining(self) -> int:
+        return self.end - self.next + 1
+
+
+class SequenceStore:
+    """sequence_leases and work_order_sequences; one connection, one transaction at a time"""
+
+    name = ""
+
+    def __init__(self, usage_queries: Sequence[str] = USAGE_QUERIES):
+        self.lock = threading.Lock()
+        self.usage_queries = list(usage_queries)
+
+    # dialect hooks
+    def _sql(self, sql: str) -> str:
+        return sql
+
+    def _after(self, seconds: int) -> str:
+        raise NotImplementedError
+
+    def _begin(self):
+        raise NotImplementedError
+
+    def _run(self, sql: str, params=()) -> List[Tuple]:
+        raise NotImplementedError
+
+    def _end(self, commit: bool):
+        raise NotImplementedError
+
+    def _since(self, leased_at):
+        raise NotImplementedError
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            self._begin()
+            try:
+                yield self._run
+            except BaseException:
+                self._end(False)
+                raise
+            self._end(True)
+
+    def close(self):
+        self.conn.close()
+
+    def division_id(self, code_or_id: str) -> str:
+        with self.transaction() as run:
+            rows = run("SELECT id FROM divisions WHERE division_code = %s OR CAST(id AS TEXT) = %s",
+                       (code_or_id, code_or_id))
+        if not rows:
+            raise AllocatorError(f"no division '{code_or_id}'")
+        return str(rows[0][0])
+
+    def lease(self, division_id: str, year: int, size: int, holder: str, ttl: int) -> Lease:
+        deadline = time.monotonic() + ttl
+        with self.transaction() as run:
+            rows = run(f"SELECT id, range_start, range_end FROM sequence_leases "
+                       f"WHERE division_id = %s AND year = %s AND state = 'returned' "
+                       f"ORDER BY range_start LIMIT 1{self.skip_locked}", (division_id, year))
+            if rows:
+                lease_id, start, end = rows[0]
+                if end - start + 1 > size:
+                    # keep the rest of a large returned range for the next lease
+                    run("UPDATE sequence_leases SET range_start = %s WHERE id = %s", (start + size, lease_id))
+                    lease_id, end = str(uuid.uuid4()), start + size - 1
+                    run(f"INSERT INTO sequence_leases (id, division_id, year, range_start, range_end, state, "
+                        f"holder, leased_at, expires_at) VALUES (%s, %s, %s, %s, %s, 'active', %s, "
+                        f"{self._after(0)}, {self._after(ttl)})", (lease_id, division_id, year, start, end, holder))
+                else:
+                    run(f"UPDATE sequence_leases SET state = 'active', holder = %s, leased_at = {self._after(0)}, "
+                        f"expires_at = {self._after(ttl)} WHERE id = %s", (holder, lease_id))
+                return Lease(str(lease_id), division_id, year, start, end, deadline)
+
+            end = run(f"INSERT INTO work_order_sequences (division_id, year, last_sequence) VALUES (%s, %s, %s) "
+                      f"ON CONFLICT (division_id, year) DO UPDATE SET last_sequence = "
+                      f"COALESCE(work_order_sequences.last_sequence, 0) + excluded.last_sequence, "
+                      f"updated_at = {self._after(0)} RETURNING last_sequence", (division_id, year, size))[0][0]
+            lease_id = str(uuid.uuid4())
+            run(f"INSERT INTO sequence_leases (id, division_id, year, range_start, range_end, state, holder, "
+                f"leased_at, expires_at) VALUES (%s, %s, %s, %s, %s, 'active', %s, {self._after(0)}, "
+                f"{self._after(ttl)})", (lease_id, division_id, year, end - size + 1, end, holder))
+        return Lease(lease_id, division_id, year, end - size + 1, end, deadline)
+
+    def renew(self, holder: str, ttl: int) -> set:
+        """Extend the holder's active leases; returns the ids still held"""
+        with self.transaction() as run:
+            rows = run(f"UPDATE sequence_leases SET expires_at = {self._after(ttl)} "
+                       f"WHERE holder = %s AND state = 'active' RETURNING id", (holder,))
+        return {str(r[0]) for r in rows}
+
+    def release(self, lease: Lease, holder: str) -> int:
+        """Close a lease: the issued part is consumed, the unused tail returned; returns numbers returned
+
+        A lease that is no longer active under this holder (reclaimed by
+        recover after it lapsed) is left alone: recover already returned
+        its unused numbers.
+        """
+        with self.transaction() as run:
+            if lease.next > lease.start:
+                held = run(f"UPDATE sequence_leases SET state = 'consumed', range_end = %s, "
+                           f"closed_at = {self._after(0)} WHERE id = %s AND holder = %s AND state = 'active' "
+                           "RETURNING id", (lease.next - 1, lease.id, holder))
+                if held and lease.remaining > 0:
+                    run("INSERT INTO sequence_leases (id, division_id, year, range_start, range_end, state) "
+                        "VALUES (%s, %s, %s, %s, %s, 'returned')",
+                        (str(uuid.uuid4()), lease.division_id, lease.year, lease.next, lease.end))
+            else:
+                held = run("UPDATE sequence_leases SET state = 'returned', holder = NULL, expires_at = NULL "
+                           "WHERE id = %s AND holder = %s AND state = 'active' RETURNING id", (lease.id, holder))
+        return max(lease.remaining, 0) if held else 0
+
+    def _used(self, run, division_id: str, year: int, lo: int, hi: int, since) -> set:
+        params = {"division_id": division_id, "year": year, "lo": lo, "hi": hi, "since": since}
+        used = set()
+        for sql in self.usage_queries:
+            for (value,) in run(sql, params):
+                n = _sequence_of(value)
+                if n is not None and lo <= n <= hi:
+                    used.add(n)
+        return used
+
+    def recover(self, grace: int = DEFAULT_GRACE) -> List[Tuple[str, int, int, int]]:
+        """Reclaim leases expired for longer than grace; returns (division_id, year, used, returned) per lease"""
+        out = []
+        with self.transaction() as run:
+            rows = run(f"SELECT id, division_id, year, range_start, range_end, leased_at FROM sequence_leases "
+                       f"WHERE state = 'active' AND expires_at < {self._after(-grace)}{self.skip_locked}")
+            for lease_id, division_id, year, start, end, leased_at in rows:
+                division_id = str(division_id)
+                used = self._used(run, division_id, year, start, end, self._since(leased_at))
+                free = [n for n in range(start, end + 1) if n not in used]
+                run(f"UPDATE sequence_leases SET state = 'consumed', closed_at = {self._after(0)} WHERE id = %s",
+                    (lease_id,))
+                for lo, hi in _runs(free):
+                    run("INSERT INTO sequence_leases (id, division_id, year, range_start, range_end, state) "
+                        "VALUES (%s, %s, %s, %s, %s, 'returned')", (str(uuid.uuid4()), division_id, year, lo, hi))
+                out.append((division_id, year, len(used), len(free)))
+        return out
+
+    def status(self) -> List[Tuple]:
+        with self.transaction() as run:
+            return run("SELECT s.division_id, s.year, s.last_sequence, "
+                       "SUM(CASE WHEN l.state = 'active' THEN l.range_end - l.range_start + 1 ELSE 0 END), "
+                       "SUM(CASE WHEN l.state = 'returned' THEN l.range_end - l.range_start + 1 ELSE 0 END), "
+                       "COUNT(DISTINCT l.holder) "
+                       "FROM work_order_sequences s LEFT JOIN sequence_leases l "
+                       "ON l.division_id = s.division_id AND l.year = s.year "
+                       "GROUP BY s.division_id, s.year, s.last_sequence ORDER BY s.year, s.division_id")
+
+
+class SQLiteSequenceStore(SequenceStore):
+    skip_locked = ""  # BEGIN IMMEDIATE already serialises writers
+
+    def __init__(self, path: str, usage_queries: Sequence[str] = USAGE_QUERIES):
+        super().__init__(usage_queries)
+        self.name = f"sqlite:{path}"
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        for statement in SQLITE_DDL:
+            self.conn.execute(statement)
+
+    def _sql(self, sql: str) -> str:
+        return re.sub(r"%\((\w+)\)s", r":\1", sql).replace("%s", "?")
+
+    def _after(self, seconds: int) -> str:
+        return f"datetime('now', '{seconds:+d} seconds')"
+
+    def _begin(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def _run(self, sql: str, params=()) -> List[Tuple]:
+        return self.conn.execute(self._sql(sql), params).fetchall()
+
+    def _end(self, commit: bool):
+        self.conn.execute("COMMIT" if commit else "ROLLBACK")
+
+    def _since(self, leased_at):
+        moment = datetime.strptime(leased_at, "%Y-%m-%d %H:%M:%S") - timedelta(seconds=USAGE_MARGIN)
+        return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class PostgresSequenceStore(SequenceStore):
+    skip_locked = " FOR UPDATE SKIP LOCKED"
+
+    def __init__(self, url: str, usage_queries: Sequence[str] = USAGE_QUERIES):
+        super().__init__(usage_queries)
+        self.name = mask_url(url)
+        self.conn = connect_postgres(url)
+        with self.transaction() as run:
+            for statement in POSTGRES_DDL:
+                run(statement)
+
+    def _after(self, seconds: int) -> str:
+        return f"NOW() + INTERVAL '{seconds:+d} seconds'"
+
+    def _begin(self):
+        self.cur = self.conn.cursor()
+
+    def _run(self, sql: str, params=()) -> List[Tuple]:
+        self.cur.execute(sql, params)
+        return self.cur.fetchall() if self.cur.description else []
+
+    def _end(self, commit: bool):
+        self.cur.close()
+        self.conn.commit() if commit else self.conn.rollback()
+
+    def _since(self, leased_at):
+        return leased_at - timedelta(seconds=USAGE_MARGIN)
+
+
+def open_store(spec: str, usage_queries: Sequence[str] = USAGE_QUERIES) -> SequenceStore:
+    if spec.startswith(("postgres://", "postgresql://")):
+        return PostgresSequenceStore(spec, usage_queries)
+    path = spec[len("sqlite:"):] if spec.startswith("sqlite:") else spec
+    if not os.path.isfile(path):
+        raise SystemExit(f"❌ No SQLite stand-in at {path} (create one with po_dataset.py or sql_schema.py)")
+    return SQLiteSequenceStore(path, usage_queries)
+
+
+class _Slot:
+    """Per (division, year): the lease being issued from and a prefetched spare"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current: Optional[Lease] = None
+        self.spare: Optional[Lease] = None
+        self.prefetching = False
+        self.issued = 0
+        self.leases = 0
+        self.waits = 0
+
+
+class SequenceAllocator:
+    """Hands out work order sequences from leased blocks; thread-safe"""
+
+    def __init__(self, store: SequenceStore, block: int = DEFAULT_BLOCK, ttl: int = DEFAULT_TTL,
+                 grace: int = DEFAULT_GRACE, holder: Optional[str] = None, recover: bool = True):
+        if block < 1 or ttl < 2:
+            raise ValueError("block must be >= 1 and ttl >= 2 seconds")
+        self.store = store
+        self.block = block
+        self.ttl = ttl
+        self.grace = grace
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.slots: Dict[Tuple[str, int], _Slot] = {}
+        self.slots_lock = threading.Lock()
+        self.retired: List[Lease] = []
+        self.wake = threading.Condition()
+        self.closed = False
+        self.errors = 0
+        if recover:
+            self.store.recover(grace)
+        self.worker = threading.Thread(target=self._background, name="sequence-allocator", daemon=True)
+        self.worker.start()
+
+    def _slot(self, key: Tuple[str, int]) -> _Slot:
+        slot = self.slots.get(key)
+        if slot is None:
+            with self.slots_lock:
+                slot = self.slots.setdefault(key, _Slot())
+        return slot
+
+    def next(self, division_id: str, year: Optional[int] = None) -> int:
+        """The next unused sequence number for the division and year (default: this year)"""
+        if self.closed:
+            raise AllocatorError("allocator is closed")
+        key = (division_id, year or datetime.now().year)
+        slot = self._slot(key)
+        with slot.lock:
+            lease = slot.current
+            if lease is None or lease.remaining <= 0 or time.monotonic() > lease.valid_until:
+                if lease is not None and lease.remaining <= 0:
+                    self._retire(lease)
+                lease = slot.spare
+                slot.spare = None
+                if lease is None or time.monotonic() > lease.valid_until:
+                    slot.waits += 1
+                    lease = self.store.lease(key[0], key[1], self.block, self.holder, self.ttl)
+                slot.current = lease
+                slot.leases += 1
+            number = lease.next
+            lease.next += 1
+            slot.issued += 1
+            if lease.remaining <= self.block * LOW_WATER and slot.spare is None and not slot.prefetching:
+                slot.prefetching = True
+                with self.wake:
+                    self.wake.notify()
+            return number
+
+    def work_order_number(self, division_id: str, year: Optional[int] = None) -> str:
+        return work_order_number(self.next(division_id, year))
+
+    def _retire(self, lease: Lease):
+        with self.wake:
+            self.retired.append(lease)
+            self.wake.notify()
+
+    def _background(self):
+        """Prefetch blocks, close exhausted leases, renew and recover each ttl/3 seconds"""
+        next_beat = time.monotonic() + self.ttl / 3
+        while True:
+            with self.wake:
+                if not self.closed:
+                    self.wake.wait(max(0.0, next_beat - time.monotonic()))
+                retired, self.retired = self.retired, []
+                closed = self.closed
+            try:
+                for lease in retired:
+                    self.store.release(lease, self.holder)
+                if closed:
+                    return
+                for key, slot in list(self.slots.items()):
+                    if slot.prefetching:
+                        try:
+                            spare = self.store.lease(key[0], key[1], self.block, self.holder, self.ttl)
+                        finally:
+                            slot.prefetching = False
+                        with slot.lock:
+                            slot.spare = spare
+                if time.monotonic() >= next_beat:
+                    self._heartbeat()
+                    next_beat = time.monotonic() + self.ttl / 3
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️  sequence allocator: {e}", file=sys.stderr)
+                time.sleep(1)
+
+    def _heartbeat(self):
+        started = time.monotonic()
+        held = self.store.renew(self.holder, self.ttl)
+        for slot in list(self.slots.values()):
+            with slot.lock:
+                for lease in (slot.current, slot.spare):
+                    if lease is None:
+                        continue
+                    if lease.id in held:
+                        lease.valid_until = max(lease.valid_until, started + self.ttl)
+                    elif lease.valid_until < started + self.ttl:
+                        # leased before this renewal yet not renewed: someone recovered it
+                        lease.valid_until = 0.0
+        self.store.recover(self.grace)
+
+    def stats(self) -> Dict:
+        out = {"holder": self.holder, "block": self.block, "errors": self.errors, "keys": []}
+        for (division_id, year), slot in sorted(self.slots.items()):
+            with slot.lock:
+                out["keys"].append({
+                    "division_id": division_id, "year": year, "issued": slot.issued,
+                    "leases": slot.leases, "waits": slot.waits,
+                    "remaining": sum(max(l.remaining, 0) for l in (slot.current, slot.spare) if l)})
+        return out
+
+    def close(self) -> int:
+        """Stop issuing and return every unused range; returns the numbers returned"""
+        if self.closed:
+            return 0
+        with self.wake:
+            self.closed = True
+            self.wake.notify()
+        self.worker.join()
+        returned = 0
+        for slot in self.slots.values():
+            with slot.lock:
+                for lease in (slot.current, slot.spare):
+                    if lease is not None and time.monotonic() <= lease.valid_until:
+                        returned += self.store.release(lease, self.holder)
+                slot.current = slot.spare = None
+        return returned
+
+    def abandon(self):
+        """Stop without returning anything, as a crashed process would (for tests)"""
+        with self.wake:
+            self.closed = True
+            self.retired = []
+            self.wake.notify()
+        self.worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AllocatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_version = "SequenceAllocator/1.0"
+    allocator: SequenceAllocator = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path.rstrip("/")
+        if path == "/health":
+            return self._send(200, {"status": "healthy"})
+        if path == "/v1/stats":
+            return self._send(200, self.allocator.stats())
+        self._send(404, {"message": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            division_id = body["division_id"]
+            year = int(body["year"]) if body.get("year") else None
+        except (ValueError, KeyError, TypeError):
+            return self._send(400, {"message": "expected JSON with division_id (and optionally year)"})
+        path = urlsplit(self.path).path.rstrip("/")
+        try:
+            if path == "/v1/sequences/next":
+                sequence = self.allocator.next(division_id, year)
+                return self._send(200, {"division_id": division_id, "sequence": sequence,
+                                        "work_order_number": work_order_number(sequence)})
+            if path == "/v1/po-numbers":
+                missing = [k for k in ("leader_code", "gl_code", "vendor_code") if not body.get(k)]
+                if missing:
+                    return self._send(400, {"message": f"missing {', '.join(missing)}"})
+                sequence = body.get("work_order_num")
+                created = sequence is None
+                if created:
+                    sequence = self.allocator.next(division_id, year)
+                return self._send(200, {
+                    "division_id": division_id, "sequence": int(sequence), "new_work_order": created,
+                    "work_order_number": work_order_number(int(sequence)),
+                    "po_number": smart_po_number(body["leader_code"], body["gl_code"], int(sequence),
+                                                 body["vendor_code"])})
+        except AllocatorError as e:
+            return self._send(503, {"message": str(e)})
+        except Exception as e:
+            return self._send(500, {"message": str(e)})
+        self._send(404, {"message": "not found"})
+
+
+def create_server(allocator: SequenceAllocator, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Build (but do not start) the allocator service; port 0 picks a free port"""
+    handler = type("BoundAllocatorHandler", (AllocatorHandler,), {"allocator": allocator})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+# ---------------------------------------------------------------------------
+# Benchmark: PO creation with the row-lock sequence vs leased blocks
+# ---------------------------------------------------------------------------
+
+BENCH_TABLE = "sequence_bench_work_orders"
+BENCH_USAGE = [f"SELECT sequence FROM {BENCH_TABLE} WHERE division_id = %(division_id)s "
+               f"AND year = %(year)s AND sequence BETWEEN %(lo)s AND %(hi)s"]
+
+
+class _Bench:
+    """Connections and SQL for the benchmark, on a scratch SQLite file or a PostgreSQL URL"""
+
+    def __init__(self, spec: Optional[str], divisions: int):
+        self.pg = bool(spec)
+        if self.pg:
+            self.spec = spec
+            self.store = PostgresSequenceStore(spec, BENCH_USAGE)
+            with self.store.transaction() as run:
+                self.divisions = [str(r[0]) for r in run("SELECT id FROM divisions ORDER BY division_code LIMIT %s",
+                                                         (divisions,))]
+            if not self.divisions:
+                raise SystemExit("❌ The benchmark database needs at least one divisions row")
+        else:
+            self.tmp = tempfile.TemporaryDirectory()
+            self.spec = os.path.join(self.tmp.name, "bench.db")
+            sqlite3.connect(self.spec).execute("PRAGMA journal_mode = WAL").fetchall()
+            self.store = SQLiteSequenceStore(self.spec, BENCH_USAGE)
+            self.divisions = [uuid.uuid4().hex for _ in range(divisions)]
+        with self.store.transaction() as run:
+            run(f"CREATE TABLE IF NOT EXISTS {BENCH_TABLE} (division_id VARCHAR(64) NOT NULL, "
+                f"year INTEGER NOT NULL, sequence INTEGER NOT NULL, po_number VARCHAR(20) NOT NULL, "
+                f"UNIQUE (division_id, year, sequence))")
+        self.reset()
+
+    def reset(self):
+        with self.store.transaction() as run:
+            for table in (BENCH_TABLE, "sequence_leases", "work_order_sequences"):
+                run(f"DELETE FROM {table} WHERE year = %s", (BENCH_YEAR,))
+
+    def connect(self):
+        if self.pg:
+            return connect_postgres(self.spec)
+        conn = sqlite3.connect(self.spec, timeout=60, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def new_store(self) -> SequenceStore:
+        if self.pg:
+            return PostgresSequenceStore(self.spec, BENCH_USAGE)
+        return SQLiteSequenceStore(self.spec, BENCH_USAGE)
+
+    def create(self, conn, division_id: str, next_number) -> int:
+        """One PO creation: take a number, do the rest of the transaction's work, insert, commit"""
+        p = "%s" if self.pg else "?"
+        cur = conn.cursor()
+        if not self.pg:
+            cur.execute("BEGIN")
+        try:
+            sequence = next_number(cur, division_id)
+            time.sleep(self.work)
+            cur.execute(f"INSERT INTO {BENCH_TABLE} (division_id, year, sequence, po_number) "
+                        f"VALUES ({p}, {p}, {p}, {p})",
+                        (division_id, BENCH_YEAR, sequence, smart_po_number("O1", "10", sequence, "AB")))
+            conn.commit() if self.pg else cur.execute("COMMIT")
+        except Exception:
+            conn.rollback() if self.pg else cur.execute("ROLLBACK")
+            raise
+        return sequence
+
+    def row_lock_number(self, cur, division_id: str) -> int:
+        # get_next_work_order_number inside the creating transaction
+        p = "%s" if self.pg else "?"
+        cur.execute(f"INSERT INTO work_order_sequences (division_id, year, last_sequence) VALUES ({p}, {p}, 1) "
+                    f"ON CONFLICT (division_id, year) DO UPDATE SET "
+                    f"last_sequence = work_order_sequences.last_sequence + 1 RETURNING last_sequence",
+                    (division_id, BENCH_YEAR))
+        return cur.fetchone()[0]
+
+    def numbers(self) -> Dict[str, List[int]]:
+        with self.store.transaction() as run:
+            rows = run(f"SELECT division_id, sequence FROM {BENCH_TABLE} WHERE year = %s ORDER BY 1, 2",
+                       (BENCH_YEAR,))
+        out: Dict[str, List[int]] = {}
+        for division_id, sequence in rows:
+            out.setdefault(str(division_id), []).append(sequence)
+        return out
+
+    def close(self):
+        self.reset()
+        self.store.close()
+        if not self.pg:
+            self.tmp.cleanup()
+
+
+def _run_creations(bench: _Bench, workers: int, creations: int, next_number) -> Dict:
+    latencies: List[float] = []
+    failures = []
+    lock = threading.Lock()
+    counter = iter(range(creations))
+
+    def worker():
+        conn = bench.connect()
+        rng = random.Random()
+        mine = []
+        try:
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        break
+                t0 = time.perf_counter()
+                try:
+                    bench.create(conn, rng.choice(bench.divisions), next_number)
+                except Exception as e:
+                    with lock:
+                        failures.append(str(e))
+                    continue
+                mine.append(time.perf_counter() - t0)
+        finally:
+            conn.close()
+            with lock:
+                latencies.extend(mine)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {"created": len(latencies), "failures": failures, "seconds": elapsed,
+            "rate": len(latencies) / elapsed,
+            "p50": statistics.median(latencies) * 1000 if latencies else 0.0,
+            "p99": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0}
+
+
+def benchmark(spec: Optional[str], workers: int, creations: int, block: int, work_ms: float, divisions: int):
+    bench = _Bench(spec, divisions)
+    bench.work = work_ms / 1000
+    where = mask_url(spec) if spec else "scratch SQLite (WAL)"
+    print(f"🏁 {creations:,} PO creations, {workers} concurrent workers, {len(bench.divisions)} divisions, "
+          f"{work_ms:g} ms of other work per creation transaction, on {where}")
+    results = {}
+    try:
+        results["row-lock"] = _run_creations(bench, workers, creations, bench.row_lock_number)
+
+        bench.reset()
+        allocator = SequenceAllocator(bench.new_store(), block=block)
+        results["leased"] = _run_creations(bench, workers, creations,
+                                           lambda cur, division_id: allocator.next(division_id, BENCH_YEAR))
+        stats = allocator.stats()
+        returned = allocator.close()
+        results["leased"].update(returned=returned,
+                                 leases=sum(k["leases"] for k in stats["keys"]),
+                                 waits=sum(k["waits"] for k in stats["keys"]))
+
+        print(f"{'mode':<10} {'created':>8} {'per sec':>9} {'p50 ms':>8} {'p99 ms':>8} {'failed':>7}")
+        for mode, r in results.items():
+            print(f"{mode:<10} {r['created']:>8,} {r['rate']:>9,.0f} {r['p50']:>8.1f} {r['p99']:>8.1f} "
+                  f"{len(r['failures']):>7}")
+        leased = results["leased"]
+        print(f"🔢 leased: {leased['leases']} blocks of {block} ({leased['waits']} leased while a caller waited), "
+              f"{leased['returned']} unused numbers returned on close")
+        print(f"⚡ {leased['rate'] / results['row-lock']['rate']:.1f}x the row-lock throughput")
+
+        failures = sum(len(r["failures"]) for r in results.values())
+        if failures:
+            print(f"❌ {failures} creations failed, e.g. {next(f for r in results.values() for f in r['failures'])}")
+            sys.exit(1)
+    finally:
+        bench.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lease blocks of work order sequence numbers")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Run the allocator HTTP service")
+    serve.add_argument("database", help="postgresql:// URL or SQLite stand-in path")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8095)
+
+    nxt = sub.add_parser("next", help="Allocate numbers from the command line")
+    nxt.add_argument("database")
+    nxt.add_argument("--division", required=True, help="division_code (e.g. O1) or id")
+    nxt.add_argument("--year", type=int)
+    nxt.add_argument("--count", type=int, default=1)
+    nxt.add_argument("--po", metavar="LEADER,GL,VENDOR", help="Print smart PO numbers, e.g. O1,10,AB")
+
+    for p in (serve, nxt):
+        p.add_argument("--block", type=int, default=DEFAULT_BLOCK, help=f"Numbers per lease (default: {DEFAULT_BLOCK})")
+        p.add_argument("--ttl", type=int, default=DEFAULT_TTL, help=f"Lease lifetime without heartbeat, s (default: {DEFAULT_TTL})")
+        p.add_argument("--grace", type=int, default=DEFAULT_GRACE,
+                       help=f"Seconds past expiry before a dead holder's lease is reclaimed (default: {DEFAULT_GRACE})")
+
+    rec = sub.add_parser("recover", help="Reclaim unused numbers from expired leases")
+    rec.add_argument("database")
+    rec.add_argument("--grace", type=int, default=DEFAULT_GRACE)
+
+    st = sub.add_parser("status", help="Sequences, leased and returned numbers per division and year")
+    st.add_argument("database")
+
+    bench = sub.add_parser("benchmark", help="Compare PO creation throughput under concurrent load")
+    bench.add_argument("database", nargs="?", help="Scratch postgresql:// URL (default: a scratch SQLite file)")
+    bench.add_argument("--workers", type=int, default=32)
+    bench.add_argument("--creations", type=int, default=4000)
+    bench.add_argument("--block", type=int, default=DEFAULT_BLOCK)
+    bench.add_argument("--work-ms", type=float, default=5.0,
+                       help="Other work in each creation transaction after the number is taken (default: 5)")
+    bench.add_argument("--divisions", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        if args.database and not args.database.startswith(("postgres://", "postgresql://")):
+            raise SystemExit("❌ benchmark takes a PostgreSQL URL or nothing (scratch SQLite)")
+        try:
+            return benchmark(args.database, args.workers, args.creations, args.block, args.work_ms, args.divisions)
+        except ImportError as e:
+            raise SystemExit(f"❌ {e}")
+
+    try:
+        store = open_store(args.database)
+    except ImportError as e:
+        raise SystemExit(f"❌ {e}")
+    try:
+        if args.command == "recover":
+            reclaimed = store.recover(args.grace)
+            for division_id, year, used, returned in reclaimed:
+                print(f"♻️  {division_id} {year}: {used} used, {returned} returned")
+            print(f"✅ {len(reclaimed)} expired leases reclaimed")
+        elif args.command == "status":
+            print(f"{'division':<38} {'year':>5} {'last':>7} {'leased':>7} {'returned':>9} {'holders':>8}")
+            for division_id, year, last, active, returned, holders in store.status():
+                print(f"{str(division_id):<38} {year:>5} {last or 0:>7} {active or 0:>7} {returned or 0:>9} "
+                      f"{holders:>8}")
+        elif args.command == "next":
+            division_id = store.division_id(args.division)
+            po = args.po.split(",") if args.po else None
+            if po and len(po) != 3:
+                raise SystemExit("❌ --po takes LEADER,GL,VENDOR")
+            with SequenceAllocator(store, args.block, args.ttl, args.grace) as allocator:
+                for _ in range(args.count):
+                    sequence = allocator.next(division_id, args.year)
+                    print(smart_po_number(po[0], po[1], sequence, po[2]) if po else work_order_number(sequence))
+        else:
+            allocator = SequenceAllocator(store, args.block, args.ttl, args.grace)
+            server = create_server(allocator, args.host, args.port)
+            print(f"🔢 Sequence allocator on http://{args.host}:{server.server_address[1]} "
+                  f"({store.name}, blocks of {args.block}, holder {allocator.holder})")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+                print(f"👋 Returned {allocator.close()} unused numbers")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
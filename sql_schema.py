@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Parser for the ASR PO System PostgreSQL schema (database/schema.sql)
+
+Extracts enum types, tables (columns, types, defaults, NOT NULL, primary
+keys, UNIQUE constraints and foreign keys), indexes, functions, triggers
+and views into plain objects, and translates the tables and indexes into
+SQLite DDL so the schema can be exercised on a local SQLite stand-in.
+
+This is not a general SQL parser: it understands the statement forms
+schema.sql uses (and ignores anything else), with comments, quoted
+strings and $$-quoted function bodies handled when splitting statements.
+
+Usage:
+    schema = load_schema()                     # database/schema.sql
+    schema.tables["po_headers"].columns["status"].enum_values
+    schema.topological_order()                 # parents before children
+    schema.create_sqlite("standin.db")
+
+    python sql_schema.py                       # summary
+    python sql_schema.py --sqlite standin.db   # create an empty SQLite stand-in
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database", "schema.sql")
+
+_COLUMN_CONSTRAINT_WORDS = {"NOT", "NULL", "DEFAULT", "PRIMARY", "UNIQUE", "REFERENCES",
+                            "CHECK", "CONSTRAINT", "GENERATED", "COLLATE"}
+
+
+class Column:
+    def __init__(self, name: str, sql_type: str):
+        self.name = name
+        self.sql_type = sql_type  # normalised lower case, e.g. "varchar(15)", "po_status"
+        self.not_null = False
+        self.primary_key = False
+        self.unique = False
+        self.default: Optional[str] = None
+        self.references: Optional[Tuple[str, str]] = None  # (table, column)
+        self.on_delete: Optional[str] = None
+        self.enum_values: Optional[List[str]] = None
+
+    @property
+    def base_type(self) -> str:
+        return self.sql_type.split("(")[0].strip()
+
+    @property
+    def length(self) -> Optional[int]:
+        """Declared length of varchar(n) columns"""
+        match = re.match(r"varchar\((\d+)\)", self.sql_type)
+        return int(match.group(1)) if match else None
+
+    @property
+    def precision(self) -> Optional[Tuple[int, int]]:
+        match = re.match(r"(?:decimal|numeric)\((\d+),\s*(\d+)\)", self.sql_type)
+        return (int(match.group(1)), int(match.group(2))) if match else None
+
+    def __repr__(self):
+        return f"Column({self.name} {self.sql_type})"
+
+
+class Table:
+    def __init__(self, name: str):
+        self.name = name
+        self.columns: Dict[str, Column] = {}
+        self.primary_key: List[str] = []
+        self.unique: List[Tuple[str, ...]] = []
+        self.comment: Optional[str] = None
+
+    @property
+    def foreign_keys(self) -> List[Tuple[str, str, str]]:
+        """(column, referenced table, referenced column)"""
+        return [(c.name, *c.references) for c in self.columns.values() if c.references]
+
+    def __repr__(self):
+        return f"Table({self.name}, {len(self.columns)} columns)"
+
+
+class Index:
+    def __init__(self, name: str, table: str, columns: List[str], unique: bool = False,
+                 where: Optional[str] = None, include: Optional[List[str]] = None):
+        self.name = name
+        self.table = table
+        self.columns = columns
+        self.unique = unique
+        self.where = where
+        self.include = include or []
+
+    def __repr__(self):
+        return f"Index({self.name} ON {self.table}({', '.join(self.columns)}))"
+
+
+class Schema:
+    def __init__(self):
+        self.enums: Dict[str, List[str]] = {}
+        self.tables: Dict[str, Table] = {}
+        self.indexes: List[Index] = []
+        self.functions: List[str] = []
+        self.triggers: List[Tuple[str, str]] = []  # (trigger, table)
+        self.views: List[str] = []
+
+    def indexes_on(self, table: str) -> List[Index]:
+        """Declared indexes plus the implicit ones from PRIMARY KEY / UNIQUE"""
+        implicit = []
+        t = self.tables[table]
+        if t.primary_key:
+            implicit.append(Index(f"{table}_pkey", table, list(t.primary_key), unique=True))
+        for columns in t.unique:
+            implicit.append(Index(f"{table}_{'_'.join(columns)}_key", table, list(columns), unique=True))
+        return implicit + [index for index in self.indexes if index.table == table]
+
+    def topological_order(self) -> List[str]:
+        """Table names with referenced tables before the tables referencing them"""
+        ordered, visiting = [], set()
+
+        def visit(name: str):
+            if name in ordered or name in visiting:
+                return
+            visiting.add(name)
+            for _, parent, _ in self.tables[name].foreign_keys:
+                if parent in self.tables and parent != name:
+                    visit(parent)
+            visiting.discard(name)
+            ordered.append(name)
+
+        for name in self.tables:
+            visit(name)
+        return ordered
+
+    def sqlite_ddl(self) -> List[str]:
+        """CREATE TABLE / CREATE INDEX statements for a SQLite stand-in"""
+        statements = []
+        for name in self.topological_order():
+            table = self.tables[name]
+            lines = [f"    {sqlite_column(column)}" for column in table.columns.values()]
+            if len(table.primary_key) > 1:
+                lines.append(f"    PRIMARY KEY ({', '.join(table.primary_key)})")
+            for columns in table.unique:
+                if len(columns) > 1:
+                    lines.append(f"    UNIQUE ({', '.join(columns)})")
+            statements.append(f"CREATE TABLE IF NOT EXISTS {name} (\n" + ",\n".join(lines) + "\n)")
+        for index in self.indexes:
+            statements.append(sqlite_index(index))
+        return statements
+
+    def create_sqlite(self, path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path)
+        db.execute("PRAGMA foreign_keys = ON")
+        with db:
+            for statement in self.sqlite_ddl():
+                db.execute(statement)
+        return db
+
+
+def split_statements(sql: str) -> List[str]:
+    """Split on top-level semicolons, skipping comments, strings and $tag$ bodies"""
+    statements, current = [], []
+    i, n = 0, len(sql)
+    while i < n:
+        c = sql[i]
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if c == "'":
+            end = i + 1
+            while end < n:
+                if sql[end] == "'" and sql.startswith("''", end):
+                    end += 2
+                    continue
+                if sql[end] == "'":
+                    break
+                end += 1
+            current.append(sql[i:end + 1])
+            i = end + 1
+            continue
+        if c == "$":
+            match = re.match(r"\$[A-Za-z_]*\$", sql[i:])
+            if match:
+                tag = match.group(0)
+                end = sql.find(tag, i + len(tag))
+                end = n if end == -1 else end + len(tag)
+                current.append(sql[i:end])
+                i = end
+                continue
+        if c == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            i += 1
+            continue
+        current.append(c)
+        i += 1
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def split_top_level(text: str, separator: str = ",") -> List[str]:
+    """Split on separator outside parentheses and quotes"""
+    parts, depth, current, quote = [], 0, [], False
+    for c in text:
+        if c == "'":
+            quote = not quote
+        elif not quote and c == "(":
+            depth += 1
+        elif not quote and c == ")":
+            depth -= 1
+        elif not quote and depth == 0 and c == separator:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(c)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _identifier_list(text: str) -> List[str]:
+    return [part.strip().strip('"') for part in text.split(",") if part.strip()]
+
+
+def _parse_column(definition: str, enums: Dict[str, List[str]]) -> Column:
+    words = re.findall(r"'(?:[^']|'')*'|\w+\([^)]*\)|\([^)]*\)|[^\s]+", definition)
+    name = words[0].strip('"')
+    type_words = []
+    i = 1
+    while i < len(words) and words[i].upper() not in _COLUMN_CONSTRAINT_WORDS:
+        type_words.append(words[i])
+        i += 1
+    column = Column(name, re.sub(r"\s+", " ", " ".join(type_words)).lower())
+    if column.sql_type in enums:
+        column.enum_values = enums[column.sql_type]
+    while i < len(words):
+        word = words[i].upper()
+        if word == "NOT" and i + 1 < len(words) and words[i + 1].upper() == "NULL":
+            column.not_null = True
+            i += 2
+        elif word == "PRIMARY":
+            column.primary_key = column.not_null = True
+            i += 2
+        elif word == "UNIQUE":
+            column.unique = True
+            i += 1
+        elif word == "DEFAULT":
+            column.default = words[i + 1]
+            i += 2
+        elif word == "REFERENCES":
+            match = re.match(r"(\w+)\((\w+)\)", words[i + 1])
+            if match:
+                column.references = (match.group(1), match.group(2))
+                i += 2
+            else:
+                column.references = (words[i + 1], words[i + 2].strip("()"))
+                i += 3
+        elif word == "ON" and i + 2 < len(words) and words[i + 1].upper() == "DELETE":
+            action = words[i + 2].upper()
+            if action in ("SET", "NO"):
+                action += " " + words[i + 3].upper()
+                i += 1
+            column.on_delete = action
+            i += 3
+        else:
+            i += 1
+    return column
+
+
+def parse_schema(sql: str) -> Schema:
+    schema = Schema()
+    for statement in split_statements(sql):
+        flat = re.sub(r"\s+", " ", statement).strip()
+        upper = flat.upper()
+
+        match = re.match(r"CREATE TYPE (\w+) AS ENUM \((.*)\)$", flat, re.I)
+        if match:
+            schema.enums[match.group(1).lower()] = re.findall(r"'((?:[^']|'')*)'", match.group(2))
+            continue
+
+        match = re.match(r"CREATE TABLE (?:IF NOT EXISTS )?\"?(\w+)\"? \((.*)\)$", flat, re.I)
+        if match:
+            table = Table(match.group(1))
+            for item in split_top_level(match.group(2)):
+                head = re.match(r"\w+", item).group(0).upper()
+                if head in ("UNIQUE", "PRIMARY", "CONSTRAINT", "FOREIGN", "CHECK"):
+                    inner = re.search(r"\(([^)]*)\)", item)
+                    columns = tuple(_identifier_list(inner.group(1))) if inner else ()
+                    if "PRIMARY KEY" in item.upper():
+                        table.primary_key = list(columns)
+                    elif "UNIQUE" in item.upper():
+                        table.unique.append(columns)
+                    continue
+                column = _parse_column(item, schema.enums)
+                table.columns[column.name] = column
+                if column.primary_key:
+                    table.primary_key = [column.name]
+                if column.unique:
+                    table.unique.append((column.name,))
+            schema.tables[table.name] = table
+            continue
+
+        match = re.match(r"CREATE (UNIQUE )?INDEX (?:CONCURRENTLY )?(?:IF NOT EXISTS )?(\w+) ON (\w+)"
+                         r"(?: USING \w+)? ?\(([^)]*)\)(?: INCLUDE \(([^)]*)\))?(?: WHERE (.*))?$", flat, re.I)
+        if match:
+            schema.indexes.append(Index(match.group(2), match.group(3), _identifier_list(match.group(4)),
+                                        unique=bool(match.group(1)),
+                                        include=_identifier_list(match.group(5) or ""),
+                                        where=match.group(6)))
+            continue
+
+        match = re.match(r"COMMENT ON TABLE (\w+) IS '(.*)'$", flat, re.I)
+        if match and match.group(1) in schema.tables:
+            schema.tables[match.group(1)].comment = match.group(2).replace("''", "'")
+            continue
+
+        if upper.startswith("CREATE OR REPLACE FUNCTION") or upper.startswith("CREATE FUNCTION"):
+            schema.functions.append(re.search(r"FUNCTION (\w+)", flat, re.I).group(1))
+        elif upper.startswith("CREATE TRIGGER"):
+            match = re.search(r"CREATE TRIGGER (\w+) .*? ON (\w+)", flat, re.I)
+            if match:
+                schema.triggers.append((match.group(1), match.group(2)))
+        elif re.match(r"CREATE (OR REPLACE )?VIEW", upper):
+            schema.views.append(re.search(r"VIEW (\w+)", flat, re.I).group(1))
+    return schema
+
+
+def load_schema(path: str = SCHEMA_PATH) -> Schema:
+    with open(path, encoding="utf-8") as f:
+        return parse_schema(f.read())
+
+
+def mask_url(url: str) -> str:
+    """A connection URL with the password hidden, for messages and manifests"""
+    return re.sub(r"//[^@/]*@", "//***@", url)
+
+
+def connect_postgres(url: str):
+    """Connect with psycopg 3, falling back to psycopg2; ImportError if neither is installed"""
+    try:
+        import psycopg
+    except ImportError:
+        try:
+            import psycopg2 as psycopg
+        except ImportError:
+            raise ImportError("PostgreSQL support needs psycopg: pip install 'psycopg[binary]'") from None
+    return psycopg.connect(url)
+
+
+def sqlite_type(column: Column) -> str:
+    base = column.base_type
+    if base in ("integer", "int", "bigint", "smallint", "serial", "boolean"):
+        return "INTEGER"
+    if base in ("decimal", "numeric", "real", "double precision", "float"):
+        return "NUMERIC"
+    return "TEXT"
+
+
+def sqlite_default(column: Column) -> Optional[str]:
+    default = column.default
+    if default is None:
+        return None
+    lowered = default.lower()
+    if lowered.startswith("uuid_generate_v4"):
+        return "(lower(hex(randomblob(16))))"
+    if lowered.startswith("now("):
+        return "CURRENT_TIMESTAMP"
+    if lowered in ("true", "false"):
+        return "1" if lowered == "true" else "0"
+    return default
+
+
+def sqlite_column(column: Column) -> str:
+    parts = [column.name, sqlite_type(column)]
+    if column.primary_key:
+        parts.append("PRIMARY KEY")
+    if column.not_null and not column.primary_key:
+        parts.append("NOT NULL")
+    if column.unique:
+        parts.append("UNIQUE")
+    default = sqlite_default(column)
+    if default is not None:
+        parts.append(f"DEFAULT {default}")
+    if column.enum_values:
+        values = ", ".join("'" + v.replace("'", "''") + "'" for v in column.enum_values)
+        parts.append(f"CHECK ({column.name} IN ({values}))")
+    if column.references:
+        parts.append(f"REFERENCES {column.references[0]}({column.references[1]})")
+        if column.on_delete:
+            parts.append(f"ON DELETE {column.on_delete}")
+    return " ".join(parts)
+
+
+def sqlite_index(index: Index, name: Optional[str] = None) -> str:
+    """SQLite has no INCLUDE: included columns become trailing key columns"""
+    columns = index.columns + [c for c in index.include if c not in index.columns]
+    statement = (f"CREATE {'UNIQUE ' if index.unique else ''}INDEX IF NOT EXISTS {name or index.name} "
+                 f"ON {index.table} ({', '.join(columns)})")
+    if index.where:
+        statement += f" WHERE {sqlite_predicate(index.where)}"
+    return statement
+
+
+def sqlite_predicate(predicate: str) -> str:
+    return re.sub(r"\btrue\b", "1", re.sub(r"\bfalse\b", "0", predicate, flags=re.I), flags=re.I)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect database/schema.sql")
+    parser.add_argument("--schema", default=SCHEMA_PATH, help="Schema file (default: database/schema.sql)")
+    parser.add_argument("--sqlite", metavar="PATH", help="Create an empty SQLite stand-in at PATH")
+    args = parser.parse_args()
+
+    schema = load_schema(args.schema)
+    if args.sqlite:
+        if os.path.exists(args.sqlite):
+            print(f"❌ {args.sqlite} already exists")
+            sys.exit(1)
+        schema.create_sqlite(args.sqlite).close()
+        print(f"✅ Created {args.sqlite} with {len(schema.tables)} tables and {len(schema.indexes)} indexes")
+        return
+
+    print(f"📄 {args.schema}: {len(schema.tables)} tables, {len(schema.enums)} enums, "
+          f"{len(schema.indexes)} indexes, {len(schema.functions)} functions, "
+          f"{len(schema.triggers)} triggers, {len(schema.views)} views")
+    for name in schema.topological_order():
+        table = schema.tables[name]
+        fks = ", ".join(f"{c}→{t}" for c, t, _ in table.foreign_keys)
+        print(f"   {name:<22} {len(table.columns):>3} columns  {fks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Continuous synthetic monitoring daemon for the ASR PO System
+
+Probes the /api/health* endpoints (and optionally Render deploy status)
+on a fixed schedule, writes every result to the ring-buffer time series
+in timeseries_store.py, and serves Prometheus text-format metrics on
+/metrics. All in-memory state is fixed-size counters and histogram
+buckets per endpoint, so memory stays flat for weeks of uptime.
+
+Usage:
+    python synthetic_monitor.py --url https://asr-po-system-enterprise.onrender.com
+    python synthetic_monitor.py --url http://127.0.0.1:8765 --interval 5 --metrics-port 9108
+
+    # Also track the latest deploy status of Render services
+    export RENDER_API_KEY="your_api_key_here"
+    python synthetic_monitor.py --service srv-d5girrp4tr6s73ed7d1g
+
+    curl http://127.0.0.1:9108/metrics
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import time
+from typing import Dict, List, Optional
+
+from async_http import AsyncHTTPClient
+from health_prober import APP_URL, HEALTH_ENDPOINTS, HealthProber
+from monitor_render_deployment import BASE_URL, AsyncRenderAPI
+from timeseries_store import TimeSeriesStore
+
+DEFAULT_INTERVAL = 30  # seconds between probe rounds
+DEFAULT_SAMPLES = 3  # requests per endpoint per round
+DEFAULT_METRICS_PORT = 9108
+DEFAULT_DATA_DIR = "monitoring-data"
+# Prometheus histogram bucket bounds, in seconds
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+
+class EndpointMetrics:
+    """Prometheus counters, gauges and a fixed-bucket histogram for one endpoint"""
+
+    def __init__(self):
+        self.probes = {"success": 0, "failure": 0}
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.last_latency = 0.0
+        self.up = 0
+        self.last_probe = 0.0
+
+    def observe(self, latency_seconds: float, count: int = 1):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency_seconds <= bound:
+                self.bucket_counts[i] += count
+        self.latency_count += count
+        self.latency_sum += latency_seconds * count
+
+
+class SyntheticMonitor:
+    def __init__(self, app_url: str = APP_URL, endpoints: Optional[List[str]] = None,
+                 interval: float = DEFAULT_INTERVAL, samples: int = DEFAULT_SAMPLES,
+                 store: Optional[TimeSeriesStore] = None, services: Optional[List[str]] = None,
+                 api_key: Optional[str] = None, render_base_url: Optional[str] = None):
+        self.prober = HealthProber(app_url, endpoints or HEALTH_ENDPOINTS, samples=samples)
+        self.interval = interval
+        self.store = store
+        self.services = services or []
+        self.api_key = api_key
+        self.render_base_url = render_base_url
+        self.endpoints = {endpoint: EndpointMetrics() for endpoint in self.prober.endpoints}
+        self.deploy_status: Dict[str, str] = {}
+        self.rounds = 0
+        self.started = time.time()
+        self._stopping = asyncio.Event()
+
+    @staticmethod
+    def metric_key(endpoint: str) -> str:
+        return endpoint.strip("/").replace("/", "_") or "root"
+
+    async def probe_round(self, client: AsyncHTTPClient, render_api=None):
+        now = time.time()
+        stats = await self.prober.probe(client)
+        for endpoint, endpoint_stats in stats.items():
+            metrics = self.endpoints[endpoint]
+            result = endpoint_stats.to_dict()
+            metrics.probes["success"] += endpoint_stats.successes
+            metrics.probes["failure"] += endpoint_stats.attempts - endpoint_stats.successes
+            for latency_ms, count in endpoint_stats.histograms["total"].buckets():
+                metrics.observe(latency_ms / 1000, count)
+            metrics.up = 1 if result["success"] else 0
+            metrics.last_probe = now
+            median = result["response_time_ms"]
+            if median is not None:
+                metrics.last_latency = median / 1000
+
+            if self.store is not None:
+                key = self.metric_key(endpoint)
+                self.store.record(f"health.{key}.up", now, metrics.up)
+                if median is not None:
+                    self.store.record(f"health.{key}.latency_ms", now, median)
+                    self.store.record(f"health.{key}.p95_ms", now, result["latency"]["total"]["p95_ms"])
+
+        if render_api is not None:
+            await self._poll_deploys(render_api, now)
+        self.rounds += 1
+
+    async def _poll_deploys(self, render_api, now: float):
+        for service_id in self.services:
+            try:
+                deployments = await render_api.get_deployments(service_id, limit=1)
+            except Exception:  # a failed poll keeps the previous status
+                continue
+            if deployments:
+                status = deployments[0].get("status", "unknown")
+                self.deploy_status[service_id] = status
+                if self.store is not None:
+                    self.store.record(f"deploy.{service_id}.live", now, 1 if status == "live" else 0)
+
+    async def run(self):
+        async with AsyncHTTPClient(limit_per_host=self.prober.concurrency) as client:
+            render_api = None
+            if self.services and self.api_key:
+                render_api = AsyncRenderAPI(self.api_key, client, self.render_base_url or BASE_URL)
+            while not self._stopping.is_set():
+                started = time.monotonic()
+                await self.probe_round(client, render_api)
+                delay = max(0.0, self.interval - (time.monotonic() - started))
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stop(self):
+        self._stopping.set()
+
+    def render_metrics(self) -> str:
+        """Prometheus text exposition format"""
+        lines = [
+            "# HELP asr_probe_total Health probes by endpoint and result",
+            "# TYPE asr_probe_total counter",
+        ]
+        for endpoint, m in self.endpoints.items():
+            for result, count in m.probes.items():
+                lines.append(f'asr_probe_total{{endpoint="{endpoint}",result="{result}"}} {count}')
+
+        lines += ["# HELP asr_endpoint_up Whether every probe in the last round succeeded",
+                  "# TYPE asr_endpoint_up gauge"]
+        lines += [f'asr_endpoint_up{{endpoint="{e}"}} {m.up}' for e, m in self.endpoints.items()]
+
+        lines += ["# HELP asr_probe_latency_seconds Median latency of the last probe round",
+                  "# TYPE asr_probe_latency_seconds gauge"]
+        lines += [f'asr_probe_latency_seconds{{endpoint="{e}"}} {m.last_latency:.6f}'
+                  for e, m in self.endpoints.items()]
+
+        lines += ["# HELP asr_request_duration_seconds Health probe request latency",
+                  "# TYPE asr_request_duration_seconds histogram"]
+        for endpoint, m in self.endpoints.items():
+            for bound, count in zip(LATENCY_BUCKETS, m.bucket_counts):
+                lines.append(f'asr_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+            lines.append(f'asr_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {m.latency_count}')
+            lines.append(f'asr_request_duration_seconds_sum{{endpoint="{endpoint}"}} {m.latency_sum:.6f}')
+            lines.append(f'asr_request_duration_seconds_count{{endpoint="{endpoint}"}} {m.latency_count}')
+
+        if self.deploy_status:
+            lines += ["# HELP asr_render_deploy_live Whether the latest Render deploy is live",
+                      "# TYPE asr_render_deploy_live gauge"]
+            for service_id, status in self.deploy_status.items():
+                lines.append(f'asr_render_deploy_live{{service="{service_id}",status="{status}"}} '
+                             f'{1 if status == "live" else 0}')
+
+        lines += ["# HELP asr_monitor_rounds_total Completed probe rounds",
+                  "# TYPE asr_monitor_rounds_total counter",
+                  f"asr_monitor_rounds_total {self.rounds}",
+                  "# HELP asr_monitor_uptime_seconds Seconds since the daemon started",
+                  "# TYPE asr_monitor_uptime_seconds gauge",
+                  f"asr_monitor_uptime_seconds {time.time() - self.started:.0f}"]
+        return "\n".join(lines) + "\n"
+
+
+async def serve_metrics(monitor: SyntheticMonitor, host: str, port: int):
+    """Minimal HTTP server for GET /metrics"""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 10)
+            while (await asyncio.wait_for(reader.readline(), 10)) not in (b"\r\n", b"\n", b""):
+                pass
+            path = request_line.decode("latin-1").split(" ")[1] if request_line.count(b" ") >= 2 else ""
+            if path.split("?")[0] == "/metrics":
+                body, status = monitor.render_metrics().encode("utf-8"), "200 OK"
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                body, status, content_type = b"not found\n", "404 Not Found", "text/plain"
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def run_daemon(monitor: SyntheticMonitor, host: str, port: int):
+    server = await serve_metrics(monitor, host, port)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, monitor.stop)
+        except NotImplementedError:  # Windows
+            pass
+    print(f"📈 Serving metrics on http://{host}:{port}/metrics")
+    try:
+        await monitor.run()
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Continuous synthetic monitoring for the ASR PO System")
+    parser.add_argument("--url", default=APP_URL, help=f"Application base URL (default: {APP_URL})")
+    parser.add_argument("--endpoint", action="append", default=[],
+                        help="Endpoint to probe; repeatable (default: the /api/health* set)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"Seconds between probe rounds (default: {DEFAULT_INTERVAL})")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES,
+                        help=f"Requests per endpoint per round (default: {DEFAULT_SAMPLES})")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR,
+                        help=f"Time series directory (default: {DEFAULT_DATA_DIR})")
+    parser.add_argument("--metrics-host", default="127.0.0.1")
+    parser.add_argument("--metrics-port", type=int, default=DEFAULT_METRICS_PORT)
+    parser.add_argument("--service", action="append", default=[],
+                        help="Render service ID whose latest deploy status to track; repeatable")
+    parser.add_argument("--render-base-url", default=os.environ.get("RENDER_API_BASE_URL"),
+                        help="Render API base URL (default: $RENDER_API_BASE_URL or the public API)")
+    args = parser.parse_args()
+
+    api_key = os.environ.get("RENDER_API_KEY")
+    if args.service and not api_key:
+        print("❌ RENDER_API_KEY must be set to track deploy status")
+        sys.exit(1)
+
+    store = TimeSeriesStore(args.data_dir)
+    monitor = SyntheticMonitor(args.url, args.endpoint or None, args.interval, args.samples,
+                               store, args.service, api_key, args.render_base_url)
+    print(f"🔁 Probing {len(monitor.endpoints)} endpoints every {args.interval:g}s → {args.data_dir}/")
+    try:
+        asyncio.run(run_daemon(monitor, args.metrics_host, args.metrics_port))
+    finally:
+        store.close()
+        print("👋 Monitor stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import json
+import os
+
+import pytest
+
+from alert_rules import AlertEvaluator, AlertState, Rule, _replay, format_event, load_config, read_samples
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SAMPLES = os.path.join(FIXTURES, "alert_samples.jsonl")
+TRANSITIONS = os.path.join(FIXTURES, "alert_transitions.jsonl")
+LEVELS = [{"level": 1, "delay": 0.0, "channels": ["slack"]},
+          {"level": 2, "delay": 300.0, "channels": ["slack", "email"]},
+          {"level": 3, "delay": 900.0, "channels": ["slack", "email", "webhook"]}]
+
+
+def _transitions(stream: bool, batch: int):
+    rules, levels = load_config()
+    evaluator = AlertEvaluator(rules, levels)
+    return [json.loads(format_event(event))
+            for event in _replay(evaluator, read_samples(SAMPLES, evaluator.fields), stream, batch)]
+
+
+@pytest.mark.parametrize("stream, batch", [(False, 65536), (False, 50), (True, 0)],
+                         ids=["batch", "small-batches", "stream"])
+def test_replay_matches_recorded_transitions(stream, batch):
+    with open(TRANSITIONS, "r", encoding="utf-8") as f:
+        expected = [json.loads(line) for line in f if line.strip()]
+    assert _transitions(stream, batch) == expected
+
+
+def test_alert_fires_on_first_match_and_escalates_after_escalation_time():
+    state = AlertState(Rule("Database Connection Failed", "critical", "database_health = false",
+                            ["slack", "email", "webhook"], escalation_time=180), LEVELS)
+    events = state.step(1000.0, True, 0.0)
+    assert [(e["state"], e.get("level")) for e in events] == [("pending", None), ("firing", 1)]
+
+    assert state.step(1179.0, True, 0.0) == []
+    assert [(e["state"], e["level"]) for e in state.step(1180.0, True, 0.0)] == [("escalated", 2)]
+    assert state.step(1779.0, True, 0.0) == []
+    assert [(e["state"], e["level"]) for e in state.step(1780.0, True, 0.0)] == [("escalated", 3)]
+    assert [e["state"] for e in state.step(1800.0, False, 1.0)] == ["resolved"]
+
+
+def test_for_delays_firing():
+    state = AlertState(Rule("Slow Response Time", "warning", "response_time > 1500ms", ["slack"],
+                            for_seconds=60), LEVELS)
+    assert [e["state"] for e in state.step(0.0, True, 1600.0)] == ["pending"]
+    assert [e["state"] for e in state.step(60.0, True, 1600.0)] == ["firing"]
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from async_http import AsyncHTTPClient, HTTPError
+
+
+async def _serve(response: bytes, requests: int = 1):
+    """GET the response from a one-shot server that writes it and closes, `requests` times"""
+    async def handle(reader, writer):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(response)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with AsyncHTTPClient(timeout=5) as client:
+            results = []
+            for _ in range(requests):
+                try:
+                    results.append(await client.get(f"http://127.0.0.1:{port}/health"))
+                except HTTPError as e:
+                    results.append(e)
+            return results, client._idle
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.mark.parametrize("response, message", [
+    (b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\n" + b"x" * 40, "connection closed after 40 of 100 bytes"),
+    (b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n10\r\nshort", "connection closed after 5 of 16 bytes"),
+    (b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\n", "malformed response"),
+], ids=["content-length", "chunk", "chunk-size"])
+def test_truncated_response_raises_http_error(response, message):
+    results, idle = asyncio.run(_serve(response, requests=2))
+
+    assert all(isinstance(r, HTTPError) and message in str(r) for r in results), results
+    assert not any(idle.values())
+
+
+def test_complete_response():
+    (response,), _ = asyncio.run(_serve(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"))
+
+    assert response.status == 200
+    assert response.text() == "ok"
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from codemod import AddDynamicExport, discover, run_codemod
+
+BLOCK = "// Force dynamic rendering for API route\nexport const dynamic = 'force-dynamic';\n"
+
+CASES = [
+    ("multi-line import",
+     "import {\n  NextRequest,\n  NextResponse,\n} from 'next/server';\nimport { db } from '@/lib/db';\n\n"
+     "export async function GET(req: NextRequest) {}\n",
+     "import {\n  NextRequest,\n  NextResponse,\n} from 'next/server';\nimport { db } from '@/lib/db';\n\n"
+     + BLOCK + "\nexport async function GET(req: NextRequest) {}\n"),
+    ("regex and division",
+     "import { NextResponse } from 'next/server';\n"
+     "export async function GET() {\n  const ratio = total / count / 2;\n  return /import/.test(ratio);\n}\n",
+     "import { NextResponse } from 'next/server';\n\n" + BLOCK
+     + "\nexport async function GET() {\n  const ratio = total / count / 2;\n  return /import/.test(ratio);\n}\n"),
+    ("template literal",
+     "import { NextResponse } from 'next/server';\n"
+     "const note = `${'export const dynamic = 1'} ${ {a: '}'}.a }`;\nexport async function GET() {}\n",
+     "import { NextResponse } from 'next/server';\n\n" + BLOCK
+     + "\nconst note = `${'export const dynamic = 1'} ${ {a: '}'}.a }`;\nexport async function GET() {}\n"),
+    ("use server directive",
+     "'use server';\n\nexport async function POST() {}\n",
+     "'use server';\n\n" + BLOCK + "\nexport async function POST() {}\n"),
+    ("use client directive and comment",
+     "\"use client\"\n// header\nexport function x() {}\n",
+     "\"use client\"\n// header\n\n" + BLOCK + "\nexport function x() {}\n"),
+    ("double quotes",
+     'import { NextResponse } from "next/server";\nexport async function GET() {}\n',
+     'import { NextResponse } from "next/server";\n\n' + BLOCK.replace("'", '"')
+     + "\nexport async function GET() {}\n"),
+    ("CRLF",
+     "import { NextResponse } from 'next/server';\r\nexport async function GET() {}\r\n",
+     ("import { NextResponse } from 'next/server';\n\n" + BLOCK + "\nexport async function GET() {}\n")
+     .replace("\n", "\r\n")),
+    ("empty file", "", BLOCK),
+    ("already migrated",
+     "import { NextResponse } from 'next/server';\n\n" + BLOCK + "\nexport async function GET() {}\n", None),
+    ("already migrated, other value",
+     "export const dynamic = \"force-static\"\nexport async function GET() {}\n", None),
+    ("already migrated, export list",
+     "const dynamic = 'force-dynamic';\nasync function GET() {}\nexport { GET, dynamic };\n", None),
+]
+
+
+@pytest.mark.parametrize("before, after", [case[1:] for case in CASES], ids=[case[0] for case in CASES])
+def test_add_dynamic_export(before, after):
+    transform = AddDynamicExport()
+    assert transform.transform("route.ts", before) == after
+    # idempotent: the migrated file needs nothing more
+    assert transform.transform("route.ts", after if after is not None else before) is None
+
+
+def test_option_value():
+    assert "export const dynamic = 'force-static';" in AddDynamicExport(value="force-static").transform(
+        "route.ts", "export async function GET() {}\n")
+
+
+def write_cases(root) -> list:
+    """One route.ts per case under root; returns their paths"""
+    for i, (_, before, _) in enumerate(CASES):
+        os.makedirs(root / f"case{i}")
+        (root / f"case{i}" / "route.ts").write_text(before, encoding="utf-8", newline="")
+    return discover(str(root))
+
+
+def read_cases(root) -> list:
+    out = []
+    for i in range(len(CASES)):
+        with open(root / f"case{i}" / "route.ts", encoding="utf-8", newline="") as f:
+            out.append(f.read())
+    return out
+
+
+def test_run_codemod_dry_run_then_write(tmp_path):
+    paths = write_cases(tmp_path)
+    changed = sum(1 for case in CASES if case[2] is not None)
+
+    dry = run_codemod(paths, "add-dynamic-export", dry_run=True, workers=1)
+    assert sum(1 for r in dry if r["status"] == "changed" and r["diff"]) == changed
+    assert read_cases(tmp_path) == [before for _, before, _ in CASES]
+
+    first = run_codemod(paths, "add-dynamic-export", workers=1)
+    second = run_codemod(paths, "add-dynamic-export", workers=1)
+    assert sum(1 for r in first if r["status"] == "changed") == changed
+    assert all(r["status"] == "unchanged" for r in second)
+    assert read_cases(tmp_path) == [after if after is not None else before for _, before, after in CASES]
@@ -0,0 +1,31 @@
+from codemod import run_codemod
+from codemod_cache import CodemodCache
+
+from test_codemod import CASES, read_cases, write_cases
+
+
+def test_second_run_is_served_from_cache(tmp_path):
+    paths = write_cases(tmp_path / "src")
+    cache = CodemodCache(str(tmp_path / "cache.sqlite"))
+    try:
+        first = run_codemod(paths, "add-dynamic-export", workers=1, cache=cache)
+        second = run_codemod(paths, "add-dynamic-export", workers=1, cache=cache)
+    finally:
+        cache.close()
+    assert sum(1 for r in first if r["status"] == "changed") == sum(1 for case in CASES if case[2] is not None)
+    assert all(r["status"] == "unchanged" and r["cached"] for r in second)
+    assert read_cases(tmp_path / "src") == [after if after is not None else before for _, before, after in CASES]
+
+
+def test_edited_file_is_transformed_again(tmp_path):
+    paths = write_cases(tmp_path / "src")
+    cache = CodemodCache(str(tmp_path / "cache.sqlite"))
+    try:
+        run_codemod(paths, "add-dynamic-export", workers=1, cache=cache)
+        with open(paths[0], "w", encoding="utf-8") as f:
+            f.write("export async function GET() {}\n")
+        results = {r["path"]: r for r in run_codemod(paths, "add-dynamic-export", workers=1, cache=cache)}
+    finally:
+        cache.close()
+    assert results[paths[0]]["status"] == "changed" and not results[paths[0]]["cached"]
+    assert all(r["status"] == "unchanged" for path, r in results.items() if path != paths[0])
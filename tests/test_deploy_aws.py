@@ -0,0 +1,85 @@
+import importlib.util
+import os
+from unittest import mock
+
+import pytest
+
+spec = importlib.util.spec_from_file_location(
+    "deploy_aws", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "deploy-aws.py"))
+deploy_aws = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(deploy_aws)
+
+BASELINE = {
+    "vpc": "asr-po-system-vpc",
+    "subnets": ["asr-po-system-private-1", "asr-po-system-private-2",
+                "asr-po-system-public-1", "asr-po-system-public-2"],
+    "security_groups": ["asr-po-system-app", "asr-po-system-rds", "asr-po-system-redis"],
+    "security_group_tags": ["asr-po-system-app-sg", "asr-po-system-rds-sg", "asr-po-system-redis-sg"],
+    "db_subnet_group": "asr-po-system-db-subnet-group",
+    "db_instance": "asr-po-system-prod",
+    "bucket": "asr-po-system-exports-prod",
+}
+
+
+def _tags(call) -> str:
+    return next(tag["Value"] for tag in call.kwargs["TagSpecifications"][0]["Tags"] if tag["Key"] == "Name")
+
+
+def _names(deployer) -> dict:
+    """Names the deployer gives each resource, from the create calls on stand-in clients"""
+    ec2, rds, s3 = mock.MagicMock(), mock.MagicMock(), mock.MagicMock()
+    ec2.describe_availability_zones.return_value = {"AvailabilityZones": [{"ZoneName": "a"}, {"ZoneName": "b"}]}
+    deployer._clients.update(ec2=ec2, rds=rds, s3=s3)
+
+    deployer.create_vpc()
+    deployer.create_subnets("vpc-1")
+    deployer.create_security_groups("vpc-1")
+    deployer.create_rds_instance(["subnet-1"], "sg-1")
+    deployer.create_s3_bucket()
+
+    groups = ec2.create_security_group.call_args_list
+    return {
+        "vpc": _tags(ec2.create_vpc.call_args),
+        "subnets": sorted(_tags(call) for call in ec2.create_subnet.call_args_list),
+        "security_groups": [call.kwargs["GroupName"] for call in groups],
+        "security_group_tags": [_tags(call) for call in groups],
+        "db_subnet_group": rds.create_db_subnet_group.call_args.kwargs["DBSubnetGroupName"],
+        "db_instance": rds.create_db_instance.call_args.kwargs["DBInstanceIdentifier"],
+        "bucket": s3.create_bucket.call_args.kwargs["Bucket"],
+    }
+
+
+@pytest.mark.parametrize("region", ["us-east-2", "us-west-2"])
+def test_single_target_production_keeps_the_original_names(region):
+    deployer = deploy_aws.AWSDeployer(region=region, quiet=True)
+
+    assert _names(deployer) == BASELINE
+    assert deployer.state_file == "aws-infrastructure-config.json"
+
+
+def test_matrix_scopes_names_except_for_default_production():
+    matrix = deploy_aws.DeploymentMatrix([("us-east-2", "production"), ("us-west-2", "production"),
+                                          ("us-east-2", "staging")])
+    names = {target: _names(deploy_aws.AWSDeployer(region=target[0], environment=target[1], quiet=True,
+                                                   name_suffix=matrix._name_suffix(*target)))
+             for target in matrix.targets}
+
+    assert names[("us-east-2", "production")] == BASELINE
+    assert names[("us-west-2", "production")] == {
+        "vpc": "asr-po-system-prod-us-west-2-vpc",
+        "subnets": ["asr-po-system-prod-us-west-2-private-1", "asr-po-system-prod-us-west-2-private-2",
+                    "asr-po-system-prod-us-west-2-public-1", "asr-po-system-prod-us-west-2-public-2"],
+        "security_groups": ["asr-po-system-prod-us-west-2-app", "asr-po-system-prod-us-west-2-rds",
+                            "asr-po-system-prod-us-west-2-redis"],
+        "security_group_tags": ["asr-po-system-prod-us-west-2-app-sg", "asr-po-system-prod-us-west-2-rds-sg",
+                                "asr-po-system-prod-us-west-2-redis-sg"],
+        "db_subnet_group": "asr-po-system-prod-us-west-2-db-subnet-group",
+        "db_instance": "asr-po-system-prod-us-west-2",
+        "bucket": "asr-po-system-exports-prod-us-west-2",
+    }
+    staging = names[("us-east-2", "staging")]
+    assert staging["vpc"] == "asr-po-system-staging-vpc"
+    assert staging["security_groups"] == ["asr-po-system-staging-app", "asr-po-system-staging-rds",
+                                          "asr-po-system-staging-redis"]
+    assert staging["db_subnet_group"] == "asr-po-system-staging-db-subnet-group"
+    assert staging["db_instance"] == "asr-po-system-staging"
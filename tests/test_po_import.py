@@ -0,0 +1,162 @@
+import csv
+import os
+import uuid
+from urllib.parse import urlsplit, urlunsplit
+
+import pytest
+
+from po_import import Lookups, Staging, open_target, reconcile
+from sql_schema import SCHEMA_PATH, connect_postgres, load_schema, split_statements
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "po_import.csv")
+DATABASE_URL = os.environ.get("DATABASE_URL")
+# (subtotal, tax, total) in cents, as calculate_po_totals writes them:
+# T-1001 at 7.75%: 1.5 x 3.33 = 4.995 -> 5.00 and 1.00 taxable, 20.00 of labor (GL 20) not; 6.00 x 0.0775 = 0.465
+# T-1002 at the default 8%: 0.5 x 0.01 -> 0.01 and 1.5 x -3.33 -> -5.00 taxable, 7 x 1.07 not; -4.99 x 0.08 = -0.3992
+EXPECTED = {"T-1001": (2600, 47, 2647), "T-1002": (250, -40, 210)}
+
+DIVISION = "11111111-1111-4111-8111-111111111111"
+USER = "22222222-2222-4222-8222-222222222222"
+PROJECT = "33333333-3333-4333-8333-333333333333"
+SEED = [
+    f"INSERT INTO divisions (id, division_name, division_code) VALUES ('{DIVISION}', 'Test Roofing', 'T1')",
+    f"INSERT INTO users (id, email, first_name, last_name, role, division_id) "
+    f"VALUES ('{USER}', 'buyer@example.com', 'Pat', 'Buyer', 'DIVISION_LEADER', '{DIVISION}')",
+    f"INSERT INTO division_leaders (id, user_id, name, email, division_code, division_id) "
+    f"VALUES ('44444444-4444-4444-8444-444444444444', '{USER}', 'Pat Buyer', 'buyer@example.com', 'T1', "
+    f"'{DIVISION}')",
+    "INSERT INTO vendors (id, vendor_name, vendor_code) "
+    "VALUES ('55555555-5555-4555-8555-555555555555', 'Test Supply', 'TS')",
+    f"INSERT INTO projects (id, project_code, project_name) VALUES ('{PROJECT}', 'P-100', 'Test Project')",
+    "INSERT INTO gl_account_mappings (id, gl_code_short, gl_account_number, gl_account_name, is_taxable_default) "
+    "VALUES ('66666666-6666-4666-8666-666666666666', '10', '5000', 'Materials', true)",
+    "INSERT INTO gl_account_mappings (id, gl_code_short, gl_account_number, gl_account_name, is_taxable_default) "
+    "VALUES ('77777777-7777-4777-8777-777777777777', '20', '6000', 'Subcontract labor', false)",
+    f"INSERT INTO work_orders (id, work_order_number, division_id, project_id, title) "
+    f"VALUES ('88888888-8888-4888-8888-888888888888', 'WO-0001', '{DIVISION}', '{PROJECT}', 'Re-roof')",
+]
+HEADER = ["po_number", "division", "project", "vendor", "work_order", "status", "tax_rate", "line_number",
+          "item_description", "quantity", "unit_price", "line_subtotal", "gl_account", "is_taxable"]
+VALID = {"po_number": "OK-1", "division": "T1", "project": "P-100", "vendor": "TS", "item_description": "Flashing",
+         "quantity": "2", "unit_price": "12.50"}
+
+
+def _import(target, path: str = FIXTURE) -> Staging:
+    staging = Staging(path, Lookups(target))
+    staging.reject_existing(target.existing(staging.po_number.tolist()))
+    target.load(staging.batches(2, os.path.basename(path)), lambda group: None)
+    return staging
+
+
+def _totals_by_number(target, staging: Staging):
+    stored = target.stored_totals(staging.po_id.tolist())
+    return {str(number): stored[po_id] for number, po_id in zip(staging.po_number, staging.po_id.tolist())}
+
+
+@pytest.fixture
+def standin(tmp_path):
+    path = str(tmp_path / "standin.db")
+    db = load_schema().create_sqlite(path)
+    with db:
+        for statement in SEED:
+            db.execute(statement)
+    db.close()
+    target = open_target(path)
+    yield target
+    target.close()
+
+
+@pytest.fixture
+def pg_url():
+    schema = f"po_import_test_{uuid.uuid4().hex[:8]}"
+    conn = connect_postgres(DATABASE_URL)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE SCHEMA {schema}")
+            cur.execute(f"SET search_path TO {schema}, public")
+            with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+                for statement in split_statements(f.read()) + SEED:
+                    cur.execute(statement)
+        conn.commit()
+        parts = urlsplit(DATABASE_URL)
+        options = f"options=-csearch_path%3D{schema},public"
+        yield urlunsplit(parts._replace(query=f"{parts.query}&{options}" if parts.query else options))
+    finally:
+        conn.rollback()
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        conn.commit()
+        conn.close()
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="set DATABASE_URL to a scratch PostgreSQL database")
+@pytest.mark.parametrize("trigger_mode", ["replica", "table"])
+def test_postgres_import_matches_calculate_po_totals(pg_url, trigger_mode):
+    target = open_target(pg_url, trigger_mode)
+    try:
+        try:
+            staging = _import(target)
+        except SystemExit as e:
+            if trigger_mode == "replica":
+                pytest.skip(f"replica mode needs a superuser: {e}")
+            raise
+        assert staging.errors == []
+        assert _totals_by_number(target, staging) == EXPECTED
+        assert reconcile(target, staging.po_id.tolist(), 0) == (len(EXPECTED), [])
+        # table mode re-enables the totals trigger after each batch
+        assert target.query("SELECT tgenabled FROM pg_trigger WHERE tgrelid = 'po_line_items'::regclass "
+                            "AND tgname = 'recalculate_po_totals_insert'") == [("O",)]
+    finally:
+        target.close()
+
+
+def test_sqlite_import_matches_calculate_po_totals(standin):
+    staging = _import(standin)
+
+    assert staging.errors == []
+    assert _totals_by_number(standin, staging) == EXPECTED
+    assert reconcile(standin, staging.po_id.tolist(), 0) == (len(EXPECTED), [])
+    assert standin.query("SELECT COUNT(*) FROM po_line_items") == [(6,)]
+    assert standin.query("SELECT COUNT(*) FROM po_approvals WHERE action = 'Created'") == [(2,)]
+
+
+@pytest.mark.parametrize("rows, message", [
+    ([{"item_description": ""}], "item_description is required"),
+    ([{"po_number": "R-12345678901234"}], "po_number is longer than 15 characters"),
+    ([{"quantity": "two"}], "quantity, unit_price, line_subtotal or line_number is not a number"),
+    ([{"quantity": "0"}], "quantity must be positive"),
+    ([{"line_subtotal": "26.00"}], "line_subtotal does not match quantity x unit_price"),
+    ([{"vendor": "ZZ"}], "unknown vendor 'ZZ'"),
+    ([{"work_order": "WO-0404"}], "unknown work_order 'WO-0404' in division 'T1'"),
+    ([{"gl_account": "99"}], "unknown gl_account"),
+    ([{"is_taxable": "maybe"}], "is_taxable is not true/false"),
+    ([{"status": "Bogus"}], "status 'Bogus' is not one of"),
+    ([{"tax_rate": "1.5"}], "tax_rate must be between 0 and 0.9999"),
+    ([{}, {"vendor": "Test Supply"}], "vendor 'Test Supply' disagrees with 'TS'"),
+    ([{"line_number": "1"}, {"line_number": "1"}], "duplicate line_number in this PO"),
+])
+def test_sqlite_rejects_whole_po(standin, tmp_path, rows, message):
+    path = str(tmp_path / "rejects.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, HEADER, restval="")
+        writer.writeheader()
+        writer.writerow(VALID)
+        for row in rows:
+            writer.writerow({**VALID, "po_number": "R-1", "item_description": "Drip edge", **row})
+
+    staging = Staging(path, Lookups(standin))
+
+    assert any(message in error for _, _, error in staging.errors), staging.errors
+    assert staging.po_number.tolist() == ["OK-1"]
+    assert staging.rejected_pos == 1
+    assert _totals_by_number(standin, _import(standin, path)) == {"OK-1": (2500, 200, 2700)}
+
+
+def test_sqlite_rejects_existing_po_numbers(standin):
+    _import(standin)
+    staging = _import(standin)
+
+    assert staging.po_number.tolist() == []
+    assert sorted((number, error) for _, number, error in staging.errors) == [
+        ("T-1001", "po_number already exists in the target"),
+        ("T-1002", "po_number already exists in the target")]
@@ -0,0 +1,38 @@
+from schema_advisor import Candidate, QueryShape, apply_validation
+
+
+def _candidate(columns, served, validation):
+    """served: (fingerprint, weighted gain, selectivity); validation: fingerprint -> (before ms, after ms)"""
+    candidate = Candidate("po_headers", tuple(columns), ())
+    candidate.name = "idx_po_headers_" + "_".join(columns)
+    candidate.shapes = [QueryShape(fingerprint, [], []) for fingerprint, _, _ in served]
+    candidate.gains = {fingerprint: (gain, sel) for fingerprint, gain, sel in served}
+    candidate.score = sum(gain for _, gain, _ in served)
+    candidate.selectivity = served[0][2]
+    candidate.validation = [{"query": fingerprint, "before": {"ms": before, "plan": "SCAN"},
+                             "after": {"ms": after, "plan": "SEARCH"}}
+                            for fingerprint, (before, after) in validation.items()]
+    return candidate
+
+
+def test_slower_queries_leave_the_score_and_the_ranking():
+    first = _candidate(["status", "division_id", "created_at"], [("q1", 600.0, 0.01), ("q2", 300.0, 0.02),
+                                                                 ("q3", 200.0, 0.05)],
+                       {"q1": (0.6, 1.0), "q2": (0.7, 1.0), "q3": (4.0, 1.0)})
+    second = _candidate(["division_id", "created_at"], [("q4", 500.0, 0.03)], {"q4": (5.0, 1.0)})
+    dropped = _candidate(["created_at"], [("q5", 100.0, 0.5)], {"q5": (1.0, 2.0)})
+
+    ranked = apply_validation([first, second, dropped])
+
+    assert ranked == [second, first]
+    assert [shape.fingerprint for shape in first.shapes] == ["q3"]
+    assert first.score == 200.0
+    assert first.selectivity == 0.05
+    assert [result["slower"] for result in first.validation] == [True, True, False]
+
+
+def test_noise_within_tolerance_still_counts():
+    candidate = _candidate(["status"], [("q1", 100.0, 0.1)], {"q1": (1.0, 1.05)})
+
+    assert apply_validation([candidate]) == [candidate]
+    assert candidate.score == 100.0
@@ -0,0 +1,82 @@
+from collections import Counter
+
+import pytest
+
+from sequence_allocator import BENCH_YEAR, SequenceAllocator, _Bench, _run_creations
+
+BLOCK = 20
+
+
+@pytest.fixture
+def bench():
+    bench = _Bench(None, divisions=3)
+    bench.work = 0.0
+    yield bench
+    bench.close()
+
+
+def _expire(store):
+    with store.transaction() as run:
+        run("UPDATE sequence_leases SET expires_at = datetime('now', '-60 seconds') WHERE state = 'active'")
+
+
+def _returned(store) -> Counter:
+    with store.transaction() as run:
+        rows = run("SELECT division_id, range_start, range_end FROM sequence_leases "
+                   "WHERE year = %s AND state = 'returned'", (BENCH_YEAR,))
+    return Counter((str(d), n) for d, start, end in rows for n in range(start, end + 1))
+
+
+def _account(bench):
+    """(duplicated, lost): every number up to last_sequence is issued or returned, exactly once"""
+    issued = Counter((d, n) for d, numbers in bench.numbers().items() for n in numbers)
+    returned = _returned(bench.store)
+    with bench.store.transaction() as run:
+        last = run("SELECT division_id, last_sequence FROM work_order_sequences WHERE year = %s", (BENCH_YEAR,))
+    seen = issued + returned
+    duplicated = sum(count - 1 for count in seen.values() if count > 1)
+    lost = sum(1 for d, highest in last for n in range(1, highest + 1) if (str(d), n) not in seen)
+    return duplicated, lost
+
+
+def test_crash_recovery_duplicates_and_loses_nothing(bench):
+    crashed = SequenceAllocator(bench.new_store(), block=BLOCK, ttl=2, recover=False)
+    conn = bench.connect()
+    for i in range(len(bench.divisions) * BLOCK // 2):
+        bench.create(conn, bench.divisions[i % len(bench.divisions)],
+                     lambda cur, division_id: crashed.next(division_id, BENCH_YEAR))
+    conn.close()
+    crashed.abandon()
+    _expire(bench.store)
+
+    survivor = SequenceAllocator(bench.new_store(), block=BLOCK, grace=0, recover=False)
+    reclaimed = survivor.store.recover(0)
+    result = _run_creations(bench, 4, len(bench.divisions) * BLOCK,
+                            lambda cur, division_id: survivor.next(division_id, BENCH_YEAR))
+    survivor.close()
+
+    assert len(reclaimed) == len(bench.divisions)
+    assert sum(r[2] for r in reclaimed) == len(bench.divisions) * BLOCK // 2
+    assert result["failures"] == []
+    assert _account(bench) == (0, 0)
+
+
+def test_release_returns_unused_tail(bench):
+    division = bench.divisions[0]
+    lease = bench.store.lease(division, BENCH_YEAR, 10, "holder", ttl=60)
+    lease.next += 3
+
+    assert bench.store.release(lease, "holder") == 7
+    assert sorted(n for _, n in _returned(bench.store)) == list(range(4, 11))
+
+
+def test_release_after_recover_returns_nothing(bench):
+    division = bench.divisions[0]
+    lease = bench.store.lease(division, BENCH_YEAR, 10, "holder", ttl=60)
+    lease.next += 3
+    _expire(bench.store)
+    # nothing was written to the usage table, so recover returns the whole range
+    assert bench.store.recover(0) == [(division, BENCH_YEAR, 0, 10)]
+
+    assert bench.store.release(lease, "holder") == 0
+    assert _returned(bench.store) == Counter((division, n) for n in range(1, 11))
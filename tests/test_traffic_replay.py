@@ -0,0 +1,54 @@
+import asyncio
+
+from async_http import AsyncHTTPClient
+from traffic_replay import CaptureProxy, TraceBuilder, replay
+
+TRUNCATED = b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\n" + b"x" * 40
+OK = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"
+
+
+async def _upstream():
+    """Server that answers /ok and closes every other response 40 bytes into a 100-byte body"""
+    async def handle(reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        writer.write(OK if head.startswith(b"GET /ok ") else TRUNCATED)
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+def test_replay_records_failures_as_status_zero_with_latency():
+    builder = TraceBuilder()
+    for i, path in enumerate(["/ok", "/truncated", "/truncated", "/ok"]):
+        builder.add(i * 1000, "GET", path, 200, 1000, 2)
+
+    async def run():
+        server, url = await _upstream()
+        async with server:
+            return await replay(builder.build(), url, speed=1.0, timeout=5)
+
+    measured = asyncio.run(run())
+
+    assert measured.status.tolist() == [200, 0, 0, 200]
+    assert (measured.latency_us > 0).all()
+
+
+def test_proxy_answers_502_and_records_status_zero():
+    async def run():
+        server, url = await _upstream()
+        proxy = CaptureProxy(url, timeout=5)
+        front = await asyncio.start_server(proxy.handle, "127.0.0.1", 0)
+        async with server, front:
+            async with AsyncHTTPClient(timeout=5) as client:
+                port = front.sockets[0].getsockname()[1]
+                responses = [await client.get(f"http://127.0.0.1:{port}{path}") for path in ("/ok", "/truncated")]
+        await proxy.client.close()
+        return responses, proxy.builder.build()
+
+    responses, trace = asyncio.run(run())
+
+    assert [r.status for r in responses] == [200, 502]
+    assert trace.status.tolist() == [200, 0]
+    assert (trace.latency_us > 0).all()
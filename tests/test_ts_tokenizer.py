@@ -0,0 +1,75 @@
+import pytest
+
+from ts_tokenizer import COMMENT, IDENT, NUMBER, PUNCT, REGEX, STRING, TEMPLATE, scan_module, tokenize
+
+
+def _significant(source: str):
+    return [(token.kind, token.text) for token in tokenize(source)]
+
+
+@pytest.mark.parametrize("source, expected", [
+    # regex vs division
+    ("a / b / c", [(IDENT, "a"), (PUNCT, "/"), (IDENT, "b"), (PUNCT, "/"), (IDENT, "c")]),
+    ("return /ab+c/g", [(IDENT, "return"), (REGEX, "/ab+c/g")]),
+    ("x = /[/]/", [(IDENT, "x"), (PUNCT, "="), (REGEX, "/[/]/")]),
+    ("(a) / 2", [(PUNCT, "("), (IDENT, "a"), (PUNCT, ")"), (PUNCT, "/"), (NUMBER, "2")]),
+    ("arr[0] / 2", [(IDENT, "arr"), (PUNCT, "["), (NUMBER, "0"), (PUNCT, "]"), (PUNCT, "/"), (NUMBER, "2")]),
+    ("i++ / 2", [(IDENT, "i"), (PUNCT, "++"), (PUNCT, "/"), (NUMBER, "2")]),
+    ("a /= 2", [(IDENT, "a"), (PUNCT, "/="), (NUMBER, "2")]),
+    ("f(/=/)", [(IDENT, "f"), (PUNCT, "("), (REGEX, "/=/"), (PUNCT, ")")]),
+    # template literals, with ${} expressions holding braces, strings and templates
+    ("`a ${b} c`", [(TEMPLATE, "`a ${b} c`")]),
+    ("`${ {d: 1}.d } }`", [(TEMPLATE, "`${ {d: 1}.d } }`")]),
+    ("`a ${`b ${c}`} ${'}'}` + 1", [(TEMPLATE, "`a ${`b ${c}`} ${'}'}`"), (PUNCT, "+"), (NUMBER, "1")]),
+    ("`cost: $${price}`", [(TEMPLATE, "`cost: $${price}`")]),
+    # comments and strings are single tokens
+    ("// import x from 'y'\nz", [(COMMENT, "// import x from 'y'"), (IDENT, "z")]),
+    ("/* a */ 'it\\'s' \"q\"", [(COMMENT, "/* a */"), (STRING, "'it\\'s'"), (STRING, '"q"')]),
+])
+def test_tokenize(source, expected):
+    assert _significant(source) == expected
+
+
+def test_tokens_keep_offsets_and_lines():
+    source = "import {\n  a,\n} from 'x';\n"
+    tokens = tokenize(source)
+    assert all(source[t.start:t.end] == t.text for t in tokens)
+    assert [(t.text, t.line) for t in tokens if t.kind == IDENT] == [("import", 1), ("a", 2), ("from", 3)]
+
+
+@pytest.mark.parametrize("source, imports", [
+    # multi-line imports, with type-only names and a trailing comma
+    ("import {\n  a,\n  b as c,\n  type D,\n} from '@/lib/x';\n",
+     [("@/lib/x", None, None, ["a", "c", "D"], False)]),
+    ("import def, {\n  f\n} from 'def'\nimport * as ns from \"ns\"\n",
+     [("def", "def", None, ["f"], False), ("ns", None, "ns", [], False)]),
+    ("import type {\n  E,\n} from './types';\nimport './side-effect.css';\n",
+     [("./types", None, None, ["E"], True), ("./side-effect.css", None, None, [], False)]),
+    # directives come before the imports
+    ("'use client';\nimport { useState } from 'react';\n", [("react", None, None, ["useState"], False)]),
+    ('"use server"\n\nimport { db } from "@/lib/db"\n', [("@/lib/db", None, None, ["db"], False)]),
+    # import-looking text in strings, templates and comments, and dynamic import()
+    ("const s = \"import a from 'a'\";\nconst t = `${'import b from \"b\"'}`;\n// import c from 'c'\n"
+     "const m = await import('./lazy');\n", []),
+])
+def test_scan_imports(source, imports):
+    info = scan_module(source)
+    assert [(d.specifier, d.default, d.namespace, d.names, d.type_only) for d in info.imports] == imports
+
+
+@pytest.mark.parametrize("source, names", [
+    ("export { a as GET, c as POST };\nexport * from './more';\n", {"GET", "POST"}),
+    ("export async function PUT() { if (x) { return `}`; } }\nexport const dynamic = 'force-dynamic';\n",
+     {"PUT", "dynamic"}),
+    ("const t = `${\"export const dynamic = 1\"}`;\nexport const revalidate = 0\n", {"revalidate"}),
+    ("'use server';\nexport async function save(a, b = a / 2) { return /x/.test(a) }\n", {"save"}),
+    ("export const dynamic = 'force-dynamic', revalidate = 0;\n", {"dynamic", "revalidate"}),
+])
+def test_scan_exports(source, names):
+    assert scan_module(source).exported_names() == names
+
+
+def test_export_value():
+    info = scan_module("import x from 'x'\nexport const dynamic = 'force-static'\nexport const GET = () => x\n")
+    assert info.export("dynamic").value == "'force-static'"
+    assert info.export("dynamic").kind == "const"
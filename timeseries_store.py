@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Fixed-size on-disk time series store for the ASR PO System monitors
+
+Each metric is kept at several resolutions (raw samples, 5-minute and
+1-hour rollups by default). Every resolution is a binary ring buffer file
+of fixed capacity, so disk use is bounded from the first write and memory
+only holds one open rollup bucket per resolution. Records are 36 bytes:
+
+    timestamp (float64) | count (uint32) | sum, min, max (float64)
+
+Raw samples are stored as count=1 records; rollups keep count/sum/min/max
+so averages stay exact when buckets are combined.
+
+Usage:
+    store = TimeSeriesStore("monitoring-data")
+    store.record("health.api_health.latency_ms", time.time(), 123.4)
+    store.query("health.api_health.latency_ms", start, end, resolution=300)
+
+    python timeseries_store.py monitoring-data                       # list series
+    python timeseries_store.py monitoring-data health.api_health.latency_ms --resolution 3600
+"""
+
+import argparse
+import os
+import re
+import struct
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+MAGIC = b"ASRTS1\0\0"
+HEADER = struct.Struct("<8sdIQ")  # magic, resolution seconds, capacity, total records written
+RECORD = struct.Struct("<dIddd")  # timestamp, count, sum, min, max
+
+# (resolution seconds, capacity): 0 = raw samples
+DEFAULT_TIERS = (
+    (0, 20_160),      # raw: a week of 30 s samples
+    (300, 8_640),     # 5-minute rollups: 30 days
+    (3_600, 8_760),   # 1-hour rollups: a year
+)
+
+
+class RingBufferFile:
+    """Fixed-capacity ring of RECORD entries with a small header"""
+
+    def __init__(self, path: str, resolution: float, capacity: int):
+        self.path = path
+        exists = os.path.exists(path)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if exists and os.fstat(self.fd).st_size >= HEADER.size:
+            magic, self.resolution, self.capacity, self.written = HEADER.unpack(os.pread(self.fd, HEADER.size, 0))
+            if magic != MAGIC:
+                os.close(self.fd)
+                raise ValueError(f"{path} is not a time series file")
+        else:
+            self.resolution, self.capacity, self.written = resolution, capacity, 0
+            os.ftruncate(self.fd, HEADER.size + capacity * RECORD.size)
+            self._write_header()
+
+    def _write_header(self):
+        os.pwrite(self.fd, HEADER.pack(MAGIC, self.resolution, self.capacity, self.written), 0)
+
+    def append(self, timestamp: float, count: int, total: float, minimum: float, maximum: float):
+        slot = self.written % self.capacity
+        os.pwrite(self.fd, RECORD.pack(timestamp, count, total, minimum, maximum),
+                  HEADER.size + slot * RECORD.size)
+        self.written += 1
+        self._write_header()
+
+    def read(self, start: float = 0.0, end: float = float("inf")) -> List[Tuple]:
+        """Records with start <= timestamp < end, oldest first"""
+        count = min(self.written, self.capacity)
+        if not count:
+            return []
+        data = os.pread(self.fd, self.capacity * RECORD.size, HEADER.size)
+        first = self.written % self.capacity if self.written > self.capacity else 0
+        records = []
+        for i in range(count):
+            slot = (first + i) % self.capacity
+            record = RECORD.unpack_from(data, slot * RECORD.size)
+            if start <= record[0] < end:
+                records.append(record)
+        return records
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _Series:
+    """One metric across all tiers, with an open accumulator per rollup tier"""
+
+    def __init__(self, directory: str, name: str, tiers):
+        self.files = []
+        self.buckets = []  # [bucket_start, count, sum, min, max] per tier, or None
+        for resolution, capacity in tiers:
+            suffix = "raw" if resolution == 0 else f"{int(resolution)}s"
+            path = os.path.join(directory, f"{name}.{suffix}.ring")
+            self.files.append(RingBufferFile(path, resolution, capacity))
+            self.buckets.append(None)
+
+    def record(self, timestamp: float, value: float):
+        for index, ring in enumerate(self.files):
+            if ring.resolution == 0:
+                ring.append(timestamp, 1, value, value, value)
+                continue
+            bucket_start = timestamp - timestamp % ring.resolution
+            bucket = self.buckets[index]
+            if bucket is not None and bucket[0] != bucket_start:
+                ring.append(*bucket)
+                bucket = None
+            if bucket is None:
+                self.buckets[index] = [bucket_start, 1, value, value, value]
+            else:
+                bucket[1] += 1
+                bucket[2] += value
+                bucket[3] = min(bucket[3], value)
+                bucket[4] = max(bucket[4], value)
+
+    def flush(self):
+        """Write open rollup buckets (called on shutdown; partial buckets are kept)"""
+        for index, bucket in enumerate(self.buckets):
+            if bucket is not None:
+                self.files[index].append(*bucket)
+                self.buckets[index] = None
+
+    def close(self):
+        self.flush()
+        for ring in self.files:
+            ring.close()
+
+
+class TimeSeriesStore:
+    """Directory of ring-buffer series, one set of tier files per metric"""
+
+    def __init__(self, directory: str, tiers=DEFAULT_TIERS):
+        self.directory = directory
+        self.tiers = tiers
+        self.series: Dict[str, _Series] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def safe_name(name: str) -> str:
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+
+    def _series(self, name: str) -> _Series:
+        name = self.safe_name(name)
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = _Series(self.directory, name, self.tiers)
+        return series
+
+    def record(self, name: str, timestamp: float, value: float):
+        self._series(name).record(timestamp, float(value))
+
+    def query(self, name: str, start: float = 0.0, end: Optional[float] = None,
+              resolution: float = 0) -> List[Dict]:
+        """Points from the tier with the given resolution (0 = raw)"""
+        series = self._series(name)
+        ring = next((r for r in series.files if r.resolution == resolution), None)
+        if ring is None:
+            raise ValueError(f"no tier with resolution {resolution}s")
+        end = time.time() + 1 if end is None else end
+        return [{"timestamp": ts, "count": count, "mean": total / count if count else None,
+                 "min": minimum, "max": maximum}
+                for ts, count, total, minimum, maximum in ring.read(start, end)]
+
+    def names(self) -> List[str]:
+        """Metric names present on disk"""
+        return sorted({f.rsplit(".", 2)[0] for f in os.listdir(self.directory) if f.endswith(".ring")})
+
+    def close(self):
+        for series in self.series.values():
+            series.close()
+        self.series.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect an ASR PO System time series directory")
+    parser.add_argument("directory")
+    parser.add_argument("metric", nargs="?", help="Metric to print (omit to list metrics)")
+    parser.add_argument("--resolution", type=float, default=0,
+                        help="Tier resolution in seconds, 0 for raw samples (default: 0)")
+    parser.add_argument("--hours", type=float, default=24, help="Look-back window (default: 24)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"❌ {args.directory} does not exist")
+        sys.exit(1)
+    store = TimeSeriesStore(args.directory)
+    if not args.metric:
+        for name in store.names():
+            print(name)
+        return
+
+    for point in store.query(args.metric, time.time() - args.hours * 3600, resolution=args.resolution):
+        stamp = datetime.fromtimestamp(point["timestamp"]).isoformat(timespec="seconds")
+        print(f"{stamp}  n={point['count']:<5} mean={point['mean']:.3f} "
+              f"min={point['min']:.3f} max={point['max']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,775 @@
+#!/usr/bin/env python3
+"""
+Traffic capture, replay and latency regression checks for the ASR PO System
+
+load_generator.py replays the synthetic Artillery scenarios; this tool
+replays real traffic shapes and compares builds:
+
+    record     turns an access log into a trace: nginx/Apache combined
+               format with a trailing response time ($request_time, or %D
+               with --time-unit us), key=value router lines (method= path=
+               status= service=) or JSON lines (method, url, status,
+               responseTime, time). Requests logged within the same second
+               are spread evenly across it
+    proxy      a capture proxy: forwards to --upstream over pooled
+               keep-alive connections and records every request, with its
+               body, until interrupted
+    replay     sends a trace's requests against --target at their original
+               offsets divided by --speed (1x-50x), whether or not earlier
+               requests have finished, over one AsyncHTTPClient pool.
+               Latency is measured from each request's scheduled start, so
+               queueing behind a saturated pool or server is counted
+               instead of hidden. The result is a trace of the same requests
+    compare    baseline vs candidate trace, per endpoint (path with ids
+               collapsed) and overall: one-sided Mann-Whitney U for
+               "candidate is slower" with Holm correction across endpoints,
+               bootstrap CIs for the candidate/baseline ratio of p50 and p95,
+               and a two-proportion test on error rates. An endpoint is a
+               regression when the shift is significant and the CI clears
+               --min-change; compare exits 1 if any endpoint regressed
+
+Traces are a small binary format: a zlib'd JSON header (metadata and the
+distinct requests: method, target, content type, body) followed by one
+array per field (start offset, request, status, latency, response bytes),
+byte-shuffled and zlib'd, starts delta-encoded. A million requests take a
+few MB. Bootstrap resampling works on 1%-wide log latency buckets, so
+2000 resamples of 10^6 requests take well under a second.
+
+Usage:
+    python traffic_replay.py record /var/log/nginx/access.log -o prod.trace
+    python traffic_replay.py proxy --listen 127.0.0.1:8080 --upstream http://localhost:3000 -o captured.trace
+    python traffic_replay.py info prod.trace
+    python traffic_replay.py replay prod.trace --target http://localhost:3000 --speed 10 -o build-a.trace
+    python traffic_replay.py replay prod.trace --target http://localhost:3000 --speed 10 -o build-b.trace
+    python traffic_replay.py compare build-a.trace build-b.trace --json comparison.json
+
+    # Also check the Artillery ensure thresholds (p95, p99, maxErrorRate)
+    python traffic_replay.py replay prod.trace --target http://localhost:3000 --ensure
+
+Requirements:
+    pip install numpy            (and pyyaml for --ensure)
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import re
+import signal
+import struct
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from async_http import AsyncHTTPClient, HTTPError
+
+MAGIC = b"ASRTRACE"
+FORMAT_VERSION = 1
+# column: stored dtype (start offsets are delta-encoded microseconds)
+COLUMNS = {"start": "<i8", "request": "<u4", "status": "<u2", "latency": "<u4", "bytes": "<u4"}
+DEFAULT_CONNECTIONS = 256
+DEFAULT_TIMEOUT = 30  # seconds
+DEFAULT_ALPHA = 0.01
+DEFAULT_MIN_CHANGE = 0.05  # 5% slower before a significant shift counts as a regression
+DEFAULT_MAX_ERROR_INCREASE = 1.0  # percentage points
+DEFAULT_MIN_REQUESTS = 30  # per build, for an endpoint to be tested
+DEFAULT_BOOTSTRAP = 2000
+BUCKET_WIDTH = 0.01  # relative width of the latency buckets the bootstrap resamples
+PROGRESS_INTERVAL = 10  # seconds
+# Headers the proxy does not forward or record
+HOP_HEADERS = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "te", "trailer",
+               "upgrade", "content-length", "host"}
+TIME_UNITS = {"s": 1e6, "ms": 1e3, "us": 1.0}
+
+COMBINED_LOG = re.compile(
+    r'^\S+ \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<target>\S+)[^"]*" (?P<status>\d{3}) '
+    r'(?P<bytes>\d+|-)(?: "[^"]*" "[^"]*")?(?: (?P<latency>[\d.]+))?')
+KEY_VALUE = re.compile(r'(\w+)=("[^"]*"|\S+)')
+ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{12,}|[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}"
+                        r"|[A-Za-z]*\d+[-_][\w-]*\d[\w-]*)$")
+
+
+class Trace:
+    """Requests with their start offsets and measured status, latency and size"""
+
+    def __init__(self, requests: List[Tuple], start_us: np.ndarray, request: np.ndarray,
+                 status: np.ndarray, latency_us: np.ndarray, nbytes: np.ndarray, meta: Optional[Dict] = None):
+        self.requests = requests  # (method, target, content type, body) per distinct request
+        self.start_us = start_us
+        self.request = request
+        self.status = status
+        self.latency_us = latency_us
+        self.bytes = nbytes
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return len(self.start_us)
+
+    @property
+    def span(self) -> float:
+        return float(self.start_us[-1] - self.start_us[0]) / 1e6 if len(self) else 0.0
+
+    def save(self, path: str) -> int:
+        header = {"version": FORMAT_VERSION, "count": len(self), "meta": self.meta,
+                  "requests": [[method, target, content_type, base64.b64encode(body).decode() if body else None]
+                               for method, target, content_type, body in self.requests],
+                  "columns": []}
+        arrays = {"start": np.diff(self.start_us, prepend=0), "request": self.request,
+                  "status": self.status, "latency": self.latency_us, "bytes": self.bytes}
+        blobs = []
+        for name, dtype in COLUMNS.items():
+            data = np.ascontiguousarray(arrays[name], dtype=dtype)
+            # Byte-shuffle: the high bytes of every value end up next to each other and compress away
+            shuffled = data.view(np.uint8).reshape(-1, data.itemsize).T.tobytes()
+            blobs.append(zlib.compress(shuffled, 6))
+            header["columns"].append([name, len(blobs[-1])])
+        packed = zlib.compress(json.dumps(header, separators=(",", ":")).encode("utf-8"), 6)
+        with open(path, "wb") as f:
+            f.write(MAGIC + struct.pack("<HI", FORMAT_VERSION, len(packed)) + packed)
+            for blob in blobs:
+                f.write(blob)
+        return os.path.getsize(path)
+
+    @classmethod
+    def load(cls, path: str) -> "Trace":
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a trace file")
+            version, length = struct.unpack("<HI", f.read(6))
+            if version != FORMAT_VERSION:
+                raise ValueError(f"{path} has trace format {version}, expected {FORMAT_VERSION}")
+            header = json.loads(zlib.decompress(f.read(length)))
+            count = header["count"]
+            arrays = {}
+            for name, size in header["columns"]:
+                dtype = np.dtype(COLUMNS[name])
+                shuffled = np.frombuffer(zlib.decompress(f.read(size)), dtype=np.uint8)
+                arrays[name] = shuffled.reshape(dtype.itemsize, count).T.copy().view(dtype).ravel()
+        requests = [(method, target, content_type, base64.b64decode(body) if body else b"")
+                    for method, target, content_type, body in header["requests"]]
+        return cls(requests, np.cumsum(arrays["start"]), arrays["request"], arrays["status"],
+                   arrays["latency"], arrays["bytes"], header["meta"])
+
+    def endpoints(self) -> np.ndarray:
+        """Endpoint name per request ("GET /api/po/{id}")"""
+        names = [endpoint(method, target) for method, target, _, _ in self.requests]
+        return np.array(names, dtype=object)[self.request] if len(self) else np.array([], dtype=object)
+
+    def errors(self) -> np.ndarray:
+        """Transport failures (status 0) and 5xx responses"""
+        return (self.status == 0) | (self.status >= 500)
+
+
+class TraceBuilder:
+    """Collects requests one at a time and interns the distinct ones"""
+
+    def __init__(self, meta: Optional[Dict] = None):
+        self.meta = meta or {}
+        self.index: Dict[Tuple, int] = {}
+        self.requests: List[Tuple] = []
+        self.rows: List[Tuple[int, int, int, int, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def add(self, start_us: int, method: str, target: str, status: int, latency_us: int, nbytes: int,
+            content_type: str = "", body: bytes = b""):
+        key = (method, target, content_type, body)
+        request = self.index.get(key)
+        if request is None:
+            request = self.index[key] = len(self.requests)
+            self.requests.append(key)
+        self.rows.append((start_us, request, status, min(max(latency_us, 0), 2 ** 32 - 1),
+                          min(nbytes, 2 ** 32 - 1)))
+
+    def build(self) -> Trace:
+        """Trace sorted by start, with offsets relative to the first request"""
+        table = np.array(self.rows, dtype=np.int64).reshape(-1, 5)
+        table = table[np.argsort(table[:, 0], kind="stable")]
+        meta = dict(self.meta)
+        if len(table):
+            meta.setdefault("started_at", datetime.fromtimestamp(table[0, 0] / 1e6, timezone.utc).isoformat())
+            table[:, 0] -= table[0, 0]
+        return Trace(self.requests, table[:, 0].copy(), table[:, 1].astype(np.uint32),
+                     table[:, 2].astype(np.uint16), table[:, 3].astype(np.uint32),
+                     table[:, 4].astype(np.uint32), meta)
+
+
+def endpoint(method: str, target: str) -> str:
+    """Method and path with the query dropped and id-like segments collapsed"""
+    path = target.split("?", 1)[0]
+    return f"{method} " + "/".join("{id}" if ID_SEGMENT.match(part) else part for part in path.split("/"))
+
+
+# =====================================================
+# Recording
+# =====================================================
+
+def _epoch(value) -> float:
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)  # epoch milliseconds or seconds
+    stamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return (stamp if stamp.tzinfo else stamp.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _parse_combined(line: str, unit: float) -> Optional[Tuple]:
+    match = COMBINED_LOG.match(line)
+    if not match:
+        return None
+    logged = datetime.strptime(match["time"], "%d/%b/%Y:%H:%M:%S %z").timestamp()
+    latency = float(match["latency"]) * unit if match["latency"] else 0.0
+    return (logged, match["method"], match["target"], int(match["status"]), latency,
+            0 if match["bytes"] == "-" else int(match["bytes"]))
+
+
+def _parse_key_value(line: str, unit: float) -> Optional[Tuple]:
+    fields = {key: value.strip('"') for key, value in KEY_VALUE.findall(line)}
+    if "method" not in fields or "path" not in fields or "status" not in fields:
+        return None
+    latency = fields.get("service", fields.get("duration", "0"))
+    number = latency.rstrip("mus")
+    scale = TIME_UNITS.get(latency[len(number):], unit)
+    try:
+        logged = _epoch(line.split(" ", 1)[0])  # syslog-style leading timestamp
+    except ValueError:
+        logged = _epoch(fields.get("time", fields.get("at", "0")))
+    return (logged, fields["method"], fields["path"], int(fields["status"]), float(number or 0) * scale,
+            int(fields.get("bytes", 0) or 0))
+
+
+def _parse_json(line: str, unit: float) -> Optional[Tuple]:
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    request = record.get("req") or record.get("request") or record
+    response = record.get("res") or record.get("response") or record
+    method = request.get("method")
+    target = request.get("url") or request.get("path")
+    status = response.get("statusCode") or response.get("status") or record.get("status")
+    if not method or not target or status is None:
+        return None
+    latency_ms = next((record[key] for key in ("responseTime", "response_time", "duration_ms", "latency_ms",
+                                               "duration") if key in record), 0)
+    logged = record.get("time") or record.get("timestamp") or 0
+    return (_epoch(logged), method, target, int(status), float(latency_ms) * 1e3,
+            int(response.get("bytes") or record.get("bytes") or 0))
+
+
+PARSERS = {"combined": _parse_combined, "router": _parse_key_value, "json": _parse_json}
+
+
+def record_log(lines: Iterable[str], log_format: str = "auto", time_unit: str = "s",
+               logged_at: str = "end", meta: Optional[Dict] = None) -> Tuple[Trace, int]:
+    """Parse an access log into a trace; returns the trace and the number of lines skipped"""
+    unit = TIME_UNITS[time_unit]
+    parser = PARSERS.get(log_format)
+    parsed, skipped = [], 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if parser is None:  # auto: first format that parses the first usable line
+            for name in ("json", "combined", "router") if line.startswith("{") else ("combined", "router"):
+                if PARSERS[name](line, unit):
+                    parser = PARSERS[name]
+                    break
+        entry = parser(line, unit) if parser else None
+        if entry is None:
+            skipped += 1
+        else:
+            parsed.append(entry)
+
+    builder = TraceBuilder(meta)
+    # Whole-second log stamps: spread the requests of each second evenly across it, in log order
+    logged = np.array([entry[0] for entry in parsed])
+    offsets = np.zeros(len(parsed))
+    if len(parsed) and np.all(logged == np.floor(logged)):
+        first = np.r_[True, logged[1:] != logged[:-1]]
+        group = np.cumsum(first) - 1
+        starts = np.flatnonzero(first)
+        sizes = np.diff(np.r_[starts, len(parsed)])
+        offsets = (np.arange(len(parsed)) - starts[group]) / sizes[group]
+    for (stamp, method, target, status, latency, nbytes), offset in zip(parsed, offsets):
+        start = (stamp + offset) * 1e6 - (latency if logged_at == "end" else 0)
+        builder.add(int(start), method, target, status, int(latency), nbytes)
+    return builder.build(), skipped
+
+
+class CaptureProxy:
+    """Reverse proxy that records every request it forwards"""
+
+    def __init__(self, upstream: str, connections: int = DEFAULT_CONNECTIONS, timeout: float = DEFAULT_TIMEOUT):
+        self.upstream = upstream.rstrip("/")
+        self.client = AsyncHTTPClient(limit_per_host=connections, timeout=timeout)
+        self.builder = TraceBuilder({"source": "proxy", "upstream": self.upstream})
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        method, target, _ = line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = b""
+        if "content-length" in headers or "chunked" in headers.get("transfer-encoding", "").lower():
+            body = await AsyncHTTPClient._read_body(method, 200, headers, reader)
+        return method, target, headers, body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                started = time.time()
+                clock = time.perf_counter()
+                forward = {name: value for name, value in headers.items() if name not in HOP_HEADERS}
+                try:
+                    response = await self.client.request(method, self.upstream + target, headers=forward,
+                                                         body=body if body else None)
+                    status, reason, payload = response.status, response.reason, response.body
+                    response_headers, recorded = response.headers, response.status
+                except Exception as e:  # any upstream failure, truncated responses included
+                    status, reason, payload = 502, "Bad Gateway", (str(e) or type(e).__name__).encode()
+                    response_headers = {}
+                    recorded = 0  # transport failure, as in replay
+                self.builder.add(int(started * 1e6), method, target, recorded,
+                                 int((time.perf_counter() - clock) * 1e6), len(payload),
+                                 headers.get("content-type", ""), body)
+                head = [f"HTTP/1.1 {status} {reason}\r\n"]
+                head.extend(f"{name}: {value}\r\n" for name, value in response_headers.items()
+                            if name not in HOP_HEADERS)
+                head.append(f"Content-Length: {len(payload)}\r\n\r\n")
+                writer.write("".join(head).encode("latin-1") + payload)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int, output: str, save_every: float = 60.0):
+        server = await asyncio.start_server(self.handle, host, port)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:  # Windows
+                pass
+        print(f"🎥 Recording {host}:{port} -> {self.upstream} into {output} (Ctrl+C to stop)")
+        async with server:
+            while not stop.is_set():
+                try:
+                    await asyncio.wait_for(stop.wait(), save_every)
+                except asyncio.TimeoutError:
+                    pass
+                if len(self.builder):
+                    self.builder.build().save(output)
+                    print(f"   {len(self.builder):,} requests recorded")
+        await self.client.close()
+
+
+# =====================================================
+# Replay
+# =====================================================
+
+async def replay(trace: Trace, target: str, speed: float = 1.0, connections: int = DEFAULT_CONNECTIONS,
+                 timeout: float = DEFAULT_TIMEOUT, headers: Optional[Dict[str, str]] = None,
+                 label: Optional[str] = None) -> Trace:
+    """Send the trace's requests on its schedule (scaled by speed); returns the measured trace"""
+    n = len(trace)
+    target = target.rstrip("/")
+    scheduled = trace.start_us / speed / 1e6
+    status = np.zeros(n, dtype=np.uint16)
+    latency = np.zeros(n, dtype=np.uint32)
+    nbytes = np.zeros(n, dtype=np.uint32)
+    lag = np.zeros(n)
+    loop = asyncio.get_running_loop()
+
+    async def send(i: int, due: float):
+        method, path, content_type, body = trace.requests[trace.request[i]]
+        request_headers = dict(headers or {})
+        if content_type:
+            request_headers["Content-Type"] = content_type
+        try:
+            response = await client.request(method, target + path, headers=request_headers, body=body or None)
+            status[i] = response.status
+            nbytes[i] = min(len(response.body), 2 ** 32 - 1)
+        except Exception:  # every failure is a status 0 row, so a task never dies with its error unread
+            status[i] = 0
+        latency[i] = int((loop.time() - due) * 1e6)
+
+    tasks = set()
+    done = 0
+    async with AsyncHTTPClient(limit_per_host=connections, timeout=timeout) as client:
+        base = loop.time() + 0.05
+        next_progress = base + PROGRESS_INTERVAL
+        for i in range(n):
+            due = base + scheduled[i]
+            delay = due - loop.time()
+            if delay > 0.001:  # requests due within a millisecond go out together
+                await asyncio.sleep(delay)
+            lag[i] = max(0.0, loop.time() - due)
+            task = loop.create_task(send(i, due))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            if loop.time() >= next_progress:
+                done = i + 1 - len(tasks)
+                print(f"   {i + 1:,}/{n:,} sent  {len(tasks):,} in flight  {done:,} done  "
+                      f"schedule lag p99 {np.percentile(lag[:i + 1], 99) * 1000:.1f}ms")
+                next_progress += PROGRESS_INTERVAL
+        if tasks:
+            await asyncio.gather(*list(tasks))
+        opened = client.connections_opened
+
+    meta = {"source": "replay", "trace": trace.meta, "target": target, "speed": speed,
+            "connections": connections, "connections_opened": opened, "label": label,
+            "replayed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "schedule_lag_p99_ms": round(float(np.percentile(lag, 99)) * 1000, 3) if n else 0.0}
+    return Trace(trace.requests, (scheduled * 1e6).astype(np.int64), trace.request.copy(), status,
+                 latency, nbytes, meta)
+
+
+# =====================================================
+# Comparison
+# =====================================================
+
+def mann_whitney(baseline: np.ndarray, candidate: np.ndarray) -> Tuple[float, float]:
+    """One-sided Mann-Whitney U test that candidate values tend to be larger
+
+    Normal approximation with tie and continuity correction. Returns
+    (p-value, probability that a random candidate value exceeds a random
+    baseline value, ties counting half).
+    """
+    n1, n2 = len(baseline), len(candidate)
+    values, inverse, counts = np.unique(np.concatenate([baseline, candidate]), return_inverse=True,
+                                        return_counts=True)
+    ends = np.cumsum(counts)
+    ranks = (ends - (counts - 1) / 2.0)[inverse]  # average rank of each tie group
+    u = ranks[n1:].sum() - n2 * (n2 + 1) / 2.0
+    n = n1 + n2
+    ties = (counts.astype(np.float64) ** 3 - counts).sum()
+    variance = n1 * n2 / 12.0 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0, 0.5
+    z = (u - n1 * n2 / 2.0 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2)), u / (n1 * n2)
+
+
+def _buckets(latency_us: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Log-bucket indexes (1% wide) and counts of a latency sample"""
+    index = np.floor(np.log1p(latency_us.astype(np.float64)) / math.log1p(BUCKET_WIDTH)).astype(np.int64)
+    return np.unique(index, return_counts=True)
+
+
+def _resampled_quantiles(latency_us: np.ndarray, quantiles: Tuple[float, ...], rounds: int,
+                         rng: np.random.Generator) -> np.ndarray:
+    """Quantiles of `rounds` bootstrap resamples, shape (rounds, len(quantiles))"""
+    index, counts = _buckets(latency_us)
+    n = int(counts.sum())
+    draws = rng.multinomial(n, counts / n, size=rounds).cumsum(axis=1)
+    values = np.expm1(index * math.log1p(BUCKET_WIDTH))
+    out = np.empty((rounds, len(quantiles)))
+    for j, q in enumerate(quantiles):
+        rank = max(1, math.ceil(q * n))
+        out[:, j] = values[np.argmax(draws >= rank, axis=1)]
+    return out
+
+
+def _holm(p_values: List[float]) -> List[float]:
+    order = sorted(range(len(p_values)), key=lambda i: p_values[i])
+    adjusted = [1.0] * len(p_values)
+    running = 0.0
+    for rank, i in enumerate(order):
+        running = max(running, min(1.0, (len(p_values) - rank) * p_values[i]))
+        adjusted[i] = running
+    return adjusted
+
+
+def _error_test(base_errors: int, base_n: int, cand_errors: int, cand_n: int) -> float:
+    """One-sided two-proportion z-test that the candidate error rate is higher"""
+    pooled = (base_errors + cand_errors) / (base_n + cand_n)
+    if pooled in (0.0, 1.0):
+        return 1.0
+    z = (cand_errors / cand_n - base_errors / base_n) / math.sqrt(pooled * (1 - pooled) * (1 / base_n + 1 / cand_n))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(baseline: Trace, candidate: Trace, alpha: float = DEFAULT_ALPHA,
+            min_change: float = DEFAULT_MIN_CHANGE, max_error_increase: float = DEFAULT_MAX_ERROR_INCREASE,
+            min_requests: int = DEFAULT_MIN_REQUESTS, rounds: int = DEFAULT_BOOTSTRAP, seed: int = 0) -> Dict:
+    """Per-endpoint and overall latency and error comparison of two traces"""
+    rng = np.random.default_rng(seed)
+    groups = {}
+    for side, trace in (("baseline", baseline), ("candidate", candidate)):
+        names = trace.endpoints()
+        ok = ~trace.errors()
+        groups.setdefault("ALL", {})[side] = (trace.latency_us[ok], len(trace), int((~ok).sum()))
+        for name in np.unique(names) if len(names) else []:
+            mask = names == name
+            groups.setdefault(name, {})[side] = (trace.latency_us[mask & ok], int(mask.sum()),
+                                                 int((mask & ~ok).sum()))
+
+    rows = []
+    for name, sides in groups.items():
+        if len(sides) < 2:
+            continue
+        (base, base_n, base_err), (cand, cand_n, cand_err) = sides["baseline"], sides["candidate"]
+        row = {"endpoint": name, "baseline_n": base_n, "candidate_n": cand_n,
+               "baseline_error_pct": round(100.0 * base_err / base_n, 3),
+               "candidate_error_pct": round(100.0 * cand_err / cand_n, 3),
+               "error_p": _error_test(base_err, base_n, cand_err, cand_n), "tested": False}
+        if len(base) >= min_requests and len(cand) >= min_requests:
+            p, superiority = mann_whitney(base, cand)
+            p_faster, _ = mann_whitney(cand, base)
+            base_q = np.quantile(base, (0.5, 0.95))
+            cand_q = np.quantile(cand, (0.5, 0.95))
+            ratios = (_resampled_quantiles(cand, (0.5, 0.95), rounds, rng)
+                      / np.maximum(_resampled_quantiles(base, (0.5, 0.95), rounds, rng), 1.0))
+            low, high = np.percentile(ratios, (100 * alpha / 2, 100 * (1 - alpha / 2)), axis=0)
+            row.update({
+                "tested": True, "p": p, "p_faster": p_faster, "superiority": round(superiority, 4),
+                "baseline_p50_ms": round(base_q[0] / 1000, 3), "candidate_p50_ms": round(cand_q[0] / 1000, 3),
+                "baseline_p95_ms": round(base_q[1] / 1000, 3), "candidate_p95_ms": round(cand_q[1] / 1000, 3),
+                "p50_ratio": round(cand_q[0] / max(base_q[0], 1.0), 4),
+                "p50_ratio_ci": [round(low[0], 4), round(high[0], 4)],
+                "p95_ratio": round(cand_q[1] / max(base_q[1], 1.0), 4),
+                "p95_ratio_ci": [round(low[1], 4), round(high[1], 4)],
+            })
+        rows.append(row)
+
+    tested = [row for row in rows if row["tested"]]
+    for row, adjusted, faster in zip(tested, _holm([row["p"] for row in tested]),
+                                     _holm([row["p_faster"] for row in tested])):
+        row["p_holm"], row["p_faster_holm"] = adjusted, faster
+    for row, adjusted in zip(rows, _holm([row["error_p"] for row in rows])):
+        row["error_p_holm"] = adjusted
+
+    for row in rows:
+        reasons = []
+        if row["tested"] and row["p_holm"] < alpha:
+            if row["p50_ratio_ci"][0] > 1 + min_change:
+                reasons.append(f"p50 x{row['p50_ratio']:.2f}")
+            if row["p95_ratio_ci"][0] > 1 + min_change:
+                reasons.append(f"p95 x{row['p95_ratio']:.2f}")
+        if row["error_p_holm"] < alpha and row["candidate_error_pct"] - row["baseline_error_pct"] > max_error_increase:
+            reasons.append(f"errors {row['baseline_error_pct']:.2f}% -> {row['candidate_error_pct']:.2f}%")
+        row["regression"] = reasons
+        row["improvement"] = bool(row["tested"] and not reasons and row["p_faster_holm"] < alpha
+                                  and row["p50_ratio_ci"][1] < 1 - min_change)
+    rows.sort(key=lambda row: (row["endpoint"] != "ALL", -len(row["regression"]), row["endpoint"]))
+    return {"baseline": baseline.meta, "candidate": candidate.meta, "alpha": alpha, "min_change": min_change,
+            "bootstrap_rounds": rounds, "endpoints": rows,
+            "regressions": [row["endpoint"] for row in rows if row["regression"]]}
+
+
+def print_comparison(result: Dict):
+    print(f"   {'endpoint':<48} {'n':>7} {'p50 ms':>17} {'p50 ratio (CI)':>22} {'p95 ratio (CI)':>22} "
+          f"{'p (Holm)':>9}")
+    for row in result["endpoints"]:
+        marker = "❌" if row["regression"] else ("✅" if row["improvement"] else "  ")
+        n = min(row["baseline_n"], row["candidate_n"])
+        if not row["tested"]:
+            print(f"{marker} {row['endpoint'][:48]:<48} {n:>7}  too few requests to test")
+            continue
+        p50 = f"{row['baseline_p50_ms']:.1f} -> {row['candidate_p50_ms']:.1f}"
+        ci50 = f"{row['p50_ratio']:.3f} ({row['p50_ratio_ci'][0]:.3f}-{row['p50_ratio_ci'][1]:.3f})"
+        ci95 = f"{row['p95_ratio']:.3f} ({row['p95_ratio_ci'][0]:.3f}-{row['p95_ratio_ci'][1]:.3f})"
+        print(f"{marker} {row['endpoint'][:48]:<48} {n:>7} {p50:>17} {ci50:>22} {ci95:>22} {row['p_holm']:>9.2g}"
+              + (f"  {', '.join(row['regression'])}" if row["regression"] else ""))
+
+
+def print_info(trace: Trace, path: str):
+    size = os.path.getsize(path)
+    print(f"📼 {path}: {len(trace):,} requests over {trace.span:,.1f}s "
+          f"({len(trace) / max(trace.span, 1e-9):,.1f} req/s), {len(trace.requests):,} distinct, "
+          f"{size / 1024:,.1f} KiB ({size / max(len(trace), 1):.1f} bytes/request)")
+    for key, value in trace.meta.items():
+        if not isinstance(value, dict):
+            print(f"   {key}: {value}")
+    if not len(trace):
+        return
+    errors = trace.errors()
+    print(f"   errors: {int(errors.sum()):,} ({100.0 * errors.mean():.2f}%)")
+    names = trace.endpoints()
+    print(f"   {'endpoint':<56} {'count':>8} {'p50':>9} {'p95':>9} {'p99':>9}")
+    unique, counts = np.unique(names, return_counts=True)
+    for i in np.argsort(-counts)[:25]:
+        latency = trace.latency_us[names == unique[i]] / 1000
+        p50, p95, p99 = np.percentile(latency, (50, 95, 99))
+        print(f"   {unique[i][:56]:<56} {counts[i]:>8,} {p50:>7.1f}ms {p95:>7.1f}ms {p99:>7.1f}ms")
+
+
+def check_ensure(trace: Trace, config_path: str) -> List[str]:
+    """Artillery ensure thresholds (load_generator.check_ensure) applied to a replay"""
+    from load_generator import LoadMetrics, check_ensure as ensure_failures, load_artillery_config
+
+    metrics = LoadMetrics()
+    for name, status, latency in zip(trace.endpoints(), trace.status.tolist(), (trace.latency_us / 1000).tolist()):
+        if status == 0:
+            metrics.record_error(HTTPError("transport failure"))
+        else:
+            metrics.record(name, status, latency)
+    return ensure_failures(load_artillery_config(config_path)["ensure"], metrics)
+
+
+def _load(path: str) -> Trace:
+    try:
+        return Trace.load(path)
+    except (OSError, ValueError, KeyError, zlib.error) as e:
+        print(f"❌ Could not read trace {path}: {e}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record, replay and compare ASR PO System traffic")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("record", help="Build a trace from an access log")
+    p.add_argument("log", help="Access log ('-' for stdin)")
+    p.add_argument("-o", "--output", required=True)
+    p.add_argument("--format", choices=("auto",) + tuple(PARSERS), default="auto")
+    p.add_argument("--time-unit", choices=tuple(TIME_UNITS), default="s",
+                   help="Unit of the combined log's trailing response time (default: s, as nginx $request_time)")
+    p.add_argument("--logged-at", choices=("end", "start"), default="end",
+                   help="Whether log timestamps mark the end (nginx) or start of each request")
+
+    p = sub.add_parser("proxy", help="Record traffic through a capture proxy")
+    p.add_argument("--listen", default="127.0.0.1:8080")
+    p.add_argument("--upstream", required=True, help="e.g. http://localhost:3000")
+    p.add_argument("-o", "--output", required=True)
+    p.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS)
+
+    p = sub.add_parser("info", help="Summarise a trace")
+    p.add_argument("trace")
+
+    p = sub.add_parser("replay", help="Replay a trace against a target")
+    p.add_argument("trace")
+    p.add_argument("--target", required=True, help="e.g. http://localhost:3000")
+    p.add_argument("--speed", type=float, default=1.0, help="Time compression, 1-50 (default: 1)")
+    p.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS,
+                   help="Keep-alive connections to the target (default: %(default)s)")
+    p.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    p.add_argument("--header", action="append", default=[], help="Extra header for every request, 'Name: value'")
+    p.add_argument("--limit", type=int, help="Only replay the first N requests")
+    p.add_argument("--label", help="Build label stored with the result")
+    p.add_argument("-o", "--output", help="Write the measured trace here")
+    p.add_argument("--ensure", nargs="?", const=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                             "load-testing", "artillery-config.yml"),
+                   help="Check the ensure thresholds of an Artillery config (default: load-testing/artillery-config.yml)")
+
+    p = sub.add_parser("compare", help="Compare a candidate build's trace with a baseline")
+    p.add_argument("baseline")
+    p.add_argument("candidate")
+    p.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="Significance level (default: %(default)s)")
+    p.add_argument("--min-change", type=float, default=DEFAULT_MIN_CHANGE,
+                   help="Smallest slowdown that counts, as a fraction (default: %(default)s)")
+    p.add_argument("--max-error-increase", type=float, default=DEFAULT_MAX_ERROR_INCREASE,
+                   help="Error rate rise, in percentage points, that counts (default: %(default)s)")
+    p.add_argument("--min-requests", type=int, default=DEFAULT_MIN_REQUESTS,
+                   help="Requests per build an endpoint needs to be tested (default: %(default)s)")
+    p.add_argument("--bootstrap", type=int, default=DEFAULT_BOOTSTRAP, help="Bootstrap resamples")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", help="Write the comparison to this file")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        started = time.perf_counter()
+        f = sys.stdin if args.log == "-" else open(args.log, "r", encoding="utf-8", errors="replace")
+        try:
+            trace, skipped = record_log(f, args.format, args.time_unit, args.logged_at,
+                                        {"source": "access-log", "log": os.path.basename(args.log)})
+        finally:
+            if f is not sys.stdin:
+                f.close()
+        if not len(trace):
+            print(f"❌ No requests recognised in {args.log}")
+            sys.exit(1)
+        size = trace.save(args.output)
+        print(f"✅ {len(trace):,} requests ({skipped:,} lines skipped) -> {args.output}, "
+              f"{size / 1024:,.1f} KiB in {time.perf_counter() - started:.1f}s")
+        if not trace.latency_us.any():
+            print("⚠️  The log has no response times; the trace is usable for replay only")
+
+    elif args.command == "proxy":
+        host, _, port = args.listen.rpartition(":")
+        proxy = CaptureProxy(args.upstream, args.connections)
+        asyncio.run(proxy.serve(host or "127.0.0.1", int(port), args.output))
+        if len(proxy.builder):
+            proxy.builder.build().save(args.output)
+        print(f"✅ {len(proxy.builder):,} requests recorded to {args.output}")
+
+    elif args.command == "info":
+        print_info(_load(args.trace), args.trace)
+
+    elif args.command == "replay":
+        if not 0 < args.speed <= 50:
+            print("❌ --speed must be between 0 and 50")
+            sys.exit(1)
+        trace = _load(args.trace)
+        if args.limit:
+            trace = Trace(trace.requests, trace.start_us[:args.limit], trace.request[:args.limit],
+                          trace.status[:args.limit], trace.latency_us[:args.limit], trace.bytes[:args.limit],
+                          trace.meta)
+        headers = dict(h.split(":", 1) for h in args.header)
+        headers = {name.strip(): value.strip() for name, value in headers.items()}
+        print(f"▶️  Replaying {len(trace):,} requests ({trace.span:,.0f}s) against {args.target} "
+              f"at {args.speed:g}x -> {trace.span / args.speed:,.0f}s")
+        started = time.perf_counter()
+        result = asyncio.run(replay(trace, args.target, args.speed, args.connections, args.timeout,
+                                    headers, args.label))
+        elapsed = time.perf_counter() - started
+        print(f"📊 {len(result):,} requests in {elapsed:.1f}s ({len(result) / elapsed:,.0f} req/s), "
+              f"{int(result.errors().sum()):,} errors, {result.meta['connections_opened']} connections, "
+              f"schedule lag p99 {result.meta['schedule_lag_p99_ms']:.1f}ms")
+        if result.meta["schedule_lag_p99_ms"] > 100:
+            print("⚠️  Requests left late: the replay client is saturated, lower --speed or raise --connections")
+        if args.output:
+            size = result.save(args.output)
+            print(f"📝 Measured trace written to {args.output} ({size / 1024:,.1f} KiB)")
+        if args.ensure:
+            failures = check_ensure(result, args.ensure)
+            for failure in failures:
+                print(f"❌ ensure: {failure}")
+            if failures:
+                sys.exit(1)
+            print("✅ All ensure thresholds met")
+
+    elif args.command == "compare":
+        baseline, candidate = _load(args.baseline), _load(args.candidate)
+        started = time.perf_counter()
+        result = compare(baseline, candidate, args.alpha, args.min_change, args.max_error_increase,
+                         args.min_requests, args.bootstrap, args.seed)
+        labels = [trace.meta.get("label") or path for trace, path in
+                  ((baseline, args.baseline), (candidate, args.candidate))]
+        print(f"🔬 {labels[0]} ({len(baseline):,} requests) vs {labels[1]} ({len(candidate):,} requests), "
+              f"alpha {args.alpha:g}, min change {args.min_change:.0%} "
+              f"[{time.perf_counter() - started:.2f}s]")
+        print_comparison(result)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+            print(f"📝 Comparison written to {args.json}")
+        if result["regressions"]:
+            print(f"❌ {len(result['regressions'])} regression(s): {', '.join(result['regressions'])}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
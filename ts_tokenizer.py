@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+"""
+TypeScript-aware tokenizer and module scanner for codemods
+
+tokenize() splits TypeScript/JavaScript source into tokens that keep
+their exact source offsets, so transforms can splice text without
+disturbing anything around it (whitespace is left implicit in the gaps). Strings, comments, template literals
+(including nested ${...} expressions) and regular expression literals
+are single tokens, which means braces, quotes or the word "import"
+inside them never confuse the scanner.
+
+scan_module() walks the top-level statements and indexes import and
+export declarations, including multi-line imports, `import type`,
+side-effect imports, re-exports and `export { a as GET }` lists.
+
+JSX text is lexed as code; an apostrophe in JSX text starts a string
+that ends at the end of its line, so damage never spreads past it.
+
+Usage:
+    info = scan_module(open("web/src/app/api/po/route.ts").read())
+    [(d.specifier, d.names) for d in info.imports]
+    info.exported_names()          # {"GET", "POST", "dynamic"}
+    info.export("dynamic").value   # "'force-dynamic'"
+
+    python ts_tokenizer.py web/src/app/api/po/route.ts   # print the index
+"""
+
+import json
+import re
+import sys
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+WS, COMMENT, STRING, TEMPLATE, REGEX, IDENT, NUMBER, PUNCT = (
+    "ws", "comment", "string", "template", "regex", "ident", "number", "punct")
+TRIVIA = (WS, COMMENT)
+
+_WS = re.compile(r"[ \t\r\n\f\v\u00a0\ufeff\u2028\u2029]+")
+_NEWLINE = re.compile(r"\n")
+_LINE_COMMENT = re.compile(r"//[^\n]*")
+_BLOCK_COMMENT = re.compile(r"/\*[\s\S]*?(?:\*/|\Z)")
+# Unterminated strings stop at the end of the line, like the TS compiler's recovery
+_STRING = {
+    "'": re.compile(r"'(?:[^'\\\n]|\\[\s\S])*'?"),
+    '"': re.compile(r'"(?:[^"\\\n]|\\[\s\S])*"?'),
+}
+_IDENT = re.compile(r"(?:[^\W\d]|\$)[\w$]*")
+_NUMBER = re.compile(r"(?:0[xXoObB][\da-fA-F_]+|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?)n?")
+_REGEX = re.compile(r"/(?![*/])(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+_PUNCT = re.compile(r">>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|&&=|\|\|=|\?\?=|=>|==|!=|<=|>=|&&|\|\||"
+                    r"\?\?|\?\.(?!\d)|\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|<<|\*\*|[\s\S]")
+_TEMPLATE_CHUNK = re.compile(r"(?:[^`\\$]|\\[\s\S]|\$(?!\{))*")
+# One match per token, leading whitespace included: the group name is the
+# token kind; "/" and "`" need context
+_TOKEN = re.compile(rf"(?=(?P<ws>{_WS.pattern[:-1]}*))(?P=ws)(?:" + "|".join([
+    rf"(?P<{COMMENT}>{_LINE_COMMENT.pattern}|{_BLOCK_COMMENT.pattern})",
+    rf"(?P<{STRING}>{_STRING[chr(39)].pattern}|{_STRING[chr(34)].pattern})",
+    rf"(?P<{IDENT}>{_IDENT.pattern})",
+    rf"(?P<{NUMBER}>(?=\.?\d){_NUMBER.pattern})",
+    r"(?P<slash>/)",
+    r"(?P<tick>`)",
+    rf"(?P<{PUNCT}>{_PUNCT.pattern})",
+]) + ")")
+
+# After these keywords a "/" starts a regular expression, not a division
+_EXPRESSION_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+                        "throw", "case", "do", "else", "yield", "await"}
+_OPENERS = {"{": "}", "(": ")", "[": "]"}
+_CLOSERS = {"}", ")", "]"}
+# Keywords that start a new top-level statement (used to end ASI statements)
+_STATEMENT_KEYWORDS = {"import", "export", "const", "let", "var", "function", "async", "class",
+                       "interface", "type", "enum", "declare", "abstract", "namespace", "@"}
+
+
+class Token:
+    __slots__ = ("kind", "text", "start", "end", "line")
+
+    def __init__(self, kind: str, text: str, start: int, end: int, line: int = 0):
+        self.kind = kind
+        self.text = text
+        self.start = start
+        self.end = end
+        self.line = line
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.text!r}, {self.start}, line {self.line})"
+
+
+def _regex_allowed(prev_kind: Optional[str], prev_text: Optional[str]) -> bool:
+    if prev_kind is None:
+        return True
+    if prev_kind == IDENT:
+        return prev_text in _EXPRESSION_KEYWORDS
+    if prev_kind == PUNCT:
+        return prev_text not in (")", "]", "}", "++", "--")
+    return False
+
+
+def _lex(src: str, pos: int, out: Optional[List[Token]], nested: bool) -> int:
+    """Lex from pos, appending to out; in nested mode stop after the "}" closing a ${...}"""
+    n = len(src)
+    depth = 0
+    prev_kind, prev_text = None, None
+    match_token = _TOKEN.match
+    while pos < n:
+        match = match_token(src, pos)
+        if match is None:
+            break  # trailing whitespace
+        kind, end = match.lastgroup, match.end()
+        pos = match.start(kind)
+        if kind == "slash":
+            kind = PUNCT
+            if _regex_allowed(prev_kind, prev_text):
+                regex = _REGEX.match(src, pos)
+                if regex:
+                    kind, end = REGEX, regex.end()
+            if kind == PUNCT:
+                end = _PUNCT.match(src, pos).end()
+        elif kind == "tick":
+            kind, end = TEMPLATE, _scan_template(src, pos)
+        elif kind == PUNCT and nested:
+            text = src[pos]
+            if text == "{":
+                depth += 1
+            elif text == "}":
+                if depth == 0:
+                    return end
+                depth -= 1
+        if kind != COMMENT:
+            prev_kind, prev_text = kind, src[pos:end]
+        if out is not None:
+            out.append(Token(kind, src[pos:end], pos, end))
+        pos = end
+    return pos
+
+
+def _scan_template(src: str, pos: int) -> int:
+    """End offset of the template literal starting at pos"""
+    pos += 1
+    n = len(src)
+    while pos < n:
+        pos = _TEMPLATE_CHUNK.match(src, pos).end()
+        if pos >= n:
+            break
+        if src[pos] == "`":
+            return pos + 1
+        # "${": skip the embedded expression, which may hold its own templates
+        pos = _lex(src, pos + 2, None, nested=True)
+    return n
+
+
+def tokenize(source: str) -> List[Token]:
+    """Comment and code tokens with 1-based start lines
+
+    Whitespace is not materialised (it is a third of all tokens); the
+    gaps between consecutive token offsets are exactly the whitespace.
+    """
+    tokens: List[Token] = []
+    _lex(source, 0, tokens, nested=False)
+    line_starts = [0] + [m.end() for m in _NEWLINE.finditer(source)]
+    for token in tokens:
+        token.line = bisect_right(line_starts, token.start)
+    return tokens
+
+
+class ImportDecl:
+    """One import declaration: `import a, { b as c, type D } from 'x';`"""
+
+    __slots__ = ("specifier", "default", "namespace", "names", "type_only", "start", "end", "line")
+
+    def __init__(self, start: int, line: int):
+        self.specifier: Optional[str] = None
+        self.default: Optional[str] = None
+        self.namespace: Optional[str] = None
+        self.names: List[str] = []  # local names bound by the braces
+        self.type_only = False
+        self.start = start
+        self.end = start
+        self.line = line
+
+    def bindings(self) -> List[str]:
+        return [name for name in (self.default, self.namespace) if name] + self.names
+
+    def to_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class ExportDecl:
+    """One export declaration
+
+    kind is one of: const, let, var, function, class, interface, type,
+    enum, namespace, default, named (export { ... }), reexport
+    (export { ... } from / export * from). value holds the initializer
+    text of a const/let/var export.
+    """
+
+    __slots__ = ("kind", "names", "value", "specifier", "is_async", "type_only", "start", "end", "line")
+
+    def __init__(self, kind: str, start: int, line: int):
+        self.kind = kind
+        self.names: List[str] = []
+        self.value: Optional[str] = None
+        self.specifier: Optional[str] = None
+        self.is_async = False
+        self.type_only = False
+        self.start = start
+        self.end = start
+        self.line = line
+
+    def to_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class ModuleInfo:
+    def __init__(self, source: str, tokens: List[Token]):
+        self.source = source
+        self.tokens = tokens
+        self.imports: List[ImportDecl] = []
+        self.exports: List[ExportDecl] = []
+
+    def exported_names(self) -> set:
+        return {name for decl in self.exports for name in decl.names}
+
+    def export(self, name: str) -> Optional[ExportDecl]:
+        return next((decl for decl in self.exports if name in decl.names), None)
+
+    def imported_specifiers(self) -> List[str]:
+        return [decl.specifier for decl in self.imports if decl.specifier]
+
+    def imports_end(self) -> int:
+        """Offset just past the last top-level import (0 if there are none)"""
+        return max((decl.end for decl in self.imports), default=0)
+
+    def to_dict(self) -> Dict:
+        return {"imports": [d.to_dict() for d in self.imports],
+                "exports": [d.to_dict() for d in self.exports]}
+
+
+def string_value(token: Token) -> str:
+    """Contents of a string literal token (escapes are left as written)"""
+    return token.text[1:-1] if len(token.text) >= 2 else token.text[1:]
+
+
+class _StatementScanner:
+    """Top-level statement walker over significant (non-trivia) tokens"""
+
+    def __init__(self, source: str, tokens: List[Token]):
+        self.source = source
+        self.tokens = [t for t in tokens if t.kind not in TRIVIA]
+        self.i = 0
+
+    def peek(self, offset: int = 0) -> Optional[Token]:
+        index = self.i + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def is_(self, text: str, offset: int = 0) -> bool:
+        token = self.peek(offset)
+        return token is not None and token.text == text and token.kind in (IDENT, PUNCT)
+
+    def skip_group(self):
+        """Advance past the bracketed group starting at the current token"""
+        depth = 0
+        while self.i < len(self.tokens):
+            token = self.tokens[self.i]
+            self.i += 1
+            if token.kind == PUNCT:
+                if token.text in _OPENERS:
+                    depth += 1
+                elif token.text in _CLOSERS:
+                    depth -= 1
+                    if depth <= 0:
+                        return
+
+    def skip_statement(self) -> Optional[Token]:
+        """Advance to the end of the current statement; returns its last token"""
+        last = None
+        while self.i < len(self.tokens):
+            token = self.tokens[self.i]
+            if last is not None and token.line > last.line and token.kind in (IDENT, PUNCT) \
+                    and token.text in _STATEMENT_KEYWORDS and last.text not in ("=", ",", "=>", "(", "."):
+                return last  # ASI: a new declaration starts on the next line
+            if token.kind == PUNCT and token.text in _OPENERS:
+                start = self.i
+                self.skip_group()
+                last = self.tokens[self.i - 1] if self.i > start else token
+                continue
+            self.i += 1
+            last = token
+            if token.kind == PUNCT and token.text == ";":
+                return token
+        return last
+
+    def brace_names(self) -> List[str]:
+        """Names bound by `{ a, b as c, type D }`: the local name for imports, the public one for exports"""
+        names = []
+        self.i += 1  # "{"
+        while self.i < len(self.tokens) and not self.is_("}"):
+            item = []
+            while self.i < len(self.tokens) and not self.is_(",") and not self.is_("}"):
+                item.append(self.tokens[self.i].text)
+                self.i += 1
+            if self.is_(","):
+                self.i += 1
+            if item and item[0] == "type" and len(item) > 1:
+                item = item[1:]
+            if not item:
+                continue
+            name = item[0]
+            if "as" in item[1:]:
+                position = item.index("as", 1)
+                if position + 1 < len(item):
+                    name = item[position + 1]
+            names.append(name.strip("'\""))
+        self.i += 1  # "}"
+        return names
+
+    def end_after(self, decl, last: Optional[Token]):
+        if last is not None:
+            decl.end = last.end
+
+    def finish_clause(self, decl, last: Optional[Token]) -> Optional[Token]:
+        """Consume `from 'x'`, import attributes and a trailing semicolon"""
+        if self.is_("from") and self.peek(1) is not None and self.peek(1).kind == STRING:
+            decl.specifier = string_value(self.peek(1))
+            last = self.peek(1)
+            self.i += 2
+        if (self.is_("assert") or self.is_("with")) and self.is_("{", 1) \
+                and self.peek().line == (last.line if last else self.peek().line):
+            self.i += 1
+            self.skip_group()
+            last = self.tokens[self.i - 1]
+        if self.is_(";"):
+            last = self.peek()
+            self.i += 1
+        return last
+
+    def parse_import(self, info: ModuleInfo):
+        keyword = self.peek()
+        decl = ImportDecl(keyword.start, keyword.line)
+        self.i += 1
+        last = keyword
+        if self.is_("type") and not (self.is_(",", 1) or self.is_("from", 1)):
+            decl.type_only = True
+            last = self.peek()
+            self.i += 1
+        token = self.peek()
+        if token is not None and token.kind == STRING:
+            decl.specifier = string_value(token)
+            self.i += 1
+            last = self.finish_clause(decl, token)
+        else:
+            while self.i < len(self.tokens) and not self.is_("from"):
+                token = self.peek()
+                if self.is_("{"):
+                    decl.names.extend(self.brace_names())
+                    last = self.tokens[self.i - 1]
+                elif self.is_("*") and self.is_("as", 1):
+                    decl.namespace = self.peek(2).text if self.peek(2) else None
+                    last = self.peek(2) or token
+                    self.i += 3
+                elif self.is_("="):
+                    # TS `import x = require('y')` / `import x = A.B`
+                    self.i += 1
+                    for candidate in self.tokens[self.i:self.i + 4]:
+                        if candidate.kind == STRING:
+                            decl.specifier = string_value(candidate)
+                            break
+                    last = self.skip_statement() or token
+                    break
+                elif self.is_(","):
+                    self.i += 1
+                elif token.kind == IDENT and decl.default is None:
+                    decl.default = token.text
+                    last = token
+                    self.i += 1
+                else:
+                    last = self.skip_statement() or token  # unrecognised: resync at the statement end
+                    break
+            last = self.finish_clause(decl, last)
+        decl.end = last.end
+        info.imports.append(decl)
+
+    def parse_export(self, info: ModuleInfo):
+        keyword = self.peek()
+        self.i += 1
+        while self.is_("declare"):
+            self.i += 1
+        token = self.peek()
+        if token is None:
+            return
+
+        if self.is_("default"):
+            decl = ExportDecl("default", keyword.start, keyword.line)
+            decl.names.append("default")
+            self.i += 1
+            decl.is_async = self.is_("async")
+            decl.end = self._skip_declaration_or_statement(keyword).end
+        elif self.is_("{") or (self.is_("type") and self.is_("{", 1)):
+            type_only = self.is_("type")
+            if type_only:
+                self.i += 1
+            names = self.brace_names()
+            last = self.tokens[self.i - 1]
+            decl = ExportDecl("named", keyword.start, keyword.line)
+            decl.type_only = type_only
+            decl.names = names
+            last = self.finish_clause(decl, last)
+            if decl.specifier is not None:
+                decl.kind = "reexport"
+            decl.end = last.end
+        elif self.is_("*"):
+            decl = ExportDecl("reexport", keyword.start, keyword.line)
+            self.i += 1
+            if self.is_("as"):
+                decl.names.append(self.peek(1).text.strip("'\"") if self.peek(1) else "*")
+                self.i += 2
+            last = self.finish_clause(decl, self.tokens[self.i - 1])
+            decl.end = last.end
+        elif self.is_("import"):
+            # `export import A = B.C` (TS namespaces alias)
+            decl = ExportDecl("named", keyword.start, keyword.line)
+            decl.names.append(self.peek(1).text if self.peek(1) else "")
+            decl.end = self.skip_statement().end
+        else:
+            decl = self._parse_declaration(keyword)
+        info.exports.append(decl)
+
+    def _parse_declaration(self, keyword: Token) -> ExportDecl:
+        is_async = self.is_("async")
+        if is_async:
+            self.i += 1
+        if self.is_("abstract"):
+            self.i += 1
+        token = self.peek()
+        kind = token.text if token is not None else ""
+        decl = ExportDecl(kind, keyword.start, keyword.line)
+        decl.is_async = is_async
+
+        if kind in ("const", "let", "var"):
+            self.i += 1
+            if self.is_("enum"):  # `export const enum X {}`
+                decl.kind = "enum"
+                decl.names.append(self.peek(1).text)
+                self.i += 2
+                self.skip_group()
+                decl.end = self.tokens[self.i - 1].end
+                return decl
+            self._parse_variables(decl)
+        elif kind in ("function", "class", "interface", "type", "enum", "namespace", "module"):
+            self.i += 1
+            if self.is_("*"):
+                self.i += 1
+            name = self.peek()
+            if name is not None and name.kind == IDENT:
+                decl.names.append(name.text)
+            decl.kind = "namespace" if kind == "module" else kind
+            if kind == "type":
+                decl.end = self.skip_statement().end
+            else:
+                decl.end = self._skip_declaration_body(keyword).end
+        else:
+            decl.kind = "unknown"
+            decl.end = (self.skip_statement() or keyword).end
+        return decl
+
+    def _parse_variables(self, decl: ExportDecl):
+        """`NAME [: Type] = value[, NAME2 = value2]` up to the end of the statement"""
+        first = True
+        while self.i < len(self.tokens):
+            name = self.peek()
+            if name.kind == PUNCT and name.text in ("{", "["):
+                start = self.i
+                self.skip_group()
+                decl.names.extend(t.text for t in self.tokens[start:self.i]
+                                  if t.kind == IDENT and not self._is_property_key(t))
+            else:
+                decl.names.append(name.text)
+                self.i += 1
+            value_start = None
+            last = self.tokens[self.i - 1]
+            depth = 0
+            while self.i < len(self.tokens):
+                token = self.peek()
+                if token.kind == PUNCT:
+                    if token.text in _OPENERS:
+                        depth += 1
+                    elif token.text in _CLOSERS:
+                        depth -= 1
+                    elif depth == 0 and token.text in (";", ","):
+                        break
+                    elif depth == 0 and token.text == "=" and value_start is None:
+                        self.i += 1
+                        value_start = self.peek()
+                        continue
+                if depth == 0 and token.line > last.line and token.text in _STATEMENT_KEYWORDS \
+                        and last.text not in ("=", ",", "=>", "(", ".", "?", ":", "&&", "||", "??"):
+                    break
+                last = token
+                self.i += 1
+            if value_start is not None and first:
+                decl.value = self.source[value_start.start:last.end]
+            first = False
+            decl.end = last.end
+            if self.is_(","):
+                self.i += 1
+                continue
+            if self.is_(";"):
+                decl.end = self.peek().end
+                self.i += 1
+            return
+
+    def _is_property_key(self, token: Token) -> bool:
+        index = self.tokens.index(token)
+        return index + 1 < len(self.tokens) and self.tokens[index + 1].text == ":"
+
+    def _skip_declaration_body(self, fallback: Token) -> Token:
+        """Advance past a function/class/interface/enum/namespace body"""
+        prev = None
+        while self.i < len(self.tokens):
+            token = self.peek()
+            if token.kind == PUNCT and token.text == ";":
+                self.i += 1
+                return token  # overload signature / declare
+            if token.kind == PUNCT and token.text == "{" and (
+                    prev is None or prev.text not in (":", "|", "&", "<", ",", "=>", "?", "=")):
+                self.skip_group()
+                return self.tokens[self.i - 1]
+            if token.kind == PUNCT and token.text in ("(", "[", "{"):
+                self.skip_group()
+                prev = self.tokens[self.i - 1]
+                continue
+            prev = token
+            self.i += 1
+        return prev or fallback
+
+    def _skip_declaration_or_statement(self, fallback: Token) -> Token:
+        if self.is_("async"):
+            self.i += 1
+        if self.is_("function") or self.is_("class") or self.is_("abstract"):
+            return self._skip_declaration_body(fallback)
+        return self.skip_statement() or fallback
+
+    def scan(self, info: ModuleInfo):
+        while self.i < len(self.tokens):
+            token = self.peek()
+            if token.kind == IDENT and token.text == "import" and not (self.is_("(", 1) or self.is_(".", 1)):
+                self.parse_import(info)
+            elif token.kind == IDENT and token.text == "export":
+                self.parse_export(info)
+            elif token.kind == PUNCT and token.text in _OPENERS:
+                self.skip_group()
+            else:
+                self.i += 1
+
+
+def scan_module(source: str) -> ModuleInfo:
+    """Tokenize source and index its top-level imports and exports"""
+    tokens = tokenize(source)
+    info = ModuleInfo(source, tokens)
+    _StatementScanner(source, tokens).scan(info)
+    return info
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: python ts_tokenizer.py FILE.ts [...]")
+        sys.exit(2)
+    for path in sys.argv[1:]:
+        with open(path, encoding="utf-8") as f:
+            info = scan_module(f.read())
+        print(json.dumps({"path": path, **info.to_dict()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()